@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Словарь для браузера
+Большинство набранных слов правильные, и для них нужна только проверка
+по словарю. Редактор загружает словарь один раз и сам отмечает известные
+слова, а на сервер отправляет только неизвестные (за исправлениями).
+
+Формат - тот же минимальный автомат, что и DAWG (dawg.py), без частот и
+номеров слов: браузеру нужна только проверка слова. В отличие от фильтра
+Блума автомат точный: опечатка никогда не считается правильным словом.
+Массивы выровнены так, что JavaScript читает их через Uint32Array /
+Uint16Array / Uint8Array прямо из ArrayBuffer, без разбора.
+
+Формат (little-endian):
+    заголовок   MAGIC, число узлов, число ребер
+    first_edge  uint32[узлы + 1]  ребра узла i: first_edge[i]..first_edge[i+1]
+    target      uint32[ребра]     узел, в который ведет ребро
+    label       uint16[ребра]     код буквы (ребра узла отсортированы)
+    final       uint8[узлы]       1 - в узле заканчивается слово
+
+Метка - один код UTF-16, поэтому слова с символами вне BMP в словарь не
+попадают: браузер считает их неизвестными и проверяет на сервере.
+"""
+
+import sys
+import gzip
+import json
+import time
+import random
+import struct
+import pickle
+import hashlib
+import argparse
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from dawg import Dawg
+from georgian_tokenizer import iter_tokens
+
+MAGIC = b'KADICT01'
+HEADER = struct.Struct('<8sII')
+# Наибольший код метки (uint16): символы BMP
+MAX_LABEL = '\uffff'
+
+
+def in_bmp(word: str) -> bool:
+    """Слово помещается в метки uint16"""
+    return max(word, default='') <= MAX_LABEL
+
+
+def export_dawg(dawg: Dawg) -> bytes:
+    """Словарь для браузера из готового DAWG
+    ValueError - в DAWG есть символы вне BMP (такой DAWG экспортируется через export_words)"""
+    if not in_bmp(dawg.label_text):
+        outside = sorted({f"U+{ord(char):X}" for char in dawg.label_text if char > MAX_LABEL})
+        raise ValueError(f"Символы вне BMP не помещаются в метку uint16: {', '.join(outside[:5])}")
+    labels = array('H', (ord(char) for char in dawg.label_text))
+    final = bytes(dawg.final.tolist())
+    parts = [HEADER.pack(MAGIC, dawg.node_count, dawg.edge_count)]
+    for part in (array('I', dawg.first_edge), array('I', dawg.targets), labels):
+        if sys.byteorder != 'little':
+            part.byteswap()
+        parts.append(part.tobytes())
+    parts.append(final)
+    return b''.join(parts)
+
+
+def export_words(words: Iterable[str]) -> bytes:
+    """Словарь для браузера из списка слов
+    Слова с символами вне BMP пропускаются (метка ребра - uint16), их проверяет сервер"""
+    kept, skipped = {}, 0
+    for word in words:
+        if in_bmp(word):
+            kept[word] = 1
+        else:
+            skipped += 1
+    if skipped:
+        print(f"Слов с символами вне BMP (остаются на сервере): {skipped}")
+    return export_dawg(Dawg.build(kept))
+
+
+def export_vocabulary(vocabulary) -> Optional[bytes]:
+    """Словарь для браузера из словаря модели (None - словарь не перечисляет слова)"""
+    if isinstance(vocabulary, Dawg):
+        if not in_bmp(vocabulary.label_text):
+            return export_words(vocabulary.keys())
+        return export_dawg(vocabulary)
+    if isinstance(vocabulary, (set, frozenset)):
+        return export_words(vocabulary)
+    # Hunspell хранит основы и правила: проверка остается на сервере
+    return None
+
+
+def contains(data: bytes, word: str) -> bool:
+    """Проверка слова по экспортированному словарю (тот же алгоритм, что в app.js)"""
+    magic, nodes, edges = HEADER.unpack_from(data, 0)
+    offset = HEADER.size
+    first_edge = memoryview(data)[offset:offset + (nodes + 1) * 4].cast('I')
+    offset += (nodes + 1) * 4
+    targets = memoryview(data)[offset:offset + edges * 4].cast('I')
+    offset += edges * 4
+    labels = memoryview(data)[offset:offset + edges * 2].cast('H')
+    offset += edges * 2
+    final = data[offset:offset + nodes]
+    node = 0
+    for char in word:
+        code = ord(char)
+        for edge in range(first_edge[node], first_edge[node + 1]):
+            if labels[edge] == code:
+                node = targets[edge]
+                break
+        else:
+            return False
+    return final[node] == 1
+
+
+def _paragraph_hash(text: str) -> str:
+    return f"{len(text)}:{hashlib.md5(text.encode('utf-8')).hexdigest()[:8]}"
+
+
+def replay(texts: List[str], vocabulary, check_every: int = 5, typo_rate: float = 0.05,
+           max_words: int = 500, seed: int = 42) -> Dict[str, dict]:
+    """Воспроизведение сессий набора текста: запросы и байты трех протоколов
+    full        - весь текст на /check после каждой паузы
+    paragraphs  - /check/paragraphs: хеши абзацев, текст только новых
+    local       - словарь в браузере: на /suggest только новые неизвестные слова
+    Размер ответа оценивается по ошибкам с тремя исправлениями длины слова"""
+    rng = random.Random(seed)
+    letters = 'აბგდევზთიკლმნოპჟრსტუფქღყშჩცძწჭხჯჰ'
+    totals = {name: {'requests': 0, 'request_bytes': 0, 'response_bytes': 0}
+              for name in ('full', 'paragraphs', 'local')}
+
+    def error_bytes(words: List[str]) -> int:
+        errors = [{'word': word, 'suggestions': [word] * 3, 'start_pos': 0, 'end_pos': len(word)}
+                  for word in words]
+        return len(json.dumps({'errors': errors}, ensure_ascii=False).encode('utf-8'))
+
+    def record(name: str, body: dict, response: int) -> None:
+        totals[name]['requests'] += 1
+        totals[name]['request_bytes'] += len(json.dumps(body, ensure_ascii=False).encode('utf-8'))
+        totals[name]['response_bytes'] += response
+
+    for text in texts:
+        sent_hashes, resolved = set(), set()
+        lines = []
+        typed = 0
+        # Набор по словам (не больше max_words на сессию); часть слов с опечаткой
+        for line in text.split('\n'):
+            lines.append([])
+            for word in line.split():
+                if typed >= max_words:
+                    break
+                if len(word) > 2 and rng.random() < typo_rate:
+                    position = rng.randrange(len(word))
+                    word = word[:position] + rng.choice(letters) + word[position + 1:]
+                lines[-1].append(word)
+                typed += 1
+                if typed % check_every:
+                    continue
+
+                document = '\n'.join(' '.join(words) for words in lines)
+                unknown = [token for token, _, _ in iter_tokens(document) if token not in vocabulary]
+
+                record('full', {'text': document}, error_bytes(unknown))
+
+                paragraphs = []
+                for paragraph in document.split('\n'):
+                    if paragraph.strip():
+                        paragraph_hash = _paragraph_hash(paragraph)
+                        item = {'hash': paragraph_hash, 'offset': 0}
+                        if paragraph_hash not in sent_hashes:
+                            item['text'] = paragraph
+                            sent_hashes.add(paragraph_hash)
+                        paragraphs.append(item)
+                record('paragraphs', {'session': 'replay', 'revision': 1, 'paragraphs': paragraphs},
+                       error_bytes(unknown))
+
+                new_words = sorted(set(unknown) - resolved)
+                if new_words:
+                    resolved.update(new_words)
+                    record('local', {'words': new_words}, error_bytes(new_words))
+    return totals
+
+
+def _load_word_freq(model_path: str) -> Dict[str, int]:
+    with open(model_path, 'rb') as f:
+        model_data = pickle.load(f)
+    word_freq = dict(model_data.get('word_freq') or {})
+    for word in model_data.get('vocabulary', ()):
+        word_freq.setdefault(word, 1)
+    return word_freq
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Словарь для проверки слов в браузере')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель со словарем')
+    parser.add_argument('--output', default='georgian_spellchecker.dict',
+                       help='Файл словаря для браузера')
+    parser.add_argument('--replay', type=str,
+                       help='Папка с текстами: воспроизвести сессии набора и сравнить протоколы')
+    parser.add_argument('--sessions', type=int, default=20,
+                       help='Сколько текстов воспроизвести')
+    parser.add_argument('--check-every', type=int, default=5,
+                       help='Проверка после каждых N набранных слов (пауза в наборе)')
+    parser.add_argument('--max-words', type=int, default=500,
+                       help='Слов в одной сессии')
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"Модель не найдена: {args.model}")
+        return
+    word_freq = _load_word_freq(args.model)
+
+    start = time.perf_counter()
+    data = export_words(word_freq)
+    Path(args.output).write_bytes(data)
+    compressed = len(gzip.compress(data, 9))
+    print(f"Слов: {len(word_freq)}, словарь: {len(data) / 1e6:.2f} MB, gzip: {compressed / 1e6:.2f} MB "
+          f"({time.perf_counter() - start:.1f} с) -> {args.output}")
+    exported = sorted(word for word in word_freq if in_bmp(word))
+    sample = random.Random(0).sample(exported, min(1000, len(exported)))
+    mismatches = sum(1 for word in sample if not contains(data, word))
+    mismatches += sum(1 for word in sample if contains(data, word + 'ჯჯ') != (word + 'ჯჯ' in word_freq))
+    print(f"Расхождений проверки на {len(sample)} словах: {mismatches}")
+
+    if not args.replay:
+        return
+    files = sorted(Path(args.replay).glob('*.txt'))[:args.sessions]
+    if not files:
+        print(f"Тексты не найдены: {args.replay}")
+        return
+    texts = [path.read_text(encoding='utf-8', errors='ignore') for path in files]
+    totals = replay(texts, word_freq, args.check_every, max_words=args.max_words)
+
+    words = sum(min(len(text.split()), args.max_words) for text in texts)
+    print(f"\nСессий: {len(texts)}, набрано слов: {words}, проверка каждые {args.check_every} слов")
+    print(f"{'протокол':<12} {'запросов':>9} {'отправлено':>12} {'получено':>12}")
+    for name, total in totals.items():
+        print(f"{name:<12} {total['requests']:>9} {total['request_bytes'] / 1e3:>10.1f}KB "
+              f"{total['response_bytes'] / 1e3:>10.1f}KB")
+    full, local = totals['full'], totals['local']
+    if full['requests']:
+        print(f"\nlocal против full: запросов {local['requests'] / full['requests']:.1%}, "
+              f"байтов {(local['request_bytes'] + local['response_bytes']) / max(full['request_bytes'] + full['response_bytes'], 1):.1%} "
+              f"(+ словарь {compressed / 1e6:.2f} MB gzip один раз на версию модели)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Автодополнение по префиксу
+Редактор отмечает ошибки только после ввода; автодополнение предлагает
+частые слова словаря, которые начинаются с набранного префикса.
+
+Префиксное дерево (trie) строится из отсортированного словаря, и в каждом
+узле заранее лежат k самых частых слов его поддерева. Запрос - проход по
+буквам префикса и срез готового списка, без обхода поддерева и сортировки.
+Слова нумеруются по убыванию частоты, поэтому k лучших слов узла - это k
+наименьших номеров: список родителя собирается из готовых списков детей.
+Узлы хранятся плоскими массивами uint32, как в DAWG (dawg.py). Сам DAWG
+не подходит: его узлы общие для разных префиксов, а лучшие слова у этих
+префиксов разные.
+
+С предыдущим словом (bigram_model) первыми идут слова, которые чаще всего
+следуют за ним в корпусе. Для каждого слова хранится не больше
+max_followers таких продолжений, отсортированных при построении.
+"""
+
+import time
+import pickle
+import random
+import argparse
+from array import array
+from bisect import bisect_left
+from heapq import nlargest
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class CompletionIndex:
+    """Префиксное дерево с k лучшими словами в каждом узле"""
+
+    def __init__(self, words: List[str], first_edge: array, label_text: str, targets: array,
+                 top_start: array, top: array, k: int, followers: Optional[Dict[str, tuple]] = None):
+        self.words = words
+        self.first_edge = first_edge
+        self.label_text = label_text
+        self.targets = targets
+        self.top_start = top_start
+        self.top = top
+        self.k = k
+        self.followers = followers or {}
+
+    @classmethod
+    def build(cls, word_freq: Dict[str, int], k: int = 10, bigram_model: Optional[dict] = None,
+              max_followers: int = 50, min_bigram_count: int = 2) -> 'CompletionIndex':
+        """Построение из словаря частот (и биграмм для подсказок по предыдущему слову)"""
+        # Номер слова - место по убыванию частоты
+        words = sorted(word_freq, key=lambda word: (-word_freq[word], word))
+        rank = {word: number for number, word in enumerate(words)}
+        alphabetical = sorted(words)
+
+        # Узел - диапазон слов с общим префиксом в алфавитном порядке; обход в ширину
+        nodes = [(0, len(alphabetical), 0)]
+        first_edge = array('I', [0])
+        labels, targets = [], array('I')
+        for lo, hi, depth in nodes:
+            i = lo
+            # Слово, которое заканчивается в узле, стоит первым в его диапазоне
+            if i < hi and len(alphabetical[i]) == depth:
+                i += 1
+            while i < hi:
+                char = alphabetical[i][depth]
+                j = i + 1
+                while j < hi and alphabetical[j][depth] == char:
+                    j += 1
+                labels.append(char)
+                targets.append(len(nodes))
+                nodes.append((i, j, depth + 1))
+                i = j
+            first_edge.append(len(labels))
+
+        # Лучшие слова узлов снизу вверх: дети в обходе в ширину идут после родителя
+        tops = [None] * len(nodes)
+        for node in range(len(nodes) - 1, -1, -1):
+            lo, hi, depth = nodes[node]
+            if hi - lo <= k:
+                tops[node] = sorted(rank[word] for word in alphabetical[lo:hi])
+                continue
+            merged = [rank[alphabetical[lo]]] if len(alphabetical[lo]) == depth else []
+            for edge in range(first_edge[node], first_edge[node + 1]):
+                merged.extend(tops[targets[edge]])
+            merged.sort()
+            tops[node] = merged[:k]
+
+        top_start, top = array('I', [0]), array('I')
+        for numbers in tops:
+            top.extend(numbers)
+            top_start.append(len(top))
+
+        followers = {}
+        for previous, following in (bigram_model or {}).items():
+            best = nlargest(max_followers, ((count, word) for word, count in following.items()
+                                            if count >= min_bigram_count and word in rank))
+            if best:
+                followers[previous] = tuple(word for _, word in best)
+
+        return cls(words, first_edge, ''.join(labels), targets, top_start, top, k, followers)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.first_edge) - 1
+
+    def _node(self, prefix: str) -> int:
+        """Узел префикса (-1 - в словаре нет слов с таким префиксом)"""
+        first_edge, find, targets = self.first_edge, self.label_text.find, self.targets
+        node = 0
+        for char in prefix:
+            edge = find(char, first_edge[node], first_edge[node + 1])
+            if edge < 0:
+                return -1
+            node = targets[edge]
+        return node
+
+    def complete(self, prefix: str, k: Optional[int] = None, previous: Optional[str] = None) -> List[str]:
+        """До k самых частых слов с префиксом; с previous - сначала частые продолжения"""
+        node = self._node(prefix)
+        if node < 0:
+            return []
+        limit = min(k or self.k, self.k)
+        results = []
+        if previous:
+            for word in self.followers.get(previous, ()):
+                if word.startswith(prefix):
+                    results.append(word)
+                    if len(results) >= limit:
+                        return results
+        words, top = self.words, self.top
+        for position in range(self.top_start[node], self.top_start[node + 1]):
+            word = words[top[position]]
+            if word not in results:
+                results.append(word)
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def naive_complete(alphabetical: List[str], word_freq: Dict[str, int], prefix: str, k: int) -> List[str]:
+    """Дополнение без индекса: диапазон префикса в отсортированном списке и выбор по частоте"""
+    lo = bisect_left(alphabetical, prefix)
+    hi = bisect_left(alphabetical, prefix + '\uffff', lo)
+    return nlargest(k, alphabetical[lo:hi], key=word_freq.__getitem__)
+
+
+def benchmark(word_freq: Dict[str, int], bigram_model: Optional[dict], k: int, samples: int,
+              max_length: int = 8) -> None:
+    """Задержка дополнения по длинам префикса: индекс и выбор без индекса"""
+    start = time.perf_counter()
+    index = CompletionIndex.build(word_freq, k, bigram_model)
+    print(f"Слов: {len(index)}, узлов: {index.node_count}, лучших слов в узлах: {len(index.top)} "
+          f"(построено за {time.perf_counter() - start:.1f} с)")
+    print(f"Продолжений биграмм: {sum(len(v) for v in index.followers.values())} "
+          f"для {len(index.followers)} слов")
+
+    alphabetical = sorted(word_freq)
+    rng = random.Random(42)
+    # Префиксы берутся из слов с учетом частоты: так их и набирают
+    population = list(word_freq)
+    weights = [word_freq[word] for word in population]
+    previous_words = list(index.followers) or [None]
+
+    print(f"\n{'длина':>5} {'индекс p50':>11} {'p99':>9} {'+биграммы p99':>14} {'без индекса p50':>16} {'p99':>9}")
+    for length in range(1, max_length + 1):
+        prefixes = [word[:length] for word in rng.choices(population, weights, k=samples * 3)
+                    if len(word) >= length][:samples]
+        if not prefixes:
+            continue
+        timings = {'index': [], 'bigram': [], 'naive': []}
+        for prefix in prefixes:
+            previous = rng.choice(previous_words)
+            started = time.perf_counter()
+            fast = index.complete(prefix)
+            timings['index'].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            index.complete(prefix, previous=previous)
+            timings['bigram'].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            slow = naive_complete(alphabetical, word_freq, prefix, k)
+            timings['naive'].append(time.perf_counter() - started)
+            if [word_freq[word] for word in fast] != [word_freq[word] for word in slow]:
+                print(f"   ⚠️  Расхождение для {prefix!r}: {fast} / {slow}")
+
+        def percentile(values, p):
+            values = sorted(values)
+            return values[min(len(values) - 1, int(len(values) * p))] * 1e6
+
+        print(f"{length:>5} {percentile(timings['index'], 0.5):>9.1f}мкс {percentile(timings['index'], 0.99):>7.1f}мкс "
+              f"{percentile(timings['bigram'], 0.99):>12.1f}мкс {percentile(timings['naive'], 0.5):>14.1f}мкс "
+              f"{percentile(timings['naive'], 0.99):>7.1f}мкс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Автодополнение по префиксу')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель со словарем и частотами (bigram_model - из продвинутой модели)')
+    parser.add_argument('--prefix', type=str,
+                       help='Показать дополнения префикса')
+    parser.add_argument('--previous', type=str,
+                       help='Предыдущее слово для --prefix')
+    parser.add_argument('-k', type=int, default=10,
+                       help='Сколько слов хранить в узле')
+    parser.add_argument('--samples', type=int, default=2000,
+                       help='Префиксов каждой длины в замере')
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"Модель не найдена: {args.model}")
+        return
+    with open(args.model, 'rb') as f:
+        model_data = pickle.load(f)
+    word_freq = dict(model_data.get('word_freq') or {})
+    for word in model_data.get('vocabulary', ()):
+        word_freq.setdefault(word, 1)
+    bigram_model = model_data.get('bigram_model')
+
+    if args.prefix is not None:
+        index = CompletionIndex.build(word_freq, args.k, bigram_model)
+        for word in index.complete(args.prefix, previous=args.previous):
+            print(f"{word}\t{word_freq[word]}")
+        return
+    benchmark(word_freq, bigram_model, args.k, args.samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Словарь в виде минимального ациклического автомата (DAWG)
+Строится из отсортированного словаря (алгоритм Дацюка: общие окончания
+слов хранятся один раз). Частоты не хранятся в узлах: каждое слово получает
+номер (минимальное совершенное хеширование по числу слов в поддеревьях),
+а частоты лежат в отдельном массиве по этим номерам.
+Весь автомат - плоский буфер из массивов uint32, поэтому файл можно
+отобразить в память (mmap) и пользоваться им без разбора и копирования.
+
+Формат (little-endian):
+    заголовок   MAGIC, число узлов, число ребер, число слов
+    first_edge  uint32[узлы + 1]  ребра узла i: first_edge[i]..first_edge[i+1]
+    final       uint32[узлы]      1 - в узле заканчивается слово
+    label       uint32[ребра]     код буквы (ребра узла отсортированы)
+    target      uint32[ребра]     узел, в который ведет ребро
+    skip        uint32[ребра]     сколько слов узла идет раньше этого ребра
+    freq        uint32[слова]     частоты по номерам слов
+"""
+
+import sys
+import mmap
+import time
+import struct
+import pickle
+import argparse
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'KADAWG01'
+HEADER = struct.Struct('<8sIII')
+ROOT = 0
+
+
+class DawgBuilder:
+    """Построение минимального автомата из слов в отсортированном порядке"""
+
+    def __init__(self):
+        # Узел сборки: [final, {буква: номер узла}]
+        self.nodes: List[list] = [[False, {}]]
+        self.register: Dict[tuple, int] = {}
+        self.previous = ''
+        # Незамороженный путь последнего слова: (родитель, буква, ребенок)
+        self.unchecked: List[Tuple[int, str, int]] = []
+
+    def add(self, word: str) -> None:
+        if word <= self.previous and self.nodes[ROOT][1]:
+            raise ValueError(f"Слова должны быть уникальны и отсортированы: {self.previous!r} >= {word!r}")
+
+        common = 0
+        for a, b in zip(word, self.previous):
+            if a != b:
+                break
+            common += 1
+        self._minimize(common)
+
+        node = self.unchecked[-1][2] if self.unchecked else ROOT
+        for char in word[common:]:
+            child = len(self.nodes)
+            self.nodes.append([False, {}])
+            self.nodes[node][1][char] = child
+            self.unchecked.append((node, char, child))
+            node = child
+        self.nodes[node][0] = True
+        self.previous = word
+
+    def _minimize(self, down_to: int) -> None:
+        """Замена узлов пути эквивалентными из регистра (снизу вверх)"""
+        while len(self.unchecked) > down_to:
+            parent, char, child = self.unchecked.pop()
+            final, edges = self.nodes[child]
+            signature = (final, tuple(sorted(edges.items())))
+            existing = self.register.get(signature)
+            if existing is None:
+                self.register[signature] = child
+            else:
+                self.nodes[parent][1][char] = existing
+
+    def finish(self, frequencies: Optional[List[int]] = None) -> bytes:
+        """Завершение сборки и упаковка в плоский буфер"""
+        self._minimize(0)
+
+        # Перенумерация достижимых узлов в порядке обхода в ширину
+        order = {ROOT: 0}
+        queue = [ROOT]
+        for node in queue:
+            for _, child in sorted(self.nodes[node][1].items()):
+                if child not in order:
+                    order[child] = len(order)
+                    queue.append(child)
+
+        # Число слов в поддереве каждого узла: обход в глубину, ребенок раньше родителя
+        counts = [-1] * len(queue)
+        stack = [ROOT]
+        while stack:
+            node = stack[-1]
+            pending = [child for child in self.nodes[node][1].values() if counts[order[child]] < 0]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            final, edges = self.nodes[node]
+            counts[order[node]] = int(final) + sum(counts[order[child]] for child in edges.values())
+
+        first_edge = array('I', [0])
+        final_flags = array('I')
+        labels, targets, skips = array('I'), array('I'), array('I')
+        for node in queue:
+            final, edges = self.nodes[node]
+            final_flags.append(int(final))
+            before = int(final)
+            for char, child in sorted(edges.items()):
+                labels.append(ord(char))
+                targets.append(order[child])
+                skips.append(before)
+                before += counts[order[child]]
+            first_edge.append(len(labels))
+
+        words = counts[0] if queue else 0
+        freq = array('I', frequencies if frequencies is not None else [1] * words)
+        if len(freq) != words:
+            raise ValueError(f"Частот {len(freq)}, а слов {words}")
+
+        parts = [HEADER.pack(MAGIC, len(queue), len(labels), words)]
+        for part in (first_edge, final_flags, labels, targets, skips, freq):
+            if sys.byteorder != 'little':
+                part.byteswap()
+            parts.append(part.tobytes())
+        return b''.join(parts)
+
+
+class Dawg:
+    """Словарь с частотами поверх плоского буфера (bytes или mmap)"""
+
+    def __init__(self, buffer):
+        magic, self.node_count, self.edge_count, self.word_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Неверный формат DAWG")
+        self._buffer = buffer
+        view = memoryview(buffer)[HEADER.size:]
+        offset = 0
+
+        def take(count: int) -> memoryview:
+            nonlocal offset
+            part = view[offset:offset + count * 4].cast('I')
+            offset += count * 4
+            return part
+
+        self.first_edge = take(self.node_count + 1)
+        self.final = take(self.node_count)
+        self.labels = take(self.edge_count)
+        self.targets = take(self.edge_count)
+        self.skips = take(self.edge_count)
+        self.freqs = take(self.word_count)
+        # Буквы ребер одной строкой: поиск перехода - str.find внутри диапазона узла
+        # (копия ~2 байта на ребро, остальное читается прямо из буфера)
+        self.label_text = self.labels.tobytes().decode('utf-32-le')
+
+    @classmethod
+    def build(cls, word_freq: Dict[str, int]) -> 'Dawg':
+        """Построение из словаря частот"""
+        builder = DawgBuilder()
+        words = sorted(word_freq)
+        for word in words:
+            builder.add(word)
+        return cls(builder.finish([word_freq[word] for word in words]))
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> 'Dawg':
+        """Загрузка файла; при use_mmap страницы читаются ОС по мере обращения"""
+        with open(path, 'rb') as f:
+            if use_mmap:
+                return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            return cls(f.read())
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+    def __reduce__(self):
+        # Через pickle (например, в процессы пула) передается копия буфера
+        return Dawg, (self.to_bytes(),)
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            f.write(self._buffer)
+
+    def _child(self, node: int, char: str) -> int:
+        """Переход по букве (-1 - перехода нет)"""
+        return self.label_text.find(char, self.first_edge[node], self.first_edge[node + 1])
+
+    def index(self, word: str) -> int:
+        """Номер слова в отсортированном словаре (-1 - слова нет)"""
+        first_edge, find, skips, targets = self.first_edge, self.label_text.find, self.skips, self.targets
+        node, position = ROOT, 0
+        for char in word:
+            edge = find(char, first_edge[node], first_edge[node + 1])
+            if edge < 0:
+                return -1
+            position += skips[edge]
+            node = targets[edge]
+        return position if self.final[node] else -1
+
+    def __contains__(self, word: str) -> bool:
+        return self.index(word) >= 0
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    def __bool__(self) -> bool:
+        return self.word_count > 0
+
+    def get(self, word: str, default: int = 0) -> int:
+        """Частота слова (как dict.get)"""
+        position = self.index(word)
+        return self.freqs[position] if position >= 0 else default
+
+    def __getitem__(self, word: str) -> int:
+        position = self.index(word)
+        if position < 0:
+            raise KeyError(word)
+        return self.freqs[position]
+
+    def _walk(self, node: int, prefix: str) -> Iterator[str]:
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            if self.final[node]:
+                yield prefix
+            # Ребра кладутся в обратном порядке, чтобы слова шли по алфавиту
+            for edge in range(self.first_edge[node + 1] - 1, self.first_edge[node] - 1, -1):
+                stack.append((self.targets[edge], prefix + self.label_text[edge]))
+
+    def __iter__(self) -> Iterator[str]:
+        return self._walk(ROOT, '')
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        for position, word in enumerate(self):
+            yield word, self.freqs[position]
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """Все слова, начинающиеся с prefix, по алфавиту"""
+        node = ROOT
+        for char in prefix:
+            edge = self._child(node, char)
+            if edge < 0:
+                return
+            node = self.targets[edge]
+        yield from self._walk(node, prefix)
+
+    def fuzzy(self, word: str, max_distance: int = 2) -> List[Tuple[str, int]]:
+        """Слова на расстоянии Левенштейна не больше max_distance: (слово, расстояние)"""
+        results = []
+        first_row = list(range(len(word) + 1))
+        stack = [(ROOT, '', first_row)]
+        first_edge, label_text, targets, final = self.first_edge, self.label_text, self.targets, self.final
+        while stack:
+            node, prefix, row = stack.pop()
+            if final[node] and row[-1] <= max_distance:
+                results.append((prefix, row[-1]))
+            for edge in range(first_edge[node], first_edge[node + 1]):
+                char = label_text[edge]
+                current = [row[0] + 1]
+                for i, word_char in enumerate(word, 1):
+                    current.append(min(current[i - 1] + 1, row[i] + 1, row[i - 1] + (word_char != char)))
+                # Ветку дальше не обходим: расстояние по ней может только расти
+                if min(current) <= max_distance:
+                    stack.append((targets[edge], prefix + char, current))
+        return results
+
+
+def memory_report(word_freq: Dict[str, int], output: str) -> None:
+    """Размер и скорость DAWG по сравнению с set + Counter"""
+    import tracemalloc
+    from collections import Counter
+
+    tracemalloc.start()
+    vocabulary = set(word_freq)
+    counter = Counter(word_freq)
+    set_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Сами строки и большие числа тоже живут в памяти процесса, DAWG их не хранит
+    set_bytes += sum(sys.getsizeof(word) for word in vocabulary)
+    set_bytes += sum(sys.getsizeof(count) for count in counter.values() if count > 256)
+
+    start = time.perf_counter()
+    Dawg.build(word_freq).save(output)
+    build_seconds = time.perf_counter() - start
+    dawg = Dawg.load(output)
+
+    words = list(vocabulary)[:20000]
+    start = time.perf_counter()
+    for word in words:
+        word in vocabulary and counter.get(word, 0)
+    set_ns = (time.perf_counter() - start) / len(words) * 1e9
+    start = time.perf_counter()
+    for word in words:
+        dawg.get(word, 0)
+    dawg_ns = (time.perf_counter() - start) / len(words) * 1e9
+
+    mismatches = sum(1 for word, count in dawg.items() if word_freq.get(word) != count)
+    print(f"Слов: {len(dawg)}, узлов: {dawg.node_count}, ребер: {dawg.edge_count} "
+          f"(построено за {build_seconds:.1f} с)")
+    print(f"set + Counter в памяти:  {set_bytes / 1e6:.1f} MB")
+    print(f"pickle (list + dict):    {len(pickle.dumps((list(vocabulary), dict(counter)))) / 1e6:.1f} MB")
+    print(f"DAWG (файл / mmap):      {Path(output).stat().st_size / 1e6:.1f} MB")
+    print(f"Проверка + частота:      set {set_ns:.0f} нс, DAWG {dawg_ns:.0f} нс")
+    print(f"Расхождений частот: {mismatches}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Словарь в виде минимального автомата (DAWG)')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель со словарем и частотами')
+    parser.add_argument('--output', default='georgian_spellchecker.dawg',
+                       help='Файл DAWG')
+    parser.add_argument('--prefix', type=str,
+                       help='Показать слова с префиксом')
+    parser.add_argument('--fuzzy', type=str,
+                       help='Показать слова на расстоянии 2')
+    args = parser.parse_args()
+
+    if args.prefix or args.fuzzy:
+        dawg = Dawg.load(args.output)
+        if args.prefix:
+            for word in list(dawg.iter_prefix(args.prefix))[:20]:
+                print(f"{word}\t{dawg.get(word)}")
+        if args.fuzzy:
+            for word, distance in sorted(dawg.fuzzy(args.fuzzy), key=lambda x: (x[1], -dawg.get(x[0])))[:20]:
+                print(f"{word}\t{distance}\t{dawg.get(word)}")
+        return
+
+    if not Path(args.model).exists():
+        print(f"Модель не найдена: {args.model}")
+        return
+    with open(args.model, 'rb') as f:
+        model_data = pickle.load(f)
+    word_freq = dict(model_data.get('word_freq') or {})
+    for word in model_data.get('vocabulary', ()):
+        word_freq.setdefault(word, 1)
+    memory_report(word_freq, args.output)
+
+
+if __name__ == "__main__":
+    main()
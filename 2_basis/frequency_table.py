@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Компактная таблица частот слов
+Частоты нужны только для ранжирования кандидатов, поэтому вместо Counter
+(объект dict на каждое слово) хранится:
+- отсортированный список слов - номер слова = его позиция (тот же порядок,
+  что и номера слов в DAWG)
+- массив array с частотами по номерам: точные uint32 или логарифмически
+  квантованные uint16 / uint8 (частота восстанавливается по таблице)
+Поиск частоты - двоичный поиск по списку, он нужен только для кандидатов.
+"""
+
+import sys
+import math
+import time
+import pickle
+import random
+import argparse
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+TYPECODES = {8: 'B', 16: 'H', 32: 'I'}
+
+
+class FrequencyTable:
+    """Частоты слов в массиве, выровненном с номерами слов (dict-подобный .get)"""
+
+    def __init__(self, words: List[str], codes: array, decode: array):
+        self.words = words
+        self.codes = codes
+        # Код -> восстановленная частота (для 32 бит пустой: код и есть частота)
+        self.decode = decode
+
+    @classmethod
+    def from_counts(cls, word_freq: Dict[str, int], bits: int = 16) -> 'FrequencyTable':
+        """Построение из словаря частот; bits = 8, 16 (квантование) или 32 (точно)"""
+        if bits not in TYPECODES:
+            raise ValueError(f"Допустимая разрядность: {', '.join(map(str, TYPECODES))}")
+        words = sorted(word_freq)
+        if bits == 32:
+            return cls(words, array('I', (word_freq[word] for word in words)), array('I'))
+
+        # Код 0 - частота 0, коды 1..levels - равные шаги по log(частоты)
+        levels = (1 << bits) - 1
+        max_log = math.log(max(max(word_freq.values(), default=1), 2))
+        scale = (levels - 1) / max_log
+        codes = array(TYPECODES[bits], (
+            0 if word_freq[word] <= 0 else 1 + round(math.log(word_freq[word]) * scale)
+            for word in words
+        ))
+        decode = array('I', [0] + [min(max(1, round(math.exp(code / scale))), 0xFFFFFFFF) for code in range(levels)])
+        return cls(words, codes, decode)
+
+    @property
+    def bits(self) -> int:
+        """Разрядность кодов (8, 16 или 32)"""
+        return next(bits for bits, typecode in TYPECODES.items() if typecode == self.codes.typecode)
+
+    def index(self, word: str) -> int:
+        """Номер слова (-1 - слова нет)"""
+        position = bisect_left(self.words, word)
+        if position < len(self.words) and self.words[position] == word:
+            return position
+        return -1
+
+    def get(self, word: str, default: int = 0) -> int:
+        position = self.index(word)
+        if position < 0:
+            return default
+        code = self.codes[position]
+        return self.decode[code] if self.decode else code
+
+    def __getitem__(self, word: str) -> int:
+        position = self.index(word)
+        if position < 0:
+            raise KeyError(word)
+        code = self.codes[position]
+        return self.decode[code] if self.decode else code
+
+    def __contains__(self, word: str) -> bool:
+        return self.index(word) >= 0
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def values(self) -> Iterator[int]:
+        decode = self.decode
+        for code in self.codes:
+            yield decode[code] if decode else code
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        decode = self.decode
+        for word, code in zip(self.words, self.codes):
+            yield word, decode[code] if decode else code
+
+    def nbytes(self) -> int:
+        """Собственная память таблицы (строки слов общие со словарем и не считаются)"""
+        return sys.getsizeof(self.words) + sys.getsizeof(self.codes) + sys.getsizeof(self.decode)
+
+
+def _container_bytes(word_freq: Dict[str, int]) -> int:
+    """Память Counter без самих строк: хеш-таблица и числа вне кеша малых int"""
+    from collections import Counter
+    counter = Counter(word_freq)
+    return sys.getsizeof(counter) + sum(sys.getsizeof(count) for count in counter.values() if count > 256)
+
+
+def ranking_agreement(word_freq: Dict[str, int], tables: Dict[str, FrequencyTable],
+                      test_corpus: str, samples: int = 500, seed: int = 42) -> Dict[str, float]:
+    """Доля опечаток, для которых топ-5 совпадает с ранжированием по точным частотам"""
+    from dawg import Dawg
+    from georgian_tokenizer import tokenize_file
+    from vocabulary_pruning import make_typo
+
+    dawg = Dawg.build(word_freq)
+    words = sorted({word for path in sorted(Path(test_corpus).rglob("*.txt"))
+                    for word in tokenize_file(path) if len(word) > 3})
+    frequent = [word for word, _ in sorted(word_freq.items(), key=lambda x: -x[1])[:5000] if len(word) > 3]
+    rng = random.Random(seed)
+    pool = words + frequent
+    typos = []
+    while len(typos) < samples and pool:
+        typo = make_typo(rng.choice(pool), rng)
+        if typo not in dawg:
+            typos.append(typo)
+
+    matches = {name: 0 for name in tables}
+    for typo in typos:
+        candidates = dawg.fuzzy(typo, 2)
+        exact = [word for word, _ in sorted(candidates, key=lambda x: (x[1], -word_freq[x[0]]))[:5]]
+        for name, table in tables.items():
+            ranked = [word for word, _ in sorted(candidates, key=lambda x: (x[1], -table.get(x[0], 0)))[:5]]
+            matches[name] += ranked == exact
+    return {name: count / max(len(typos), 1) for name, count in matches.items()}
+
+
+def report(word_freq: Dict[str, int], test_corpus: str, samples: int = 500) -> None:
+    """Память и совпадение топ-5 для точных и квантованных таблиц"""
+    counter_bytes = _container_bytes(word_freq)
+    tables = {}
+    for bits in (32, 16, 8):
+        start = time.perf_counter()
+        tables[f"uint{bits}"] = FrequencyTable.from_counts(word_freq, bits)
+        print(f"uint{bits}: построено за {time.perf_counter() - start:.2f} с")
+
+    words = list(word_freq)[:20000]
+    agreement = ranking_agreement(word_freq, tables, test_corpus, samples)
+
+    print(f"\n{'':<10}{'память, MB':>12}{'get, нс':>10}{'топ-5 = точному':>18}")
+    start = time.perf_counter()
+    for word in words:
+        word_freq.get(word, 0)
+    dict_ns = (time.perf_counter() - start) / len(words) * 1e9
+    print(f"{'Counter':<10}{counter_bytes / 1e6:>12.2f}{dict_ns:>10.0f}{'1.000':>18}")
+    for name, table in tables.items():
+        start = time.perf_counter()
+        for word in words:
+            table.get(word, 0)
+        get_ns = (time.perf_counter() - start) / len(words) * 1e9
+        print(f"{name:<10}{table.nbytes() / 1e6:>12.2f}{get_ns:>10.0f}{agreement[name]:>18.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Компактная таблица частот')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель с частотами слов')
+    parser.add_argument('--test-corpus', default=str(Path(__file__).parent.parent / "test_corpus"),
+                       help='Корпус для проверки ранжирования')
+    parser.add_argument('--samples', type=int, default=500,
+                       help='Количество опечаток для сравнения топ-5')
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"Модель не найдена: {args.model}")
+        return
+    with open(args.model, 'rb') as f:
+        model_data = pickle.load(f)
+    report(dict(model_data['word_freq']), args.test_corpus, args.samples)
+
+
+if __name__ == "__main__":
+    main()
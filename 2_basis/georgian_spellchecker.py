@@ -14,6 +14,14 @@ import argparse
 from typing import List, Tuple, Set
 import itertools
 
+from georgian_tokenizer import tokenize_georgian, tokenize_file
+from vocabulary_pruning import prune_word_freq, load_whitelist
+from hunspell_affix import build_affix_dictionary
+from morphology import MorphologyIndex
+from dawg import Dawg
+from frequency_table import FrequencyTable
+from suggestion_table import SuggestionTable
+
 def levenshtein_distance(s1: str, s2: str) -> int:
     """Вычисление расстояния Левенштейна между двумя строками"""
     if len(s1) < len(s2):
@@ -39,6 +47,10 @@ class GeorgianSpellChecker:
         self.vocabulary = set()
         self.word_freq = Counter()
         self.ngram_models = {}
+        self.morphology = None
+        self.suggestion_table = None
+        # DAWG словаря для поиска кандидатов (строится при первом поиске)
+        self._fuzzy_index = None
         
     def load_corpus(self, corpus_path: str) -> None:
         """Загрузка корпуса из папки"""
@@ -73,11 +85,8 @@ class GeorgianSpellChecker:
             
         for file_path in txt_files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Токенизация текста
-                words = self.tokenize_georgian(content)
+                # Токенизация текста (mmap, без декодирования всего файла)
+                words = tokenize_file(file_path)
                 if words:  # Добавляем только если есть слова
                     self.vocabulary.update(words)
                     self.word_freq.update(words)
@@ -94,14 +103,8 @@ class GeorgianSpellChecker:
         print(f"Загрузка завершена. Файлов: {total_files}, Уникальных слов: {len(self.vocabulary)}")
     
     def tokenize_georgian(self, text: str) -> List[str]:
-        """Токенизация грузинского текста"""
-        # Удаляем пунктуацию и лишние пробелы
-        text = re.sub(r'[^\u10A0-\u10FF\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        words = text.strip().split()
-        
-        # Фильтруем слишком короткие слова
-        return [word for word in words if len(word) > 1]
+        """Токенизация грузинского текста (общий токенизатор georgian_tokenizer)"""
+        return tokenize_georgian(text)
     
     def build_ngram_model(self, n: int = 2) -> None:
         """Построение N-gram модели"""
@@ -154,31 +157,71 @@ class GeorgianSpellChecker:
         
         print(f"Словарь обновлен. Уникальных слов: {len(self.vocabulary)}")
     
+    def prune_vocabulary(self, min_count: int = 2, mode: str = 'count',
+                         neighbor_ratio: float = 10.0, whitelist: Set[str] = None) -> int:
+        """Удаление редких слов (вероятных опечаток корпуса) из словаря"""
+        pruned = prune_word_freq(self.word_freq, min_count, mode, neighbor_ratio, whitelist)
+        removed = len(self.vocabulary) - len(pruned)
+        self.vocabulary = set(pruned)
+        self.word_freq = pruned
+        print(f"Очистка словаря ({mode}, min_count={min_count}): удалено {removed}, осталось {len(self.vocabulary)}")
+        return removed
+    
+    def build_morphology(self, min_stem_forms: int = 2, min_cooccurrence: int = 10) -> None:
+        """Построение дерева основ и автомата окончаний по словарю"""
+        self.morphology = MorphologyIndex.from_vocabulary(self.vocabulary, min_stem_forms=min_stem_forms,
+                                                          min_cooccurrence=min_cooccurrence)
+        print(f"Морфология построена. Основ: {len(self.morphology.stem_endings)}, "
+              f"окончаний: {len(self.morphology.suffixes)}")
+    
     def is_correct(self, word: str) -> bool:
         """Проверка, есть ли слово в словаре"""
-        return word in self.vocabulary
+        if word in self.vocabulary:
+            return True
+        # Слово через дефис правильное, если правильны все его части
+        if '-' in word:
+            return all(part in self.vocabulary for part in word.split('-'))
+        # Известная основа + совместимое окончание
+        if self.morphology is not None:
+            return self.morphology.accepts(word)
+        return False
     
     def generate_candidates(self, word: str, max_distance: int = 2) -> List[str]:
         """Генерация кандидатов для исправления"""
-        candidates = []
-        
         # Если слово уже правильное
         if self.is_correct(word):
             return [word]
         
-        # Генерация кандидатов на основе расстояния Левенштейна
-        for candidate in self.vocabulary:
-            distance = levenshtein_distance(word, candidate)
-            if distance <= max_distance:
-                candidates.append((candidate, distance))
+        # Слова словаря: обход DAWG с отсечением по расстоянию вместо перебора словаря
+        found = dict(self.fuzzy_index().fuzzy(word, max_distance))
+        
+        # Формы известных основ с известными окончаниями, которых нет в словаре
+        if self.morphology is not None:
+            for candidate, _ in self.morphology.candidates(word, max_distance):
+                if candidate not in found:
+                    distance = levenshtein_distance(word, candidate)
+                    if distance <= max_distance:
+                        found[candidate] = distance
         
-        # Сортируем по расстоянию и частоте
-        candidates.sort(key=lambda x: (x[1], -self.word_freq.get(x[0], 0)))
+        # Сортируем по расстоянию, затем слова словаря и частые первыми
+        candidates = sorted(found.items(), key=lambda x: (x[1], x[0] not in self.vocabulary,
+                                                          -self.word_freq.get(x[0], 0)))
         
         return [candidate for candidate, distance in candidates[:10]]
     
+    def fuzzy_index(self) -> Dawg:
+        """DAWG словаря; перестраивается, если словарь изменился"""
+        if self._fuzzy_index is None or len(self._fuzzy_index) != len(self.vocabulary):
+            self._fuzzy_index = Dawg.build({word: self.word_freq.get(word, 1) for word in self.vocabulary})
+        return self._fuzzy_index
+    
     def suggest_corrections(self, word: str, max_suggestions: int = 5) -> List[str]:
         """Предложение исправлений для слова"""
+        # Частые опечатки отвечаются из заранее вычисленной таблицы
+        if self.suggestion_table is not None:
+            suggestions = self.suggestion_table.get(word)
+            if suggestions is not None:
+                return suggestions[:max_suggestions]
         candidates = self.generate_candidates(word)
         return candidates[:max_suggestions]
     
@@ -201,12 +244,32 @@ class GeorgianSpellChecker:
             'word_freq': dict(self.word_freq),
             'ngram_models': self.ngram_models
         }
+        # Упакованные частоты сохраняются восстановленными значениями, а при
+        # загрузке снова упаковываются с той же разрядностью
+        if isinstance(self.word_freq, FrequencyTable):
+            model_data['freq_bits'] = self.word_freq.bits
+        if self.morphology is not None:
+            model_data['morphology'] = self.morphology.to_dict()
+        if self.suggestion_table is not None:
+            model_data['suggestion_table'] = self.suggestion_table.to_dict()
         
         with open(model_path, 'wb') as f:
             pickle.dump(model_data, f)
         
         print(f"Модель сохранена: {model_path}")
     
+    def compact_frequencies(self, bits: int = 16) -> None:
+        """Замена Counter компактной таблицей частот (после обучения: таблица не изменяется)"""
+        self.word_freq = FrequencyTable.from_counts(self.word_freq, bits)
+        print(f"Частоты упакованы в uint{bits}: {self.word_freq.nbytes() / 1e6:.1f} MB")
+    
+    def save_dawg(self, dawg_path: str) -> None:
+        """Сохранение словаря с частотами в виде DAWG (для загрузки через mmap)"""
+        word_freq = {word: self.word_freq.get(word, 1) for word in self.vocabulary}
+        dawg = Dawg.build(word_freq)
+        dawg.save(dawg_path)
+        print(f"DAWG сохранен: {dawg_path} ({dawg.node_count} узлов, {dawg.edge_count} ребер)")
+    
     def load_model(self, model_path: str) -> None:
         """Загрузка модели"""
         with open(model_path, 'rb') as f:
@@ -215,6 +278,12 @@ class GeorgianSpellChecker:
         self.vocabulary = set(model_data['vocabulary'])
         self.word_freq = Counter(model_data['word_freq'])
         self.ngram_models = model_data['ngram_models']
+        if 'morphology' in model_data:
+            self.morphology = MorphologyIndex.from_dict(model_data['morphology'])
+        if 'suggestion_table' in model_data:
+            self.suggestion_table = SuggestionTable.from_dict(model_data['suggestion_table'])
+        if model_data.get('freq_bits'):
+            self.compact_frequencies(model_data['freq_bits'])
         
         print(f"Модель загружена. Уникальных слов: {len(self.vocabulary)}")
 
@@ -257,11 +326,8 @@ class CorpusProcessor:
             
         for file_path in txt_files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
                 # Простая токенизация
-                words = re.findall(r'[\u10A0-\u10FF]{2,}', content)
+                words = tokenize_file(file_path)
                 if words:  # Добавляем только если есть слова
                     all_words.update(words)
                 
@@ -279,11 +345,21 @@ class CorpusProcessor:
         print(f"Обработка завершена. Файлов: {total_files}, Уникальных слов: {len(all_words)}")
         print(f"Словарь сохранен: {vocabulary_file}")
 
-def create_hunspell_files(vocabulary: Set[str], output_dir: str) -> None:
-    """Создание файлов для Hunspell"""
+def create_hunspell_files(vocabulary: Set[str], output_dir: str, compress: bool = True) -> None:
+    """Создание файлов для Hunspell
+    .dic и .aff всегда пишутся парой и в git не хранятся: сжатый .dic
+    (FLAG num) читается только со своим .aff"""
     hunspell_dir = Path(output_dir)
     hunspell_dir.mkdir(parents=True, exist_ok=True)
     
+    # Основы с флагами и правила SFX, выведенные из словаря
+    if compress:
+        affix_dictionary = build_affix_dictionary(vocabulary)
+        affix_dictionary.write(output_dir)
+        print(f"Hunspell файлы созданы в: {hunspell_dir} "
+              f"({len(affix_dictionary.stem_flags)} основ для {len(vocabulary)} слов)")
+        return
+    
     # .dic файл (словарь)
     dic_file = hunspell_dir / "ka_GE.dic"
     with open(dic_file, 'w', encoding='utf-8') as f:
@@ -509,6 +585,21 @@ def main():
                        help='Полная сборка спеллчекера')
     parser.add_argument('--test', action='store_true',
                        help='Быстрый тест')
+    parser.add_argument('--min-count', type=int, default=1,
+                       help='Минимальная частота слова в словаре (1 - без очистки)')
+    parser.add_argument('--prune-mode', choices=['count', 'neighbor'], default='count',
+                       help='Режим очистки словаря')
+    parser.add_argument('--neighbor-ratio', type=float, default=10.0,
+                       help='Во сколько раз сосед должен быть частотнее (режим neighbor)')
+    parser.add_argument('--whitelist', nargs='*', default=['hunspell_georgian/ka_GE.dic'],
+                       help='Слова, которые никогда не удаляются при очистке')
+    parser.add_argument('--morphology', action='store_true',
+                       help='Принимать словоформы "известная основа + окончание" и искать кандидатов по основам')
+    parser.add_argument('--dawg', action='store_true',
+                       help='Сохранить рядом с моделью словарь в виде DAWG (.dawg)')
+    parser.add_argument('--freq-bits', type=int, choices=[8, 16, 32], default=None,
+                       help='Хранить частоты в компактной таблице (uint8/uint16 - логарифмическое квантование); '
+                            'с --train разрядность сохраняется в модели')
     
     args = parser.parse_args()
     
@@ -535,11 +626,24 @@ def main():
             CorpusProcessor.process_existing_corpus(args.corpus, "processed_corpus")
             spell_checker.load_corpus(args.corpus)
         
+        # Очищаем словарь от редких слов
+        if args.min_count > 1:
+            spell_checker.prune_vocabulary(args.min_count, args.prune_mode, args.neighbor_ratio,
+                                           load_whitelist(args.whitelist))
+        
         # Строим N-gram модель
         spell_checker.build_ngram_model(2)
         
+        if args.morphology:
+            spell_checker.build_morphology()
+        
+        if args.freq_bits:
+            spell_checker.compact_frequencies(args.freq_bits)
+        
         # Сохраняем модель
         spell_checker.save_model(args.model)
+        if args.dawg:
+            spell_checker.save_dawg(str(Path(args.model).with_suffix('.dawg')))
         
         # Создаем файлы для Hunspell если нужно
         if args.create_hunspell:
@@ -554,6 +658,8 @@ def main():
         else:
             print("Модель не найдена. Сначала обучите модель: --train")
             return
+        if args.freq_bits and getattr(spell_checker.word_freq, 'bits', None) != args.freq_bits:
+            spell_checker.compact_frequencies(args.freq_bits)
         
         text = args.check
         if len(text.split()) == 1:
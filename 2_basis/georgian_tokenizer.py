@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Единый токенизатор грузинского текста
+Используется и при построении словаря, и при проверке текста:
+- iter_tokens(text) выдает (нормализованное_слово, start, end)
+- мтаврули (U+1C90–U+1CBF) и асомтаврули (U+10A0–U+10CD) приводятся к мхедрули
+- слова через дефис (ნელ-ნელა) считаются одним токеном
+Для корпуса есть потоковый путь: файл отображается в память (mmap) и
+читается блоками по CHUNK_SIZE байт, все байты вне грузинских букв
+отбрасываются таблицей перекодировки, а декодируются только сами токены.
+Память не зависит от размера файла; блок заканчивается на байте ASCII,
+который и так становится разделителем, поэтому слово (и предложение)
+никогда не разрезается границей блока
+"""
+
+import mmap
+import re
+import time
+import argparse
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+GEORGIAN_LETTERS = '\u10A0-\u10FF\u1C90-\u1CBF'
+HYPHENS = '\\-\u2010\u2011'
+TOKEN_RE = re.compile(f'[{GEORGIAN_LETTERS}]+(?:[{HYPHENS}][{GEORGIAN_LETTERS}]+)*')
+# Символы, которые меняет нормализация (заглавные формы и типографские дефисы)
+FOLDABLE_RE = re.compile('[\u10A0-\u10CD\u1C90-\u1CBF\u2010\u2011]')
+
+
+def _build_fold_table() -> dict:
+    """Таблица приведения заглавных форм к мхедрули (длина строки не меняется)"""
+    table = {}
+    # Асомтаврули идут в том же порядке, что и мхедрули: Ⴀ (U+10A0) -> ა (U+10D0)
+    for code in list(range(0x10A0, 0x10C6)) + [0x10C7, 0x10CD]:
+        table[code] = code + 0x30
+    # Мтаврули: Ა (U+1C90) -> ა (U+10D0)
+    for code in list(range(0x1C90, 0x1CBB)) + [0x1CBD, 0x1CBE, 0x1CBF]:
+        table[code] = code - 0x1C90 + 0x10D0
+    table[0x2010] = ord('-')
+    table[0x2011] = ord('-')
+    return table
+
+
+FOLD_TABLE = _build_fold_table()
+
+
+def normalize_georgian(word: str) -> str:
+    """Приведение слова к мхедрули и к обычному дефису"""
+    return word.translate(FOLD_TABLE)
+
+
+def _normalize_text(text: str) -> str:
+    """Нормализация всего текста, только если в нем есть что менять"""
+    if FOLDABLE_RE.search(text):
+        return normalize_georgian(text)
+    return text
+
+
+def iter_tokens(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Итерация по словам текста: (нормализованное слово, начало, конец)"""
+    # Нормализация не меняет длину текста, поэтому позиции совпадают с исходными
+    for match in TOKEN_RE.finditer(_normalize_text(text)):
+        start, end = match.span()
+        if end - start > 1:
+            yield match.group(), start, end
+
+
+def tokenize_georgian(text: str) -> List[str]:
+    """Токенизация грузинского текста"""
+    return [word for word in TOKEN_RE.findall(_normalize_text(text)) if len(word) > 1]
+
+
+# Грузинские буквы в UTF-8 - это всегда три байта:
+# U+10A0–U+10BF -> E1 82 A0..BF, U+10C0–U+10FF -> E1 83 80..BF (мхедрули),
+# U+1C90–U+1CBF -> E1 B2 90..BF (мтаврули).
+# Таблица перекодировки заменяет пробелом все ASCII-байты (кроме дефиса) и все
+# ведущие байты, кроме E1; оставшиеся "осиротевшие" байты продолжения при
+# декодировании превращаются в U+FFFD и тоже становятся разделителями.
+SENTENCE_SEPARATOR = '\n'
+BYTE_TABLE = bytes(
+    byte if byte == ord('-') else
+    0x20 if (byte < 0x80 or (byte >= 0xC0 and byte != 0xE1)) else byte
+    for byte in range(256)
+)
+SENTENCE_BYTE_TABLE = bytes(
+    ord(SENTENCE_SEPARATOR) if byte in b'.!?' else BYTE_TABLE[byte]
+    for byte in range(256)
+)
+UNICODE_HYPHENS = (b'\xe2\x80\x90', b'\xe2\x80\x91')
+HYPHEN_RUN_RE = re.compile('-+')
+# Символы U+1000–U+1FFF вне грузинских блоков (например, мьянманский)
+NON_GEORGIAN_E1_RE = re.compile(rb'\xe1(?:[^\x82\x83\xb2]|\x82[\x80-\x9f]|\xb2[\x80-\x8f])')
+# Размер блока потокового чтения и байты, после которых блок можно закончить:
+# для слов - любой ASCII, кроме дефиса, для предложений - конец предложения
+CHUNK_SIZE = 1 << 20
+WORD_CUT_RE = re.compile(rb'[\x00-\x2c\x2e-\x7f]')
+SENTENCE_CUT_RE = re.compile(rb'[.!?]')
+
+
+def _iter_georgian_chunks(file_path, table: bytes, cut_re, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Текст файла блоками (склеенные блоки - весь текст файла), только грузинские байты"""
+    size = Path(file_path).stat().st_size
+    if size == 0:
+        return
+
+    with open(file_path, 'rb') as f:
+        # Файл не больше блока дешевле прочитать целиком, чем отображать
+        if size <= chunk_size:
+            yield _decode_georgian(f.read(), table)
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        size = len(mapped)
+        offset = 0
+        while offset < size:
+            end = size
+            if offset + chunk_size < size:
+                # Байт ASCII не бывает частью многобайтового символа UTF-8
+                match = cut_re.search(mapped, offset + chunk_size)
+                if match is not None:
+                    end = match.end()
+            yield _decode_georgian(mapped[offset:end], table)
+            offset = end
+    finally:
+        mapped.close()
+
+
+def _decode_georgian(data: bytes, table: bytes) -> str:
+    """Декодирование только грузинских байтов блока"""
+    for hyphen in UNICODE_HYPHENS:
+        if hyphen in data:
+            data = data.replace(hyphen, b'-')
+    data = data.translate(table)
+
+    # Медленный путь нужен только если в файле есть символы U+1000–U+1FFF кроме мхедрули
+    needs_folding = data.count(b'\xe1') != data.count(b'\xe1\x83')
+    if needs_folding:
+        data = NON_GEORGIAN_E1_RE.sub(b' ', data)
+
+    text = data.decode('utf-8', 'replace').replace('\ufffd', ' ')
+    # После перекодировки в тексте остались только буквы, пробелы, переводы
+    # строк и дефисы, поэтому "лишний" дефис всегда соседствует с одним из них
+    if '-' in text:
+        text = HYPHEN_RUN_RE.sub(_keep_inner_hyphen, text)
+    if needs_folding:
+        text = normalize_georgian(text)
+    return text
+
+
+def _keep_inner_hyphen(match) -> str:
+    """Дефис остается, только если он одиночный и стоит между двумя буквами"""
+    start, end = match.span()
+    text = match.string
+    if (end - start == 1 and 0 < start and end < len(text)
+            and not text[start - 1].isspace() and not text[end].isspace()):
+        return '-'
+    return ' '
+
+
+def tokenize_file(file_path, chunk_size: int = CHUNK_SIZE) -> List[str]:
+    """Список слов файла (тот же поток, что и tokenize_georgian)"""
+    words = []
+    for text in _iter_georgian_chunks(file_path, BYTE_TABLE, WORD_CUT_RE, chunk_size):
+        words.extend(word for word in text.split() if len(word) > 1)
+    return words
+
+
+def iter_file_sentences(file_path, chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """Итерация по предложениям файла (разделители . ! ?) в виде списков слов"""
+    tail = ''
+    for text in _iter_georgian_chunks(file_path, SENTENCE_BYTE_TABLE, SENTENCE_CUT_RE, chunk_size):
+        sentences = text.split(SENTENCE_SEPARATOR)
+        # Последнее предложение блока может продолжиться в следующем
+        sentences[0] = tail + sentences[0]
+        tail = sentences.pop()
+        for sentence in sentences:
+            yield [word for word in sentence.split() if len(word) > 1]
+    yield [word for word in tail.split() if len(word) > 1]
+
+
+def legacy_tokenize_georgian(text: str) -> List[str]:
+    """Прежняя токенизация (два прохода re.sub), только для сравнения скорости"""
+    text = re.sub(r'[^\u10A0-\u10FF\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    words = text.strip().split()
+    return [word for word in words if len(word) > 1]
+
+
+def benchmark(corpus_path: str, repeat: int = 3) -> None:
+    """Сравнение скорости токенизаторов на корпусе"""
+    corpus_dir = Path(corpus_path)
+    txt_files = sorted(corpus_dir.rglob("*.txt"))
+    if not txt_files:
+        print(f"В папке {corpus_dir} не найдено txt файлов!")
+        return
+
+    total_bytes = sum(file_path.stat().st_size for file_path in txt_files)
+    print(f"Файлов: {len(txt_files)}, объем: {total_bytes / 1e6:.1f} MB")
+
+    def read_and(tokenizer):
+        def run():
+            tokens = 0
+            for file_path in txt_files:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    tokens += len(tokenizer(f.read()))
+            return tokens
+        return run
+
+    def run_spans():
+        tokens = 0
+        for file_path in txt_files:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for _ in iter_tokens(f.read()):
+                    tokens += 1
+        return tokens
+
+    def run_mmap():
+        tokens = 0
+        for file_path in txt_files:
+            tokens += len(tokenize_file(file_path))
+        return tokens
+
+    # Проверка идентичности потоков токенов
+    mismatches = 0
+    for file_path in txt_files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if tokenize_georgian(f.read()) != tokenize_file(file_path):
+                mismatches += 1
+    print(f"Файлов с расхождениями (str / блоки): {mismatches}")
+
+    runs = (
+        ("legacy re.sub", read_and(legacy_tokenize_georgian)),
+        ("tokenize_georgian", read_and(tokenize_georgian)),
+        ("iter_tokens (spans)", run_spans),
+        ("byte table (блоки)", run_mmap),
+    )
+    for name, func in runs:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tokens = func()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:>20}: {total_bytes / 1e6 / best:8.1f} MB/s ({tokens} токенов, {best:.3f} с)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Токенизация грузинского текста')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='Сравнить скорость токенизаторов')
+    parser.add_argument('--corpus', default=str(Path(__file__).parent.parent / "1_collect" / "corpus"),
+                       help='Путь к корпусу текстов')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Количество повторов замера')
+    parser.add_argument('--text', type=str,
+                       help='Показать токены текста с позициями')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.corpus, args.repeat)
+    elif args.text:
+        for word, start, end in iter_tokens(args.text):
+            print(f"{start:5d} {end:5d}  {word}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Сжатие словаря Hunspell с помощью выведенных из корпуса суффиксов
+Грузинский - агглютинативный язык, поэтому вместо всех словоформ в .dic
+записываются основы с флагами, а в .aff - настоящие правила SFX:
+1. mine_suffixes    - частые окончания, которые встречаются у многих основ
+2. split_vocabulary - каждое слово раскладывается на основу и окончание
+3. парадигмы        - часто повторяющиеся наборы окончаний получают общий флаг
+Набор слов, который распознает результат, в точности равен исходному словарю
+"""
+
+import time
+import argparse
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+TRY_LINE = "TRY აბგდევზთიკლმნოპჟრსტუფქღყშჩცძწჭხჯჰ"
+NEEDAFFIX_FLAG = 1
+
+
+def mine_suffixes(vocabulary: Iterable[str], max_suffix_len: int = 6, min_stem_len: int = 2,
+                  min_stems: int = 10, max_suffixes: int = 1000) -> List[Tuple[str, int]]:
+    """Частые окончания: (суффикс, число основ), от самых частых к редким"""
+    vocabulary = set(vocabulary)
+
+    # Сколько словоформ образует каждая возможная основа (сама основа тоже считается)
+    stem_forms = Counter()
+    for word in vocabulary:
+        stem_forms[word] += 1
+        for k in range(1, min(max_suffix_len, len(word) - min_stem_len) + 1):
+            stem_forms[word[:-k]] += 1
+
+    # Окончание засчитывается, если основа встречается хотя бы в двух формах
+    support = Counter()
+    for word in vocabulary:
+        for k in range(1, min(max_suffix_len, len(word) - min_stem_len) + 1):
+            if stem_forms[word[:-k]] >= 2:
+                support[word[-k:]] += 1
+
+    return [(suffix, count) for suffix, count in support.most_common(max_suffixes) if count >= min_stems]
+
+
+def split_vocabulary(vocabulary: Iterable[str], suffixes: Iterable[str],
+                     min_stem_len: int = 2) -> Dict[str, Set[str]]:
+    """Разбиение слов на основы: {основа: набор окончаний}, '' - сама основа является словом"""
+    vocabulary = set(vocabulary)
+    suffixes = set(suffixes)
+    suffix_lengths = sorted({len(suffix) for suffix in suffixes}, reverse=True)
+
+    # Сколько слов словаря образует основа с известными окончаниями
+    stem_forms = Counter()
+    for word in vocabulary:
+        stem_forms[word] += 1
+        for k in suffix_lengths:
+            if len(word) - k >= min_stem_len and word[-k:] in suffixes:
+                stem_forms[word[:-k]] += 1
+
+    stems = defaultdict(set)
+    for word in vocabulary:
+        # Самое длинное окончание, чья основа образует хотя бы две формы
+        for k in suffix_lengths:
+            if len(word) - k >= min_stem_len and word[-k:] in suffixes and stem_forms[word[:-k]] >= 2:
+                stems[word[:-k]].add(word[-k:])
+                break
+        else:
+            stems[word].add('')
+
+    return dict(stems)
+
+
+class AffixDictionary:
+    """Основы с флагами и правила SFX для записи в формате Hunspell (FLAG num)"""
+
+    def __init__(self, stems: Dict[str, Set[str]], min_paradigm_stems: int = 3):
+        self.stems = stems
+        self.flag_suffixes = {}
+        self.stem_flags = {}
+
+        used_suffixes = sorted({suffix for endings in stems.values() for suffix in endings if suffix})
+        suffix_flag = {}
+        next_flag = NEEDAFFIX_FLAG + 1
+        for suffix in used_suffixes:
+            suffix_flag[suffix] = next_flag
+            self.flag_suffixes[next_flag] = (suffix,)
+            next_flag += 1
+
+        # Парадигмы - наборы из 2+ окончаний, общие для нескольких основ
+        signatures = Counter(
+            frozenset(endings - {''}) for endings in stems.values() if len(endings - {''}) >= 2
+        )
+        paradigm_flag = {}
+        for signature, count in signatures.most_common():
+            if count < min_paradigm_stems:
+                break
+            paradigm_flag[signature] = next_flag
+            self.flag_suffixes[next_flag] = tuple(sorted(signature))
+            next_flag += 1
+
+        for stem, endings in stems.items():
+            signature = frozenset(endings - {''})
+            flags = []
+            if '' not in endings:
+                flags.append(NEEDAFFIX_FLAG)
+            if signature in paradigm_flag:
+                flags.append(paradigm_flag[signature])
+            else:
+                flags.extend(sorted(suffix_flag[suffix] for suffix in signature))
+            self.stem_flags[stem] = flags
+
+    def write(self, output_dir: str) -> Tuple[Path, Path]:
+        """Запись ka_GE.dic и ka_GE.aff"""
+        hunspell_dir = Path(output_dir)
+        hunspell_dir.mkdir(parents=True, exist_ok=True)
+
+        dic_file = hunspell_dir / "ka_GE.dic"
+        with open(dic_file, 'w', encoding='utf-8') as f:
+            f.write(f"{len(self.stem_flags)}\n")
+            for stem in sorted(self.stem_flags):
+                flags = self.stem_flags[stem]
+                if flags:
+                    f.write(f"{stem}/{','.join(map(str, flags))}\n")
+                else:
+                    f.write(f"{stem}\n")
+
+        aff_file = hunspell_dir / "ka_GE.aff"
+        with open(aff_file, 'w', encoding='utf-8') as f:
+            f.write("SET UTF-8\n")
+            f.write(f"{TRY_LINE}\n")
+            f.write("FLAG num\n")
+            f.write(f"NEEDAFFIX {NEEDAFFIX_FLAG}\n")
+            for flag, suffixes in self.flag_suffixes.items():
+                f.write(f"\nSFX {flag} Y {len(suffixes)}\n")
+                for suffix in suffixes:
+                    f.write(f"SFX {flag} 0 {suffix} .\n")
+
+        return dic_file, aff_file
+
+
+def build_affix_dictionary(vocabulary: Iterable[str], max_suffix_len: int = 6, min_stems: int = 10,
+                           max_suffixes: int = 1000, min_paradigm_stems: int = 3) -> AffixDictionary:
+    """Полный цикл: поиск суффиксов, разбиение слов и построение флагов"""
+    vocabulary = set(vocabulary)
+    suffixes = [suffix for suffix, _ in mine_suffixes(vocabulary, max_suffix_len, 2, min_stems, max_suffixes)]
+    stems = split_vocabulary(vocabulary, suffixes)
+    return AffixDictionary(stems, min_paradigm_stems)
+
+
+def expand_hunspell_files(dic_path: str, aff_path: str) -> Set[str]:
+    """Развертывание всех словоформ из .dic/.aff"""
+    from hunspell_dictionary import HunspellDictionary
+    return HunspellDictionary.load(dic_path, aff_path).words()
+
+
+def write_plain_dic(vocabulary: Set[str], dic_path: Path) -> None:
+    """Несжатый .dic: все словоформы подряд"""
+    with open(dic_path, 'w', encoding='utf-8') as f:
+        f.write(f"{len(vocabulary)}\n")
+        for word in sorted(vocabulary):
+            f.write(f"{word}\n")
+
+
+def report(vocabulary: Set[str], output_dir: str, **options) -> None:
+    """Построение сжатого словаря с отчетом о сжатии и покрытии"""
+    start = time.perf_counter()
+    affix_dictionary = build_affix_dictionary(vocabulary, **options)
+    dic_file, aff_file = affix_dictionary.write(output_dir)
+    elapsed = time.perf_counter() - start
+
+    plain_dic = Path(output_dir) / "ka_GE.plain.dic"
+    write_plain_dic(vocabulary, plain_dic)
+    plain_bytes = plain_dic.stat().st_size
+    plain_dic.unlink()
+
+    dic_bytes = dic_file.stat().st_size
+    aff_bytes = aff_file.stat().st_size
+    rules = sum(len(suffixes) for suffixes in affix_dictionary.flag_suffixes.values())
+
+    expanded = expand_hunspell_files(str(dic_file), str(aff_file))
+    missing = vocabulary - expanded
+    extra = expanded - vocabulary
+
+    print(f"Построено за {elapsed:.1f} с")
+    print(f"Слов в словаре:          {len(vocabulary)}")
+    print(f"Записей в .dic:          {len(affix_dictionary.stem_flags)} "
+          f"(в {len(vocabulary) / max(len(affix_dictionary.stem_flags), 1):.2f} раза меньше)")
+    print(f"Флагов / правил SFX:     {len(affix_dictionary.flag_suffixes)} / {rules}")
+    print(f"Размер .dic:             {plain_bytes / 1e6:.2f} MB -> {dic_bytes / 1e6:.2f} MB "
+          f"(сжатие {plain_bytes / max(dic_bytes, 1):.2f}x)")
+    print(f"Размер .dic + .aff:      {(dic_bytes + aff_bytes) / 1e6:.2f} MB "
+          f"(сжатие {plain_bytes / max(dic_bytes + aff_bytes, 1):.2f}x)")
+    print(f"Покрытие словаря:        {len(vocabulary) - len(missing)}/{len(vocabulary)} "
+          f"(не найдено {len(missing)}, лишних форм {len(extra)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сжатие словаря Hunspell суффиксными правилами')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель со словарем')
+    parser.add_argument('--vocabulary', default=None,
+                       help='Словарь vocabulary.txt вместо модели')
+    parser.add_argument('--output', default='hunspell_georgian',
+                       help='Папка для ka_GE.dic / ka_GE.aff')
+    parser.add_argument('--max-suffix-len', type=int, default=6,
+                       help='Максимальная длина окончания')
+    parser.add_argument('--min-stems', type=int, default=10,
+                       help='Минимальное число основ для окончания')
+    parser.add_argument('--max-suffixes', type=int, default=1000,
+                       help='Максимальное число окончаний')
+    args = parser.parse_args()
+
+    if args.vocabulary:
+        with open(args.vocabulary, 'r', encoding='utf-8') as f:
+            vocabulary = {line.split('\t')[0].strip() for line in f if line.strip()}
+    elif Path(args.model).exists():
+        from georgian_spellchecker import GeorgianSpellChecker
+        checker = GeorgianSpellChecker()
+        checker.load_model(args.model)
+        vocabulary = checker.vocabulary
+    else:
+        print(f"Модель не найдена: {args.model}")
+        return
+
+    report(vocabulary, args.output, max_suffix_len=args.max_suffix_len,
+           min_stems=args.min_stems, max_suffixes=args.max_suffixes)
+
+
+if __name__ == "__main__":
+    main()
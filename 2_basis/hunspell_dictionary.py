@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Чтение словаря Hunspell (.dic + .aff) без развертывания словоформ
+В памяти хранятся только записи .dic (основа -> флаги) и правила SFX/PFX.
+Проверка слова идет как в самом Hunspell: от слова отрезаются известные
+окончания/приставки, восстанавливается основа (strip), проверяется условие
+правила и наличие нужного флага у основы.
+Поддерживаются FLAG (char, long, num, UTF-8), AF, NEEDAFFIX, FORBIDDENWORD
+и перекрестные PFX+SFX. Двойные суффиксы (флаги продолжения) не разбираются.
+
+Разбор аффиксов в десятки раз дороже поиска в множестве, поэтому результаты
+проверки кешируются: в текстах одни и те же формы повторяются (закон Ципфа).
+Кеш ограничен cache_size словами и очищается целиком при заполнении.
+
+Поиск исправлений перебирает словоформы с тем же началом, что у слова
+(forms_starting_with): разворачиваются только записи из индекса начал,
+а не весь словарь.
+"""
+
+import os
+import re
+import sys
+import time
+import json
+import argparse
+import itertools
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Слов в кеше результатов проверки по умолчанию
+CACHE_SIZE = 200000
+# Длина начала словоформы в индексе начал
+START_LEN = 2
+
+
+class AffixRule:
+    """Одно правило SFX или PFX"""
+
+    __slots__ = ('flag', 'strip', 'add', 'condition', 'cross_product')
+
+    def __init__(self, flag: str, strip: str, add: str, condition: Optional[re.Pattern], cross_product: bool):
+        self.flag = flag
+        self.strip = strip
+        self.add = add
+        self.condition = condition
+        self.cross_product = cross_product
+
+
+def _compile_condition(condition: str, suffix: bool) -> Optional[re.Pattern]:
+    """Условие правила: для SFX - конец основы, для PFX - начало"""
+    if condition == '.':
+        return None
+    return re.compile(f'(?:{condition})$' if suffix else f'^(?:{condition})')
+
+
+class HunspellDictionary:
+    """Словарь Hunspell с проверкой слов через отрезание аффиксов"""
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.flag_type = 'char'
+        self.needaffix = None
+        self.forbidden = None
+        self.aliases = []
+        # Основа -> флаги; кортежи дешевле frozenset, одинаковые наборы хранятся
+        # в одном экземпляре, а сами флаги - интернированные строки
+        self.entries: Dict[str, Tuple[str, ...]] = {}
+        # Добавляемая часть -> strip -> флаг -> правила: при проверке перебираются
+        # только флаги найденной основы, а не все правила с таким окончанием
+        self.suffixes: Dict[str, Dict[str, Dict[str, List[AffixRule]]]] = {}
+        self.prefixes: Dict[str, Dict[str, Dict[str, List[AffixRule]]]] = {}
+        self.suffix_lengths: List[int] = []
+        self.prefix_lengths: List[int] = []
+        # Флаг -> правила (для развертывания)
+        self.flag_rules: Dict[str, List[Tuple[bool, AffixRule]]] = defaultdict(list)
+        self._size = None
+        # Слово -> результат проверки (0 - кеш отключен)
+        self.cache_size = cache_size
+        self._known: Dict[str, bool] = {}
+        # Начало словоформы (START_LEN букв) -> основы, формы которых так начинаются
+        self._starts: Optional[Dict[str, List[str]]] = None
+
+    @classmethod
+    def load(cls, dic_path: str, aff_path: Optional[str] = None,
+             cache_size: int = CACHE_SIZE) -> 'HunspellDictionary':
+        """Загрузка пары .dic/.aff (по умолчанию .aff лежит рядом с .dic)"""
+        dictionary = cls(cache_size)
+        aff_path = Path(aff_path) if aff_path else Path(dic_path).with_suffix('.aff')
+        if aff_path.exists():
+            dictionary._read_aff(aff_path)
+        dictionary._read_dic(Path(dic_path))
+        return dictionary
+
+    def parse_flags(self, text: str) -> List[str]:
+        """Разбор строки флагов согласно директиве FLAG"""
+        if self.aliases and text.isdigit():
+            index = int(text) - 1
+            return list(self.aliases[index]) if 0 <= index < len(self.aliases) else []
+        if self.flag_type == 'num':
+            return [flag for flag in text.split(',') if flag]
+        if self.flag_type == 'long':
+            return [text[i:i + 2] for i in range(0, len(text) - 1, 2)]
+        return list(text)
+
+    def _read_aff(self, aff_path: Path) -> None:
+        with open(aff_path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = [line.split() for line in f if not line.startswith('#')]
+
+        headers = set()
+        raw_aliases = []
+        for parts in lines:
+            if not parts:
+                continue
+            keyword = parts[0]
+            if keyword == 'FLAG' and len(parts) > 1:
+                self.flag_type = {'long': 'long', 'num': 'num'}.get(parts[1], 'char')
+            elif keyword == 'AF' and len(parts) > 1 and not parts[1].isdigit():
+                raw_aliases.append(parts[1])
+            elif keyword in ('NEEDAFFIX', 'PSEUDOROOT') and len(parts) > 1:
+                self.needaffix = parts[1]
+            elif keyword == 'FORBIDDENWORD' and len(parts) > 1:
+                self.forbidden = parts[1]
+
+        # Псевдонимы разбираются после того, как известен тип флагов
+        self.aliases = [frozenset(self.parse_flags(alias)) for alias in raw_aliases]
+
+        cross_products = {}
+        for parts in lines:
+            if len(parts) < 4 or parts[0] not in ('SFX', 'PFX'):
+                continue
+            kind, flag = parts[0], parts[1]
+            if (kind, flag) not in headers:
+                # Заголовок блока: SFX флаг Y|N количество
+                headers.add((kind, flag))
+                cross_products[kind, flag] = parts[2] == 'Y'
+                continue
+
+            suffix = kind == 'SFX'
+            strip = '' if parts[2] == '0' else parts[2]
+            add = parts[3].split('/', 1)[0]
+            add = '' if add == '0' else add
+            condition = _compile_condition(parts[4] if len(parts) > 4 else '.', suffix)
+            rule = AffixRule(flag, strip, add, condition, cross_products[kind, flag])
+            index = self.suffixes if suffix else self.prefixes
+            index.setdefault(add, {}).setdefault(strip, {}).setdefault(flag, []).append(rule)
+            self.flag_rules[flag].append((suffix, rule))
+
+        self.suffix_lengths = sorted({len(add) for add in self.suffixes}, reverse=True)
+        self.prefix_lengths = sorted({len(add) for add in self.prefixes}, reverse=True)
+
+    def _read_dic(self, dic_path: Path) -> None:
+        flag_sets = {}
+        flag_names = {}
+        with open(dic_path, 'r', encoding='utf-8', errors='replace') as f:
+            first = f.readline().strip()
+            lines = f if first.isdigit() else [first, *f]
+            for line in lines:
+                # Морфологические поля после пробела или табуляции не нужны
+                entry = line.split(None, 1)[0] if line.strip() else ''
+                if not entry:
+                    continue
+                word, _, flag_text = entry.partition('/')
+                flags = flag_sets.get(flag_text)
+                if flags is None:
+                    names = sorted({flag_names.setdefault(flag, flag) for flag in self.parse_flags(flag_text)})
+                    flags = flag_sets[flag_text] = tuple(names)
+                previous = self.entries.get(word)
+                if previous is not None:
+                    flags = tuple(sorted(set(previous) | set(flags)))
+                self.entries[word] = flags
+
+    def _is_root(self, stem: str, flag: Optional[str] = None) -> bool:
+        """Есть ли основа в .dic (с флагом flag или как самостоятельное слово)"""
+        flags = self.entries.get(stem)
+        if flags is None or (self.forbidden is not None and self.forbidden in flags):
+            return False
+        if flag is None:
+            return self.needaffix is None or self.needaffix not in flags
+        return flag in flags
+
+    def _roots(self, word: str, suffix: bool) -> Iterator[Tuple[str, AffixRule]]:
+        """Основы, из которых слово получается одним правилом: (основа, правило)
+        Как в Hunspell без FULLSTRIP: от слова остается хотя бы одна буква"""
+        index = self.suffixes if suffix else self.prefixes
+        for length in (self.suffix_lengths if suffix else self.prefix_lengths):
+            if length >= len(word):
+                continue
+            by_strip = index.get(word[len(word) - length:] if suffix else word[:length])
+            if by_strip is None:
+                continue
+            for strip, by_flag in by_strip.items():
+                stem = word[:len(word) - length] + strip if suffix else strip + word[length:]
+                flags = self.entries.get(stem) if stem else None
+                if flags is None or (self.forbidden is not None and self.forbidden in flags):
+                    continue
+                for flag in flags:
+                    for rule in by_flag.get(flag, ()):
+                        if rule.condition is None or rule.condition.search(stem):
+                            yield stem, rule
+
+    def __contains__(self, word: str) -> bool:
+        known = self._known.get(word)
+        if known is None:
+            known = self._lookup(word)
+            if self.cache_size:
+                if len(self._known) >= self.cache_size:
+                    self._known.clear()
+                self._known[word] = known
+        return known
+
+    def __getstate__(self) -> dict:
+        # Кеш не передается в pickle (процессы пула собирают свой)
+        return dict(self.__dict__, _known={})
+
+    def _lookup(self, word: str) -> bool:
+        """Проверка слова разбором аффиксов (границы те же, что в _roots)"""
+        if self._is_root(word):
+            return True
+
+        # Самый частый случай - основа + окончание; без генератора _roots
+        entries = self.entries
+        size = len(word)
+        for length in self.suffix_lengths:
+            by_strip = self.suffixes.get(word[size - length:]) if length < size else None
+            if by_strip is None:
+                continue
+            for strip, by_flag in by_strip.items():
+                stem = word[:size - length] + strip
+                flags = entries.get(stem)
+                if flags is None or (self.forbidden is not None and self.forbidden in flags):
+                    continue
+                for flag in flags:
+                    for rule in by_flag.get(flag, ()):
+                        if rule.condition is None or rule.condition.search(stem):
+                            return True
+
+        for _ in self._roots(word, suffix=False):
+            return True
+
+        # Приставка + окончание одновременно: у основы должны быть оба флага
+        for length in self.prefix_lengths:
+            by_strip = self.prefixes.get(word[:length]) if length < len(word) else None
+            if by_strip is None:
+                continue
+            for strip, by_flag in by_strip.items():
+                middle = strip + word[length:]
+                prefix_rules = [rule for rules in by_flag.values() for rule in rules
+                                if rule.cross_product and (rule.condition is None or rule.condition.search(middle))]
+                if not prefix_rules:
+                    continue
+                for root, rule in self._roots(middle, suffix=True):
+                    if rule.cross_product and any(self._is_root(root, prefix_rule.flag)
+                                                  for prefix_rule in prefix_rules):
+                        return True
+        return False
+
+    def _apply(self, stem: str, suffix: bool, rule: AffixRule) -> Optional[str]:
+        # Та же граница, что при проверке: strip не съедает основу целиком
+        if len(rule.strip) >= len(stem):
+            return None
+        if rule.condition is not None and not rule.condition.search(stem):
+            return None
+        if suffix:
+            if rule.strip and not stem.endswith(rule.strip):
+                return None
+            return stem[:len(stem) - len(rule.strip)] + rule.add
+        if rule.strip and not stem.startswith(rule.strip):
+            return None
+        return rule.add + stem[len(rule.strip):]
+
+    def expand_entry(self, stem: str, flags: Tuple[str, ...]) -> Iterator[str]:
+        """Все словоформы одной записи .dic"""
+        if self.forbidden is not None and self.forbidden in flags:
+            return
+        if self.needaffix is None or self.needaffix not in flags:
+            yield stem
+        suffixed = []
+        for flag in flags:
+            for suffix, rule in self.flag_rules.get(flag, ()):
+                if suffix:
+                    form = self._apply(stem, True, rule)
+                    if form:
+                        yield form
+                        if rule.cross_product:
+                            suffixed.append(form)
+        for flag in flags:
+            for suffix, rule in self.flag_rules.get(flag, ()):
+                if not suffix:
+                    form = self._apply(stem, False, rule)
+                    if form:
+                        yield form
+                        if rule.cross_product:
+                            for base in suffixed:
+                                cross = self._apply(base, False, rule)
+                                if cross:
+                                    yield cross
+
+    def build_start_index(self) -> Dict[str, List[str]]:
+        """Индекс начал словоформ (строится один раз)
+        Если окончания не задевают первые START_LEN букв основы, а приставок у
+        записи нет, все ее формы начинаются как основа; иначе запись разворачивается"""
+        if self._starts is not None:
+            return self._starts
+        max_strip = {}
+        has_prefix = set()
+        for flag, rules in self.flag_rules.items():
+            for suffix, rule in rules:
+                if suffix:
+                    max_strip[flag] = max(max_strip.get(flag, 0), len(rule.strip))
+                else:
+                    has_prefix.add(flag)
+        starts = defaultdict(list)
+        for stem, flags in self.entries.items():
+            strip = max((max_strip.get(flag, 0) for flag in flags), default=0)
+            if len(stem) - strip >= START_LEN and has_prefix.isdisjoint(flags):
+                starts[stem[:START_LEN]].append(stem)
+            else:
+                for start in {form[:START_LEN] for form in self.expand_entry(stem, flags)}:
+                    starts[start].append(stem)
+        self._starts = dict(starts)
+        return self._starts
+
+    def forms_starting_with(self, start: str) -> Iterator[str]:
+        """Словоформы, начинающиеся с start; разворачиваются только подходящие записи"""
+        starts = self.build_start_index()
+        if len(start) >= START_LEN:
+            keys = [start[:START_LEN]]
+        else:
+            keys = [key for key in starts if key.startswith(start)]
+        for key in keys:
+            for stem in starts.get(key, ()):
+                for form in self.expand_entry(stem, self.entries[stem]):
+                    if form.startswith(start):
+                        yield form
+
+    def __iter__(self) -> Iterator[str]:
+        """Ленивое развертывание всех словоформ (повторы возможны)"""
+        for stem, flags in self.entries.items():
+            yield from self.expand_entry(stem, flags)
+
+    def __len__(self) -> int:
+        """Количество словоформ (считается один раз, без хранения самих форм)"""
+        if self._size is None:
+            self._size = sum(1 for _ in self)
+        return self._size
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+    def words(self) -> set:
+        """Полный набор словоформ (для сравнения и экспорта)"""
+        return set(self)
+
+
+def _rss_bytes() -> int:
+    """Текущий RSS процесса (Linux) или пиковый, если /proc недоступен"""
+    status = Path('/proc/self/status')
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure_load(path: str) -> dict:
+    """Время загрузки и прирост RSS для .dic или vocabulary.txt"""
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    if path.endswith('.dic'):
+        dictionary = HunspellDictionary.load(path)
+        entries = len(dictionary.entries)
+    else:
+        # Так словарь загружает веб-интерфейс: множество слов + частоты
+        dictionary, word_freq = set(), {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if parts[0]:
+                    dictionary.add(parts[0])
+                    word_freq[parts[0]] = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1
+        entries = len(dictionary)
+    load_seconds = time.perf_counter() - start
+    rss_after = _rss_bytes()
+
+    sample = list(itertools.islice(iter(dictionary), 20000))
+    start = time.perf_counter()
+    for word in sample:
+        word in dictionary
+    lookup_ns = (time.perf_counter() - start) / max(len(sample), 1) * 1e9
+
+    return {
+        'path': path,
+        'entries': entries,
+        'load_seconds': load_seconds,
+        'rss_bytes': rss_after - rss_before,
+        'lookup_ns': lookup_ns,
+    }
+
+
+def compare(dic_path: str, vocabulary_path: str) -> None:
+    """Сравнение .dic/.aff и vocabulary.txt, каждый в отдельном процессе"""
+    results = []
+    for path in (vocabulary_path, dic_path):
+        output = subprocess.run([sys.executable, __file__, '--measure', path],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'':<22}{'vocabulary.txt':>16}{'.dic + .aff':>16}")
+    rows = (
+        ('Записей', 'entries', '{:.0f}', 1),
+        ('Загрузка, с', 'load_seconds', '{:.2f}', 1),
+        ('Прирост RSS, MB', 'rss_bytes', '{:.1f}', 1e-6),
+        ('Проверка слова, нс', 'lookup_ns', '{:.0f}', 1),
+    )
+    for title, key, fmt, factor in rows:
+        print(f"{title:<22}{fmt.format(results[0][key] * factor):>16}{fmt.format(results[1][key] * factor):>16}")
+
+    vocabulary = set()
+    with open(vocabulary_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            word = line.split('\t')[0].strip()
+            if word:
+                vocabulary.add(word)
+    dictionary = HunspellDictionary.load(dic_path)
+    missing = sum(1 for word in vocabulary if word not in dictionary)
+    print(f"Слов vocabulary.txt, не принятых словарем Hunspell: {missing}/{len(vocabulary)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Словарь Hunspell с ленивым разбором аффиксов')
+    parser.add_argument('--dic', default='hunspell_georgian/ka_GE.dic',
+                       help='Файл .dic (рядом должен лежать .aff)')
+    parser.add_argument('--vocabulary', default='processed_corpus/vocabulary.txt',
+                       help='vocabulary.txt для сравнения')
+    parser.add_argument('--check', nargs='*',
+                       help='Проверить слова')
+    parser.add_argument('--measure', type=str,
+                       help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure_load(args.measure)))
+        return
+
+    if not Path(args.dic).exists():
+        print(f"Словарь не найден: {args.dic}")
+        return
+
+    if args.check:
+        dictionary = HunspellDictionary.load(args.dic)
+        for word in args.check:
+            print(f"{'✓' if word in dictionary else '✗'} {word}")
+    elif Path(args.vocabulary).exists():
+        compare(args.dic, args.vocabulary)
+    else:
+        print(f"vocabulary.txt не найден: {args.vocabulary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Морфологическая проверка слов: префиксное дерево основ + автомат окончаний
+Основы и окончания выводятся из словаря (см. hunspell_affix), поэтому
+правильная, но не встречавшаяся в корпусе словоформа (известная основа +
+известное окончание) принимается без дорогого поиска кандидатов.
+Проверка идет за O(длина слова):
+- обратный проход по автомату окончаний отмечает позиции, с которых
+  начинается известное окончание
+- прямой проход по дереву основ проверяет, заканчивается ли основа
+  в одной из отмеченных позиций
+Кандидаты исправления ищутся обходом тех же деревьев с отсечением по
+расстоянию (как Dawg.fuzzy): ошибка в основе - обход дерева основ, ошибка
+в окончании - обход автомата окончаний.
+"""
+
+import time
+import random
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from georgian_tokenizer import tokenize_file
+from hunspell_affix import mine_suffixes, split_vocabulary
+
+END = ''
+
+
+def fuzzy_walk(trie: dict, word: str, max_distance: int) -> Iterator[Tuple[str, object, int]]:
+    """Ключи дерева на расстоянии Левенштейна не больше max_distance от word:
+    (ключ, значение END, расстояние). Ветка, на которой расстояние уже больше
+    max_distance, не обходится"""
+    stack = [(trie, '', list(range(len(word) + 1)))]
+    while stack:
+        node, prefix, row = stack.pop()
+        for char, child in node.items():
+            if char == END:
+                if row[-1] <= max_distance:
+                    yield prefix, child, row[-1]
+                continue
+            current = [row[0] + 1]
+            for i, word_char in enumerate(word, 1):
+                current.append(min(current[i - 1] + 1, row[i] + 1, row[i - 1] + (word_char != char)))
+            if min(current) <= max_distance:
+                stack.append((child, prefix + char, current))
+
+
+class MorphologyIndex:
+    """Дерево основ и автомат окончаний, построенные по словарю"""
+
+    def __init__(self, stem_endings: Dict[str, Iterable[str]], min_stem_len: int = 3,
+                 min_cooccurrence: int = 10):
+        self.min_stem_len = min_stem_len
+        self.min_cooccurrence = min_cooccurrence
+        self.stem_endings = {stem: frozenset(endings) for stem, endings in stem_endings.items()}
+        self.suffixes = {suffix for endings in self.stem_endings.values() for suffix in endings if suffix}
+
+        # Окончание совместимо с основой, если у других основ оно часто
+        # встречается вместе с одним из засвидетельствованных окончаний этой основы
+        cooccurrence = Counter()
+        for endings in self.stem_endings.values():
+            for first in endings:
+                for second in endings:
+                    if first != second:
+                        cooccurrence[first, second] += 1
+        self.compatible = {}
+        for (first, second), count in cooccurrence.items():
+            if count >= min_cooccurrence:
+                self.compatible.setdefault(second, set()).add(first)
+
+        # Префиксное дерево основ: {буква: узел}, END - конец основы и ее окончания
+        self.stem_trie = {}
+        for stem, endings in self.stem_endings.items():
+            node = self.stem_trie
+            for char in stem:
+                node = node.setdefault(char, {})
+            node[END] = endings
+
+        # Автомат окончаний: дерево перевернутых окончаний
+        self.suffix_trie = {}
+        for suffix in self.suffixes:
+            node = self.suffix_trie
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            node[END] = True
+
+    @property
+    def stems(self) -> Set[str]:
+        return set(self.stem_endings)
+
+    @classmethod
+    def from_vocabulary(cls, vocabulary: Iterable[str], min_stem_forms: int = 2, min_stem_len: int = 3,
+                        min_cooccurrence: int = 10, **mining_options) -> 'MorphologyIndex':
+        """Вывод основ и окончаний из словаря"""
+        vocabulary = set(vocabulary)
+        suffixes = [suffix for suffix, _ in mine_suffixes(vocabulary, **mining_options)]
+        stems = split_vocabulary(vocabulary, suffixes)
+        # Принимаем только продуктивные основы - с несколькими засвидетельствованными формами
+        productive = {stem: endings for stem, endings in stems.items()
+                      if len(endings) >= min_stem_forms and len(stem) >= min_stem_len}
+        return cls(productive, min_stem_len, min_cooccurrence)
+
+    def to_dict(self) -> dict:
+        """Данные для сохранения в модели"""
+        return {
+            'stem_endings': {stem: sorted(endings) for stem, endings in self.stem_endings.items()},
+            'min_stem_len': self.min_stem_len,
+            'min_cooccurrence': self.min_cooccurrence,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MorphologyIndex':
+        return cls(data['stem_endings'], data.get('min_stem_len', 3), data.get('min_cooccurrence', 10))
+
+    def _compatible(self, endings: frozenset, suffix: str) -> bool:
+        """Подходит ли окончание к основе с данными засвидетельствованными окончаниями"""
+        return suffix in endings or not endings.isdisjoint(self.compatible.get(suffix, ()))
+
+    def suffix_starts(self, word: str) -> Set[int]:
+        """Позиции, с которых в слове начинается известное окончание"""
+        starts = set()
+        node = self.suffix_trie
+        for i in range(len(word) - 1, -1, -1):
+            node = node.get(word[i])
+            if node is None:
+                break
+            if END in node:
+                starts.add(i)
+        return starts
+
+    def stem_ends(self, word: str) -> List[Tuple[int, frozenset]]:
+        """Известные основы, которыми начинается слово: (длина, окончания основы)"""
+        ends = []
+        node = self.stem_trie
+        for i, char in enumerate(word):
+            node = node.get(char)
+            if node is None:
+                break
+            if END in node:
+                ends.append((i + 1, node[END]))
+        return ends
+
+    def splits(self, word: str) -> List[Tuple[str, str]]:
+        """Все допустимые разбиения слова на основу и окончание"""
+        starts = self.suffix_starts(word)
+        return [(word[:end], word[end:]) for end, endings in self.stem_ends(word)
+                if end in starts and self._compatible(endings, word[end:])]
+
+    def accepts(self, word: str) -> bool:
+        """Слово = известная основа + совместимое с ней окончание"""
+        starts = self.suffix_starts(word)
+        if not starts:
+            return False
+        return any(end in starts and self._compatible(endings, word[end:])
+                   for end, endings in self.stem_ends(word))
+
+    def candidates(self, word: str, max_distance: int = 2) -> List[Tuple[str, int]]:
+        """Формы, найденные поиском только по основам или только по окончаниям
+        Формы могут отсутствовать в словаре (их принимает accepts). Расстояние -
+        расстояние исправленной части слова: расстояние всего слова не больше"""
+        found = {}
+
+        def add(candidate: str, distance: int):
+            if distance < found.get(candidate, max_distance + 1):
+                found[candidate] = distance
+
+        # Известное окончание, ошибка в основе: обход дерева основ
+        for start in self.suffix_starts(word):
+            if start < self.min_stem_len:
+                continue
+            broken_stem, suffix = word[:start], word[start:]
+            for stem, endings, distance in fuzzy_walk(self.stem_trie, broken_stem, max_distance):
+                if self._compatible(endings, suffix):
+                    add(stem + suffix, distance)
+
+        # Известная основа, ошибка в окончании: обход автомата окончаний
+        # (окончания в нем перевернуты, расстояние от переворота не меняется)
+        for end, endings in self.stem_ends(word):
+            stem, broken_suffix = word[:end], word[end:]
+            for reversed_suffix, _, distance in fuzzy_walk(self.suffix_trie, broken_suffix[::-1], max_distance):
+                suffix = reversed_suffix[::-1]
+                if self._compatible(endings, suffix):
+                    add(stem + suffix, distance)
+
+        return list(found.items())
+
+
+def report(corpus_path: str, held_out_every: int = 10, typo_samples: int = 200, seed: int = 42) -> None:
+    """Сколько поисков кандидатов удается избежать на отложенной части корпуса"""
+    txt_files = sorted(Path(corpus_path).rglob("*.txt"))
+    if not txt_files:
+        print(f"В папке {corpus_path} не найдено txt файлов!")
+        return
+
+    train_freq = Counter()
+    held_out_tokens = []
+    for i, file_path in enumerate(txt_files):
+        tokens = tokenize_file(file_path)
+        if i % held_out_every == 0:
+            held_out_tokens.extend(tokens)
+        else:
+            train_freq.update(tokens)
+
+    start = time.perf_counter()
+    morphology = MorphologyIndex.from_vocabulary(train_freq)
+    build_seconds = time.perf_counter() - start
+    print(f"Обучение: {len(train_freq)} слов, основ {len(morphology.stem_endings)}, "
+          f"окончаний {len(morphology.suffixes)} ({build_seconds:.1f} с)")
+
+    unknown = [word for word in held_out_tokens if word not in train_freq]
+    accepted = [word for word in unknown if morphology.accepts(word)]
+    print(f"Отложенные токены: {len(held_out_tokens)}")
+    print(f"Не найдено в словаре (поиск кандидатов): {len(unknown)} "
+          f"({len(unknown) / max(len(held_out_tokens), 1) * 100:.1f}%)")
+    print(f"Из них принято морфологией: {len(accepted)} "
+          f"({len(accepted) / max(len(unknown), 1) * 100:.1f}% поисков избежано)")
+
+    start = time.perf_counter()
+    for word in held_out_tokens:
+        word in train_freq or morphology.accepts(word)
+    lookup_ns = (time.perf_counter() - start) / max(len(held_out_tokens), 1) * 1e9
+    print(f"Проверка слова: {lookup_ns:.0f} нс")
+
+    # Цена обобщения: сколько опечаток в известных словах морфология пропускает
+    from vocabulary_pruning import make_typo
+    rng = random.Random(seed)
+    frequent = [word for word, _ in train_freq.most_common(5000) if len(word) > 3]
+    typos = []
+    while len(typos) < typo_samples and frequent:
+        typo = make_typo(rng.choice(frequent), rng)
+        if typo not in train_freq:
+            typos.append(typo)
+    missed = sum(1 for typo in typos if morphology.accepts(typo))
+    print(f"Опечаток частых слов, принятых как правильные: {missed}/{len(typos)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Морфологическая проверка слов')
+    parser.add_argument('--corpus', default=str(Path(__file__).parent.parent / "1_collect" / "corpus"),
+                       help='Путь к корпусу текстов')
+    parser.add_argument('--held-out-every', type=int, default=10,
+                       help='Каждый N-й файл корпуса откладывается для проверки')
+    parser.add_argument('--check', type=str,
+                       help='Показать разбиения слова')
+    args = parser.parse_args()
+
+    if args.check:
+        from georgian_spellchecker import GeorgianSpellChecker
+        checker = GeorgianSpellChecker()
+        checker.load_corpus(args.corpus)
+        morphology = MorphologyIndex.from_vocabulary(checker.vocabulary)
+        print(f"{args.check}: {morphology.splits(args.check)}")
+    else:
+        report(args.corpus, args.held_out_every)
+
+
+if __name__ == "__main__":
+    main()
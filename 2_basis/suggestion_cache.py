@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Постоянный кеш исправлений на диске (sqlite3)
+Кеш в памяти процесса пропадает при каждом перезапуске или /reload и не
+общий для нескольких рабочих процессов. Здесь исправления хранятся в файле
+SQLite в режиме WAL:
+- читать могут все процессы одновременно, не блокируя друг друга
+- отдельного процесса-писателя нет: пишет каждый процесс, своими пачками.
+  Писатель в один момент все равно один - SQLite допускает одну транзакцию
+  записи за раз, а одинаковые слова разных процессов не конфликтуют
+  (INSERT OR IGNORE). Единственный писатель потребовал бы пересылать ему
+  найденные исправления из всех рабочих процессов gunicorn
+- недописанная пачка сохраняется при close() и при выходе процесса (atexit)
+- ключ - (версия модели, слово): процесс читает только записи своей
+  версии, поэтому устаревшие исправления никогда не возвращаются. Записи
+  разных версий живут рядом: при поэтапном деплое и при откате (/rollback)
+  обе версии пользуются своими записями и не стирают чужие
+- у записи есть время последнего использования; при открытии кеша
+  удаляются записи, не использованные дольше max_age_days (так уходят и
+  записи старых версий), а сверх max_entries - самые давние (LRU)
+"""
+
+import json
+import time
+import atexit
+import random
+import sqlite3
+import hashlib
+import weakref
+import argparse
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suggestions (
+    model TEXT NOT NULL,
+    word TEXT NOT NULL,
+    suggestions TEXT NOT NULL,
+    used REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (model, word)
+) WITHOUT ROWID;
+"""
+# Индекс создается после добавления столбца used в файлы прежней версии
+USED_INDEX = "CREATE INDEX IF NOT EXISTS suggestions_used ON suggestions (used)"
+# Время использования записи обновляется не чаще этого (секунды):
+# чтение из кеша почти никогда не превращается в запись
+TOUCH_INTERVAL = 3600
+
+# Открытые кеши процесса: их пачки дописываются при выходе
+_open_caches = weakref.WeakSet()
+
+
+def _flush_open_caches() -> None:
+    for cache in list(_open_caches):
+        try:
+            cache.flush()
+        except sqlite3.Error as e:
+            print(f"❌ Кеш исправлений: пачка не сохранена при выходе ({e})")
+
+
+atexit.register(_flush_open_caches)
+
+
+def model_hash(path) -> str:
+    """Версия модели - хеш содержимого файла"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def vocabulary_hash(vocabulary) -> str:
+    """Версия для словаря без файла (например, тестового)"""
+    digest = hashlib.sha256()
+    for word in sorted(vocabulary):
+        digest.update(word.encode('utf-8') + b'\n')
+    return digest.hexdigest()[:16]
+
+
+class SuggestionCache:
+    """Кеш исправлений, общий для процессов и перезапусков"""
+
+    def __init__(self, path: str, model_version: str, batch_size: int = 32, timeout: float = 5.0,
+                 max_age_days: float = 7.0, max_entries: int = 1000000):
+        self.path = str(path)
+        self.model_version = model_version
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Счетчики увеличивают потоки запросов (как в metrics.MetricsRegistry)
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        self._pending: Dict[str, str] = {}
+        # Слова, время использования которых нужно обновить при следующей записи
+        self._touched = set()
+        self._write_lock = threading.Lock()
+
+        connection = self._connection()
+        with connection:
+            connection.executescript(SCHEMA)
+            # Файл прежней версии кеша: без времени использования
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(suggestions)")}
+            if 'used' not in columns:
+                connection.execute("ALTER TABLE suggestions ADD COLUMN used REAL NOT NULL DEFAULT 0")
+            connection.execute(USED_INDEX)
+        self.prune()
+        _open_caches.add(self)
+
+    def prune(self) -> int:
+        """Удаление давно не использованных записей (всех версий) и самых давних сверх
+        max_entries; возвращает число удаленных"""
+        connection = self._connection()
+        try:
+            with connection:
+                removed = connection.execute(
+                    "DELETE FROM suggestions WHERE used < ?",
+                    (time.time() - self.max_age_days * 86400,)).rowcount
+                excess = connection.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    removed += connection.execute(
+                        "DELETE FROM suggestions WHERE (model, word) IN "
+                        "(SELECT model, word FROM suggestions ORDER BY used LIMIT ?)", (excess,)).rowcount
+        except sqlite3.OperationalError as e:
+            print(f"❌ Кеш исправлений: очистка не удалась ({e})")
+            return 0
+        return removed
+
+    def _connection(self) -> sqlite3.Connection:
+        """Отдельное соединение на поток (sqlite3 не делит соединения между потоками)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, word: str) -> Optional[List[str]]:
+        """Исправления из кеша или None"""
+        with self._write_lock:
+            pending = self._pending.get(word)
+        if pending is not None:
+            self._count(True)
+            return json.loads(pending)
+        row = self._connection().execute(
+            "SELECT suggestions, used FROM suggestions WHERE model = ? AND word = ?",
+            (self.model_version, word)).fetchone()
+        self._count(row is not None)
+        if row is None:
+            return None
+        if time.time() - row[1] > TOUCH_INTERVAL:
+            with self._write_lock:
+                self._touched.add(word)
+        return json.loads(row[0])
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, word: str, suggestions: List[str]) -> None:
+        """Добавление в очередь записи; пачка пишется одной транзакцией"""
+        with self._write_lock:
+            self._pending[word] = json.dumps(suggestions, ensure_ascii=False)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, {}
+        self._write(batch)
+
+    def flush(self) -> None:
+        with self._write_lock:
+            batch, self._pending = self._pending, {}
+        if batch or self._touched:
+            self._write(batch)
+
+    def _write(self, batch: Dict[str, str]) -> None:
+        """Запись пачки и времени использования прочитанных записей одной транзакцией"""
+        with self._write_lock:
+            touched, self._touched = self._touched, set()
+        now = time.time()
+        connection = self._connection()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO suggestions (model, word, suggestions, used) VALUES (?, ?, ?, ?)",
+                    [(self.model_version, word, suggestions, now) for word, suggestions in batch.items()])
+                connection.executemany(
+                    "UPDATE suggestions SET used = ? WHERE model = ? AND word = ?",
+                    [(now, self.model_version, word) for word in touched])
+        except sqlite3.OperationalError as e:
+            # Кеш - только ускорение: если другой процесс держит запись слишком долго, пачка теряется
+            print(f"❌ Кеш исправлений: запись не удалась ({e})")
+
+    def __len__(self) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM suggestions WHERE model = ?", (self.model_version,)).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """Запись недописанной пачки и закрытие соединения этого потока"""
+        self.flush()
+        _open_caches.discard(self)
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def cached(suggest: Callable[[str], List[str]], cache: SuggestionCache) -> Callable[[str], List[str]]:
+    """Обертка функции исправлений: сначала кеш, потом поиск с записью в кеш"""
+    def suggest_cached(word: str) -> List[str]:
+        suggestions = cache.get(word)
+        if suggestions is None:
+            suggestions = suggest(word)
+            cache.put(word, suggestions)
+        return suggestions
+    return suggest_cached
+
+
+def _percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))] if ordered else 0.0
+
+
+def _read_worker(path: str, version: str, words: List[str], results) -> None:
+    cache = SuggestionCache(path, version)
+    results.put(sum(1 for word in words if cache.get(word) is not None))
+
+
+def report(model_path: str, cache_path: str, test_corpus: str, samples: int = 200,
+           workers: int = 4, seed: int = 42) -> None:
+    """Задержка после "деплоя" без кеша, с холодным и с заполненным кешем на диске"""
+    import pickle
+    import multiprocessing
+    from dawg import Dawg
+    from georgian_tokenizer import tokenize_file
+    from vocabulary_pruning import make_typo
+
+    with open(model_path, 'rb') as f:
+        model_data = pickle.load(f)
+    word_freq = dict(model_data['word_freq'])
+    dawg = Dawg.build(word_freq)
+    version = model_hash(model_path)
+
+    def suggest(word: str) -> List[str]:
+        candidates = sorted(dawg.fuzzy(word, 2), key=lambda x: (x[1], -dawg.get(x[0])))
+        return [candidate for candidate, _ in candidates[:5]]
+
+    rng = random.Random(seed)
+    words = sorted({word for path in sorted(Path(test_corpus).rglob("*.txt"))
+                    for word in tokenize_file(path) if len(word) > 3})
+    words += [word for word, _ in sorted(word_freq.items(), key=lambda x: -x[1])[:2000] if len(word) > 3]
+    typos = []
+    while len(typos) < samples:
+        typo = make_typo(rng.choice(words), rng)
+        if typo not in dawg:
+            typos.append(typo)
+
+    Path(cache_path).unlink(missing_ok=True)
+
+    def run(suggest_function) -> List[float]:
+        latencies = []
+        for typo in typos:
+            start = time.perf_counter()
+            suggest_function(typo)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    # Первый процесс после деплоя заполняет кеш
+    cache = SuggestionCache(cache_path, version)
+    cold = run(cached(suggest, cache))
+    cache.close()
+
+    # "Перезапуск": новое соединение, кеш уже на диске
+    cache = SuggestionCache(cache_path, version)
+    warm = run(cached(suggest, cache))
+    cache.close()
+
+    # Новая версия модели не видит записей прежней, но и не удаляет их (откат)
+    cache = SuggestionCache(cache_path, version + '-next')
+    invalidated = sum(1 for typo in typos if cache.get(typo) is not None)
+    cache.close()
+    kept = len(SuggestionCache(cache_path, version))
+
+    # Параллельное чтение из нескольких процессов
+    cache = SuggestionCache(cache_path, version)
+    run(cached(suggest, cache))
+    cache.close()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_read_worker, args=(cache_path, version, typos, results))
+                 for _ in range(workers)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    parallel_seconds = time.perf_counter() - start
+    worker_hits = [results.get() for _ in processes]
+
+    print(f"Опечаток: {len(typos)}, версия модели: {version}")
+    print(f"{'':<34}{'p50, мс':>10}{'p99, мс':>10}")
+    print(f"{'после деплоя, кеш пуст':<34}{_percentile(cold, 0.5):>10.2f}{_percentile(cold, 0.99):>10.2f}")
+    print(f"{'после перезапуска, кеш на диске':<34}{_percentile(warm, 0.5):>10.2f}{_percentile(warm, 0.99):>10.2f}")
+    print(f"Записей, видимых после смены версии модели: {invalidated}; "
+          f"записей прежней версии сохранено: {kept}")
+    print(f"Параллельное чтение: {workers} процессов, попаданий {worker_hits} за {parallel_seconds:.2f} с")
+    print(f"Размер файла кеша: {Path(cache_path).stat().st_size / 1e3:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Постоянный кеш исправлений')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель (ее хеш - версия записей кеша)')
+    parser.add_argument('--cache', default='suggestion_cache.sqlite',
+                       help='Файл кеша')
+    parser.add_argument('--test-corpus', default=str(Path(__file__).parent.parent / "test_corpus"),
+                       help='Корпус для опечаток')
+    parser.add_argument('--samples', type=int, default=200,
+                       help='Количество опечаток')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Процессов для проверки параллельного чтения')
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"Модель не найдена: {args.model}")
+        return
+    report(args.model, args.cache, args.test_corpus, args.samples, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Заранее вычисленные исправления для частых опечаток
+Большая часть неизвестных слов в запросах - одни и те же повторяющиеся
+опечатки. Этап сборки находит их:
+- в корпусе: слова, которые встречаются, но не проходят is_correct
+  (например, удаленные очисткой словаря редкие соседи частых слов)
+- в журналах запросов: неизвестные слова, которые повторяются
+и сохраняет для них готовый список исправлений в модели. При проверке
+такие слова отвечаются из таблицы за O(1), поиск кандидатов нужен только
+для новых слов.
+
+Журнал запросов - файлы, где каждая строка - текст запроса или JSON
+с полем "text" (весь текст) или "unknown" (список неизвестных слов).
+
+Долю попаданий --replay без журналов меряет на отложенных файлах корпуса
+с независимыми опечатками (typo_generator.py, как evaluate.py): отложенные файлы
+исключаются из поиска опечаток, поэтому попадания не подстроены под таблицу.
+"""
+
+import json
+import time
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional
+
+from georgian_tokenizer import tokenize_georgian, tokenize_file
+from typo_generator import build_labeled_set
+
+
+class SuggestionTable:
+    """Опечатка -> готовый список исправлений"""
+
+    def __init__(self, entries: Optional[Dict[str, List[str]]] = None):
+        self.entries = {word: tuple(suggestions) for word, suggestions in (entries or {}).items()}
+
+    @classmethod
+    def build(cls, misspellings: Iterable[str], suggest: Callable[[str], List[str]],
+              progress_every: int = 100) -> 'SuggestionTable':
+        """Вычисление исправлений для всех найденных опечаток"""
+        entries = {}
+        start = time.perf_counter()
+        for i, word in enumerate(misspellings, 1):
+            entries[word] = suggest(word)
+            if progress_every and i % progress_every == 0:
+                print(f"   {i} опечаток, {time.perf_counter() - start:.0f} с")
+        return cls(entries)
+
+    def get(self, word: str) -> Optional[List[str]]:
+        """Готовые исправления или None, если слова нет в таблице"""
+        suggestions = self.entries.get(word)
+        return None if suggestions is None else list(suggestions)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {word: list(suggestions) for word, suggestions in self.entries.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[str]]) -> 'SuggestionTable':
+        return cls(data)
+
+
+def iter_request_words(paths: Iterable[str]) -> Iterator[str]:
+    """Слова из журналов запросов (текст или JSON с полями text / unknown)"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith('{'):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        record = {'text': line}
+                    if 'unknown' in record:
+                        yield from record['unknown']
+                        continue
+                    line = record.get('text', '')
+                yield from tokenize_georgian(line)
+
+
+def mine_misspellings(is_correct: Callable[[str], bool], corpus_path: Optional[str] = None,
+                      request_logs: Iterable[str] = (), min_count: int = 2,
+                      max_entries: int = 20000, exclude: Collection[Path] = ()) -> Counter:
+    """Неизвестные слова, повторяющиеся в корпусе и журналах, от частых к редким
+    exclude - файлы корпуса, которые не просматриваются (отложенные для замера)"""
+    counts = Counter()
+    if corpus_path:
+        for file_path in sorted(Path(corpus_path).rglob("*.txt")):
+            if file_path.resolve() in exclude:
+                continue
+            counts.update(word for word in tokenize_file(file_path) if not is_correct(word))
+    counts.update(word for word in iter_request_words(request_logs) if not is_correct(word))
+    return Counter(dict((word, count) for word, count in counts.most_common(max_entries) if count >= min_count))
+
+
+def heldout_traffic(corpus_path: str, holdout_files: int = 50, sentences: int = 2000,
+                    seed: int = 7) -> dict:
+    """Предложения отложенных файлов с независимыми опечатками (разметка как в evaluate.py)"""
+    return build_labeled_set(Path(corpus_path), holdout_files, sentences, seed=seed)
+
+
+def replay(checker, table: SuggestionTable, texts: List[str], latency_samples: int = 10,
+           labeled: Optional[dict] = None) -> dict:
+    """Доля неизвестных слов, отвеченных таблицей, и задержка с таблицей и без
+    С разметкой - еще доля вставленных опечаток, попавших в таблицу, и доля
+    попаданий, где исходное слово среди исправлений таблицы"""
+    unknown = [word for text in texts for word in checker.tokenize_georgian(text) if not checker.is_correct(word)]
+    hits = sum(1 for word in unknown if word in table)
+
+    hit_words = [word for word in unknown if word in table][:latency_samples]
+    miss_words = [word for word in unknown if word not in table][:latency_samples]
+    start = time.perf_counter()
+    for word in hit_words:
+        table.get(word)
+    hit_ms = (time.perf_counter() - start) / max(len(hit_words), 1) * 1000
+    start = time.perf_counter()
+    for word in miss_words:
+        checker.generate_candidates(word)
+    search_ms = (time.perf_counter() - start) / max(len(miss_words), 1) * 1000
+
+    result = {
+        'unknown_tokens': len(unknown),
+        'unique_unknown': len(set(unknown)),
+        'hits': hits,
+        'hit_rate': hits / max(len(unknown), 1),
+        'table_ms': hit_ms,
+        'search_ms': search_ms,
+    }
+    if labeled is not None:
+        typos = [(sentence['tokens'][int(i)], typo['original'])
+                 for sentence in labeled['sentences'] for i, typo in sentence['typos'].items()]
+        typo_hits = [(typo, original) for typo, original in typos if typo in table]
+        result.update({
+            'typos': len(typos),
+            'typo_hits': len(typo_hits),
+            'typo_hit_rate': len(typo_hits) / max(len(typos), 1),
+            'hit_correct': sum(1 for typo, original in typo_hits if original in table.get(typo)),
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Таблица исправлений для частых опечаток')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель, в которую добавляется таблица')
+    parser.add_argument('--corpus', default=None,
+                       help='Искать опечатки в корпусе')
+    parser.add_argument('--requests', nargs='*', default=[],
+                       help='Журналы запросов для поиска опечаток')
+    parser.add_argument('--min-count', type=int, default=2,
+                       help='Минимальное число повторов опечатки')
+    parser.add_argument('--max-entries', type=int, default=20000,
+                       help='Максимальный размер таблицы')
+    parser.add_argument('--replay', nargs='*', default=None,
+                       help='Журналы для замера доли попаданий (без значения - отложенные файлы корпуса)')
+    parser.add_argument('--traffic-corpus', default=str(Path(__file__).parent.parent / "1_collect" / "corpus"),
+                       help='Корпус, из которого откладываются файлы для замера')
+    parser.add_argument('--holdout-files', type=int, default=50,
+                       help='Число отложенных файлов (исключаются из --corpus)')
+    parser.add_argument('--requests-count', type=int, default=2000,
+                       help='Число предложений с опечатками из отложенных файлов')
+    parser.add_argument('--search', choices=['dawg', 'checker'], default='dawg',
+                       help='Чем вычислять исправления: обход DAWG (то же ранжирование по расстоянию '
+                            'и частоте, быстрее) или generate_candidates самой модели')
+    parser.add_argument('--output', default=None,
+                       help='Сохранить модель с таблицей (по умолчанию --model)')
+    args = parser.parse_args()
+
+    from georgian_spellchecker import GeorgianSpellChecker
+
+    if not Path(args.model).exists():
+        print(f"Модель не найдена: {args.model}")
+        return
+    checker = GeorgianSpellChecker()
+    checker.load_model(args.model)
+    checker.suggestion_table = None
+
+    # Без своих журналов: отложенные файлы корпуса с независимыми опечатками.
+    # Они не участвуют в поиске опечаток, таблица о них ничего не знает
+    replay_texts = None
+    labeled = None
+    exclude = set()
+    if args.replay is not None and not args.replay:
+        labeled = heldout_traffic(args.traffic_corpus, args.holdout_files, args.requests_count)
+        exclude = {(Path(args.traffic_corpus) / path).resolve() for path in labeled['holdout_files']}
+        replay_texts = [' '.join(sentence['tokens']) for sentence in labeled['sentences']]
+        print(f"Отложено файлов: {len(exclude)}, предложений с опечатками: {len(replay_texts)}")
+    elif args.replay:
+        replay_texts = [' '.join(iter_request_words([path])) for path in args.replay]
+
+    misspellings = mine_misspellings(checker.is_correct, args.corpus, args.requests,
+                                     args.min_count, args.max_entries, exclude)
+    print(f"Найдено повторяющихся опечаток: {len(misspellings)}")
+
+    suggest = checker.suggest_corrections
+    if args.search == 'dawg' and checker.morphology is None:
+        from dawg import Dawg
+        dawg = Dawg.build({word: checker.word_freq.get(word, 1) for word in checker.vocabulary})
+
+        def suggest(word: str) -> List[str]:
+            candidates = sorted(dawg.fuzzy(word, 2), key=lambda x: (x[1], -dawg.get(x[0])))
+            return [candidate for candidate, _ in candidates[:5]]
+
+    start = time.perf_counter()
+    table = SuggestionTable.build(misspellings, suggest)
+    print(f"Таблица построена за {time.perf_counter() - start:.0f} с")
+
+    checker.suggestion_table = table
+    checker.save_model(args.output or args.model)
+
+    if replay_texts:
+        checker.suggestion_table = None
+        result = replay(checker, table, replay_texts, labeled=labeled)
+        print(f"Неизвестных слов в трафике: {result['unknown_tokens']} (уникальных {result['unique_unknown']})")
+        print(f"Отвечено из таблицы: {result['hits']} ({result['hit_rate'] * 100:.1f}%)")
+        if labeled is not None:
+            print(f"Вставленных опечаток в таблице: {result['typo_hits']} из {result['typos']} "
+                  f"({result['typo_hit_rate'] * 100:.1f}%), исходное слово среди исправлений: {result['hit_correct']}")
+        print(f"Задержка: таблица {result['table_ms']:.4f} мс, поиск кандидатов {result['search_ms']:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
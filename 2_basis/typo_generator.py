@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Опечатки, характерные для грузинского набора, и размеченный набор для замеров
+Опечатки: соседняя клавиша, пропущенный Shift (ტ/თ, ს/შ, ც/ჩ ...), похожие
+звуки (კ/ქ/ყ, პ/ფ, წ/ც ...), пропуск, удвоение и перестановка букв.
+Размеченный набор - предложения из отложенных файлов корпуса, где часть слов
+заменена такими опечатками, с исходными словами. Им пользуются evaluate.py,
+suggestion_table.py --replay и load_test.py.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, Tuple
+
+from georgian_tokenizer import iter_file_sentences
+
+# Грузинская раскладка (как QWERTY): ряды без Shift и буквы, набираемые с Shift
+KEYBOARD_ROWS = ('ქწერტყუიოპ', 'ასდფგჰჯკლ', 'ზხცვბნმ')
+SHIFT_PAIRS = {'წ': 'ჭ', 'რ': 'ღ', 'ტ': 'თ', 'ს': 'შ', 'ჯ': 'ჟ', 'ზ': 'ძ', 'ც': 'ჩ'}
+# Похожие по звучанию (абруптивные и придыхательные и т.п.)
+CONFUSABLE_GROUPS = ('კქყ', 'ტთ', 'პფ', 'წცჭჩ', 'ძზ', 'ღგ', 'ხჰ')
+TYPO_OPERATIONS = (
+    ('neighbor', 0.3),
+    ('shift', 0.15),
+    ('confusable', 0.15),
+    ('delete', 0.15),
+    ('double', 0.1),
+    ('transpose', 0.15),
+)
+
+
+def _keyboard_neighbors() -> Dict[str, str]:
+    """Буква -> соседние клавиши (тот же ряд и соседние ряды со сдвигом)"""
+    positions = {char: (row, col) for row, keys in enumerate(KEYBOARD_ROWS) for col, char in enumerate(keys)}
+    for base, shifted in SHIFT_PAIRS.items():
+        positions[shifted] = positions[base]
+    neighbors = {}
+    for char, (row, col) in positions.items():
+        nearby = [(row, col - 1), (row, col + 1), (row - 1, col), (row - 1, col + 1), (row + 1, col - 1), (row + 1, col)]
+        neighbors[char] = ''.join(KEYBOARD_ROWS[r][c] for r, c in nearby
+                                  if 0 <= r < len(KEYBOARD_ROWS) and 0 <= c < len(KEYBOARD_ROWS[r]))
+    return neighbors
+
+
+KEYBOARD_NEIGHBORS = _keyboard_neighbors()
+SHIFT_SWAP = {**SHIFT_PAIRS, **{shifted: base for base, shifted in SHIFT_PAIRS.items()}}
+CONFUSABLE = {char: group.replace(char, '') for group in CONFUSABLE_GROUPS for char in group}
+
+
+def make_realistic_typo(word: str, rng: random.Random) -> Tuple[str, str]:
+    """Опечатка, характерная для набора на грузинской раскладке: (слово, операция)"""
+    operations, weights = zip(*TYPO_OPERATIONS)
+    for _ in range(10):
+        operation = rng.choices(operations, weights)[0]
+        i = rng.randrange(len(word))
+        char = word[i]
+        if operation == 'neighbor' and KEYBOARD_NEIGHBORS.get(char):
+            typo = word[:i] + rng.choice(KEYBOARD_NEIGHBORS[char]) + word[i + 1:]
+        elif operation == 'shift' and char in SHIFT_SWAP:
+            typo = word[:i] + SHIFT_SWAP[char] + word[i + 1:]
+        elif operation == 'confusable' and char in CONFUSABLE:
+            typo = word[:i] + rng.choice(CONFUSABLE[char]) + word[i + 1:]
+        elif operation == 'delete' and len(word) > 3:
+            typo = word[:i] + word[i + 1:]
+        elif operation == 'double':
+            typo = word[:i] + char + word[i:]
+        elif operation == 'transpose' and i < len(word) - 1 and word[i] != word[i + 1]:
+            typo = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            continue
+        if typo != word:
+            return typo, operation
+    return word[:-1], 'delete'
+
+
+def build_labeled_set(corpus: Path, holdout_files: int = 50, sentences: int = 300,
+                      typo_rate: float = 0.15, seed: int = 42) -> dict:
+    """Предложения отложенных файлов с опечатками и разметкой исходных слов"""
+    rng = random.Random(seed)
+    paths = sorted(corpus.rglob("*.txt"))
+    holdout = sorted(rng.sample(paths, min(holdout_files, len(paths))))
+    pool = [sentence for path in holdout for sentence in iter_file_sentences(path) if len(sentence) >= 3]
+    chosen = rng.sample(pool, min(sentences, len(pool)))
+
+    labeled = []
+    for sentence in chosen:
+        tokens = list(sentence)
+        typos = {}
+        for i, token in enumerate(sentence):
+            if len(token) > 3 and rng.random() < typo_rate:
+                tokens[i], operation = make_realistic_typo(token, rng)
+                typos[i] = {'original': token, 'operation': operation}
+        labeled.append({'tokens': tokens, 'typos': typos})
+    return {
+        'holdout_files': [str(path.relative_to(corpus)) for path in holdout],
+        'sentences': labeled,
+    }
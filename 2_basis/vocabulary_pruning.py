@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Очистка словаря от шума корпуса по частоте
+Слово, встретившееся в корпусе всего несколько раз, чаще всего является
+опечаткой. Этап сборки удаляет такие слова из словаря:
+- режим 'count'    - удаляются все слова с частотой ниже min_count
+- режим 'neighbor' - удаляется редкое слово, только если на расстоянии
+                     редактирования 1 от него есть слово, которое встречается
+                     в neighbor_ratio раз чаще
+Слова из белого списка (например, ka_GE.dic) никогда не удаляются
+"""
+
+import time
+import pickle
+import random
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from georgian_tokenizer import tokenize_file
+from hunspell_dictionary import HunspellDictionary
+
+GEORGIAN_ALPHABET = 'აბგდევზთიკლმნოპჟრსტუფქღყშჩცძწჭხჯჰ'
+PRUNE_MODES = ('count', 'neighbor')
+
+
+def load_whitelist(paths: Iterable[str]) -> Set[str]:
+    """Загрузка белого списка из .dic (Hunspell) или vocabulary.txt"""
+    whitelist = set()
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            print(f"Белый список не найден: {path}")
+            continue
+
+        # Сжатый .dic (основы с флагами) разворачивается по правилам .aff
+        if path.suffix == '.dic' and path.with_suffix('.aff').exists():
+            whitelist.update(HunspellDictionary.load(str(path)))
+            print(f"Белый список {path.name}: {len(whitelist)} слов")
+            continue
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                # Первая строка .dic - количество слов
+                if line_number == 0 and line.isdigit():
+                    continue
+                word = line.split('\t')[0].split('/')[0].strip()
+                if word:
+                    whitelist.add(word)
+
+        print(f"Белый список {path.name}: {len(whitelist)} слов")
+    return whitelist
+
+
+class FrequentNeighborIndex:
+    """Индекс частых слов для поиска соседей на расстоянии редактирования 1"""
+
+    def __init__(self, word_freq: Dict[str, int], min_frequency: int):
+        self.word_freq = {word: count for word, count in word_freq.items() if count >= min_frequency}
+        # Удаление одной буквы из частого слова: покрывает пропуск буквы в редком слове
+        self.deletes = {}
+        # (позиция, слово без буквы): покрывает замену буквы
+        self.substitutions = {}
+
+        for word, count in self.word_freq.items():
+            for i in range(len(word)):
+                deleted = word[:i] + word[i + 1:]
+                if count > self.deletes.get(deleted, 0):
+                    self.deletes[deleted] = count
+                key = (i, deleted)
+                if count > self.substitutions.get(key, 0):
+                    self.substitutions[key] = count
+
+    def best_neighbor_count(self, word: str) -> int:
+        """Максимальная частота слова на расстоянии 1 от word (0 - соседей нет)"""
+        best = self.deletes.get(word, 0)
+
+        for i in range(len(word)):
+            deleted = word[:i] + word[i + 1:]
+            # Лишняя буква в редком слове
+            best = max(best, self.word_freq.get(deleted, 0))
+            # Замена буквы (если в индекс попало само слово, его частота
+            # все равно меньше порога neighbor_ratio * count)
+            best = max(best, self.substitutions.get((i, deleted), 0))
+
+        # Перестановка соседних букв
+        for i in range(len(word) - 1):
+            if word[i] != word[i + 1]:
+                swapped = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+                best = max(best, self.word_freq.get(swapped, 0))
+
+        return best
+
+
+def prune_word_freq(word_freq: Dict[str, int], min_count: int = 2, mode: str = 'count',
+                    neighbor_ratio: float = 10.0, whitelist: Optional[Set[str]] = None) -> Counter:
+    """Возвращает частоты только для оставленных слов"""
+    if mode not in PRUNE_MODES:
+        raise ValueError(f"Неизвестный режим очистки: {mode}. Допустимые: {', '.join(PRUNE_MODES)}")
+
+    whitelist = whitelist or set()
+    index = None
+    if mode == 'neighbor':
+        index = FrequentNeighborIndex(word_freq, min_frequency=max(1, int(neighbor_ratio)))
+
+    kept = Counter()
+    for word, count in word_freq.items():
+        if count >= min_count or word in whitelist:
+            kept[word] = count
+        elif mode == 'neighbor' and index.best_neighbor_count(word) < count * neighbor_ratio:
+            kept[word] = count
+
+    return kept
+
+
+def make_typo(word: str, rng: random.Random) -> str:
+    """Случайная опечатка: замена, вставка, удаление или перестановка букв"""
+    i = rng.randrange(len(word))
+    operation = rng.choice(('substitute', 'insert', 'delete', 'transpose'))
+    if operation == 'substitute':
+        return word[:i] + rng.choice(GEORGIAN_ALPHABET) + word[i + 1:]
+    if operation == 'insert':
+        return word[:i] + rng.choice(GEORGIAN_ALPHABET) + word[i:]
+    if operation == 'delete' and len(word) > 2:
+        return word[:i] + word[i + 1:]
+    if i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(GEORGIAN_ALPHABET) + word[i + 1:]
+
+
+def evaluate_vocabulary(word_freq: Dict[str, int], test_corpus: str,
+                        latency_samples: int = 10, seed: int = 42, lookup_rounds: int = 1000) -> dict:
+    """Размер модели, задержка проверки и полнота обнаружения ошибок на test_corpus"""
+    from georgian_spellchecker import GeorgianSpellChecker
+
+    checker = GeorgianSpellChecker()
+    checker.vocabulary = set(word_freq)
+    checker.word_freq = Counter(word_freq)
+
+    clean_tokens = []
+    for file_path in sorted(Path(test_corpus).rglob("*.txt")):
+        clean_tokens.extend(tokenize_file(file_path))
+    clean_words = set(clean_tokens)
+
+    rng = random.Random(seed)
+    typos = []
+    for word in sorted(clean_words):
+        typo = make_typo(word, rng)
+        if typo not in clean_words:
+            typos.append(typo)
+
+    detected = sum(1 for typo in typos if not checker.is_correct(typo))
+    false_alarms = sum(1 for word in clean_tokens if not checker.is_correct(word))
+
+    # Выборка проходится lookup_rounds раз, а не копируется в один длинный список
+    lookups = clean_tokens + typos
+    start = time.perf_counter()
+    for _ in range(lookup_rounds):
+        for word in lookups:
+            checker.is_correct(word)
+    lookup_ns = (time.perf_counter() - start) / max(len(lookups) * lookup_rounds, 1) * 1e9
+
+    samples = typos[:latency_samples]
+    start = time.perf_counter()
+    for typo in samples:
+        checker.suggest_corrections(typo)
+    suggest_ms = (time.perf_counter() - start) / max(len(samples), 1) * 1000
+
+    model_bytes = len(pickle.dumps({
+        'vocabulary': list(checker.vocabulary),
+        'word_freq': dict(checker.word_freq),
+    }))
+
+    return {
+        'vocabulary_size': len(checker.vocabulary),
+        'model_bytes': model_bytes,
+        'lookup_ns': lookup_ns,
+        'suggest_ms': suggest_ms,
+        'detection_recall': detected / len(typos) if typos else 0.0,
+        'false_alarm_rate': false_alarms / len(clean_tokens) if clean_tokens else 0.0,
+        'typos': len(typos),
+    }
+
+
+def print_report(before: dict, after: dict) -> None:
+    """Сравнение словаря до и после очистки"""
+    rows = [
+        ('Слов в словаре', 'vocabulary_size', '{:.0f}'),
+        ('Размер модели, MB', 'model_bytes', '{:.2f}', 1e-6),
+        ('is_correct, нс', 'lookup_ns', '{:.0f}'),
+        ('suggest_corrections, мс', 'suggest_ms', '{:.1f}'),
+        ('Полнота обнаружения', 'detection_recall', '{:.3f}'),
+        ('Ложные срабатывания', 'false_alarm_rate', '{:.3f}'),
+    ]
+    print(f"\n{'':<26}{'до':>12}{'после':>12}{'изменение':>12}")
+    for title, key, fmt, *scale in rows:
+        factor = scale[0] if scale else 1
+        old, new = before[key] * factor, after[key] * factor
+        change = f"{(new - old) / old * 100:+.1f}%" if old else '-'
+        print(f"{title:<26}{fmt.format(old):>12}{fmt.format(new):>12}{change:>12}")
+    print(f"(опечаток в тесте: {after['typos']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Очистка словаря от редких слов')
+    parser.add_argument('--model', default='georgian_spellchecker.pkl',
+                       help='Модель, словарь которой нужно очистить')
+    parser.add_argument('--corpus', default=None,
+                       help='Построить словарь из корпуса вместо загрузки модели')
+    parser.add_argument('--min-count', type=int, default=2,
+                       help='Минимальная частота слова')
+    parser.add_argument('--mode', choices=PRUNE_MODES, default='count',
+                       help='Режим очистки')
+    parser.add_argument('--ratio', type=float, default=10.0,
+                       help='Во сколько раз сосед должен быть частотнее (режим neighbor)')
+    parser.add_argument('--whitelist', nargs='*', default=[],
+                       help='Файлы белого списка (.dic или vocabulary.txt)')
+    parser.add_argument('--test-corpus', default=str(Path(__file__).parent.parent / "test_corpus"),
+                       help='Корпус для оценки полноты')
+    parser.add_argument('--latency-samples', type=int, default=10,
+                       help='Сколько опечаток использовать для замера suggest_corrections')
+    parser.add_argument('--output', default=None,
+                       help='Сохранить очищенную модель')
+    args = parser.parse_args()
+
+    from georgian_spellchecker import GeorgianSpellChecker
+
+    checker = GeorgianSpellChecker()
+    if args.corpus:
+        checker.load_corpus(args.corpus)
+    elif Path(args.model).exists():
+        checker.load_model(args.model)
+    else:
+        print(f"Модель не найдена: {args.model}. Укажите --corpus")
+        return
+
+    whitelist = load_whitelist(args.whitelist)
+    start = time.perf_counter()
+    pruned = prune_word_freq(checker.word_freq, args.min_count, args.mode, args.ratio, whitelist)
+    elapsed = time.perf_counter() - start
+    removed = len(checker.word_freq) - len(pruned)
+    print(f"Удалено слов: {removed} из {len(checker.word_freq)} "
+          f"({removed / max(len(checker.word_freq), 1) * 100:.1f}%) за {elapsed:.2f} с")
+
+    before = evaluate_vocabulary(checker.word_freq, args.test_corpus, args.latency_samples)
+    after = evaluate_vocabulary(pruned, args.test_corpus, args.latency_samples)
+    print_report(before, after)
+
+    if args.output:
+        checker.vocabulary = set(pruned)
+        checker.word_freq = pruned
+        checker.save_model(args.output)
+
+
+if __name__ == "__main__":
+    main()
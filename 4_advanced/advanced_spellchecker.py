@@ -4,11 +4,16 @@
 """
 
 import pickle
+import sys
 from collections import defaultdict, Counter
 from pathlib import Path
 import re
 from typing import List, Tuple, Set
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "2_basis"))
+from georgian_tokenizer import tokenize_georgian, tokenize_file, iter_file_sentences
+from frequency_table import FrequencyTable
+
 # Импортируем базовый класс из того же файла или создаем его
 class GeorgianSpellChecker:
     def __init__(self):
@@ -31,10 +36,7 @@ class GeorgianSpellChecker:
         
         for file_path in corpus_dir.glob("**/*.txt"):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                words = self.tokenize_georgian(content)
+                words = tokenize_file(file_path)
                 if words:
                     self.vocabulary.update(words)
                     self.word_freq.update(words)
@@ -46,15 +48,35 @@ class GeorgianSpellChecker:
         
         print(f"Загрузка завершена. Файлов: {total_files}, Уникальных слов: {len(self.vocabulary)}")
     
+    def compact_frequencies(self, bits: int = 16) -> None:
+        """Замена Counter компактной таблицей частот (после обучения: таблица не изменяется)"""
+        self.word_freq = FrequencyTable.from_counts(self.word_freq, bits)
+        print(f"Частоты упакованы в uint{bits}: {self.word_freq.nbytes() / 1e6:.1f} MB")
+    
+    def _frequency_fields(self) -> dict:
+        """Частоты для pickle: упакованные сохраняются восстановленными значениями
+        и разрядностью, при загрузке они упаковываются снова"""
+        fields = {'word_freq': dict(self.word_freq.items())}
+        if isinstance(self.word_freq, FrequencyTable):
+            fields['freq_bits'] = self.word_freq.bits
+        return fields
+    
+    def _load_frequencies(self, model_data: dict) -> None:
+        self.word_freq = Counter(model_data['word_freq'])
+        if model_data.get('freq_bits'):
+            self.compact_frequencies(model_data['freq_bits'])
+    
     def tokenize_georgian(self, text: str) -> List[str]:
-        """Токенизация грузинского текста"""
-        text = re.sub(r'[^\u10A0-\u10FF\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        words = text.strip().split()
-        return [word for word in words if len(word) > 1]
+        """Токенизация грузинского текста (общий токенизатор georgian_tokenizer)"""
+        return tokenize_georgian(text)
     
     def is_correct(self, word: str) -> bool:
-        return word in self.vocabulary
+        if word in self.vocabulary:
+            return True
+        # Слово через дефис правильное, если правильны все его части
+        if '-' in word:
+            return all(part in self.vocabulary for part in word.split('-'))
+        return False
     
     def generate_candidates(self, word: str, max_distance: int = 2) -> List[str]:
         """Генерация кандидатов для исправления"""
@@ -93,7 +115,7 @@ class GeorgianSpellChecker:
     def save_model(self, model_path: str) -> None:
         model_data = {
             'vocabulary': list(self.vocabulary),
-            'word_freq': dict(self.word_freq),
+            **self._frequency_fields(),
             'ngram_models': self.ngram_models
         }
         with open(model_path, 'wb') as f:
@@ -104,7 +126,7 @@ class GeorgianSpellChecker:
         with open(model_path, 'rb') as f:
             model_data = pickle.load(f)
         self.vocabulary = set(model_data['vocabulary'])
-        self.word_freq = Counter(model_data['word_freq'])
+        self._load_frequencies(model_data)
         self.ngram_models = model_data['ngram_models']
         print(f"Модель загружена. Уникальных слов: {len(self.vocabulary)}")
 
@@ -115,23 +137,33 @@ class AdvancedGeorgianSpellChecker(GeorgianSpellChecker):
         self.trigram_model = defaultdict(Counter)
         self.context_window = 3
     
-    def build_advanced_ngram_models(self, corpus_path: str):
-        """Построение улучшенных N-gram моделей с реальными данными"""
+    def build_advanced_ngram_models(self, corpus_path: str, memory_mb: float = None,
+                                    min_count: int = 1, tmp_dir: str = None):
+        """Построение улучшенных N-gram моделей с реальными данными
+        memory_mb - подсчет с ограниченной памятью (ngram_counter.py) для
+        корпусов, которые не помещаются в RAM; None - все в памяти"""
         print("Построение улучшенных N-gram моделей...")
         
+        if memory_mb is not None:
+            from ngram_counter import build_external, corpus_sentences
+            self.bigram_model, self.trigram_model, stats = build_external(
+                corpus_sentences(corpus_path), memory_mb, min_count, tmp_dir)
+            print(f"N-gram модели построены! Биграмм: {stats['bigrams']}, Триграмм: {stats['trigrams']}")
+            print(f"Промежуточных файлов: {stats['runs']}, память счетчиков до "
+                  f"{stats['peak_counter_mb']:.1f} MB (бюджет {memory_mb} MB), "
+                  f"подсчет {stats['count_seconds']:.1f} с, слияние {stats['merge_seconds']:.1f} с")
+            print(f"Уникальных биграмм: {len(self.bigram_model)}")
+            print(f"Уникальных триграмм: {len(self.trigram_model)}")
+            return
+        
         corpus_dir = Path(corpus_path)
         all_sentences = []
         
         # Собираем все предложения из корпуса
         for file_path in corpus_dir.glob("**/*.txt"):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
                 # Разбиваем на предложения (простой метод)
-                sentences = re.split(r'[.!?]', content)
-                for sentence in sentences:
-                    words = self.tokenize_georgian(sentence)
+                for words in iter_file_sentences(file_path):
                     if len(words) >= 2:  # Только предложения с 2+ словами
                         all_sentences.append(words)
                         
@@ -213,7 +245,7 @@ class AdvancedGeorgianSpellChecker(GeorgianSpellChecker):
         """Сохранение продвинутой модели"""
         model_data = {
             'vocabulary': list(self.vocabulary),
-            'word_freq': dict(self.word_freq),
+            **self._frequency_fields(),
             'bigram_model': dict(self.bigram_model),
             'trigram_model': {str(k): v for k, v in self.trigram_model.items()},
             'ngram_models': self.ngram_models
@@ -230,7 +262,7 @@ class AdvancedGeorgianSpellChecker(GeorgianSpellChecker):
             model_data = pickle.load(f)
         
         self.vocabulary = set(model_data['vocabulary'])
-        self.word_freq = Counter(model_data['word_freq'])
+        self._load_frequencies(model_data)
         self.bigram_model = defaultdict(Counter, model_data['bigram_model'])
         
         # Восстанавливаем триграммы
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Подсчет n-грамм с ограниченной памятью
+build_advanced_ngram_models держит все предложения корпуса и все счетчики
+в памяти, поэтому размер корпуса ограничен объемом RAM. Здесь предложения
+читаются потоком, а счетчики копятся в словаре, пока их оценочный размер не
+достигнет бюджета. После этого словарь сортируется и сбрасывается на диск
+отдельным файлом (run). В конце все runs сливаются k-way merge: одинаковые
+ключи идут подряд и суммируются. Ключи отсортированы, поэтому все
+продолжения одного слова (или пары слов) тоже идут подряд и сразу
+собираются в формат модели.
+
+Бюджет ограничивает только подсчет. Итоговая модель (вложенные словари
+bigram_model и trigram_model, формат AdvancedGeorgianSpellChecker)
+по-прежнему строится целиком в памяти, поэтому корпус ограничен уже не
+объемом RAM под все счетчики, а объемом RAM под итоговую модель. Ее
+уменьшает min_count: редкие n-граммы отбрасываются при слиянии.
+Если runs больше fan_in, они сливаются в несколько проходов, чтобы не
+открывать слишком много файлов одновременно.
+"""
+
+import os
+import sys
+import time
+import heapq
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "2_basis"))
+from georgian_tokenizer import iter_file_sentences
+
+# Оценка памяти одной записи словаря сверх самой строки ключа:
+# слот хеш-таблицы с запасом на рост, число и указатели
+ENTRY_OVERHEAD = 112
+# Список ключей, который сортировка создает при сбросе: указатель на ключ
+# (список создается, пока словарь еще в памяти, поэтому входит в бюджет)
+SORT_SLOT = 8
+SEPARATOR = '\t'
+
+
+class ExternalCounter:
+    """Счетчик строковых ключей, который сбрасывает отсортированные части на диск"""
+
+    def __init__(self, memory_bytes: int, tmp_dir: Optional[str] = None, fan_in: int = 64):
+        self.memory_bytes = memory_bytes
+        self.fan_in = fan_in
+        self.counts: Dict[str, int] = {}
+        self.estimated = 0
+        self.peak_estimated = 0
+        self.runs: List[str] = []
+        self.spills = 0
+        self._dir = tempfile.mkdtemp(prefix='ngram_runs_', dir=tmp_dir)
+
+    def __enter__(self) -> 'ExternalCounter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(self, key: str) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += 1
+            return
+        counts[key] = 1
+        self.estimated += sys.getsizeof(key) + ENTRY_OVERHEAD + SORT_SLOT
+        if self.estimated >= self.memory_bytes:
+            self._spill()
+
+    def _new_run(self) -> str:
+        path = os.path.join(self._dir, f"run_{self.spills:06d}.txt")
+        self.spills += 1
+        return path
+
+    def _spill(self) -> None:
+        """Сортировка счетчиков в памяти и запись их в новый файл"""
+        self.peak_estimated = max(self.peak_estimated, self.estimated)
+        path = self._new_run()
+        counts = self.counts
+        with open(path, 'w', encoding='utf-8') as f:
+            for key in sorted(counts):
+                f.write(f"{key}{SEPARATOR}{counts[key]}\n")
+        self.runs.append(path)
+        self.counts = {}
+        self.estimated = 0
+
+    @staticmethod
+    def _read_run(path: str) -> Iterator[Tuple[str, int]]:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                key, _, count = line.rstrip('\n').rpartition(SEPARATOR)
+                yield key, int(count)
+
+    @staticmethod
+    def _sum_sorted(pairs: Iterable[Tuple[str, int]]) -> Iterator[Tuple[str, int]]:
+        """Суммы подряд идущих одинаковых ключей"""
+        current, total = None, 0
+        for key, count in pairs:
+            if key != current:
+                if current is not None:
+                    yield current, total
+                current, total = key, 0
+            total += count
+        if current is not None:
+            yield current, total
+
+    def _merge_runs(self, paths: List[str]) -> Iterator[Tuple[str, int]]:
+        return self._sum_sorted(heapq.merge(*(self._read_run(path) for path in paths)))
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """Все ключи с суммарными счетчиками по возрастанию ключа"""
+        if not self.runs:
+            self.peak_estimated = max(self.peak_estimated, self.estimated)
+            yield from sorted(self.counts.items())
+            return
+        if self.counts:
+            self._spill()
+        # Промежуточные проходы: не больше fan_in открытых файлов
+        while len(self.runs) > self.fan_in:
+            group, self.runs = self.runs[:self.fan_in], self.runs[self.fan_in:]
+            path = self._new_run()
+            with open(path, 'w', encoding='utf-8') as f:
+                for key, count in self._merge_runs(group):
+                    f.write(f"{key}{SEPARATOR}{count}\n")
+            for merged in group:
+                os.remove(merged)
+            self.runs.append(path)
+        yield from self._merge_runs(self.runs)
+
+    def close(self) -> None:
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+def count_ngrams(sentences: Iterable[List[str]], counter: ExternalCounter) -> Tuple[int, int]:
+    """Биграммы и триграммы предложений в счетчик; возвращает их общее число"""
+    bigrams = trigrams = 0
+    add = counter.add
+    for words in sentences:
+        for i in range(len(words) - 1):
+            add(f"2{SEPARATOR}{words[i]}{SEPARATOR}{words[i + 1]}")
+            bigrams += 1
+        for i in range(len(words) - 2):
+            add(f"3{SEPARATOR}{words[i]}{SEPARATOR}{words[i + 1]}{SEPARATOR}{words[i + 2]}")
+            trigrams += 1
+    return bigrams, trigrams
+
+
+def build_models(counter: ExternalCounter, min_count: int = 1):
+    """Слияние в формат AdvancedGeorgianSpellChecker: (bigram_model, trigram_model)
+    Слияние читает счетчики потоком, но модель собирается в памяти целиком:
+    ее размер бюджетом не ограничен (его уменьшает min_count)"""
+    bigram_model, trigram_model = defaultdict(Counter), defaultdict(Counter)
+    for key, count in counter.items():
+        if count < min_count:
+            continue
+        order, *words = key.split(SEPARATOR)
+        if order == '2':
+            bigram_model[words[0]][words[1]] = count
+        else:
+            trigram_model[(words[0], words[1])][words[2]] = count
+    return bigram_model, trigram_model
+
+
+def corpus_sentences(corpus_path: str) -> Iterator[List[str]]:
+    """Предложения корпуса из 2+ слов, файл за файлом (без загрузки корпуса в память)"""
+    for file_path in sorted(Path(corpus_path).glob("**/*.txt")):
+        try:
+            for words in iter_file_sentences(file_path):
+                if len(words) >= 2:
+                    yield words
+        except Exception as e:
+            print(f"Ошибка при обработке {file_path}: {e}")
+
+
+def build_external(sentences: Iterable[List[str]], memory_mb: float, min_count: int = 1,
+                   tmp_dir: Optional[str] = None):
+    """Подсчет с бюджетом памяти memory_mb: (bigram_model, trigram_model, сведения)"""
+    start = time.perf_counter()
+    with ExternalCounter(int(memory_mb * 1024 * 1024), tmp_dir) as counter:
+        bigrams, trigrams = count_ngrams(sentences, counter)
+        spills = counter.spills
+        counted = time.perf_counter()
+        bigram_model, trigram_model = build_models(counter, min_count)
+        stats = {
+            'bigrams': bigrams,
+            'trigrams': trigrams,
+            'runs': spills,
+            'peak_counter_mb': counter.peak_estimated / 1024 / 1024,
+            'count_seconds': counted - start,
+            'merge_seconds': time.perf_counter() - counted,
+        }
+    return bigram_model, trigram_model, stats
+
+
+# Допуск замера памяти подсчета сверх бюджета: буферы файлов и временные строки
+PEAK_TOLERANCE = 1.15
+
+
+def synthetic_corpus(sentences: int = 20000, seed: int = 42) -> List[List[str]]:
+    """Синтетический корпус: распределение слов, близкое к закону Ципфа"""
+    rng = random.Random(seed)
+    letters = 'აბგდევზთიკლმნოპჟრსტუფქღყშჩცძწჭხჯჰ'
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randint(2, 10))) for _ in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [rng.choices(vocabulary, weights, k=rng.randint(2, 20)) for _ in range(sentences)]
+
+
+def measure_counting(corpus: List[List[str]], memory_mb: float):
+    """Подсчет с бюджетом под tracemalloc: (bigram_model, trigram_model, файлов, пик подсчета в байтах)
+    Пик - без итоговой модели и без самого корпуса (он создан до замера)"""
+    tracemalloc.start()
+    try:
+        with ExternalCounter(int(memory_mb * 1024 * 1024)) as counter:
+            count_ngrams(corpus, counter)
+            _, counting_peak = tracemalloc.get_traced_memory()
+            bigram_model, trigram_model = build_models(counter)
+            runs = counter.spills
+    finally:
+        tracemalloc.stop()
+    return bigram_model, trigram_model, runs, counting_peak
+
+
+def self_test(memory_mb: float = 0.25, sentences: int = 20000, seed: int = 42) -> bool:
+    """Проверка на синтетическом корпусе: маленький бюджет дает те же счетчики,
+    что подсчет в памяти, и память при подсчете не выходит за бюджет
+    (то же проверяет tests/test_ngram_counter.py)"""
+    corpus = synthetic_corpus(sentences, seed)
+
+    expected_bigrams, expected_trigrams = defaultdict(Counter), defaultdict(Counter)
+    for words in corpus:
+        for i in range(len(words) - 1):
+            expected_bigrams[words[i]][words[i + 1]] += 1
+        for i in range(len(words) - 2):
+            expected_trigrams[(words[i], words[i + 1])][words[i + 2]] += 1
+
+    budget = int(memory_mb * 1024 * 1024)
+    bigram_model, trigram_model, runs, counting_peak = measure_counting(corpus, memory_mb)
+
+    ok = True
+    if bigram_model != expected_bigrams or trigram_model != expected_trigrams:
+        print("❌ Счетчики отличаются от подсчета в памяти")
+        ok = False
+    if runs < 2:
+        print(f"❌ Бюджет не достигнут: файлов {runs}")
+        ok = False
+    if counting_peak > budget * PEAK_TOLERANCE:
+        print(f"❌ Память подсчета {counting_peak / 1024 / 1024:.2f} MB при бюджете {memory_mb} MB")
+        ok = False
+    if ok:
+        print(f"✅ Счетчики совпадают; файлов: {runs}, память подсчета "
+              f"{counting_peak / 1024 / 1024:.2f} MB при бюджете {memory_mb} MB")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Подсчет n-грамм с ограниченной памятью')
+    parser.add_argument('--corpus', default=str(Path(__file__).parent.parent / "1_collect" / "corpus"),
+                       help='Папка корпуса')
+    parser.add_argument('--model', default=str(Path(__file__).parent.parent / "2_basis" / "georgian_spellchecker.pkl"),
+                       help='Базовая модель (словарь и частоты)')
+    parser.add_argument('--output', default='advanced_georgian_spellchecker.pkl',
+                       help='Продвинутая модель')
+    parser.add_argument('--memory-mb', type=float, default=256,
+                       help='Бюджет памяти счетчиков, MB (итоговая модель строится в памяти сверх него)')
+    parser.add_argument('--min-count', type=int, default=1,
+                       help='Отбросить n-граммы, которые встретились реже')
+    parser.add_argument('--tmp-dir', type=str,
+                       help='Папка для промежуточных файлов')
+    parser.add_argument('--freq-bits', type=int, choices=[8, 16, 32], default=None,
+                       help='Хранить частоты слов в компактной таблице (разрядность сохраняется в модели)')
+    parser.add_argument('--self-test', action='store_true',
+                       help='Проверка на синтетическом корпусе с маленьким бюджетом')
+    args = parser.parse_args()
+
+    if args.self_test:
+        sys.exit(0 if self_test() else 1)
+
+    from advanced_spellchecker import AdvancedGeorgianSpellChecker
+    checker = AdvancedGeorgianSpellChecker()
+    if Path(args.model).exists():
+        checker.load_model(args.model)
+    else:
+        print(f"Базовая модель не найдена: {args.model}; словарь строится из корпуса")
+        checker.load_corpus(args.corpus)
+    checker.build_advanced_ngram_models(args.corpus, memory_mb=args.memory_mb,
+                                        min_count=args.min_count, tmp_dir=args.tmp_dir)
+    if args.freq_bits:
+        checker.compact_frequencies(args.freq_bits)
+    checker.save_advanced_model(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# candidate_search.py
+"""
+Поиск кандидатов исправления по словарю - ядро OptimizedSpellChecker
+Вынесен из web_interface, чтобы процессам пула поиска (suggestion_pool.py)
+передавались только словарь и частоты: процессы запускаются через
+forkserver и получают объект CandidateSearch через pickle, а не наследуют
+весь веб-процесс через fork.
+"""
+
+import time
+from collections import Counter
+from time import perf_counter
+
+from dawg import Dawg
+from hunspell_dictionary import HunspellDictionary
+
+
+class CandidateSearch:
+    """Словарь, частоты и поиск кандидатов до крайнего срока"""
+    # Отсечения перебора словаря (0 - отключено): кандидат должен начинаться
+    # с тех же букв, перебор останавливается после стольких найденных.
+    # Ускоряют поиск ценой полноты, см. evaluate.py
+    prefix_filter = 2
+    early_stop = 20
+    
+    def __init__(self, vocabulary=None, word_freq=None):
+        self.vocabulary = vocabulary if vocabulary is not None else set()
+        self.word_freq = word_freq if word_freq is not None else Counter()
+        self._cached_distances = {}
+    
+    def is_correct(self, word: str):
+        if word in self.vocabulary:
+            return True
+        # Слово через дефис правильное, если правильны все его части
+        if '-' in word:
+            return all(part in self.vocabulary for part in word.split('-'))
+        return False
+    
+    def optimized_levenshtein(self, s1: str, s2: str):
+        """Оптимизированное расстояние Левенштейна с кэшированием"""
+        cache_key = (s1, s2)
+        if cache_key in self._cached_distances:
+            return self._cached_distances[cache_key]
+            
+        if s1 == s2:
+            self._cached_distances[cache_key] = 0
+            return 0
+            
+        len1, len2 = len(s1), len(s2)
+        if abs(len1 - len2) > 2:
+            self._cached_distances[cache_key] = 3
+            return 3
+            
+        if len1 < len2:
+            return self.optimized_levenshtein(s2, s1)
+            
+        if len2 == 0:
+            return len1
+            
+        previous_row = list(range(len2 + 1))
+        for i, c1 in enumerate(s1):
+            current_row = [i + 1]
+            for j, c2 in enumerate(s2):
+                insertions = previous_row[j + 1] + 1
+                deletions = current_row[j] + 1
+                substitutions = previous_row[j] + (c1 != c2)
+                current_row.append(min(insertions, deletions, substitutions))
+            previous_row = current_row
+            
+        result = previous_row[-1]
+        self._cached_distances[cache_key] = result
+        return result
+    
+    def generate_candidates_fast(self, word: str, max_distance: int = 1, timer=None, deadline=None):
+        """Быстрая генерация кандидатов с оптимизациями
+        timer (metrics.PhaseTimer) - замер фаз candidates/ranking, None - без замеров
+        deadline (time.time()) - перебор словаря прерывается, кандидаты неполные"""
+        if self.is_correct(word):
+            return [word]
+        
+        if timer:
+            started = perf_counter()
+        
+        # Автомат обходит только ветки, где расстояние еще не превышено
+        if isinstance(self.vocabulary, Dawg):
+            candidates = self.vocabulary.fuzzy(word, max_distance)
+            examined = len(candidates)
+        else:
+            candidates = []
+            word_len = len(word)
+            examined = 0
+            prefix_len, early_stop = self.prefix_filter, self.early_stop
+            prefix = word[:prefix_len]
+            # Словарь Hunspell разворачивает только основы с тем же началом
+            if prefix_len and word_len > prefix_len and isinstance(self.vocabulary, HunspellDictionary):
+                forms = self.vocabulary.forms_starting_with(prefix)
+            else:
+                forms = self.vocabulary
+            
+            for candidate in forms:
+                if abs(len(candidate) - word_len) > 2:
+                    continue
+                    
+                if prefix_len and word_len > prefix_len and candidate[:prefix_len] != prefix:
+                    continue
+                    
+                examined += 1
+                # Крайний срок проверяется раз в 1024 сравнения
+                if deadline is not None and not examined & 1023 and time.time() >= deadline:
+                    break
+                distance = self.optimized_levenshtein(word, candidate)
+                if distance <= max_distance:
+                    candidates.append((candidate, distance))
+                    
+                    if early_stop and len(candidates) >= early_stop:
+                        break
+        
+        if timer:
+            ranking_started = perf_counter()
+            timer.add('candidates', ranking_started - started)
+            timer.examined(examined)
+        
+        candidates.sort(key=lambda x: (x[1], -self.word_freq.get(x[0], 0)))
+        result = [candidate for candidate, distance in candidates[:5]]
+        
+        if timer:
+            timer.add('ranking', perf_counter() - ranking_started)
+        return result
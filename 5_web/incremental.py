@@ -0,0 +1,100 @@
+# incremental.py
+"""
+Кеш результатов абзацев для живого редактора
+Редактор после каждой правки отправлял на /check весь текст, и сервер
+заново проверял весь документ. В инкрементальном протоколе клиент
+отправляет хеши всех абзацев и текст только тех, которые сервер еще не
+видел; сервер хранит результаты абзацев по хешу в кеше сессии и
+возвращает ошибки всего документа со смещениями абзацев.
+
+Каждый запрос сессии имеет номер правки (revision). Запрос, который
+обогнала более новая правка той же сессии, прекращает проверку между
+абзацами: его ответ клиенту уже не нужен.
+
+Кеш у каждого процесса сервера свой: если абзаца нет (вытеснен, другой
+процесс, перезапуск), сервер возвращает его хеш в missing, и клиент
+повторяет запрос с текстом этого абзаца.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class Session:
+    __slots__ = ('paragraphs', 'revision', 'touched')
+
+    def __init__(self):
+        self.paragraphs = OrderedDict()
+        self.revision = -1
+        self.touched = time.monotonic()
+
+
+class ParagraphSessions:
+    """Сессии редактора: хеш абзаца -> ошибки (позиции внутри абзаца), последняя правка"""
+
+    def __init__(self, max_sessions: int = 1000, max_paragraphs: int = 5000, ttl: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.max_paragraphs = max_paragraphs
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id: str) -> Session:
+        session = self._sessions.get(session_id)
+        now = time.monotonic()
+        if session is None or now - session.touched > self.ttl:
+            session = Session()
+            self._sessions[session_id] = session
+            # Вытесняются давно не использованные сессии
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        session.touched = now
+        return session
+
+    def begin(self, session_id: str, revision: int) -> bool:
+        """Регистрация правки; False - уже есть более новая (запрос устарел)"""
+        with self._lock:
+            session = self._session(session_id)
+            if revision < session.revision:
+                return False
+            session.revision = revision
+            return True
+
+    def is_current(self, session_id: str, revision: int) -> bool:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return session is None or session.revision <= revision
+
+    def get(self, session_id: str, paragraph_hash: str) -> Optional[List[dict]]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            errors = session.paragraphs.get(paragraph_hash) if session is not None else None
+            if errors is None:
+                self.misses += 1
+                return None
+            session.paragraphs.move_to_end(paragraph_hash)
+            self.hits += 1
+            return errors
+
+    def put(self, session_id: str, paragraph_hash: str, errors: List[dict]) -> None:
+        with self._lock:
+            paragraphs = self._session(session_id).paragraphs
+            paragraphs[paragraph_hash] = errors
+            paragraphs.move_to_end(paragraph_hash)
+            while len(paragraphs) > self.max_paragraphs:
+                paragraphs.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'sessions': len(self._sessions), 'hits': self.hits, 'misses': self.misses}
+
+
+def shift_errors(errors: List[dict], offset: int) -> List[dict]:
+    """Ошибки абзаца в позициях документа"""
+    return [dict(error, start_pos=error['start_pos'] + offset, end_pos=error['end_pos'] + offset)
+            for error in errors]
@@ -0,0 +1,277 @@
+# jobs.py
+"""
+Фоновые задания проверки больших документов
+/check рассчитан на короткие тексты: у него крайний срок и не больше 100
+ошибок. Большой документ отправляется заданием:
+- документ делится на абзацы (непустые строки), задание проверяет их по
+  очереди в пуле потоков; поиск исправлений идет в пуле процессов
+- результат каждого абзаца сразу пишется в SQLite, поэтому клиент видит
+  готовые абзацы, пока задание выполняется, а завершенные задания
+  переживают перезапуск сервера
+- отмена - статус в базе: ее видят задания любого процесса сервера
+- задания, прерванные остановкой сервера, продолжаются с первого
+  непроверенного абзаца другим процессом. Процесс владеет заданием, пока
+  продлевает аренду (lease): владелец - случайный идентификатор запуска, а
+  не PID, который после перезапуска контейнера обычно тот же
+- абзац, поиск исправлений которого не уложился в срок, сохраняется с
+  флагом partial; задание с такими абзацами тоже помечается partial
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    lease REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL,
+    error_count INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    partial INTEGER NOT NULL DEFAULT 0,
+    document TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    paragraph INTEGER NOT NULL,
+    errors TEXT NOT NULL,
+    partial INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, paragraph)
+) WITHOUT ROWID;
+"""
+
+# Столбцы, добавленные после первой версии схемы (базы прежних версий дополняются)
+COLUMNS = {
+    'jobs': {'lease': 'REAL NOT NULL DEFAULT 0', 'partial': 'INTEGER NOT NULL DEFAULT 0'},
+    'results': {'partial': 'INTEGER NOT NULL DEFAULT 0'},
+}
+
+ACTIVE = ('queued', 'running')
+FINISHED = ('done', 'cancelled', 'failed')
+
+
+def split_paragraphs(document: str) -> List[Tuple[int, str]]:
+    """Абзацы документа: (смещение в документе, текст) для каждой непустой строки"""
+    paragraphs = []
+    offset = 0
+    for line in document.split('\n'):
+        if line.strip():
+            paragraphs.append((offset, line))
+        offset += len(line) + 1
+    return paragraphs
+
+
+class JobManager:
+    """Очередь заданий, их выполнение и хранение результатов"""
+
+    def __init__(self, path: str, check: Callable[[str], Tuple[List[dict], bool]], workers: int = 2,
+                 retention_days: float = 7.0, timeout: float = 5.0, lease: float = 30.0):
+        """check(абзац) -> (ошибки абзаца в формате /check с позициями внутри абзаца,
+        partial - поиск исправлений прерван сроком)
+        lease - сколько секунд задание принадлежит процессу без продления"""
+        self.path = str(path)
+        self.check = check
+        self.timeout = timeout
+        self.lease = lease
+        self.pid = os.getpid()
+        # Идентификатор этого запуска: владелец заданий в базе
+        self.owner = uuid.uuid4().hex
+        self._local = threading.local()
+        self._closed = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='spellcheck-job')
+
+        connection = self._connection()
+        with connection:
+            connection.executescript(SCHEMA)
+            for table, columns in COLUMNS.items():
+                existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                for column, definition in columns.items():
+                    if column not in existing:
+                        connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            # Старые задания удаляются вместе с результатами
+            expired = time.time() - retention_days * 86400
+            connection.execute("DELETE FROM results WHERE job_id IN (SELECT id FROM jobs WHERE updated < ?)",
+                               (expired,))
+            connection.execute("DELETE FROM jobs WHERE updated < ?", (expired,))
+        # Продление аренды своих заданий и подбор брошенных чужих
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name='spellcheck-job-lease', daemon=True)
+        self._heartbeat.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Отдельное соединение на поток (sqlite3 не делит соединения между потоками)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def submit(self, document: str, name: str = '') -> str:
+        """Новое задание; возвращает его идентификатор"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        total = len(split_paragraphs(document))
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, name, status, owner, lease, created, updated, total, done, error_count,"
+                " message, document) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, 0, 0, '', ?)",
+                (job_id, name, self.owner, now + self.lease, now, now, total, document))
+        self.executor.submit(self._run, job_id)
+        return job_id
+
+    def renew(self) -> int:
+        """Продление аренды заданий этого запуска; возвращает их число"""
+        with self._connection() as connection:
+            return connection.execute(
+                "UPDATE jobs SET lease = ? WHERE owner = ? AND status IN (?, ?)",
+                (time.time() + self.lease, self.owner, *ACTIVE)).rowcount
+
+    def resume(self) -> int:
+        """Продолжение заданий, аренда которых истекла (процесс-владелец остановился);
+        возвращает их число"""
+        now = time.time()
+        rows = self._connection().execute(
+            "SELECT id, owner FROM jobs WHERE status IN (?, ?) AND owner != ? AND lease < ?",
+            (*ACTIVE, self.owner, now)).fetchall()
+        resumed = 0
+        for job_id, owner in rows:
+            # Задание забирает только один из одновременно запущенных процессов
+            with self._connection() as connection:
+                claimed = connection.execute(
+                    "UPDATE jobs SET owner = ?, lease = ?, status = 'queued' WHERE id = ? AND owner = ? AND lease < ?",
+                    (self.owner, now + self.lease, job_id, owner, now)).rowcount
+            if claimed:
+                self.executor.submit(self._run, job_id)
+                resumed += 1
+        return resumed
+
+    def _heartbeat_loop(self) -> None:
+        while not self._closed.wait(self.lease / 3):
+            try:
+                self.renew()
+                resumed = self.resume()
+                if resumed:
+                    print(f"⚙️  Продолжены прерванные задания: {resumed}")
+            except sqlite3.Error as e:
+                print(f"⚠️  Аренда заданий не продлена: {e}")
+
+    def close(self) -> None:
+        """Остановка продления аренды; задания в работе дорабатывают"""
+        self._closed.set()
+
+    def _status(self, job_id: str) -> Optional[str]:
+        row = self._connection().execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def _run(self, job_id: str) -> None:
+        connection = self._connection()
+        row = connection.execute("SELECT document, done FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return
+        document, done = row
+        with connection:
+            updated = connection.execute(
+                "UPDATE jobs SET status = 'running', updated = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)).rowcount
+        if not updated:
+            return
+
+        paragraphs = split_paragraphs(document)
+        try:
+            for index in range(done, len(paragraphs)):
+                # Отмена могла прийти из другого процесса сервера
+                if self._status(job_id) != 'running':
+                    return
+                offset, paragraph = paragraphs[index]
+                errors, partial = self.check(paragraph)
+                for error in errors:
+                    error['start_pos'] += offset
+                    error['end_pos'] += offset
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO results (job_id, paragraph, errors, partial) VALUES (?, ?, ?, ?)",
+                        (job_id, index, json.dumps(errors, ensure_ascii=False), int(partial)))
+                    connection.execute(
+                        "UPDATE jobs SET done = ?, error_count = error_count + ?, partial = MAX(partial, ?),"
+                        " updated = ? WHERE id = ?",
+                        (index + 1, len(errors), int(partial), time.time(), job_id))
+            with connection:
+                connection.execute("UPDATE jobs SET status = 'done', updated = ? WHERE id = ? AND status = 'running'",
+                                   (time.time(), job_id))
+        except Exception as e:
+            print(f"❌ Задание {job_id}: {e}")
+            with connection:
+                connection.execute("UPDATE jobs SET status = 'failed', message = ?, updated = ? WHERE id = ?",
+                                   (str(e), time.time(), job_id))
+
+    def cancel(self, job_id: str) -> bool:
+        """Отмена задания в очереди или в работе (False - задание уже завершено или не найдено)"""
+        with self._connection() as connection:
+            return connection.execute(
+                "UPDATE jobs SET status = 'cancelled', updated = ? WHERE id = ? AND status IN (?, ?)",
+                (time.time(), job_id, *ACTIVE)).rowcount > 0
+
+    def get(self, job_id: str, since: int = 0) -> Optional[dict]:
+        """Состояние задания и ошибки абзацев с номера since (для опроса по частям)"""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT name, status, created, updated, total, done, error_count, message, partial FROM jobs WHERE id = ?",
+            (job_id,)).fetchone()
+        if row is None:
+            return None
+        name, status, created, updated, total, done, error_count, message, partial = row
+        errors, partial_paragraphs = [], []
+        for paragraph, paragraph_errors, paragraph_partial in connection.execute(
+                "SELECT paragraph, errors, partial FROM results WHERE job_id = ? AND paragraph >= ? AND paragraph < ?"
+                " ORDER BY paragraph", (job_id, since, done)):
+            errors.extend(json.loads(paragraph_errors))
+            if paragraph_partial:
+                partial_paragraphs.append(paragraph)
+        result = {
+            'job_id': job_id,
+            'name': name,
+            'status': status,
+            'progress': {'done': done, 'total': total,
+                         'percent': round(done / total * 100, 1) if total else 100.0},
+            'error_count': error_count,
+            'created': created,
+            'updated': updated,
+            'errors': errors,
+            # Есть абзацы, исправления которых найдены не полностью (срок поиска истек)
+            'partial': bool(partial),
+            'partial_paragraphs': partial_paragraphs,
+            # Следующий опрос: ?since=next вернет только новые абзацы
+            'next': done,
+        }
+        if message:
+            result['message'] = message
+        return result
+
+    def stream(self, job_id: str, since: int = 0, interval: float = 0.5) -> Iterator[dict]:
+        """Новые результаты по мере готовности абзацев, до завершения задания"""
+        while True:
+            job = self.get(job_id, since)
+            if job is None:
+                return
+            if job['errors'] or job['next'] != since or job['status'] in FINISHED:
+                yield job
+            since = job['next']
+            if job['status'] in FINISHED:
+                return
+            time.sleep(interval)
+
+    def counts(self) -> dict:
+        """Число заданий по статусам"""
+        return dict(self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
@@ -0,0 +1,145 @@
+# metrics.py
+"""
+Замеры фаз проверки текста и вывод в формате Prometheus
+Фазы одного запроса: tokenize, lookup, candidates, ranking, serialization
+(и completion у /complete).
+Код горячего пути получает объект PhaseTimer или None: при None замеры
+не делаются вовсе (одна проверка `if timer`), поэтому с выключенными
+метриками накладные расходы практически нулевые.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from time import perf_counter
+
+PHASES = ('tokenize', 'lookup', 'candidates', 'ranking', 'serialization', 'completion')
+# Границы корзин гистограмм (секунды и число кандидатов)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CANDIDATE_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+METRICS_ENABLED = os.environ.get('SPELLCHECK_METRICS', '1') not in ('', '0', 'false', 'no')
+
+
+class Histogram:
+    """Гистограмма Prometheus: накопительные корзины, сумма и количество"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str = '') -> list:
+        separator = ',' if labels else ''
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {self.count}')
+        suffix = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{suffix} {self.total}')
+        lines.append(f'{name}_count{suffix} {self.count}')
+        return lines
+
+
+class PhaseTimer:
+    """Замеры одного запроса"""
+
+    __slots__ = ('phases', 'candidates_examined', 'cache')
+
+    def __init__(self):
+        self.phases = defaultdict(float)
+        self.candidates_examined = []
+        self.cache = defaultdict(int)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] += seconds
+
+    def examined(self, count: int) -> None:
+        self.candidates_examined.append(count)
+
+    def cache_result(self, cache: str, hit: bool) -> None:
+        self.cache[f"{cache}_{'hit' if hit else 'miss'}"] += 1
+
+    def to_dict(self) -> dict:
+        """Для ответа /check с debug: миллисекунды по фазам"""
+        return {
+            'phases_ms': {phase: round(self.phases[phase] * 1000, 3) for phase in PHASES if phase in self.phases},
+            'candidates_examined': self.candidates_examined,
+            'cache': dict(self.cache),
+        }
+
+
+class MetricsRegistry:
+    """Гистограммы и счетчики всех запросов процесса"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phase_seconds = {phase: Histogram(LATENCY_BUCKETS) for phase in PHASES}
+        self.request_seconds = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.candidates_examined = Histogram(CANDIDATE_BUCKETS)
+        self.cache = defaultdict(int)
+        self.requests = defaultdict(int)
+
+    def record(self, endpoint: str, timer: PhaseTimer, total_seconds: float) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.request_seconds[endpoint].observe(total_seconds)
+            for phase, seconds in timer.phases.items():
+                # Фаза вне PHASES получает гистограмму при первом замере
+                histogram = self.phase_seconds.get(phase)
+                if histogram is None:
+                    histogram = self.phase_seconds[phase] = Histogram(LATENCY_BUCKETS)
+                histogram.observe(seconds)
+            for count in timer.candidates_examined:
+                self.candidates_examined.observe(count)
+            for key, count in timer.cache.items():
+                self.cache[key] += count
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus (version 0.0.4)"""
+        with self._lock:
+            lines = ['# HELP spellcheck_phase_seconds Time spent in each phase per request',
+                     '# TYPE spellcheck_phase_seconds histogram']
+            for phase, histogram in self.phase_seconds.items():
+                lines.extend(histogram.render('spellcheck_phase_seconds', f'phase="{phase}"'))
+
+            lines += ['# HELP spellcheck_request_seconds Total handler time per endpoint',
+                      '# TYPE spellcheck_request_seconds histogram']
+            for endpoint, histogram in sorted(self.request_seconds.items()):
+                lines.extend(histogram.render('spellcheck_request_seconds', f'endpoint="{endpoint}"'))
+
+            lines += ['# HELP spellcheck_candidates_examined Vocabulary entries compared per unknown word',
+                      '# TYPE spellcheck_candidates_examined histogram']
+            lines.extend(self.candidates_examined.render('spellcheck_candidates_examined'))
+
+            lines += ['# HELP spellcheck_cache_total Suggestion table and cache lookups',
+                      '# TYPE spellcheck_cache_total counter']
+            for key, count in sorted(self.cache.items()):
+                cache, result = key.rsplit('_', 1)
+                lines.append(f'spellcheck_cache_total{{cache="{cache}",result="{result}"}} {count}')
+
+            lines += ['# HELP spellcheck_requests_total Instrumented requests per endpoint',
+                      '# TYPE spellcheck_requests_total counter']
+            for endpoint, count in sorted(self.requests.items()):
+                lines.append(f'spellcheck_requests_total{{endpoint="{endpoint}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def start_timer(debug: bool = False):
+    """PhaseTimer, если метрики включены или запрошен debug, иначе None"""
+    if METRICS_ENABLED or debug:
+        return PhaseTimer(), perf_counter()
+    return None, 0.0
@@ -0,0 +1,191 @@
+# socket_protocol.py
+"""
+Двоичный протокол сокетного сервера проверки (socket_server.py)
+HTTP + JSON для одного слова дороже самой проверки: разбор запроса,
+JSON списков исправлений и новое соединение на каждый вызов. Здесь кадр -
+длина и полезная нагрузка, строки - длина и UTF-8, без разбора текста.
+
+Кадр:      uint32 длина, затем полезная нагрузка
+Запрос:    uint32 номер, uint8 операция, тело операции
+Ответ:     uint32 номер, uint8 статус, тело ответа (при ошибке - сообщение)
+
+Номер запроса возвращается в ответе: клиент отправляет запросы подряд,
+не дожидаясь ответов (pipelining), и сопоставляет ответы по номеру.
+Строка - uint16 длина байтов и UTF-8, список строк - uint16 число и строки,
+текст - uint32 длина и UTF-8. Все числа little-endian.
+
+Операции:
+    PING        -                                      -> версия модели, uint32 наибольшее
+                                                          число слов в CHECK и SUGGEST
+    CHECK       список слов                            -> uint8 на слово (1 - правильное)
+    SUGGEST     uint8 исправлений, uint32 срок мс,      -> uint8 неполный, на слово:
+                список слов                               uint8 правильное, список исправлений
+    CHECK_TEXT  uint16 ошибок, uint32 срок мс, текст   -> uint8 неполный, uint16 число ошибок,
+                                                          на ошибку: uint32 начало, uint32 конец,
+                                                          слово, список исправлений
+Срок 0 - серверный по умолчанию (SPELLCHECK_DEADLINE_MS).
+"""
+
+import struct
+from typing import Dict, List, Optional, Tuple
+
+FRAME = struct.Struct('<I')
+HEADER = struct.Struct('<IB')
+U8 = struct.Struct('<B')
+U16 = struct.Struct('<H')
+U32 = struct.Struct('<I')
+SUGGEST_PARAMS = struct.Struct('<BI')
+TEXT_PARAMS = struct.Struct('<HI')
+SPAN = struct.Struct('<II')
+
+# Больше - ошибка протокола (защита от мусора вместо длины)
+MAX_FRAME = 16 * 1024 * 1024
+
+OP_PING = 0
+OP_CHECK = 1
+OP_SUGGEST = 2
+OP_CHECK_TEXT = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+# Пул поиска исправлений заполнен (в HTTP - 503)
+STATUS_BUSY = 2
+# Модель еще загружается
+STATUS_NOT_READY = 3
+
+
+class ProtocolError(Exception):
+    """Поврежденный кадр или тело"""
+
+
+def pack_str(value: str) -> bytes:
+    data = value.encode('utf-8')
+    if len(data) > 0xFFFF:
+        raise ProtocolError("Строка длиннее 65535 байт")
+    return U16.pack(len(data)) + data
+
+
+def pack_strings(values) -> bytes:
+    values = list(values)
+    if len(values) > 0xFFFF:
+        raise ProtocolError("Больше 65535 строк в списке")
+    return U16.pack(len(values)) + b''.join(pack_str(value) for value in values)
+
+
+def pack_text(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return U32.pack(len(data)) + data
+
+
+def frame(request_id: int, code: int, body: bytes = b'') -> bytes:
+    """Кадр запроса (code - операция) или ответа (code - статус)"""
+    return FRAME.pack(HEADER.size + len(body)) + HEADER.pack(request_id, code) + body
+
+
+def split_frames(buffer: bytearray) -> List[bytes]:
+    """Полные кадры из начала буфера (буфер укорачивается); неполный остается"""
+    payloads = []
+    offset = 0
+    while len(buffer) - offset >= FRAME.size:
+        (length,) = FRAME.unpack_from(buffer, offset)
+        if length > MAX_FRAME or length < HEADER.size:
+            raise ProtocolError(f"Недопустимая длина кадра: {length}")
+        end = offset + FRAME.size + length
+        if end > len(buffer):
+            break
+        payloads.append(bytes(buffer[offset + FRAME.size:end]))
+        offset = end
+    del buffer[:offset]
+    return payloads
+
+
+class Reader:
+    """Последовательное чтение тела кадра"""
+
+    __slots__ = ('data', 'offset')
+
+    def __init__(self, data: bytes, offset: int = 0):
+        self.data = data
+        self.offset = offset
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        try:
+            values = fmt.unpack_from(self.data, self.offset)
+        except struct.error:
+            raise ProtocolError("Тело кадра короче ожидаемого") from None
+        self.offset += fmt.size
+        return values
+
+    def u8(self) -> int:
+        return self.unpack(U8)[0]
+
+    def _bytes(self, length: int) -> str:
+        end = self.offset + length
+        if end > len(self.data):
+            raise ProtocolError("Строка выходит за конец кадра")
+        value = self.data[self.offset:end].decode('utf-8')
+        self.offset = end
+        return value
+
+    def string(self) -> str:
+        return self._bytes(self.unpack(U16)[0])
+
+    def strings(self) -> List[str]:
+        return [self.string() for _ in range(self.unpack(U16)[0])]
+
+    def text(self) -> str:
+        return self._bytes(self.unpack(U32)[0])
+
+
+def encode_ping(version: str, max_words: int) -> bytes:
+    return pack_str(version) + U32.pack(max_words)
+
+
+def decode_ping(reader: Reader) -> Tuple[str, Optional[int]]:
+    """(версия модели, предел слов в запросе); сервер без предела в ответе - None"""
+    version = reader.string()
+    if len(reader.data) - reader.offset < U32.size:
+        return version, None
+    return version, reader.unpack(U32)[0]
+
+
+def decode_check(reader: Reader) -> List[bool]:
+    return [flag == 1 for flag in reader.data[reader.offset:]]
+
+
+def encode_suggest(results: List[Tuple[bool, List[str]]], partial: bool) -> bytes:
+    parts = [U8.pack(partial)]
+    for correct, suggestions in results:
+        parts.append(U8.pack(correct))
+        parts.append(pack_strings(suggestions))
+    return b''.join(parts)
+
+
+def decode_suggest(reader: Reader, count: int) -> Tuple[List[Tuple[bool, List[str]]], bool]:
+    partial = reader.u8() == 1
+    results = []
+    for _ in range(count):
+        correct = reader.u8() == 1
+        results.append((correct, reader.strings()))
+    return results, partial
+
+
+def encode_errors(errors: List[dict], partial: bool) -> bytes:
+    parts = [U8.pack(partial), U16.pack(len(errors))]
+    for error in errors:
+        parts.append(SPAN.pack(error['start_pos'], error['end_pos']))
+        parts.append(pack_str(error['word']))
+        parts.append(pack_strings(error['suggestions']))
+    return b''.join(parts)
+
+
+def decode_errors(reader: Reader) -> Tuple[List[Dict], bool]:
+    """Ошибки в том же виде, что в ответе /check"""
+    partial = reader.u8() == 1
+    errors = []
+    for _ in range(reader.unpack(U16)[0]):
+        start_pos, end_pos = reader.unpack(SPAN)
+        word = reader.string()
+        errors.append({'word': word, 'suggestions': reader.strings(),
+                       'start_pos': start_pos, 'end_pos': end_pos})
+    return errors, partial
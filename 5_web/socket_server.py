@@ -0,0 +1,189 @@
+# socket_server.py
+"""
+Сокетный сервер проверки для внутренних сервисов
+Та же модель, пул поиска исправлений и кеши, что у веб-интерфейса, но
+вместо HTTP + JSON - двоичный протокол socket_protocol.py через Unix-сокет
+или TCP. Соединение постоянное; клиент может отправить несколько запросов
+подряд, не дожидаясь ответов: сервер разбирает все полные кадры из
+прочитанного блока, отвечает на них по порядку и отправляет ответы одним
+вызовом sendall. Каждое соединение обслуживается своим потоком.
+
+Клиент с пулом соединений и автоматической группировкой слов -
+spellcheck_client.py.
+"""
+
+import os
+import sys
+import socket
+import argparse
+import socketserver
+from time import perf_counter
+from pathlib import Path
+
+# Модель загружается до открытия сокета: клиент не получает "не готово" при старте
+os.environ.setdefault('SPELLCHECK_LAZY_LOAD', '0')
+
+sys.path.insert(0, str(Path(__file__).parent))
+import web_interface
+from web_interface import get_suggestion_pool, request_deadline, MAX_SUGGEST_WORDS
+from georgian_tokenizer import normalize_georgian
+from metrics import registry, start_timer
+from suggestion_pool import PoolSaturated
+from socket_protocol import (
+    HEADER, SUGGEST_PARAMS, TEXT_PARAMS, OP_PING, OP_CHECK, OP_SUGGEST, OP_CHECK_TEXT,
+    STATUS_OK, STATUS_ERROR, STATUS_BUSY, STATUS_NOT_READY,
+    ProtocolError, Reader, frame, split_frames, pack_str, encode_ping, encode_suggest, encode_errors,
+)
+
+RECV_SIZE = 65536
+
+
+def _deadline(deadline_ms: int) -> float:
+    return request_deadline(deadline_ms or None)
+
+
+def _check(checker, info, reader):
+    words = reader.strings()
+    if len(words) > MAX_SUGGEST_WORDS:
+        raise ProtocolError(f"ერთ მოთხოვნაში მაქსიმუმ {MAX_SUGGEST_WORDS} სიტყვა")
+    return bytes(checker.is_correct(normalize_georgian(word)) for word in words)
+
+
+def _suggest(checker, info, reader):
+    max_suggestions, deadline_ms = reader.unpack(SUGGEST_PARAMS)
+    words = reader.strings()
+    if len(words) > MAX_SUGGEST_WORDS:
+        raise ProtocolError(f"ერთ მოთხოვნაში მაქსიმუმ {MAX_SUGGEST_WORDS} სიტყვა")
+    timer, started = start_timer()
+    forms = [normalize_georgian(word) for word in words]
+    correct = [checker.is_correct(form) for form in forms]
+    unknown = list(dict.fromkeys(form for form, known in zip(forms, correct) if not known))
+    found, partial = {}, False
+    if unknown:
+        found, partial = checker.suggest_many(unknown, _deadline(deadline_ms), get_suggestion_pool(checker),
+                                              max_suggestions=max_suggestions or 3, timer=timer)
+    body = encode_suggest([(known, [] if known else found.get(form, []))
+                           for form, known in zip(forms, correct)], partial)
+    if timer:
+        registry.record('socket_suggest', timer, perf_counter() - started)
+    return body
+
+
+def _check_text(checker, info, reader):
+    max_errors, deadline_ms = reader.unpack(TEXT_PARAMS)
+    text = reader.text()
+    timer, started = start_timer()
+    errors, partial = checker.check_text_within(text, _deadline(deadline_ms), get_suggestion_pool(checker),
+                                                max_errors=max_errors or 50, timer=timer)
+    body = encode_errors(errors, partial)
+    if timer:
+        registry.record('socket_check', timer, perf_counter() - started)
+    return body
+
+
+def _ping(checker, info, reader):
+    # Клиент ограничивает свои группы пределом сервера
+    return encode_ping(info.get('model_version') or '', MAX_SUGGEST_WORDS)
+
+
+OPERATIONS = {
+    OP_PING: _ping,
+    OP_CHECK: _check,
+    OP_SUGGEST: _suggest,
+    OP_CHECK_TEXT: _check_text,
+}
+
+
+def handle_payload(payload: bytes) -> bytes:
+    """Ответ на один запрос (кадр целиком)"""
+    request_id, operation = HEADER.unpack_from(payload)
+    handler = OPERATIONS.get(operation)
+    if handler is None:
+        return frame(request_id, STATUS_ERROR, pack_str(f"უცნობი ოპერაცია: {operation}"))
+    # Запрос работает с одной версией модели, даже если ее заменили
+    checker, info = web_interface.active_model
+    if checker is None:
+        return frame(request_id, STATUS_NOT_READY, pack_str('სპელჩეკერი არ ინიციალიზირებულია'))
+    try:
+        return frame(request_id, STATUS_OK, handler(checker, info, Reader(payload, HEADER.size)))
+    except PoolSaturated:
+        return frame(request_id, STATUS_BUSY, pack_str('სერვერი გადატვირთულია, სცადეთ მოგვიანებით'))
+    except Exception as e:
+        return frame(request_id, STATUS_ERROR, pack_str(str(e)[:1000]))
+
+
+class SpellcheckHandler(socketserver.BaseRequestHandler):
+    """Соединение клиента: кадры читаются блоками, ответы на блок - одним sendall"""
+
+    def handle(self):
+        sock = self.request
+        if sock.family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buffer = bytearray()
+        while True:
+            try:
+                chunk = sock.recv(RECV_SIZE)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buffer += chunk
+            try:
+                payloads = split_frames(buffer)
+            except ProtocolError as e:
+                print(f"❌ Ошибка протокола от {self.client_address}: {e}")
+                return
+            if payloads:
+                sock.sendall(b''.join(handle_payload(payload) for payload in payloads))
+
+
+class ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def create_server(unix_path=None, host='127.0.0.1', port=5050):
+    """Сервер на Unix-сокете (unix_path) или TCP; запуск - serve_forever()"""
+    if unix_path:
+        # Файл сокета от прошлого запуска мешает bind
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        return ThreadingUnixServer(unix_path, SpellcheckHandler)
+    return ThreadingTCPServer((host, port), SpellcheckHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сокетный сервер проверки орфографии')
+    parser.add_argument('--unix', type=str,
+                       help='Путь Unix-сокета (по умолчанию - TCP)')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='Адрес TCP')
+    parser.add_argument('--port', type=int, default=5050,
+                       help='Порт TCP')
+    args = parser.parse_args()
+
+    if web_interface.active_model[0] is None and not web_interface.initialize_spellcheckers():
+        print("❌ Критическая ошибка инициализации спеллчекера!")
+        sys.exit(1)
+    # Модель, загруженная при импорте (SPELLCHECK_LAZY_LOAD=0), еще без пула
+    web_interface.start_suggestion_pool(web_interface.active_model[0])
+    server = create_server(args.unix, args.host, args.port)
+    address = args.unix or f"{args.host}:{args.port}"
+    print(f"🔌 Сокетный сервер: {address} (модель {web_interface.active_model[1].get('model_version')})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Сервер остановлен")
+    finally:
+        server.server_close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+if __name__ == '__main__':
+    main()
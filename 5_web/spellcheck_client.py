@@ -0,0 +1,434 @@
+# spellcheck_client.py
+"""
+Клиент сокетного сервера проверки (socket_server.py)
+- пул постоянных соединений: новое соединение на вызов не открывается
+- pipelining: запросы уходят сразу, не дожидаясь ответов на предыдущие;
+  поток чтения каждого соединения сопоставляет ответы по номеру запроса
+- группировка: одиночные is_correct / suggest из разных потоков
+  собираются в один запрос на много слов. Пока предыдущая группа ждет
+  ответа, новые слова копятся (не дольше batch_window_ms и не больше
+  max_batch); без ожидающих групп слово уходит сразу. Повторы слова в
+  группе отправляются один раз
+- предел группы: сервер сообщает свой MAX_SUGGEST_WORDS в ответе на PING
+  каждого нового соединения, и max_batch не превышает его
+
+    with SpellcheckClient(unix_path='/tmp/spellcheck.sock') as client:
+        client.suggest('გამარჯობს')          # ['გამარჯობა', ...]
+        client.check_words(['და', 'დაა'])    # [True, False]
+
+Модуль зависит только от socket_protocol.py; без аргументов запускает
+замер задержки и пропускной способности (и HTTP для сравнения, --http).
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import itertools
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from socket_protocol import (
+    HEADER, SUGGEST_PARAMS, TEXT_PARAMS, OP_PING, OP_CHECK, OP_SUGGEST, OP_CHECK_TEXT,
+    STATUS_OK, STATUS_BUSY, STATUS_NOT_READY,
+    ProtocolError, Reader, frame, split_frames, pack_strings, pack_text,
+    decode_ping, decode_check, decode_suggest, decode_errors,
+)
+
+
+class SpellcheckError(Exception):
+    """Сервер ответил ошибкой"""
+
+
+class ServerBusy(SpellcheckError):
+    """Пул поиска исправлений сервера заполнен (повторить позже)"""
+
+
+class NotReady(SpellcheckError):
+    """Модель сервера еще загружается"""
+
+
+STATUS_ERRORS = {STATUS_BUSY: ServerBusy, STATUS_NOT_READY: NotReady}
+# Группа слов, пока предел сервера неизвестен (значение SPELLCHECK_MAX_SUGGEST_WORDS по умолчанию)
+DEFAULT_MAX_BATCH = 100
+
+
+class Connection:
+    """Одно соединение с сервером; запросы из разных потоков идут без ожидания ответов"""
+
+    def __init__(self, unix_path: Optional[str], host: str, port: int, timeout: float):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Чтение блокируется без срока: срок ответа - у Future вызывающего
+        self.sock.settimeout(None)
+        self.closed = False
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, tuple] = {}
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, name='spellcheck-client-reader', daemon=True)
+        self._reader.start()
+
+    def request(self, operation: int, body: bytes, decode) -> Future:
+        """Отправка запроса; результат decode(Reader) придет в Future"""
+        future = Future()
+        with self._send_lock:
+            if self.closed:
+                raise ConnectionError("Соединение закрыто")
+            request_id = next(self._ids) & 0xFFFFFFFF
+            self._pending[request_id] = (decode, future)
+            try:
+                self.sock.sendall(frame(request_id, operation, body))
+            except OSError:
+                self._pending.pop(request_id, None)
+                self.close()
+                raise
+        return future
+
+    def _read_loop(self) -> None:
+        buffer = bytearray()
+        error = ConnectionError("Сервер закрыл соединение")
+        try:
+            while True:
+                chunk = self.sock.recv(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                for payload in split_frames(buffer):
+                    request_id, status = HEADER.unpack_from(payload)
+                    decode, future = self._pending.pop(request_id, (None, None))
+                    if future is None:
+                        continue
+                    reader = Reader(payload, HEADER.size)
+                    try:
+                        if status == STATUS_OK:
+                            future.set_result(decode(reader))
+                        else:
+                            future.set_exception(STATUS_ERRORS.get(status, SpellcheckError)(reader.string()))
+                    except ProtocolError as e:
+                        future.set_exception(e)
+        except (OSError, ProtocolError) as e:
+            error = ConnectionError(f"Соединение прервано: {e}")
+        finally:
+            # Под тем же замком, что у request: после закрытия новый запрос
+            # не попадет в словарь, который уже никто не разберет
+            with self._send_lock:
+                self.close()
+                pending, self._pending = self._pending, {}
+            # Запросы без ответа не должны ждать вечно
+            for _, future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class _Batcher:
+    """Сборка одиночных слов в групповые запросы
+    send(слова) возвращает Future со списком результатов в порядке слов
+    Как в алгоритме Нейгла: группа копится, только пока предыдущая в пути
+    limit() - наибольшая группа (может измениться, когда станет известен предел сервера)"""
+
+    def __init__(self, send, window: float, limit: Callable[[], int]):
+        self._send = send
+        self._window = window
+        self._limit = limit
+        self._max_batch = DEFAULT_MAX_BATCH
+        self._waiting: Dict[str, List[Future]] = {}
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def submit(self, word: str) -> Future:
+        future = Future()
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='spellcheck-client-batcher', daemon=True)
+                self._thread.start()
+            self._waiting.setdefault(word, []).append(future)
+            if len(self._waiting) == 1 or len(self._waiting) >= self._max_batch:
+                self._condition.notify()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            # Вне замка: при первом вызове limit() открывает соединение
+            try:
+                self._max_batch = self._limit()
+            except Exception:
+                pass
+            with self._condition:
+                while not self._waiting:
+                    self._condition.wait()
+                # Окно начинается с первого слова группы
+                flush_at = time.monotonic() + self._window
+                while self._in_flight and len(self._waiting) < self._max_batch:
+                    remaining = flush_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                words = list(itertools.islice(self._waiting, self._max_batch))
+                batch = {word: self._waiting.pop(word) for word in words}
+                self._in_flight += 1
+            try:
+                sent = self._send(words)
+            except Exception as e:
+                sent = Future()
+                sent.set_exception(e)
+            # Ответ разбирается в потоке чтения, группировка продолжается
+            sent.add_done_callback(lambda done, batch=batch: self._deliver(done, batch))
+
+    def _deliver(self, done: Future, batch: Dict[str, List[Future]]) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+        error = done.exception()
+        results = None if error else done.result()
+        for index, futures in enumerate(batch.values()):
+            for future in futures:
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[index])
+
+
+class SpellcheckClient:
+    """Клиент с пулом соединений, pipelining и группировкой одиночных вызовов"""
+
+    def __init__(self, unix_path: Optional[str] = None, host: str = '127.0.0.1', port: int = 5050,
+                 connections: int = 2, batch_window_ms: float = 1.0, max_batch: Optional[int] = None,
+                 max_suggestions: int = 3, timeout: float = 10.0):
+        self.unix_path = unix_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        # None - предел сервера; явное значение тоже не больше предела сервера
+        self._requested_batch = max_batch
+        self.max_batch = max_batch or DEFAULT_MAX_BATCH
+        self.server_max_words: Optional[int] = None
+        self.max_suggestions = max_suggestions
+        self._connections: List[Optional[Connection]] = [None] * max(1, connections)
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        window = batch_window_ms / 1000
+        self._check_batcher = _Batcher(self._send_check, window, self._batch_size)
+        self._suggest_batcher = _Batcher(self._send_suggest, window, self._batch_size)
+
+    def __enter__(self) -> 'SpellcheckClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _connection(self) -> Connection:
+        """Соединения по кругу; закрытое заменяется новым"""
+        slot = next(self._next) % len(self._connections)
+        with self._lock:
+            connection = self._connections[slot]
+            if connection is None or connection.closed:
+                connection = Connection(self.unix_path, self.host, self.port, self.timeout)
+                self._learn_limit(connection)
+                self._connections[slot] = connection
+            return connection
+
+    def _learn_limit(self, connection: Connection) -> None:
+        """Предел слов в запросе из ответа сервера на PING (сервер мог смениться)"""
+        try:
+            _, max_words = connection.request(OP_PING, b'', decode_ping).result(self.timeout)
+        except SpellcheckError:
+            # Модель сервера еще грузится: предел узнается на следующем соединении
+            return
+        if max_words:
+            self.server_max_words = max_words
+            self.max_batch = min(self._requested_batch or max_words, max_words)
+
+    def _batch_size(self) -> int:
+        """Наибольшая группа слов; предел сервера узнается при первом соединении"""
+        if self.server_max_words is None:
+            self._connection()
+        return self.max_batch
+
+    def _request(self, operation: int, body: bytes, decode) -> Future:
+        try:
+            return self._connection().request(operation, body, decode)
+        except OSError:
+            # Сервер перезапустили: одна попытка на новом соединении
+            return self._connection().request(operation, body, decode)
+
+    def _send_check(self, words: List[str]) -> Future:
+        return self._request(OP_CHECK, pack_strings(words), decode_check)
+
+    def _send_suggest(self, words: List[str], max_suggestions: Optional[int] = None,
+                      deadline_ms: int = 0) -> Future:
+        body = SUGGEST_PARAMS.pack(max_suggestions or self.max_suggestions, deadline_ms) + pack_strings(words)
+        return self._request(OP_SUGGEST, body, lambda reader: decode_suggest(reader, len(words))[0])
+
+    # Одиночные вызовы: группируются с вызовами других потоков
+
+    def is_correct_async(self, word: str) -> Future:
+        return self._check_batcher.submit(word)
+
+    def is_correct(self, word: str) -> bool:
+        return self.is_correct_async(word).result(self.timeout)
+
+    def suggest_async(self, word: str) -> Future:
+        """Future с (правильное ли слово, исправления)"""
+        return self._suggest_batcher.submit(word)
+
+    def suggest(self, word: str) -> List[str]:
+        """Исправления слова ([] - слово правильное или исправлений нет)"""
+        return self.suggest_async(word).result(self.timeout)[1]
+
+    # Групповые вызовы: один запрос на каждые max_batch слов
+
+    def ping(self) -> str:
+        """Версия модели сервера"""
+        return self._request(OP_PING, b'', decode_ping).result(self.timeout)[0]
+
+    def check_words(self, words: List[str]) -> List[bool]:
+        size = self._batch_size()
+        futures = [self._send_check(words[i:i + size]) for i in range(0, len(words), size)]
+        return [flag for future in futures for flag in future.result(self.timeout)]
+
+    def suggest_many(self, words: List[str], max_suggestions: Optional[int] = None,
+                     deadline_ms: int = 0) -> Tuple[Dict[str, List[str]], bool]:
+        """Исправления неправильных слов (как POST /suggest): (слово -> исправления, неполный ли результат)"""
+        unique = list(dict.fromkeys(words))
+        size = self._batch_size()
+        futures = []
+        for i in range(0, len(unique), size):
+            chunk = unique[i:i + size]
+            body = SUGGEST_PARAMS.pack(max_suggestions or self.max_suggestions, deadline_ms) + pack_strings(chunk)
+            futures.append((chunk, self._request(OP_SUGGEST, body,
+                                                 lambda reader, count=len(chunk): decode_suggest(reader, count))))
+        suggestions, partial = {}, False
+        for chunk, future in futures:
+            results, chunk_partial = future.result(self.timeout)
+            partial = partial or chunk_partial
+            for word, (correct, candidates) in zip(chunk, results):
+                if not correct:
+                    suggestions[word] = candidates
+        return suggestions, partial
+
+    def check_text(self, text: str, max_errors: int = 50, deadline_ms: int = 0) -> Tuple[List[dict], bool]:
+        """Ошибки текста в формате /check: (ошибки, неполный ли результат)"""
+        body = TEXT_PARAMS.pack(max_errors, deadline_ms) + pack_text(text)
+        return self._request(OP_CHECK_TEXT, body, decode_errors).result(self.timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                if connection is not None:
+                    connection.close()
+            self._connections = [None] * len(self._connections)
+
+
+# Слова для замера: правильные и с опечатками
+SAMPLE_WORDS = ['გამარჯობა', 'საქართველო', 'არის', 'რომ', 'და', 'თბილისი', 'ქალაქი', 'წიგნი',
+                'გამარჯობს', 'საქართველი', 'თბილისა', 'ქალქი', 'წიგმი', 'პროგრამა', 'კომპიუტერი']
+
+
+def _percentiles(values: List[float]) -> str:
+    values = sorted(values)
+    pick = lambda p: values[min(len(values) - 1, int(len(values) * p))] * 1000
+    return f"p50 {pick(0.5):.3f} мс, p99 {pick(0.99):.3f} мс"
+
+
+def benchmark(client: SpellcheckClient, words: List[str], requests: int, threads: int,
+              http_url: Optional[str] = None) -> None:
+    """Задержка одиночных вызовов и пропускная способность pipelining и группировки"""
+    stream = [words[i % len(words)] for i in range(requests)]
+    print(f"Модель сервера: {client.ping()}")
+    # Первый проход заполняет кеши исправлений сервера: замеряется протокол, а не поиск
+    client.suggest_many(words)
+
+    latencies = []
+    for word in stream:
+        started = time.perf_counter()
+        client._send_suggest([word]).result(client.timeout)
+        latencies.append(time.perf_counter() - started)
+    print(f"сокет, по одному запросу:     {_percentiles(latencies)}, "
+          f"{len(stream) / sum(latencies):.0f} слов/с")
+
+    started = time.perf_counter()
+    futures = [client._send_suggest([word]) for word in stream]
+    for future in futures:
+        future.result(client.timeout)
+    elapsed = time.perf_counter() - started
+    print(f"сокет, pipelining:            {len(stream) / elapsed:.0f} слов/с")
+
+    def worker(part):
+        for word in part:
+            client.suggest(word)
+
+    parts = [stream[i::threads] for i in range(threads)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, parts))
+    elapsed = time.perf_counter() - started
+    print(f"сокет, группировка ({threads} потоков): {len(stream) / elapsed:.0f} слов/с")
+
+    if not http_url:
+        return
+    latencies = []
+    for word in stream[:min(len(stream), 2000)]:
+        started = time.perf_counter()
+        with urllib.request.urlopen(f"{http_url.rstrip('/')}/suggest/{urllib.parse.quote(word)}",
+                                    timeout=client.timeout) as response:
+            json.loads(response.read())
+        latencies.append(time.perf_counter() - started)
+    print(f"HTTP /suggest, по одному:     {_percentiles(latencies)}, "
+          f"{len(latencies) / sum(latencies):.0f} слов/с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Клиент сокетного сервера проверки (замер или проверка слов)')
+    parser.add_argument('words', nargs='*',
+                       help='Слова для проверки (без слов - замер)')
+    parser.add_argument('--unix', type=str,
+                       help='Путь Unix-сокета (по умолчанию - TCP)')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='Адрес TCP')
+    parser.add_argument('--port', type=int, default=5050,
+                       help='Порт TCP')
+    parser.add_argument('--connections', type=int, default=2,
+                       help='Соединений в пуле')
+    parser.add_argument('--requests', type=int, default=5000,
+                       help='Вызовов в замере')
+    parser.add_argument('--threads', type=int, default=8,
+                       help='Потоков в замере группировки')
+    parser.add_argument('--http', type=str,
+                       help='Адрес веб-интерфейса для сравнения (http://localhost:5000)')
+    args = parser.parse_args()
+
+    with SpellcheckClient(args.unix, args.host, args.port, args.connections) as client:
+        if args.words:
+            suggestions, partial = client.suggest_many(args.words)
+            for word in args.words:
+                print(f"{word}\t{'❌ ' + ', '.join(suggestions[word]) if word in suggestions else '✅'}")
+            if partial:
+                print("⚠️  Результат неполный (истек срок)")
+            return
+        benchmark(client, SAMPLE_WORDS, args.requests, args.threads, args.http)
+
+
+if __name__ == '__main__':
+    main()
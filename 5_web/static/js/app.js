@@ -1,52 +1,295 @@
 let currentErrors = [];
-let checkInProgress = false;
 let checkTimeout;
 let currentErrorElement = null;
 
+// Инкрементальная проверка: сервер хранит результаты абзацев по хешу,
+// текст отправляется только для абзацев, которых сервер еще не видел
+const sessionId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+let revision = 0;
+let sentHashes = new Set();
+let checkController = null;
+
+// Словарь в браузере: известные слова отмечаются без сервера,
+// на /suggest уходят только неизвестные (за исправлениями)
+let localDictionary = null;
+const suggestionCache = new Map();
+const GEORGIAN_TOKEN_RE = /[\u10A0-\u10FF\u1C90-\u1CBF]+(?:[\-\u2010\u2011][\u10A0-\u10FF\u1C90-\u1CBF]+)*/g;
+const FOLDABLE_RE = /[\u10A0-\u10CD\u1C90-\u1CBF\u2010\u2011]/;
+
+// FNV-1a (32 бита) с длиной абзаца в начале ключа
+function hashParagraph(text) {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193) >>> 0;
+    }
+    return text.length + ':' + hash.toString(16);
+}
+
+// აბზაცები: (ჰეში, წანაცვლება ტექსტში, ტექსტი)
+function splitParagraphs(text) {
+    const paragraphs = [];
+    let offset = 0;
+    text.split('\n').forEach(line => {
+        if (line.trim()) {
+            paragraphs.push({hash: hashParagraph(line), offset: offset, text: line});
+        }
+        offset += line.length + 1;
+    });
+    return paragraphs;
+}
+
+// Приведение заглавных форм к мхедрули, как normalize_georgian на сервере
+// (длина текста не меняется, позиции совпадают)
+function normalizeGeorgian(text) {
+    if (!FOLDABLE_RE.test(text)) {
+        return text;
+    }
+    let result = '';
+    for (let i = 0; i < text.length; i++) {
+        let code = text.charCodeAt(i);
+        if ((code >= 0x10A0 && code <= 0x10C5) || code === 0x10C7 || code === 0x10CD) {
+            code += 0x30;
+        } else if ((code >= 0x1C90 && code <= 0x1CBA) || (code >= 0x1CBD && code <= 0x1CBF)) {
+            code = code - 0x1C90 + 0x10D0;
+        } else if (code === 0x2010 || code === 0x2011) {
+            code = 0x2D;
+        }
+        result += String.fromCharCode(code);
+    }
+    return result;
+}
+
+// ლექსიკონის ჩატვირთვა (browser_dictionary.py); вне формата - проверка на сервере
+function loadDictionary(attempt = 0) {
+    return fetch('/dictionary')
+    .then(response => {
+        // Словарь строится в фоне после загрузки модели: повтор через Retry-After
+        if (response.status === 503 && attempt < 30) {
+            const delay = (parseInt(response.headers.get('Retry-After'), 10) || 2) * 1000;
+            setTimeout(() => loadDictionary(attempt + 1), delay);
+            return null;
+        }
+        return response.ok ? response.json() : null;
+    })
+    .then(info => {
+        if (!info) {
+            return;
+        }
+        return fetch(info.url)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('სერვერის შეცდომა: ' + response.status);
+            }
+            return response.arrayBuffer();
+        })
+        .then(buffer => {
+            localDictionary = parseDictionary(buffer, info.version);
+            suggestionCache.clear();
+        });
+    })
+    .catch(error => {
+        console.warn('ლექსიკონი ვერ ჩაიტვირთა, შემოწმება სერვერზე:', error);
+    });
+}
+
+function parseDictionary(buffer, version) {
+    const magic = String.fromCharCode.apply(null, new Uint8Array(buffer, 0, 8));
+    if (magic !== 'KADICT01') {
+        throw new Error('უცნობი ლექსიკონის ფორმატი');
+    }
+    const view = new DataView(buffer);
+    const nodes = view.getUint32(8, true);
+    const edges = view.getUint32(12, true);
+    let offset = 16;
+    const firstEdge = new Uint32Array(buffer, offset, nodes + 1);
+    offset += (nodes + 1) * 4;
+    const targets = new Uint32Array(buffer, offset, edges);
+    offset += edges * 4;
+    const labels = new Uint16Array(buffer, offset, edges);
+    offset += edges * 2;
+    const final = new Uint8Array(buffer, offset, nodes);
+    return {version, firstEdge, targets, labels, final};
+}
+
+function dictionaryContains(word) {
+    const {firstEdge, targets, labels, final} = localDictionary;
+    let node = 0;
+    for (let i = 0; i < word.length; i++) {
+        const code = word.charCodeAt(i);
+        let next = -1;
+        for (let edge = firstEdge[node]; edge < firstEdge[node + 1]; edge++) {
+            if (labels[edge] === code) {
+                next = targets[edge];
+                break;
+            }
+        }
+        if (next < 0) {
+            return false;
+        }
+        node = next;
+    }
+    return final[node] === 1;
+}
+
+// Как is_correct на сервере: слово через дефис правильное, если правильны все части
+function isKnownWord(word) {
+    if (dictionaryContains(word)) {
+        return true;
+    }
+    return word.indexOf('-') >= 0 && word.split('-').every(dictionaryContains);
+}
+
+// Неизвестные слова текста (тот же токенизатор, что iter_tokens на сервере)
+function findUnknownWords(text) {
+    const normalized = normalizeGeorgian(text);
+    const unknown = [];
+    GEORGIAN_TOKEN_RE.lastIndex = 0;
+    let match;
+    while ((match = GEORGIAN_TOKEN_RE.exec(normalized)) !== null) {
+        const word = match[0];
+        if (word.length > 1 && !isKnownWord(word)) {
+            const start = match.index;
+            unknown.push({normalized: word, word: text.slice(start, start + word.length),
+                          start_pos: start, end_pos: start + word.length});
+        }
+    }
+    return unknown;
+}
+
+function checkTextLocally(text, controller) {
+    const unknown = findUnknownWords(text);
+    const missing = Array.from(new Set(unknown.map(token => token.normalized)))
+        .filter(word => !suggestionCache.has(word));
+    
+    let ready = Promise.resolve();
+    if (missing.length > 0) {
+        ready = fetch('/suggest', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                words: missing
+            }),
+            signal: controller.signal
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('სერვერის შეცდომა: ' + response.status);
+            }
+            return response.json();
+        })
+        .then(data => {
+            Object.entries(data.suggestions || {}).forEach(([word, suggestions]) => {
+                // Пустой список из-за крайнего срока не запоминается: спросим еще раз
+                if (suggestions.length > 0 || !data.partial) {
+                    suggestionCache.set(word, suggestions);
+                }
+            });
+            (data.correct || []).forEach(word => suggestionCache.set(word, null));
+            // Модель на сервере сменилась: словарь браузера устарел
+            if (data.model_version && data.model_version !== localDictionary.version) {
+                loadDictionary();
+            }
+        });
+    }
+    
+    return ready.then(() => unknown
+        .filter(token => suggestionCache.get(token.normalized) !== null)
+        .map(token => ({
+            word: token.word,
+            suggestions: suggestionCache.get(token.normalized) || [],
+            start_pos: token.start_pos,
+            end_pos: token.end_pos
+        })));
+}
+
 function checkText() {
-    if (checkInProgress) {
+    const text = document.getElementById('editableText').innerText;
+    if (!text.trim()) {
         return;
     }
     
-    const text = document.getElementById('editableText').textContent.trim();
-    if (!text) {
-        return;
+    // Более новая правка отменяет незавершенный запрос
+    if (checkController) {
+        checkController.abort();
     }
+    checkController = new AbortController();
+    const controller = checkController;
+    revision += 1;
     
-    checkInProgress = true;
     showLoading();
+    const check = localDictionary
+        ? checkTextLocally(text, controller)
+        : sendParagraphs(splitParagraphs(text), revision, controller, true).then(data => data && (data.errors || []));
+    check
+    .then(errors => {
+        if (!errors) {
+            return;
+        }
+        currentErrors = errors;
+        highlightErrors(currentErrors);
+    })
+    .catch(error => {
+        if (error.name !== 'AbortError') {
+            console.error('შეცდომა ტექსტის შემოწმებისას:', error);
+        }
+    })
+    .finally(() => {
+        if (checkController === controller) {
+            checkController = null;
+            hideLoading();
+        }
+    });
+}
+
+function sendParagraphs(paragraphs, requestRevision, controller, retryMissing) {
+    const body = paragraphs.map(paragraph => sentHashes.has(paragraph.hash)
+        ? {hash: paragraph.hash, offset: paragraph.offset}
+        : paragraph);
     
-    fetch('/check', {
+    return fetch('/check/paragraphs', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-            text: text
-        })
+            session: sessionId,
+            revision: requestRevision,
+            paragraphs: body
+        }),
+        signal: controller.signal
     })
     .then(response => {
+        // 409: запрос обогнала более новая правка
+        if (response.status === 409) {
+            return null;
+        }
         if (!response.ok) {
             throw new Error('სერვერის შეცდომა: ' + response.status);
         }
         return response.json();
     })
     .then(data => {
-        hideLoading();
-        checkInProgress = false;
-        
+        if (!data) {
+            return null;
+        }
         if (data.error) {
             console.error('შეცდომა:', data.error);
-            return;
+            return null;
         }
+        paragraphs.forEach(paragraph => sentHashes.add(paragraph.hash));
         
-        currentErrors = data.errors || [];
-        highlightErrors(currentErrors);
-    })
-    .catch(error => {
-        hideLoading();
-        checkInProgress = false;
-        console.error('შეცდომა ტექსტის შემოწმებისას:', error);
+        // Сервер не нашел абзацы в кеше (вытеснены, другой процесс): повтор с текстом
+        const missing = new Set(data.missing || []);
+        if (missing.size > 0) {
+            missing.forEach(hash => sentHashes.delete(hash));
+            if (retryMissing) {
+                return sendParagraphs(paragraphs, requestRevision, controller, false);
+            }
+        }
+        return data;
     });
 }
 
@@ -199,6 +442,9 @@ function scheduleCheck() {
 document.addEventListener('DOMContentLoaded', function() {
     const editableText = document.getElementById('editableText');
     
+    // Словарь кешируется браузером по адресу с версией модели
+    loadDictionary();
+    
     editableText.addEventListener('input', function() {
         // Автоматически меняем размер поля
         autoResizeTextarea();
@@ -0,0 +1,170 @@
+# suggestion_pool.py
+"""
+Пул процессов для поиска исправлений
+Поиск кандидатов - чистый Python: в потоке Flask длинный текст с множеством
+неизвестных слов держит GIL секундами и останавливает все остальные запросы.
+Здесь поиск выполняется в ограниченном пуле процессов:
+- процессы запускаются через forkserver (без него - spawn), а не fork:
+  пул создается из веб-процесса, где уже работают потоки (загрузка модели,
+  задания, запросы), и fork такого процесса может оставить в дочернем
+  захваченные чужими потоками блокировки. Процесс получает через pickle
+  только словарь и частоты (candidate_search.CandidateSearch); сервер
+  forkserver загружает заранее только модули поиска
+- если процесс не ответил к крайнему сроку, результат помечается как
+  просроченный (expired), а не выглядит как "исправлений нет"
+- у каждого запроса есть крайний срок: процесс прерывает поиск по сроку
+  и возвращает то, что успел найти
+- контроль допуска: не больше workers + queue_size задач одновременно,
+  сверх этого запрос ждет свободное место не дольше admission_wait и
+  получает отказ (PoolSaturated)
+"""
+
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
+
+from metrics import PhaseTimer
+
+# Ожидание ответа процесса после крайнего срока (он прерывает текущее слово)
+DEADLINE_GRACE = 0.05
+# Модули, которые сервер forkserver импортирует один раз для всех процессов
+FORKSERVER_PRELOAD = ['candidate_search', 'suggestion_pool']
+# Прогрев пула: пауза ответа на ping и предел ожидания запуска всех процессов
+PING_PAUSE = 0.01
+WARMUP_TIMEOUT = 120.0
+
+_worker_checker = None
+
+
+class PoolSaturated(Exception):
+    """Все места в пуле и очереди заняты"""
+
+
+def _init_worker(checker) -> None:
+    global _worker_checker
+    _worker_checker = checker
+
+
+def _ping() -> int:
+    # Пауза дает ping остальным процессам: быстрый не забирает все задачи
+    time.sleep(PING_PAUSE)
+    return os.getpid()
+
+
+def search_until(checker, words: List[str], deadline: Optional[float] = None, timer=None):
+    """Поиск кандидатов слов по очереди до крайнего срока
+    Возвращает (полные результаты, результаты слов, прерванных сроком)"""
+    found, interrupted = {}, {}
+    for word in words:
+        if deadline is not None and time.time() >= deadline:
+            break
+        candidates = checker.generate_candidates_fast(word, timer=timer, deadline=deadline)
+        if deadline is not None and time.time() >= deadline:
+            interrupted[word] = candidates
+        else:
+            found[word] = candidates
+    return found, interrupted
+
+
+def _suggest_words(words: List[str], deadline: float, timed: bool):
+    """Поиск в процессе пула до крайнего срока: (полные, прерванные, замеры или None)"""
+    timer = PhaseTimer() if timed else None
+    found, interrupted = search_until(_worker_checker, words, deadline, timer)
+    return found, interrupted, (dict(timer.phases), timer.candidates_examined) if timer else None
+
+
+def pool_context():
+    """Контекст запуска процессов без fork текущего (многопоточного) процесса"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def in_pool_process() -> bool:
+    """Идет ли импорт или работа внутри процесса пула
+    Процесс spawn/forkserver импортирует главный модуль родителя заново
+    (как __mp_main__): модуль с побочными действиями при импорте (загрузка
+    модели) проверяет это и пропускает их"""
+    return multiprocessing.current_process().name != 'MainProcess'
+
+
+class SuggestionPool:
+    """Ограниченный пул процессов с загруженной моделью"""
+
+    def __init__(self, checker, workers: int, queue_size: int, admission_wait: float = 0.0):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.admission_wait = admission_wait
+        self.pid = os.getpid()
+        # Модель, для которой создан пул (задает владелец)
+        self.owner = None
+        self.submitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(),
+                                            initializer=_init_worker, initargs=(checker,))
+        # Все процессы запускаются и получают модель сразу, а не на первых запросах.
+        # Процесс отвечает на ping только после initializer, но готовый процесс
+        # может ответить и за еще не готовые: ping повторяется, пока не ответят все
+        self.pids = set()
+        deadline = time.time() + WARMUP_TIMEOUT
+        while len(self.pids) < workers and time.time() < deadline:
+            futures = [self.executor.submit(_ping) for _ in range(workers)]
+            self.pids.update(future.result() for future in futures)
+
+    def suggest(self, words: List[str], deadline: float,
+                timer: Optional[PhaseTimer] = None) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], bool]:
+        """Исправления слов до крайнего срока: (полные, прерванные сроком, просрочен);
+        слов, до которых поиск не дошел, нет ни в одном словаре; просрочен -
+        процесс не ответил вовремя, и результатов нет совсем"""
+        wait = min(self.admission_wait, max(deadline - time.time(), 0.0))
+        acquired = self._slots.acquire(timeout=wait) if wait > 0 else self._slots.acquire(blocking=False)
+        if not acquired:
+            self.rejected += 1
+            raise PoolSaturated()
+
+        try:
+            future = self.executor.submit(_suggest_words, words, deadline, timer is not None)
+        except Exception:
+            self._slots.release()
+            raise
+        self.submitted += 1
+        # Место освобождается, когда процесс закончит, даже если запрос уже ответил
+        future.add_done_callback(lambda _: self._slots.release())
+
+        started = time.perf_counter()
+        try:
+            found, interrupted, timings = future.result(timeout=max(deadline - time.time(), 0.0) + DEADLINE_GRACE)
+        except FutureTimeout:
+            self.expired += 1
+            if timer:
+                timer.add('candidates', time.perf_counter() - started)
+            return {}, {}, True
+        if timer:
+            phases, examined = timings
+            for phase, seconds in phases.items():
+                timer.add(phase, seconds)
+            for count in examined:
+                timer.examined(count)
+        if interrupted:
+            self.expired += 1
+        return found, interrupted, False
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'expired': self.expired,
+        }
+
+    def shutdown(self, cancel_pending: bool = True) -> None:
+        """Остановка пула; cancel_pending=False - принятые задачи дорабатываются"""
+        self.executor.shutdown(wait=False, cancel_futures=cancel_pending)
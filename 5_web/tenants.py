@@ -0,0 +1,419 @@
+# tenants.py
+"""
+Словари команд поверх общей модели
+Каждой команде нужны свои названия продуктов и термины. Отдельная модель
+на команду умножает память и время сборки, поэтому здесь у команды только
+небольшой слой (overlay): ее слова с частотами и, для больших слоев,
+индекс кандидатов. Запрос команды проверяется общей моделью (только
+чтение, одна на процесс) вместе со слоем:
+- слово правильное, если оно есть в слое или в модели
+- исправления из слоя (расстояние до MAX_DISTANCE) идут первыми, затем
+  исправления модели; кеш исправлений модели общий и слоя не содержит
+
+Слой неизменяемый: правка создает новый слой (копия слов команды с
+изменениями) и атомарно заменяет прежний, запросы, начатые на прежнем,
+дорабатывают на нем. Модель при этом не перезагружается.
+
+Слои хранятся в SQLite (как задания, jobs.py): правку через API любого
+процесса сервера остальные видят не позже чем через refresh секунд.
+Править слой может администратор или владелец токена команды: токен
+выдается при создании команды, в базе хранится только его хеш.
+Индекс кандидатов - словарь удалений одной буквы (как в SymSpell): слово
+и все его варианты без одной буквы указывают на слово. Ключи - хеши
+вариантов, а не сами строки (вдвое меньше памяти); совпадение хеша
+проверяется расстоянием. Маленькому слою индекс не нужен, кандидаты
+ищутся перебором. DAWG (dawg.py) здесь не подходит: в глоссарии мало
+общих префиксов, и нечеткий обход почти не отсекает ветки.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import pickle
+import sqlite3
+import hmac
+import secrets
+import hashlib
+import argparse
+import threading
+import tracemalloc
+from bisect import bisect_left
+from heapq import nlargest
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "2_basis"))
+from georgian_tokenizer import normalize_georgian
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenants (
+    name TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    use_index INTEGER,
+    words TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tenant_tokens (
+    name TEXT PRIMARY KEY,
+    token_hash TEXT NOT NULL
+);
+"""
+
+# Исправления слоя: не дальше этого расстояния (как поиск модели по умолчанию)
+MAX_DISTANCE = 1
+# Слой от стольких слов получает индекс кандидатов (если не задано явно)
+INDEX_MIN_WORDS = 32
+NAME_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.')
+
+
+class OverlayTooLarge(ValueError):
+    """Слов в слое больше допустимого"""
+
+
+def valid_name(name: str) -> bool:
+    return 0 < len(name) <= 64 and set(name) <= NAME_CHARS
+
+
+def _index_keys(word: str) -> set:
+    """Хеши слова и его вариантов без одной буквы"""
+    keys = {hash(word[:i] + word[i + 1:]) for i in range(len(word))}
+    keys.add(hash(word))
+    return keys
+
+
+def _distance(s1: str, s2: str, limit: int) -> int:
+    """Расстояние Левенштейна; больше limit - любое значение больше limit"""
+    if abs(len(s1) - len(s2)) > limit:
+        return limit + 1
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current = [i + 1]
+        for j, c2 in enumerate(s2):
+            current.append(min(previous[j + 1] + 1, current[j] + 1, previous[j] + (c1 != c2)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def normalize_words(words: Union[Dict[str, int], Iterable[str]]) -> Dict[str, int]:
+    """Слова запроса (список или слово -> частота) в нормальной форме; частота не меньше 1"""
+    items = words.items() if isinstance(words, dict) else ((word, 1) for word in words)
+    result = {}
+    for word, freq in items:
+        if not isinstance(word, str):
+            raise ValueError("Слово должно быть строкой")
+        word = normalize_georgian(word.strip())
+        if not word or any(char.isspace() for char in word):
+            continue
+        try:
+            result[word] = max(int(freq), 1)
+        except OverflowError:
+            # JSON 1e999 и Infinity - бесконечность, а не частота
+            raise ValueError(f"Недопустимая частота: {freq}") from None
+    return result
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class TenantOverlay:
+    """Неизменяемый слой команды: слова с частотами и необязательный индекс кандидатов"""
+
+    __slots__ = ('name', 'word_freq', 'use_index', 'index', 'sorted_words', 'version')
+
+    def __init__(self, name: str, word_freq: Dict[str, int], use_index: Optional[bool] = None,
+                 version: Optional[str] = None):
+        self.name = name
+        self.word_freq = word_freq
+        # None - индекс по размеру слоя
+        self.use_index = use_index
+        self.index = None
+        if use_index or (use_index is None and len(word_freq) >= INDEX_MIN_WORDS):
+            # Значение - слово или кортеж слов (у большинства ключей слово одно)
+            index = {}
+            for word in word_freq:
+                for key in _index_keys(word):
+                    current = index.get(key)
+                    if current is None:
+                        index[key] = word
+                    elif isinstance(current, str):
+                        index[key] = (current, word)
+                    else:
+                        index[key] = current + (word,)
+            self.index = index
+        self.sorted_words = sorted(word_freq)
+        self.version = version or self.content_version(word_freq)
+
+    @staticmethod
+    def content_version(word_freq: Dict[str, int]) -> str:
+        digest = hashlib.sha256()
+        for word in sorted(word_freq):
+            digest.update(f"{word}\t{word_freq[word]}\n".encode('utf-8'))
+        return digest.hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.word_freq)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.word_freq
+
+    def updated(self, add: Optional[Dict[str, int]] = None, remove: Iterable[str] = ()) -> 'TenantOverlay':
+        """Новый слой с изменениями (копирование при записи); этот не меняется"""
+        word_freq = dict(self.word_freq)
+        for word in remove:
+            word_freq.pop(word, None)
+        word_freq.update(add or {})
+        return TenantOverlay(self.name, word_freq, self.use_index)
+
+    def candidates(self, word: str) -> List[str]:
+        """Слова слоя не дальше MAX_DISTANCE: ближние и частые первыми"""
+        if self.index is not None:
+            pool = set()
+            for key in _index_keys(word):
+                value = self.index.get(key)
+                if value is None:
+                    continue
+                if isinstance(value, str):
+                    pool.add(value)
+                else:
+                    pool.update(value)
+        else:
+            pool = self.word_freq
+        found = []
+        for candidate in pool:
+            distance = _distance(word, candidate, MAX_DISTANCE)
+            if distance <= MAX_DISTANCE:
+                found.append((distance, -self.word_freq[candidate], candidate))
+        return [candidate for _, _, candidate in sorted(found)]
+
+    def merge(self, word: str, suggestions: List[str], limit: int = 5) -> List[str]:
+        """Исправления слоя перед исправлениями модели, без повторов"""
+        own = self.candidates(word)
+        if not own:
+            return suggestions
+        seen = set(own)
+        return (own + [candidate for candidate in suggestions if candidate not in seen])[:limit]
+
+    def complete(self, prefix: str, k: int) -> List[str]:
+        """Самые частые слова слоя с префиксом"""
+        words = self.sorted_words
+        lo = bisect_left(words, prefix)
+        hi = bisect_left(words, prefix + '\uffff', lo)
+        return nlargest(k, words[lo:hi], key=self.word_freq.__getitem__)
+
+    def memory_bytes(self) -> int:
+        """Оценка памяти слоя: словарь частот, строки, отсортированный список и индекс
+        Строки слов общие для словаря и списка и считаются один раз"""
+        total = sys.getsizeof(self.word_freq) + sys.getsizeof(self.sorted_words)
+        total += sum(sys.getsizeof(word) + sys.getsizeof(freq) for word, freq in self.word_freq.items())
+        if self.index is not None:
+            total += sys.getsizeof(self.index)
+            total += sum(sys.getsizeof(key) + (0 if isinstance(value, str) else sys.getsizeof(value))
+                         for key, value in self.index.items())
+        return total
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'words': len(self.word_freq),
+            'index': self.index is not None,
+            'memory_bytes': self.memory_bytes(),
+        }
+
+
+class TenantRegistry:
+    """Слои команд в SQLite и их копии в памяти процесса"""
+
+    def __init__(self, path: str, max_words: int = 100000, refresh: float = 1.0, timeout: float = 5.0):
+        self.path = str(path)
+        self.max_words = max_words
+        self.refresh = refresh
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._local = threading.local()
+        # Имя -> (слой, когда версия сверялась с базой)
+        self._overlays: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Отдельное соединение на поток (sqlite3 не делит соединения между потоками)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _load(self, row) -> TenantOverlay:
+        name, version, use_index, words = row
+        return TenantOverlay(name, json.loads(words), None if use_index is None else bool(use_index), version)
+
+    def get(self, name: str) -> Optional[TenantOverlay]:
+        """Текущий слой команды (None - команды нет)
+        Версия сверяется с базой не чаще раза в refresh секунд"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._overlays.get(name)
+        if cached is not None and now - cached[1] < self.refresh:
+            return cached[0]
+        row = self._connection().execute("SELECT version FROM tenants WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            with self._lock:
+                self._overlays.pop(name, None)
+            return None
+        if cached is not None and cached[0].version == row[0]:
+            overlay = cached[0]
+        else:
+            row = self._connection().execute(
+                "SELECT name, version, use_index, words FROM tenants WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            overlay = self._load(row)
+        with self._lock:
+            self._overlays[name] = (overlay, now)
+        return overlay
+
+    def _save(self, connection: sqlite3.Connection, overlay: TenantOverlay) -> None:
+        if len(overlay) > self.max_words:
+            raise OverlayTooLarge(f"Слов в слое {len(overlay)}, допустимо {self.max_words}")
+        connection.execute(
+            "INSERT OR REPLACE INTO tenants (name, version, use_index, words, updated) VALUES (?, ?, ?, ?, ?)",
+            (overlay.name, overlay.version, None if overlay.use_index is None else int(overlay.use_index),
+             json.dumps(overlay.word_freq, ensure_ascii=False), time.time()))
+        with self._lock:
+            self._overlays[overlay.name] = (overlay, time.monotonic())
+
+    def put(self, name: str, word_freq: Dict[str, int], use_index: Optional[bool] = None) -> TenantOverlay:
+        """Замена слоя команды целиком"""
+        overlay = TenantOverlay(name, word_freq, use_index)
+        with self._connection() as connection:
+            self._save(connection, overlay)
+        return overlay
+
+    def update(self, name: str, add: Optional[Dict[str, int]] = None, remove: Iterable[str] = (),
+               use_index: Optional[bool] = None) -> TenantOverlay:
+        """Добавление и удаление слов (команда создается, если ее нет)
+        Чтение и запись в одной транзакции: правки разных процессов не теряются"""
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT name, version, use_index, words FROM tenants WHERE name = ?", (name,)).fetchone()
+            current = self._load(row) if row is not None else TenantOverlay(name, {}, use_index)
+            if use_index is not None and use_index != current.use_index:
+                current = TenantOverlay(name, current.word_freq, use_index)
+            overlay = current.updated(add, remove)
+            self._save(connection, overlay)
+        return overlay
+
+    def issue_token(self, name: str) -> str:
+        """Новый токен команды (прежний перестает действовать); возвращается один раз"""
+        token = secrets.token_urlsafe(32)
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO tenant_tokens (name, token_hash) VALUES (?, ?)",
+                               (name, _token_hash(token)))
+        return token
+
+    def has_token(self, name: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM tenant_tokens WHERE name = ?", (name,)).fetchone() is not None
+
+    def check_token(self, name: str, token: str) -> bool:
+        """Токен дает право править слой команды name"""
+        row = self._connection().execute(
+            "SELECT token_hash FROM tenant_tokens WHERE name = ?", (name,)).fetchone()
+        return row is not None and bool(token) and hmac.compare_digest(row[0], _token_hash(token))
+
+    def delete(self, name: str) -> bool:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM tenant_tokens WHERE name = ?", (name,))
+            deleted = connection.execute("DELETE FROM tenants WHERE name = ?", (name,)).rowcount
+        with self._lock:
+            self._overlays.pop(name, None)
+        return bool(deleted)
+
+    def names(self) -> List[str]:
+        return [row[0] for row in self._connection().execute("SELECT name FROM tenants ORDER BY name")]
+
+    def stats(self) -> List[dict]:
+        """Сведения и память слоев всех команд"""
+        return [overlay.stats() for overlay in map(self.get, self.names()) if overlay is not None]
+
+
+def _random_terms(rng: random.Random, count: int) -> Dict[str, int]:
+    """Синтетический глоссарий: названия продуктов и термины"""
+    letters = 'აბგდევზთიკლმნოპჟრსტუფქღყშჩცძწჭხჯჰ'
+    return {''.join(rng.choice(letters) for _ in range(rng.randint(4, 12))): rng.randint(1, 100)
+            for _ in range(count)}
+
+
+def measure(model_path: str, tenants: int, words: int, seed: int = 42) -> None:
+    """Память отдельной модели на команду против слоя на команду и цена проверки со слоем"""
+    rng = random.Random(seed)
+
+    tracemalloc.start()
+    with open(model_path, 'rb') as f:
+        model_data = pickle.load(f)
+    vocabulary = set(model_data.get('vocabulary') or model_data.get('word_freq', {}))
+    word_freq = dict(model_data.get('word_freq') or {})
+    del model_data
+    model_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"Модель {Path(model_path).name}: {len(vocabulary)} слов, {model_bytes / 1e6:.1f} MB "
+          f"(словарь и частоты) - столько стоит каждая команда с отдельной моделью")
+
+    print(f"\nКоманд: {tenants}, слов в глоссарии: {words}")
+    print(f"{'индекс':<8} {'память на команду':>18} {'оценка memory_bytes':>20} {'от модели':>10}")
+    for use_index in (False, True):
+        # Глоссарии те же в обоих проходах; их память - часть слоя
+        terms_rng = random.Random(seed)
+        tracemalloc.start()
+        overlays = [TenantOverlay(f"team{i}", _random_terms(terms_rng, words), use_index) for i in range(tenants)]
+        traced = tracemalloc.get_traced_memory()[0] / tenants
+        tracemalloc.stop()
+        estimated = sum(overlay.memory_bytes() for overlay in overlays) / tenants
+        print(f"{'да' if use_index else 'нет':<8} {traced / 1e3:>15.1f} KB {estimated / 1e3:>17.1f} KB "
+              f"{traced / model_bytes:>10.2%}")
+
+        # Цена запроса: проверка слова и исправления слоя (опечатки терминов)
+        overlay = overlays[0]
+        terms = list(overlay.word_freq)
+        typos = [term[:-1] + rng.choice('აბგდ') for term in rng.sample(terms, min(500, len(terms)))]
+        sample = rng.sample(list(vocabulary), min(2000, len(vocabulary)))
+        started = time.perf_counter()
+        for word in sample:
+            _ = word in overlay or word in vocabulary
+        check_us = (time.perf_counter() - started) / len(sample) * 1e6
+        started = time.perf_counter()
+        found = sum(1 for typo in typos if overlay.candidates(typo))
+        candidates_us = (time.perf_counter() - started) / len(typos) * 1e6
+        print(f"         проверка слова {check_us:.2f} мкс, исправления слоя {candidates_us:.1f} мкс "
+              f"(найдены для {found}/{len(typos)} опечаток)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Словари команд: цена памяти и запроса')
+    parser.add_argument('--model', default=str(Path(__file__).parent.parent / "2_basis" / "georgian_spellchecker.pkl"),
+                       help='Общая модель для сравнения')
+    parser.add_argument('--tenants', type=int, default=20,
+                       help='Сколько команд')
+    parser.add_argument('--words', type=int, default=2000,
+                       help='Слов в глоссарии команды')
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"Модель не найдена: {args.model}")
+        return
+    measure(args.model, args.tenants, args.words)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,141 +1,285 @@
 # web_interface.py
 import os
 import sys
+import gzip
+import hmac
+import json
 import pickle
+import sqlite3
 import re
+import time
+import threading
+from time import perf_counter
 from pathlib import Path
 from collections import Counter, defaultdict
-from flask import Flask, request, jsonify, render_template
 
-# Настройка путей
-current_dir = Path(__file__).parent
-project_root = current_dir.parent
+IMPORT_STARTED = perf_counter()
 
-# Правильные пути к моделям согласно структуре проекта
-possible_paths = [
-    current_dir,
-    project_root / "2_basis",
-    project_root / "4_advanced", 
-    project_root,
-    Path("."),
-    Path(".."),
-    Path("../2_basis"),
-    Path("../4_advanced"),
-    Path("../../2_basis"),  # Добавлены дополнительные пути
-    Path("../../4_advanced")
-]
+from flask import Flask, Response, request, jsonify, render_template
+
+# Настройка путей: модули веб-интерфейса и базовые модули (токенизатор, DAWG, кеши)
+current_dir = Path(__file__).parent.resolve()
+project_root = current_dir.parent
 
-for path in possible_paths:
-    if path.exists():
+for path in (project_root / "2_basis", current_dir):
+    if str(path) not in sys.path:
         sys.path.insert(0, str(path))
-        print(f"✅ Добавлен путь: {path}")
+
+from georgian_tokenizer import iter_tokens, tokenize_georgian, normalize_georgian
+from hunspell_dictionary import HunspellDictionary
+from dawg import Dawg
+from frequency_table import FrequencyTable
+from suggestion_table import SuggestionTable
+from completion import CompletionIndex
+from browser_dictionary import export_vocabulary
+from suggestion_cache import SuggestionCache, model_hash, vocabulary_hash
+from metrics import registry, start_timer
+from candidate_search import CandidateSearch
+from suggestion_pool import SuggestionPool, PoolSaturated, search_until, in_pool_process
+from jobs import JobManager
+from incremental import ParagraphSessions, shift_errors
+from tenants import TenantRegistry, OverlayTooLarge, normalize_words, valid_name
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 app.config['SECRET_KEY'] = 'georgian-spellchecker-secret-key'
 
 # Глобальные переменные для модели
+# Запрос берет пару (спеллчекер, сведения) из active_model один раз в начале
+# и работает с этой версией модели до конца, даже если модель заменили
 checker = None
 model_info = {}
+active_model = (None, {})
+# Прежняя модель для мгновенного отката (/rollback)
+previous_model = None
+_swap_lock = threading.Lock()
+# Устанавливается при первой активации модели (то же, что 200 от /ready)
+model_ready = threading.Event()
+
+# Журнал неизвестных слов для suggestion_table.py --requests (пусто - не писать)
+REQUEST_LOG = os.environ.get('SPELLCHECK_REQUEST_LOG', '')
+# Общий для процессов и перезапусков кеш исправлений (пусто - не использовать)
+SUGGESTION_CACHE = os.environ.get('SPELLCHECK_SUGGESTION_CACHE', str(current_dir / "suggestion_cache.sqlite"))
+# Пул процессов для поиска исправлений (0 - поиск в потоке запроса)
+POOL_WORKERS = int(os.environ.get('SPELLCHECK_POOL_WORKERS', min(4, os.cpu_count() or 1)))
+# Задач сверх числа процессов, которые ждут в очереди пула
+POOL_QUEUE = int(os.environ.get('SPELLCHECK_POOL_QUEUE', POOL_WORKERS * 2))
+# Сколько запрос ждет места в заполненной очереди перед отказом 503
+ADMISSION_WAIT_MS = int(os.environ.get('SPELLCHECK_ADMISSION_WAIT_MS', '100'))
+# Крайний срок запроса: после него ответ содержит найденное и "partial": true
+DEADLINE_MS = int(os.environ.get('SPELLCHECK_DEADLINE_MS', '2000'))
+# Задания для больших документов: база результатов, потоков-исполнителей,
+# срок поиска исправлений одного абзаца
+JOBS_DB = os.environ.get('SPELLCHECK_JOBS_DB', str(current_dir / "jobs.sqlite"))
+JOB_WORKERS = int(os.environ.get('SPELLCHECK_JOB_WORKERS', '2'))
+JOB_PARAGRAPH_DEADLINE_MS = int(os.environ.get('SPELLCHECK_JOB_PARAGRAPH_DEADLINE_MS', '30000'))
+
+# Файл модели (пусто - первый существующий из MODEL_CANDIDATES)
+MODEL_PATH = os.environ.get('SPELLCHECK_MODEL', '')
+# 1 - сервер отвечает сразу, а модель загружается в фоне (готовность - /ready);
+# 0 - модель загружается при импорте (gunicorn --preload, скрипты замеров)
+LAZY_LOAD = os.environ.get('SPELLCHECK_LAZY_LOAD', '1') != '0'
+# Сколько слов можно отправить на /suggest одним запросом
+MAX_SUGGEST_WORDS = int(os.environ.get('SPELLCHECK_MAX_SUGGEST_WORDS', '100'))
+# Слов в каждом узле индекса автодополнения (0 - без /complete)
+COMPLETION_K = int(os.environ.get('SPELLCHECK_COMPLETION_K', '10'))
+# Словари команд поверх общей модели: база слоев и предел слов в слое
+TENANTS_DB = os.environ.get('SPELLCHECK_TENANTS_DB', str(current_dir / "tenants.sqlite"))
+MAX_TENANT_WORDS = int(os.environ.get('SPELLCHECK_MAX_TENANT_WORDS', '100000'))
+# Токен администратора словарей команд: создание и правка любых словарей
+# (пусто - словари правят только владельцы токенов команд, новые не создаются)
+ADMIN_TOKEN = os.environ.get('SPELLCHECK_ADMIN_TOKEN', '')
+
+# Результаты абзацев живого редактора (/check/paragraphs)
+paragraph_sessions = ParagraphSessions()
 
 # Базовые классы для работы
-class OptimizedSpellChecker:
+class OptimizedSpellChecker(CandidateSearch):
+    
     def __init__(self):
-        self.vocabulary = set()
-        self.word_freq = Counter()
-        self._cached_distances = {}
+        super().__init__(set(), Counter())
+        self.suggestion_table = None
+        self.suggestion_cache = None
+        self.completion = None
+        # Данные для индекса автодополнения (словарь, точные частоты, биграммы),
+        # пока он не построен; None - строить нечего
+        self.completion_source = None
+        # Словарь для браузера (данные, gzip)
+        self.browser_dictionary = None
+        # Оба индекса строятся в фоне после активации модели
+        self.index_thread = None
+        # Пул процессов поиска исправлений этой модели (False - не удалось создать)
+        # и поток его прогрева в процессе после fork
+        self.pool = None
+        self.pool_thread = None
         
     def tokenize_georgian(self, text: str):
-        """Быстрая токенизация грузинского текста"""
-        words = re.findall(r'[\u10A0-\u10FF]{2,}', text)
-        return words
+        """Быстрая токенизация грузинского текста (общий токенизатор georgian_tokenizer)"""
+        return tokenize_georgian(text)
     
-    def is_correct(self, word: str):
-        return word in self.vocabulary
+    def lookup_suggestions(self, word: str, timer=None):
+        """Готовые исправления без поиска (None - слово нужно искать)"""
+        # Частые опечатки отвечаются из таблицы, поставляемой с моделью
+        if self.suggestion_table is not None:
+            suggestions = self.suggestion_table.get(word)
+            if timer:
+                timer.cache_result('table', suggestions is not None)
+            if suggestions is not None:
+                return suggestions
+        # Затем постоянный кеш, общий для всех рабочих процессов
+        if self.suggestion_cache is not None:
+            candidates = self.suggestion_cache.get(word)
+            if timer:
+                timer.cache_result('disk', candidates is not None)
+            return candidates
+        return None
     
-    def optimized_levenshtein(self, s1: str, s2: str):
-        """Оптимизированное расстояние Левенштейна с кэшированием"""
-        cache_key = (s1, s2)
-        if cache_key in self._cached_distances:
-            return self._cached_distances[cache_key]
-            
-        if s1 == s2:
-            self._cached_distances[cache_key] = 0
-            return 0
-            
-        len1, len2 = len(s1), len(s2)
-        if abs(len1 - len2) > 2:
-            self._cached_distances[cache_key] = 3
-            return 3
-            
-        if len1 < len2:
-            return self.optimized_levenshtein(s2, s1)
-            
-        if len2 == 0:
-            return len1
-            
-        previous_row = list(range(len2 + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-            
-        result = previous_row[-1]
-        self._cached_distances[cache_key] = result
-        return result
-    
-    def generate_candidates_fast(self, word: str, max_distance: int = 1):
-        """Быстрая генерация кандидатов с оптимизациями"""
-        if self.is_correct(word):
-            return [word]
-        
-        candidates = []
-        word_len = len(word)
-        
-        for candidate in self.vocabulary:
-            if abs(len(candidate) - word_len) > 2:
-                continue
-                
-            if word_len > 2 and candidate[:2] != word[:2]:
-                continue
-                
-            distance = self.optimized_levenshtein(word, candidate)
-            if distance <= max_distance:
-                candidates.append((candidate, distance))
-                
-                if len(candidates) >= 20:
-                    break
-        
-        candidates.sort(key=lambda x: (x[1], -self.word_freq.get(x[0], 0)))
-        return [candidate for candidate, distance in candidates[:5]]
+    def find_suggestions(self, words, deadline=None, pool=None, timer=None):
+        """Поиск исправлений до крайнего срока (time.time()) в пуле или в этом потоке
+        Возвращает (слово -> исправления, неполный ли результат)"""
+        expired = False
+        if pool is not None:
+            found, interrupted, expired = pool.suggest(words, deadline or time.time() + DEADLINE_MS / 1000, timer)
+        else:
+            found, interrupted = search_until(self, words, deadline, timer)
+        # В кеш попадают только слова, поиск которых не прерывался
+        if self.suggestion_cache is not None:
+            for word, candidates in found.items():
+                self.suggestion_cache.put(word, candidates)
+        found.update(interrupted)
+        # Пул не ответил к сроку: пустой результат - не "исправлений нет"
+        return found, expired or len(found) < len(words) or bool(interrupted)
     
-    def suggest_corrections(self, word: str, max_suggestions: int = 3):
-        candidates = self.generate_candidates_fast(word)
+    def suggest_corrections(self, word: str, max_suggestions: int = 3, timer=None):
+        candidates = self.lookup_suggestions(word, timer)
+        if candidates is None:
+            found, _ = self.find_suggestions([word], timer=timer)
+            candidates = found[word]
         return candidates[:max_suggestions]
     
-    def check_text_fast(self, text: str, max_errors: int = 50):
-        """Быстрая проверка текста с ограничением количества ошибок"""
-        words = self.tokenize_georgian(text)
+    def suggest_within(self, word: str, deadline: float, pool=None, max_suggestions: int = 3, timer=None):
+        """Исправления слова до крайнего срока: (исправления, неполный ли результат)"""
+        candidates = self.lookup_suggestions(word, timer)
+        if candidates is not None:
+            return candidates[:max_suggestions], False
+        found, partial = self.find_suggestions([word], deadline, pool, timer)
+        return found.get(word, [])[:max_suggestions], partial
+    
+    def suggest_many(self, words, deadline: float, pool=None, max_suggestions: int = 3, timer=None):
+        """Исправления нескольких слов до крайнего срока: (слово -> исправления, неполный ли результат)"""
+        suggestions, pending = {}, []
+        for word in words:
+            candidates = self.lookup_suggestions(word, timer)
+            if candidates is None:
+                pending.append(word)
+            else:
+                suggestions[word] = candidates[:max_suggestions]
+        partial = False
+        if pending:
+            found, partial = self.find_suggestions(pending, deadline, pool, timer)
+            for word in pending:
+                suggestions[word] = found.get(word, [])[:max_suggestions]
+        return suggestions, partial
+    
+    def check_text_fast(self, text: str, max_errors: int = 50, timer=None):
+        """Быстрая проверка текста с ограничением количества ошибок
+        timer (metrics.PhaseTimer) - замер фаз, None - без замеров"""
+        errors, _ = self.check_text_within(text, None, max_errors=max_errors, timer=timer)
+        return errors
+    
+    def check_text_within(self, text: str, deadline, pool=None, max_errors: int = 50, timer=None):
+        """Проверка текста с крайним сроком для поиска исправлений
+        Все ошибки находятся всегда (проверка словаря дешевая); исправления
+        слов, не найденные до срока, пустые, и результат помечается неполным.
+        Каждое неизвестное слово ищется один раз, даже если повторяется.
+        Возвращает (ошибки, неполный ли результат)"""
         errors = []
+        pending = {}
         
-        for word in words:
-            if not self.is_correct(word):
-                suggestions = self.suggest_corrections(word)
-                start_pos = text.find(word)
-                errors.append({
-                    'word': word,
-                    'suggestions': suggestions,
+        if timer:
+            started = perf_counter()
+            tokens = list(iter_tokens(text))
+            timer.add('tokenize', perf_counter() - started)
+        else:
+            tokens = iter_tokens(text)
+        
+        for word, start_pos, end_pos in tokens:
+            if timer:
+                started = perf_counter()
+                correct = self.is_correct(word)
+                timer.add('lookup', perf_counter() - started)
+            else:
+                correct = self.is_correct(word)
+            if not correct:
+                error = {
+                    'word': text[start_pos:end_pos],
+                    'suggestions': [],
                     'start_pos': start_pos,
-                    'end_pos': start_pos + len(word)
-                })
+                    'end_pos': end_pos
+                }
+                if word in pending:
+                    pending[word].append(error)
+                else:
+                    suggestions = self.lookup_suggestions(word, timer)
+                    if suggestions is None:
+                        pending[word] = [error]
+                    else:
+                        error['suggestions'] = suggestions[:3]
+                errors.append(error)
                 
                 if len(errors) >= max_errors:
                     break
         
-        return errors
+        partial = False
+        if pending:
+            found, partial = self.find_suggestions(list(pending), deadline, pool, timer)
+            for word, candidates in found.items():
+                for error in pending[word]:
+                    error['suggestions'] = candidates[:3]
+        
+        return errors, partial
+
+class TenantSpellChecker(OptimizedSpellChecker):
+    """Общая модель со словарем команды (tenants.TenantOverlay)
+    Структуры модели не копируются: представление ссылается на них и
+    добавляет слова и исправления слоя. Создается на запрос, это дешево"""
+    
+    def __init__(self, base, overlay):
+        self.base = base
+        self.overlay = overlay
+        self.vocabulary = base.vocabulary
+        self.word_freq = base.word_freq
+        self.suggestion_table = base.suggestion_table
+        self.suggestion_cache = base.suggestion_cache
+        self.completion = base.completion
+        self.completion_source = None
+        self.browser_dictionary = None
+        self.index_thread = None
+        self._cached_distances = base._cached_distances
+    
+    def is_correct(self, word: str):
+        own = self.overlay.word_freq
+        if word in own or word in self.vocabulary:
+            return True
+        if '-' in word:
+            return all(part in own or part in self.vocabulary for part in word.split('-'))
+        return False
+    
+    def lookup_suggestions(self, word: str, timer=None):
+        suggestions = super().lookup_suggestions(word, timer)
+        if suggestions is None:
+            return None
+        return self.overlay.merge(word, suggestions)
+    
+    def find_suggestions(self, words, deadline=None, pool=None, timer=None):
+        # В общий кеш попадают исправления модели без слоя (это делает базовый метод)
+        found, partial = super().find_suggestions(words, deadline, pool, timer)
+        return {word: self.overlay.merge(word, candidates) for word, candidates in found.items()}, partial
+    
+    def complete(self, prefix: str, k: int, previous=None):
+        """Дополнения слоя, затем общей модели"""
+        own = self.overlay.complete(prefix, k)
+        shared = self.completion.complete(prefix, k, previous) if self.completion is not None else []
+        return (own + [word for word in shared if word not in self.overlay])[:k]
 
 def load_vocabulary_from_file(file_path):
     """Загрузка словаря из файла"""
@@ -170,6 +314,31 @@ def load_vocabulary_from_file(file_path):
         print(f"   ❌ Ошибка загрузки {file_path}: {e}")
         return set(), {}
 
+def load_hunspell_dictionary(file_path):
+    """Загрузка ka_GE.dic + ka_GE.aff без развертывания словоформ"""
+    try:
+        dictionary = HunspellDictionary.load(str(file_path))
+        # Индекс начал для поиска исправлений - при загрузке, а не в первом запросе
+        dictionary.build_start_index()
+        print(f"   📖 Загружено {len(dictionary.entries)} основ из {file_path.name} "
+              f"({len(dictionary.suffixes)} окончаний в .aff)")
+        return dictionary, {}
+        
+    except Exception as e:
+        print(f"   ❌ Ошибка загрузки {file_path}: {e}")
+        return set(), {}
+
+def load_dawg(file_path):
+    """Загрузка DAWG через mmap: словарь и частоты без копирования в память процесса"""
+    try:
+        dawg = Dawg.load(str(file_path))
+        print(f"   📖 Загружено {len(dawg)} слов из {file_path.name} (mmap)")
+        return dawg, dawg
+        
+    except Exception as e:
+        print(f"   ❌ Ошибка загрузки {file_path}: {e}")
+        return set(), {}
+
 def load_pickle_model(file_path):
     """Загрузка модели из pickle файла"""
     try:
@@ -178,6 +347,8 @@ def load_pickle_model(file_path):
         
         vocabulary = set()
         word_freq = {}
+        suggestion_table = None
+        bigram_model = model_data.get('bigram_model')
         
         if 'vocabulary' in model_data:
             vocabulary = set(model_data['vocabulary'])
@@ -188,84 +359,328 @@ def load_pickle_model(file_path):
             word_freq = model_data['word_freq']
         else:
             word_freq = {word: 1 for word in vocabulary}
+        
+        if 'suggestion_table' in model_data:
+            suggestion_table = SuggestionTable.from_dict(model_data['suggestion_table'])
             
-        return vocabulary, word_freq, True
+        return vocabulary, word_freq, suggestion_table, bigram_model, True
         
     except Exception as e:
         print(f"   ❌ Ошибка загрузки pickle {file_path}: {e}")
-        return set(), {}, False
+        return set(), {}, None, None, False
 
-def initialize_spellcheckers():
-    """Инициализация спеллчекеров с реальным словарем"""
-    global checker, model_info
-    
+def open_suggestion_cache(model_version):
+    """Кеш исправлений для данной версии модели (None - кеш отключен или недоступен)"""
+    if not SUGGESTION_CACHE:
+        return None
+    try:
+        cache = SuggestionCache(SUGGESTION_CACHE, model_version)
+        print(f"   💾 Кеш исправлений: {SUGGESTION_CACHE} (версия {model_version}, записей {len(cache)})")
+        return cache
+    except sqlite3.Error as e:
+        print(f"   ❌ Кеш исправлений недоступен: {e}")
+        return None
+
+_pool_lock = threading.Lock()
+
+def start_suggestion_pool(model_checker):
+    """Создание и прогрев пула процессов модели в вызывающем потоке
+    Вызывается в потоке загрузки до активации модели, поэтому первый запрос
+    не ждет запуска процессов; пул хранится в самой модели. None - пул отключен"""
+    if POOL_WORKERS <= 0 or model_checker is None:
+        return None
+    with _pool_lock:
+        pool = model_checker.pool
+        if pool is False or (pool is not None and pool.pid == os.getpid()):
+            return pool or None
+        started = perf_counter()
+        try:
+            # Процессам нужен только словарь и частоты (без кеша и его соединений)
+            worker_checker = CandidateSearch(model_checker.vocabulary, model_checker.word_freq)
+            pool = SuggestionPool(worker_checker, POOL_WORKERS, POOL_QUEUE, ADMISSION_WAIT_MS / 1000)
+        except Exception as e:
+            print(f"❌ Пул поиска исправлений не запустился: {e}")
+            model_checker.pool = False
+            return None
+        model_checker.pool = pool
+    print(f"⚙️  Пул поиска исправлений: {POOL_WORKERS} процессов, очередь {POOL_QUEUE} "
+          f"({perf_counter() - started:.2f}s)")
+    return pool
+
+def start_suggestion_pool_in_background(model_checker):
+    """Прогрев пула в фоновом потоке (процесс после fork, модель загружена при импорте)"""
+    if POOL_WORKERS <= 0 or in_pool_process():
+        return
+    with _pool_lock:
+        thread = model_checker.pool_thread
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=start_suggestion_pool, args=(model_checker,),
+                                  name='suggestion-pool', daemon=True)
+        model_checker.pool_thread = thread
+        thread.start()
+
+def get_suggestion_pool(model_checker=None):
+    """Пул процессов модели model_checker (по умолчанию текущей)
+    None - пул отключен или еще прогревается: поиск идет в потоке запроса.
+    Запрос сам пул не создает: пул, созданный до fork (gunicorn --preload),
+    в дочернем процессе не работает, и процесс прогревает свой в фоне"""
+    current = active_model[0]
+    if model_checker is None:
+        model_checker = current
+    # Словарь команды ищет исправления модели в пуле общей модели
+    model_checker = getattr(model_checker, 'base', model_checker)
+    if POOL_WORKERS <= 0 or model_checker is None:
+        return None
+    pool = model_checker.pool
+    if pool and pool.pid == os.getpid():
+        return pool
+    if pool is not False and model_checker is current:
+        start_suggestion_pool_in_background(model_checker)
+    return None
+
+def stop_suggestion_pool(model_checker):
+    """Остановка пула выбывшей модели
+    Уже принятые задачи пул дорабатывает: их ждут запросы прежней версии"""
+    with _pool_lock:
+        pool = model_checker.pool
+        model_checker.pool = None
+    if pool and pool.pid == os.getpid():
+        pool.shutdown(cancel_pending=False)
+
+def request_deadline(requested_ms=None):
+    """Крайний срок запроса (time.time()); клиент может только сократить серверный"""
+    deadline_ms = DEADLINE_MS
+    if requested_ms is not None:
+        try:
+            deadline_ms = min(deadline_ms, max(float(requested_ms), 0.0))
+        except (TypeError, ValueError):
+            pass
+    return time.time() + deadline_ms / 1000
+
+_indexes_lock = threading.Lock()
+
+def start_model_indexes(model_checker, phases=None):
+    """Автодополнение и словарь для браузера в фоновом потоке: модель начинает
+    обслуживать проверку, не дожидаясь их; время построения - в phases"""
+    with _indexes_lock:
+        thread = model_checker.index_thread
+        if thread is not None and thread.is_alive():
+            return
+        if model_checker.completion_source is None and model_checker.browser_dictionary is not None:
+            return
+        
+        def run():
+            started = perf_counter()
+            if model_checker.completion_source is not None:
+                try:
+                    model_checker.completion = build_completion(*model_checker.completion_source)
+                except Exception as e:
+                    print(f"❌ ავტოდასრულების ინდექსი ვერ შეიქმნა: {e}")
+                model_checker.completion_source = None
+                if phases is not None:
+                    phases['completion'] = round(perf_counter() - started, 4)
+            started = perf_counter()
+            if model_checker.browser_dictionary is None:
+                try:
+                    data = export_vocabulary(model_checker.vocabulary)
+                    model_checker.browser_dictionary = (data, gzip.compress(data, 6)) if data else False
+                except Exception as e:
+                    print(f"❌ ბრაუზერის ლექსიკონის ექსპორტი ვერ მოხერხდა: {e}")
+                    model_checker.browser_dictionary = False
+                if phases is not None:
+                    phases['browser_dictionary'] = round(perf_counter() - started, 4)
+        
+        thread = threading.Thread(target=run, name='model-indexes', daemon=True)
+        model_checker.index_thread = thread
+        thread.start()
+
+def get_browser_dictionary(model_checker):
+    """Словарь для браузера (данные, gzip); None - еще строится, False - не экспортируется
+    Построение, прерванное fork (gunicorn --preload), начинается заново"""
+    exported = model_checker.browser_dictionary
+    if exported is None:
+        start_model_indexes(model_checker)
+    return exported
+
+def index_status(model_checker):
+    """Состояние фоновых индексов: 'building', True - готов, False - отключен"""
+    return {
+        'completion': 'building' if model_checker.completion_source is not None
+                      else model_checker.completion is not None,
+        'browser_dictionary': 'building' if model_checker.browser_dictionary is None
+                              else bool(model_checker.browser_dictionary)
+    }
+
+def completion_pending(model_checker):
+    """Индекс автодополнения еще строится (построение, прерванное fork, начинается заново)"""
+    if model_checker.completion_source is None:
+        return False
+    start_model_indexes(model_checker)
+    return True
+
+tenant_registry = None
+_tenants_lock = threading.Lock()
+
+def get_tenant_registry():
+    """Словари команд обслуживающего процесса (соединения SQLite создаются после fork)"""
+    global tenant_registry
+    with _tenants_lock:
+        if tenant_registry is None or tenant_registry.pid != os.getpid():
+            tenant_registry = TenantRegistry(TENANTS_DB, MAX_TENANT_WORDS)
+        return tenant_registry
+
+def request_checker(base):
+    """Спеллчекер запроса: общая модель или она же со словарем команды
+    Команда - заголовок X-Tenant или ?tenant=. Возвращает (спеллчекер, слой или None);
+    KeyError - словаря такой команды нет"""
+    name = request.headers.get('X-Tenant') or request.args.get('tenant')
+    if not name:
+        return base, None
+    overlay = get_tenant_registry().get(name) if valid_name(name) else None
+    if overlay is None:
+        raise KeyError(name)
+    return TenantSpellChecker(base, overlay), overlay
+
+def tenant_fields(overlay):
+    """Поля ответа о словаре команды"""
+    if overlay is None:
+        return {}
+    return {'tenant': overlay.name, 'tenant_version': overlay.version}
+
+job_manager = None
+_jobs_lock = threading.Lock()
+
+def check_paragraph(paragraph):
+    """Проверка абзаца задания: (все ошибки, partial), ожидание места в заполненном пуле"""
+    while True:
+        # Каждый абзац проверяется текущей моделью
+        paragraph_checker = active_model[0]
+        try:
+            return paragraph_checker.check_text_within(
+                paragraph, time.time() + JOB_PARAGRAPH_DEADLINE_MS / 1000, get_suggestion_pool(paragraph_checker),
+                max_errors=len(paragraph))
+        except PoolSaturated:
+            # Интерактивные запросы важнее: задание ждет, а не получает отказ
+            time.sleep(0.2)
+
+def get_job_manager():
+    """Менеджер заданий обслуживающего процесса (как и пул, создается после fork)
+    При создании продолжает задания, прерванные остановкой прежнего процесса"""
+    global job_manager
+    with _jobs_lock:
+        if job_manager is None or job_manager.pid != os.getpid():
+            job_manager = JobManager(JOBS_DB, check_paragraph, JOB_WORKERS)
+            resumed = job_manager.resume()
+            if resumed:
+                print(f"⚙️  Продолжены прерванные задания: {resumed}")
+        return job_manager
+
+# Файлы моделей в порядке приоритета; загружается только первый найденный
+MODEL_CANDIDATES = [
+    project_root / "4_advanced" / "merged_georgian_spellchecker.pkl",
+    project_root / "4_advanced" / "advanced_georgian_spellchecker.pkl",
+    project_root / "2_basis" / "georgian_spellchecker.dawg",
+    project_root / "2_basis" / "georgian_spellchecker.pkl",
+    project_root / "2_basis" / "processed_corpus" / "vocabulary.txt",
+    project_root / "2_basis" / "hunspell_georgian" / "ka_GE.dic",
+    current_dir / "merged_georgian_spellchecker.pkl",
+    current_dir / "fallback_spellchecker.pkl",
+]
+
+def select_model_source():
+    """Файл модели без загрузки: SPELLCHECK_MODEL или первый существующий кандидат"""
+    if MODEL_PATH:
+        path = Path(MODEL_PATH)
+        if path.exists():
+            return path
+        print(f"❌ SPELLCHECK_MODEL не найден: {MODEL_PATH}")
+        return None
+    for path in MODEL_CANDIDATES:
+        if path.exists():
+            return path
+    return None
+
+def load_model_source(path):
+    """Словарь, частоты, таблица исправлений и биграммы из файла модели"""
+    if path.suffix == '.pkl':
+        vocabulary, word_freq, suggestion_table, bigram_model, _ = load_pickle_model(path)
+        return vocabulary, word_freq, suggestion_table, bigram_model
+    if path.suffix == '.dawg':
+        vocabulary, word_freq = load_dawg(path)
+    elif path.suffix == '.dic':
+        vocabulary, word_freq = load_hunspell_dictionary(path)
+    else:
+        vocabulary, word_freq = load_vocabulary_from_file(path)
+    return vocabulary, word_freq, None, None
+
+def build_completion(vocabulary, word_freq, bigram_model=None):
+    """Индекс автодополнения (None - отключен или словарь не перечисляет слова)"""
+    if COMPLETION_K <= 0:
+        return None
+    if isinstance(vocabulary, Dawg):
+        counts = dict(vocabulary.items())
+    elif isinstance(vocabulary, (set, frozenset)):
+        counts = {word: word_freq.get(word, 1) for word in vocabulary}
+    else:
+        # Словарь Hunspell хранит основы, а не словоформы: дополнять нечем
+        return None
+    return CompletionIndex.build(counts, COMPLETION_K, bigram_model)
+
+def build_spellchecker():
+    """Загрузка модели в новый спеллчекер, не трогая текущий
+    Возвращает (спеллчекер, сведения о модели); время фаз - в сведениях (startup)"""
     print("🔍 ინიციალიზაცია სპელჩეკერის...")
+    phases = {}
+    mark = perf_counter()
+    
+    def lap(phase):
+        nonlocal mark
+        now = perf_counter()
+        phases[phase] = round(now - mark, 4)
+        mark = now
     
     checker = OptimizedSpellChecker()
+    source_path = select_model_source()
+    lap('select')
     
-    # Пытаемся загрузить словарь из разных мест согласно структуре проекта
-    vocabulary_sources = [
-        # Основные пути
-        project_root / "2_basis" / "processed_corpus" / "vocabulary.txt",
-        project_root / "2_basis" / "hunspell_georgian" / "ka_GE.dic",
-        project_root / "2_basis" / "georgian_spellchecker.pkl",
-        project_root / "4_advanced" / "advanced_georgian_spellchecker.pkl",
-        project_root / "4_advanced" / "merged_georgian_spellchecker.pkl",
-        
-        # Альтернативные пути
-        current_dir / "merged_georgian_spellchecker.pkl",
-        current_dir / "fallback_spellchecker.pkl",
-        Path("2_basis") / "georgian_spellchecker.pkl",
-        Path("4_advanced") / "advanced_georgian_spellchecker.pkl",
-    ]
-    
-    best_vocabulary = set()
-    best_word_freq = {}
-    best_source = ""
-    best_size = 0
-    
-    for source_path in vocabulary_sources:
-        if source_path.exists():
-            print(f"   🔍 ვამოწმებთ {source_path}...")
-            try:
-                if source_path.suffix == '.pkl':
-                    vocabulary, word_freq, success = load_pickle_model(source_path)
-                    if success and vocabulary:
-                        current_size = len(vocabulary)
-                        if current_size > best_size:
-                            best_vocabulary = vocabulary
-                            best_word_freq = word_freq
-                            best_source = source_path.name
-                            best_size = current_size
-                            print(f"   ✅ ვიპოვეთ ლექსიკონი {current_size} სიტყვით")
-                            
-                elif source_path.suffix == '.txt' or source_path.name == 'ka_GE.dic':
-                    vocabulary, word_freq = load_vocabulary_from_file(source_path)
-                    if vocabulary:
-                        current_size = len(vocabulary)
-                        if current_size > best_size:
-                            best_vocabulary = vocabulary
-                            best_word_freq = word_freq
-                            best_source = source_path.name
-                            best_size = current_size
-                            print(f"   ✅ ვიპოვეთ ლექსიკონი {current_size} სიტყვით")
-                    
-            except Exception as e:
-                print(f"   ❌ შეცდომა ფაილის ჩატვირთვისას {source_path}: {e}")
-                continue
+    vocabulary, word_freq, suggestion_table, bigram_model = set(), {}, None, None
+    if source_path is not None:
+        print(f"   🔍 ვტვირთავთ {source_path}...")
+        try:
+            vocabulary, word_freq, suggestion_table, bigram_model = load_model_source(source_path)
+        except Exception as e:
+            print(f"   ❌ შეცდომა ფაილის ჩატვირთვისას {source_path}: {e}")
+    lap('load')
+    source = source_path.name if source_path is not None else ""
     
-    if best_vocabulary:
-        checker.vocabulary = best_vocabulary
-        checker.word_freq = Counter(best_word_freq)
+    if vocabulary:
+        checker.vocabulary = vocabulary
+        # Частоты нужны только для ранжирования: uint16 дает тот же топ-5, что и точные
+        if isinstance(word_freq, Dawg):
+            checker.word_freq = word_freq
+        else:
+            checker.word_freq = FrequencyTable.from_counts(word_freq, 16)
+        checker.suggestion_table = suggestion_table
+        lap('frequencies')
+        # Индекс строится по точным частотам, до квантования, в фоне после активации
+        checker.completion_source = (vocabulary, word_freq, bigram_model)
+        model_version = model_hash(source_path)
+        lap('model_hash')
+        checker.suggestion_cache = open_suggestion_cache(model_version)
+        lap('suggestion_cache')
         model_info = {
             "type": "production", 
-            "vocabulary_size": len(best_vocabulary),
-            "source": best_source,
-            "status": "loaded"
+            "vocabulary_size": len(vocabulary),
+            "source": source,
+            "model_version": model_version,
+            "status": "loaded",
+            "suggestion_table_size": len(suggestion_table) if suggestion_table else 0,
+            "startup": phases
         }
-        print(f"✅ ლექსიკონი ჩაიტვირთა {best_source}-დან")
-        print(f"📊 სიტყვები ლექსიკონში: {len(best_vocabulary)}")
-        return True
+        print(f"✅ ლექსიკონი ჩაიტვირთა {source}-დან")
+        print(f"📊 სიტყვები ლექსიკონში: {len(vocabulary)}")
+        return checker, model_info
     else:
         print("⚠️  რეალური ლექსიკონები ვერ მოიძებნა. ვიყენებთ ძირითად ტესტურ ლექსიკონს.")
         test_vocabulary = {
@@ -280,18 +695,170 @@ def initialize_spellcheckers():
         
         checker.vocabulary = test_vocabulary
         checker.word_freq = {word: 1 for word in test_vocabulary}
+        checker.completion_source = (test_vocabulary, checker.word_freq)
+        model_version = vocabulary_hash(test_vocabulary)
+        checker.suggestion_cache = open_suggestion_cache(model_version)
+        lap('suggestion_cache')
         model_info = {
             "type": "test", 
             "vocabulary_size": len(test_vocabulary),
             "source": "basic_test",
-            "status": "fallback"
+            "model_version": model_version,
+            "status": "fallback",
+            "startup": phases
         }
         print(f"✅ შეიქმნა ძირითადი ტესტური ლექსიკონი {len(test_vocabulary)} სიტყვით")
-        return True
+        return checker, model_info
+
+# Слова для проверки новой модели перед заменой: хотя бы одно должно быть известно
+SMOKE_WORDS = ['გამარჯობა', 'საქართველო', 'არის', 'რომ', 'და']
+
+def smoke_test(new_checker):
+    """Проверка загруженной модели до замены; возвращает описание проблемы или None"""
+    # bool, а не len: словарь Hunspell считает словоформы полным развертыванием
+    if not new_checker.vocabulary:
+        return "ცარიელი ლექსიკონი"
+    try:
+        if not any(new_checker.is_correct(word) for word in SMOKE_WORDS):
+            return "ლექსიკონში საბაზისო სიტყვები არ არის"
+        # Короткий срок: проверяется, что поиск работает, а не его полнота
+        errors, _ = new_checker.check_text_within(' '.join(SMOKE_WORDS) + ' გამარჯობს', time.time() + 0.2)
+        if not isinstance(errors, list):
+            return "შემოწმების შედეგი არასწორია"
+    except Exception as e:
+        return f"შემოწმების შეცდომა: {e}"
+    return None
+
+def activate_model(new_checker, info):
+    """Атомарная замена модели; прежняя сохраняется для отката вместе с пулом
+    Запросы, начатые на прежней модели, дорабатывают на ней"""
+    global checker, model_info, active_model, previous_model
+    with _swap_lock:
+        old_checker, old_info = active_model
+        if 'loaded_at' not in info:
+            info = dict(info, loaded_at=time.time())
+        active_model = (new_checker, info)
+        checker, model_info = active_model
+        if old_checker is not None and old_checker is not new_checker:
+            retired = previous_model[0] if previous_model is not None else None
+            previous_model = (old_checker, old_info)
+            # Недописанная пачка прежнего кеша сохраняется при замене модели
+            if old_checker.suggestion_cache is not None:
+                old_checker.suggestion_cache.flush()
+            # Пул прежней модели остается для мгновенного отката; останавливается
+            # пул модели, которая выбыла совсем
+            if retired is not None and retired is not new_checker and retired is not old_checker:
+                stop_suggestion_pool(retired)
+    print(f"🔄 აქტიური მოდელი: {info.get('source')} (ვერსია {info.get('model_version')})")
+    model_ready.set()
+    start_model_indexes(new_checker, info.get('startup'))
+
+def rollback_model():
+    """Возврат к прежней модели вместе с ее прогретым пулом; False - прежней модели нет"""
+    if previous_model is None:
+        return False
+    activate_model(*previous_model)
+    return True
+
+def load_and_activate(start_pool=True):
+    """Загрузка, проверка и замена модели; возвращает описание проблемы или None
+    start_pool - прогреть пул поиска до замены (False - процесс может оказаться
+    мастером gunicorn --preload: пул прогревается после fork)"""
+    new_checker, info = build_spellchecker()
+    started = perf_counter()
+    problem = smoke_test(new_checker)
+    info['startup']['smoke_test'] = round(perf_counter() - started, 4)
+    if problem:
+        print(f"❌ მოდელმა შემოწმება ვერ გაიარა: {problem}")
+        # При старте заменять нечего: сервер работает с тем, что загрузилось
+        if active_model[0] is not None:
+            return problem
+    if start_pool:
+        started = perf_counter()
+        start_suggestion_pool(new_checker)
+        info['startup']['suggestion_pool'] = round(perf_counter() - started, 4)
+    activate_model(new_checker, info)
+    phases = ', '.join(f"{phase} {seconds:.3f}s" for phase, seconds in info['startup'].items())
+    print(f"⏱️  ჩატვირთვის ეტაპები: {phases}")
+    return None
+
+def initialize_spellcheckers(start_pool=True):
+    """Инициализация спеллчекеров с реальным словарем (в текущем потоке)"""
+    return load_and_activate(start_pool) is None
+
+# Фоновая перезагрузка (/reload): одна загрузка одновременно
+reload_state = {'status': 'idle'}
+_reload_lock = threading.Lock()
+
+def reload_in_background():
+    """Загрузка, проверка и замена модели в отдельном потоке
+    Возвращает поток или None, если загрузка уже идет"""
+    global reload_state
+    if not _reload_lock.acquire(blocking=False):
+        return None
+    reload_state = {'status': 'loading', 'started': time.time()}
+    
+    def run():
+        global reload_state
+        try:
+            problem = load_and_activate()
+            if problem:
+                reload_state = dict(reload_state, status='failed', message=problem, finished=time.time())
+            else:
+                reload_state = dict(reload_state, status='success', model_version=active_model[1].get('model_version'),
+                                    finished=time.time())
+        except Exception as e:
+            print(f"❌ მოდელის განახლება ვერ მოხერხდა: {e}")
+            reload_state = dict(reload_state, status='failed', message=str(e), finished=time.time())
+        finally:
+            _reload_lock.release()
+    
+    thread = threading.Thread(target=run, name='spellcheck-reload', daemon=True)
+    thread.start()
+    return thread
 
-# Инициализируем при старте
-if not initialize_spellcheckers():
-    print("❌ Критическая ошибка инициализации спеллчекера!")
+def ensure_model_loading():
+    """Фоновая загрузка модели, если в этом процессе ее нет и загрузка не начиналась"""
+    if active_model[0] is None and reload_state['status'] == 'idle':
+        reload_in_background()
+
+def _after_fork():
+    """Поток загрузки не переживает fork (gunicorn --preload): процесс начинает свою
+    Пул модели, загруженной до fork, процесс прогревает сразу, не дожидаясь запросов"""
+    global _reload_lock, _indexes_lock, _pool_lock, reload_state
+    _reload_lock = threading.Lock()
+    _indexes_lock = threading.Lock()
+    _pool_lock = threading.Lock()
+    if reload_state['status'] == 'loading':
+        reload_state = {'status': 'idle'}
+    if active_model[0] is not None:
+        start_suggestion_pool_in_background(active_model[0])
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+IMPORT_SECONDS = round(perf_counter() - IMPORT_STARTED, 4)
+
+# Инициализируем при старте: в фоне или сразу (SPELLCHECK_LAZY_LOAD=0)
+# Процесс пула поиска импортирует главный модуль заново: модель ему не нужна
+if not in_pool_process():
+    if LAZY_LOAD:
+        ensure_model_loading()
+    # Пул - после fork или при первом запросе, в фоне
+    elif not initialize_spellcheckers(start_pool=False):
+        print("❌ Критическая ошибка инициализации спеллчекера!")
+
+@app.before_request
+def start_model_loading():
+    ensure_model_loading()
+
+def log_unknown_words(words):
+    """Добавление неизвестных слов запроса в журнал (сам текст не сохраняется)"""
+    try:
+        with open(REQUEST_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'unknown': words}, ensure_ascii=False) + '\n')
+    except OSError as e:
+        print(f"❌ Журнал запросов недоступен: {e}")
 
 @app.route('/')
 def index():
@@ -301,8 +868,13 @@ def index():
 @app.route('/check', methods=['POST'])
 def check_text():
     """API для проверки текста"""
+    checker, info = active_model
     if not checker:
-        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 500
+        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 503, {'Retry-After': '1'}
+    try:
+        checker, overlay = request_checker(checker)
+    except KeyError:
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
     
     data = request.get_json()
     if not data:
@@ -313,78 +885,591 @@ def check_text():
     if not text:
         return jsonify({'errors': [], 'stats': {'total_words': 0, 'error_count': 0}})
     
+    # Замеры фаз в ответе: "debug": true в теле или ?debug=1
+    debug = bool(data.get('debug')) or request.args.get('debug') == '1'
+    timer, request_started = start_timer(debug)
+    deadline = request_deadline(data.get('deadline_ms'))
+    
     try:
-        errors = checker.check_text_fast(text, max_errors=100)
+        errors, partial = checker.check_text_within(text, deadline, get_suggestion_pool(checker),
+                                                    max_errors=100, timer=timer)
+        if REQUEST_LOG and errors:
+            log_unknown_words([normalize_georgian(error['word']) for error in errors])
         
-        return jsonify({
+        result = {
             'errors': errors,
             'stats': {
                 'total_words': len(checker.tokenize_georgian(text)),
                 'error_count': len(errors)
             },
-            'model_info': model_info
-        })
+            'partial': partial,
+            'model_version': info.get('model_version'),
+            **tenant_fields(overlay),
+            'model_info': info
+        }
+        if not timer:
+            return jsonify(result)
         
+        started = perf_counter()
+        response = jsonify(result)
+        timer.add('serialization', perf_counter() - started)
+        if debug:
+            # Повторная сериализация с замерами; в метриках учтена первая
+            result['timings'] = timer.to_dict()
+            response = jsonify(result)
+        registry.record('check', timer, perf_counter() - request_started)
+        return response
+        
+    except PoolSaturated:
+        return jsonify({'error': 'სერვერი გადატვირთულია, სცადეთ მოგვიანებით'}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"❌ შეცდომა ტექსტის შემოწმებისას: {e}")
         return jsonify({'error': f'შეცდომა ტექსტის შემოწმებისას: {str(e)}'}), 500
 
+@app.route('/check/paragraphs', methods=['POST'])
+def check_paragraphs():
+    """Инкрементальная проверка для редактора
+    Тело: {"session": id, "revision": номер правки,
+           "paragraphs": [{"hash": ..., "offset": смещение в документе, "text": только для новых}]}
+    Ответ: ошибки всего документа и missing - хеши, которые нужно прислать с текстом"""
+    checker, info = active_model
+    if not checker:
+        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 503, {'Retry-After': '1'}
+    try:
+        checker, overlay = request_checker(checker)
+    except KeyError:
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('paragraphs'), list):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    # Результаты абзацев зависят от версии модели (/reload, /rollback) и словаря команды:
+    # после замены любой из них кеш сессии начинается заново
+    session_id = f"{data.get('session', '')}@{info.get('model_version')}"
+    if overlay is not None:
+        session_id = f"{session_id}@{overlay.name}:{overlay.version}"
+    try:
+        revision = int(data.get('revision', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    
+    if not paragraph_sessions.begin(session_id, revision):
+        return jsonify({'superseded': True, 'revision': revision}), 409
+    
+    timer, request_started = start_timer()
+    deadline = request_deadline(data.get('deadline_ms'))
+    errors, missing = [], []
+    partial = False
+    checked = 0
+    try:
+        pool = get_suggestion_pool(checker)
+        for paragraph in data['paragraphs']:
+            paragraph_hash = str(paragraph.get('hash', ''))
+            offset = int(paragraph.get('offset', 0))
+            paragraph_errors = paragraph_sessions.get(session_id, paragraph_hash)
+            if paragraph_errors is None:
+                text = paragraph.get('text')
+                if text is None:
+                    missing.append(paragraph_hash)
+                    continue
+                # Более новая правка уже пришла: эту проверку никто не ждет
+                if not paragraph_sessions.is_current(session_id, revision):
+                    return jsonify({'superseded': True, 'revision': revision}), 409
+                paragraph_errors, paragraph_partial = checker.check_text_within(
+                    text, deadline, pool, max_errors=len(text), timer=timer)
+                checked += 1
+                if paragraph_partial:
+                    partial = True
+                else:
+                    paragraph_sessions.put(session_id, paragraph_hash, paragraph_errors)
+            errors.extend(shift_errors(paragraph_errors, offset))
+    except PoolSaturated:
+        return jsonify({'error': 'სერვერი გადატვირთულია, სცადეთ მოგვიანებით'}), 503, {'Retry-After': '1'}
+    except (TypeError, ValueError, AttributeError):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    
+    result = {
+        'revision': revision,
+        'model_version': info.get('model_version'),
+        **tenant_fields(overlay),
+        'errors': errors,
+        'missing': missing,
+        'partial': partial,
+        'stats': {
+            'paragraphs': len(data['paragraphs']),
+            'checked_paragraphs': checked,
+            'error_count': len(errors)
+        }
+    }
+    if not timer:
+        return jsonify(result)
+    started = perf_counter()
+    response = jsonify(result)
+    timer.add('serialization', perf_counter() - started)
+    registry.record('check_paragraphs', timer, perf_counter() - request_started)
+    return response
+
 @app.route('/suggest/<word>')
 def suggest_word(word):
     """API для получения предложений для одного слова"""
+    checker, info = active_model
     if not checker:
-        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 500
+        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 503, {'Retry-After': '1'}
+    try:
+        checker, overlay = request_checker(checker)
+    except KeyError:
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
     
+    word = normalize_georgian(word)
+    timer, request_started = start_timer()
+    deadline = request_deadline(request.args.get('deadline_ms'))
     try:
-        suggestions = checker.suggest_corrections(word, max_suggestions=5)
-        return jsonify({
+        suggestions, partial = checker.suggest_within(word, deadline, get_suggestion_pool(checker),
+                                                      max_suggestions=5, timer=timer)
+        result = {
             'word': word,
             'is_correct': checker.is_correct(word),
-            'suggestions': suggestions
-        })
+            'suggestions': suggestions,
+            'partial': partial,
+            'model_version': info.get('model_version'),
+            **tenant_fields(overlay)
+        }
+        if not timer:
+            return jsonify(result)
+        
+        started = perf_counter()
+        response = jsonify(result)
+        timer.add('serialization', perf_counter() - started)
+        registry.record('suggest', timer, perf_counter() - request_started)
+        return response
+    except PoolSaturated:
+        return jsonify({'error': 'სერვერი გადატვირთულია, სცადეთ მოგვიანებით'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/suggest', methods=['POST'])
+def suggest_words():
+    """Исправления для слов, которые браузер не нашел в своем словаре
+    Тело: {"words": [...]}; ответ: исправления неизвестных слов и список
+    слов, которые сервер считает правильными"""
+    checker, info = active_model
+    if not checker:
+        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 503, {'Retry-After': '1'}
+    try:
+        checker, overlay = request_checker(checker)
+    except KeyError:
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    
+    data = request.get_json(silent=True)
+    words = data.get('words') if isinstance(data, dict) else None
+    if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    if len(words) > MAX_SUGGEST_WORDS:
+        return jsonify({'error': f'ერთ მოთხოვნაში მაქსიმუმ {MAX_SUGGEST_WORDS} სიტყვა'}), 413
+    
+    timer, request_started = start_timer()
+    deadline = request_deadline(data.get('deadline_ms'))
+    normalized = {word: normalize_georgian(word) for word in dict.fromkeys(words)}
+    correct, incorrect = [], {}
+    for word, form in normalized.items():
+        if checker.is_correct(form):
+            correct.append(word)
+        else:
+            incorrect[word] = form
+    unknown = set(incorrect.values())
+    try:
+        found, partial = checker.suggest_many(list(unknown), deadline, get_suggestion_pool(checker), timer=timer)
+    except PoolSaturated:
+        return jsonify({'error': 'სერვერი გადატვირთულია, სცადეთ მოგვიანებით'}), 503, {'Retry-After': '1'}
+    
+    if REQUEST_LOG and unknown:
+        log_unknown_words(sorted(unknown))
+    response = jsonify({
+        'suggestions': {word: found.get(form, []) for word, form in incorrect.items()},
+        'correct': correct,
+        'partial': partial,
+        'model_version': info.get('model_version'),
+        **tenant_fields(overlay)
+    })
+    if timer:
+        registry.record('suggest_batch', timer, perf_counter() - request_started)
+    return response
+
+@app.route('/dictionary')
+def dictionary_info():
+    """Адрес словаря для браузера текущей модели (404 - словарь не экспортируется)"""
+    checker, info = active_model
+    if not checker:
+        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 503, {'Retry-After': '1'}
+    exported = get_browser_dictionary(checker)
+    if exported is None:
+        return jsonify({'error': 'ლექსიკონი მზადდება'}), 503, {'Retry-After': '2'}
+    if not exported:
+        return jsonify({'error': 'ლექსიკონის ექსპორტი შეუძლებელია'}), 404
+    
+    version = info.get('model_version')
+    response = jsonify({
+        'version': version,
+        'url': f'/dictionary/{version}.bin',
+        'bytes': len(exported[0]),
+        'gzip_bytes': len(exported[1])
+    })
+    # Адрес меняется с версией модели, поэтому сам ответ не кешируется
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/dictionary/<version>.bin')
+def dictionary_file(version):
+    """Словарь для браузера; адрес включает версию модели, поэтому файл кешируется навсегда"""
+    checker, info = active_model
+    if not checker or version != info.get('model_version'):
+        return jsonify({'error': 'ლექსიკონის ვერსია ვერ მოიძებნა'}), 404
+    exported = get_browser_dictionary(checker)
+    if exported is None:
+        return jsonify({'error': 'ლექსიკონი მზადდება'}), 503, {'Retry-After': '2'}
+    if not exported:
+        return jsonify({'error': 'ლექსიკონის ექსპორტი შეუძლებელია'}), 404
+    
+    data, compressed = exported
+    use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    response = Response(compressed if use_gzip else data, mimetype='application/octet-stream')
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['ETag'] = f'"{version}"'
+    return response
+
+@app.route('/complete')
+def complete_prefix():
+    """Автодополнение: ?prefix=...&previous=предыдущее слово&k=число"""
+    checker, info = active_model
+    if not checker:
+        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 503, {'Retry-After': '1'}
+    try:
+        checker, overlay = request_checker(checker)
+    except KeyError:
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    if checker.completion is None and overlay is None:
+        if completion_pending(checker):
+            return jsonify({'error': 'ავტოდასრულების ინდექსი მზადდება'}), 503, {'Retry-After': '2'}
+        return jsonify({'error': 'ავტოდასრულება გამორთულია'}), 404
+    
+    prefix = normalize_georgian(request.args.get('prefix', ''))
+    if not prefix:
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    previous = normalize_georgian(request.args.get('previous', '')) or None
+    try:
+        k = int(request.args.get('k', COMPLETION_K))
+    except ValueError:
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    
+    timer, request_started = start_timer()
+    started = perf_counter()
+    if overlay is not None:
+        completions = checker.complete(prefix, max(k, 1), previous)
+    else:
+        completions = checker.completion.complete(prefix, max(k, 1), previous)
+    if timer:
+        timer.add('completion', perf_counter() - started)
+    response = jsonify({
+        'prefix': prefix,
+        'completions': completions,
+        'model_version': info.get('model_version'),
+        **tenant_fields(overlay)
+    })
+    if timer:
+        registry.record('complete', timer, perf_counter() - request_started)
+    return response
+
+@app.route('/tenants')
+def list_tenants():
+    """Словари команд и память каждого слоя (общая модель одна на процесс и не копируется)"""
+    checker, info = active_model
+    overlays = get_tenant_registry().stats()
+    return jsonify({
+        'tenants': overlays,
+        'memory_bytes': sum(overlay['memory_bytes'] for overlay in overlays),
+        'model_version': info.get('model_version'),
+        'vocabulary_size': len(checker.vocabulary) if checker else 0
+    })
+
+@app.route('/tenants/<name>', methods=['GET'])
+def get_tenant(name):
+    """Слова словаря команды с частотами"""
+    overlay = get_tenant_registry().get(name) if valid_name(name) else None
+    if overlay is None:
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    return jsonify(dict(overlay.stats(), words=overlay.word_freq))
+
+def tenant_words(data, key):
+    """Слова из тела запроса: список или {слово: частота}; None - неверный формат"""
+    words = data.get(key, [])
+    if not isinstance(words, (list, dict)):
+        return None
+    try:
+        return normalize_words(words)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def tenant_access(name):
+    """Право править словарь команды по токену (Authorization: Bearer или X-Tenant-Token):
+    ('admin' | 'tenant', None) или (None, ответ 401/403)"""
+    token = request.headers.get('Authorization', '')
+    token = token[7:].strip() if token.startswith('Bearer ') else request.headers.get('X-Tenant-Token', '')
+    if not token:
+        return None, (jsonify({'error': 'საჭიროა ავტორიზაცია'}), 401, {'WWW-Authenticate': 'Bearer'})
+    if ADMIN_TOKEN and hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        return 'admin', None
+    if get_tenant_registry().check_token(name, token):
+        return 'tenant', None
+    return None, (jsonify({'error': 'წვდომა აკრძალულია'}), 403)
+
+def tenant_written(overlay):
+    """Ответ на правку; команде, созданной администратором, выдается токен (один раз)"""
+    registry = get_tenant_registry()
+    result = overlay.stats()
+    if not registry.has_token(overlay.name):
+        result['token'] = registry.issue_token(overlay.name)
+    return jsonify(result)
+
+@app.route('/tenants/<name>', methods=['PUT'])
+def replace_tenant(name):
+    """Замена словаря команды: {"words": [...] или {слово: частота}, "index": true/false}
+    Без "index" индекс кандидатов строится по размеру словаря"""
+    data = request.get_json(silent=True)
+    if not valid_name(name) or not isinstance(data, dict):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    _, denied = tenant_access(name)
+    if denied:
+        return denied
+    words = tenant_words(data, 'words')
+    use_index = data.get('index')
+    if words is None or not isinstance(use_index, (bool, type(None))):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    try:
+        overlay = get_tenant_registry().put(name, words, use_index)
+    except OverlayTooLarge:
+        return jsonify({'error': f'ლექსიკონში მაქსიმუმ {MAX_TENANT_WORDS} სიტყვა'}), 413
+    return tenant_written(overlay)
+
+@app.route('/tenants/<name>', methods=['PATCH'])
+def update_tenant(name):
+    """Добавление и удаление слов без перезагрузки модели: {"add": ..., "remove": [...]}
+    Запросы, начатые до правки, дорабатывают с прежней версией словаря"""
+    data = request.get_json(silent=True)
+    if not valid_name(name) or not isinstance(data, dict):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    _, denied = tenant_access(name)
+    if denied:
+        return denied
+    add, remove = tenant_words(data, 'add'), tenant_words(data, 'remove')
+    use_index = data.get('index')
+    if add is None or remove is None or not isinstance(use_index, (bool, type(None))):
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    try:
+        overlay = get_tenant_registry().update(name, add, list(remove), use_index)
+    except OverlayTooLarge:
+        return jsonify({'error': f'ლექსიკონში მაქსიმუმ {MAX_TENANT_WORDS} სიტყვა'}), 413
+    return tenant_written(overlay)
+
+@app.route('/tenants/<name>', methods=['DELETE'])
+def delete_tenant(name):
+    """Удаление словаря команды (вместе с ее токеном)"""
+    if not valid_name(name):
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    _, denied = tenant_access(name)
+    if denied:
+        return denied
+    if not get_tenant_registry().delete(name):
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    return jsonify({'status': 'success', 'message': 'გუნდის ლექსიკონი წაიშალა'})
+
+@app.route('/tenants/<name>/token', methods=['POST'])
+def rotate_tenant_token(name):
+    """Новый токен команды; прежний сразу перестает действовать"""
+    if not valid_name(name):
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    _, denied = tenant_access(name)
+    if denied:
+        return denied
+    registry = get_tenant_registry()
+    if registry.get(name) is None:
+        return jsonify({'error': 'გუნდის ლექსიკონი ვერ მოიძებნა'}), 404
+    return jsonify({'tenant': name, 'token': registry.issue_token(name)})
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Задание проверки большого документа: JSON {"text": ...} или файл (поле file)"""
+    if active_model[0] is None:
+        return jsonify({'error': 'სპელჩეკერი არ ინიციალიზირებულია'}), 503, {'Retry-After': '1'}
+    
+    upload = request.files.get('file')
+    if upload is not None:
+        try:
+            text = upload.read().decode('utf-8')
+        except UnicodeDecodeError:
+            return jsonify({'error': 'ფაილი უნდა იყოს UTF-8 კოდირებით'}), 400
+        name = upload.filename or ''
+    else:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+        text = data.get('text', '')
+        name = data.get('name', '')
+    
+    if not isinstance(text, str) or not isinstance(name, str) or not text.strip():
+        return jsonify({'error': 'არასწორი მოთხოვნა'}), 400
+    
+    try:
+        job_id = get_job_manager().submit(text, name)
+    except sqlite3.Error as e:
+        print(f"❌ Задание не создано: {e}")
+        return jsonify({'error': 'დავალების შექმნა ვერ მოხერხდა'}), 500
+    return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/jobs/{job_id}',
+                    'stream_url': f'/jobs/{job_id}/stream'}), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Состояние задания; ?since=N - ошибки только абзацев начиная с N"""
+    job = get_job_manager().get(job_id, request.args.get('since', 0, type=int))
+    if job is None:
+        return jsonify({'error': 'დავალება ვერ მოიძებნა'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/stream')
+def stream_job(job_id):
+    """Результаты задания по мере готовности абзацев (Server-Sent Events)"""
+    manager = get_job_manager()
+    if manager.get(job_id, 0) is None:
+        return jsonify({'error': 'დავალება ვერ მოიძებნა'}), 404
+    # Генератор выполняется после выхода из обработчика, без контекста запроса
+    since = request.args.get('since', 0, type=int)
+    
+    def events():
+        for job in manager.stream(job_id, since):
+            yield f"event: {job['status']}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+    
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Отмена задания"""
+    manager = get_job_manager()
+    if manager.cancel(job_id):
+        return jsonify({'job_id': job_id, 'status': 'cancelled'})
+    job = manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'დავალება ვერ მოიძებნა'}), 404
+    return jsonify({'error': 'დავალება უკვე დასრულებულია', 'status': job['status']}), 409
+
 @app.route('/stats')
 def get_stats():
     """Получение статистики модели"""
     return jsonify(model_info)
 
+@app.route('/metrics')
+def metrics():
+    """Гистограммы фаз, кандидатов и попаданий в кеши (формат Prometheus)"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
 def health_check():
-    """Проверка работоспособности"""
-    status = "healthy" if checker else "unhealthy"
+    """Проверка работоспособности (liveness): процесс отвечает, даже пока модель грузится"""
+    checker, info = active_model
     return jsonify({
-        'status': status,
+        'status': 'healthy',
+        'ready': checker is not None,
         'model_loaded': checker is not None,
-        'vocabulary_size': len(checker.vocabulary) if checker else 0
+        'vocabulary_size': len(checker.vocabulary) if checker else 0,
+        'model_version': info.get('model_version'),
+        'previous_model_version': previous_model[1].get('model_version') if previous_model else None,
+        'reload': reload_state,
+        'pool': checker.pool.stats() if checker and checker.pool else None,
+        'jobs': job_manager.counts() if job_manager is not None else None,
+        'editor_sessions': paragraph_sessions.stats()
     })
 
+@app.route('/ready')
+def readiness():
+    """Готовность (readiness): 200 - модель загружена, 503 - еще грузится или не загрузилась"""
+    checker, info = active_model
+    result = {
+        'ready': checker is not None,
+        'model_version': info.get('model_version'),
+        'source': info.get('source'),
+        'reload': reload_state,
+        # Индексы строятся в фоне: проверка уже работает, /complete и /dictionary - после них
+        'indexes': index_status(checker) if checker is not None else None,
+        # Время фаз запуска: импорт модуля и загрузка активной модели
+        'startup': dict(info.get('startup', {}), import_module=IMPORT_SECONDS)
+    }
+    if checker is None:
+        return jsonify(result), 503, {'Retry-After': '1'}
+    return jsonify(result)
+
 @app.route('/reload', methods=['POST'])
 def reload_model():
-    """Перезагрузка модели"""
-    global checker, model_info
-    try:
-        success = initialize_spellcheckers()
-        if success:
-            return jsonify({'status': 'success', 'message': 'მოდელი განახლებულია', 'model_info': model_info})
-        else:
-            return jsonify({'status': 'error', 'message': 'მოდელის განახლება ვერ მოხერხდა'}), 500
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    """Перезагрузка модели в фоне: запросы обслуживает текущая модель, пока
+    новая не загрузится и не пройдет проверку. ?wait=1 - ответ после замены"""
+    thread = reload_in_background()
+    if thread is None:
+        return jsonify({'status': 'loading', 'message': 'მოდელი უკვე იტვირთება', 'reload': reload_state}), 409
+    if request.args.get('wait') != '1':
+        return jsonify({'status': 'loading', 'message': 'მოდელის ჩატვირთვა დაიწყო', 'reload': reload_state}), 202
+    
+    thread.join()
+    if reload_state['status'] == 'success':
+        return jsonify({'status': 'success', 'message': 'მოდელი განახლებულია', 'model_info': active_model[1]})
+    return jsonify({'status': 'error', 'message': reload_state.get('message', 'მოდელის განახლება ვერ მოხერხდა')}), 500
 
-if __name__ == '__main__':
+@app.route('/reload', methods=['GET'])
+def reload_status():
+    """Состояние последней перезагрузки и версии моделей"""
+    return jsonify({
+        'reload': reload_state,
+        'model_version': active_model[1].get('model_version'),
+        'previous_model_version': previous_model[1].get('model_version') if previous_model else None
+    })
+
+@app.route('/rollback', methods=['POST'])
+def rollback():
+    """Мгновенный возврат к модели, работавшей до последней замены"""
+    if not rollback_model():
+        return jsonify({'status': 'error', 'message': 'წინა მოდელი არ არის'}), 409
+    return jsonify({'status': 'success', 'message': 'დაბრუნდა წინა მოდელი', 'model_info': active_model[1]})
+
+def print_banner():
+    """Сведения о загруженной модели и адрес сервера"""
+    info = active_model[1]
     print("=" * 60)
     print("🇬🇪 ქართული სპელჩეკერი - ვებ ინტერფეისი")
     print("=" * 60)
-    print(f"📍 მოდელის ტიპი: {model_info.get('type', 'unknown')}")
-    print(f"📊 სიტყვები ლექსიკონში: {model_info.get('vocabulary_size', 0)}")
-    if model_info.get('source'):
-        print(f"📁 წყარო: {model_info['source']}")
+    print(f"📍 მოდელის ტიპი: {info.get('type', 'unknown')}")
+    print(f"📊 სიტყვები ლექსიკონში: {info.get('vocabulary_size', 0)}")
+    if info.get('source'):
+        print(f"📁 წყარო: {info['source']}")
     print(f"🌐 სერვერი გაშვებულია: http://localhost:5000")
     print("=" * 60)
     print("✨ გახსენით ბრაუზერი და გადადით მისამართზე ზემოთ!")
     print("=" * 60)
+
+def print_banner_when_ready():
+    """При фоновой загрузке (SPELLCHECK_LAZY_LOAD) сведения о модели печатаются после ее активации"""
+    while not model_ready.wait(1):
+        if reload_state['status'] == 'failed':
+            print(f"❌ მოდელი ვერ ჩაიტვირთა: {reload_state.get('message')}")
+            return
+    print_banner()
+
+if __name__ == '__main__':
+    if model_ready.is_set():
+        # Модель загружена при импорте (SPELLCHECK_LAZY_LOAD=0): пул - до первого запроса
+        start_suggestion_pool(active_model[0])
+        print_banner()
+    else:
+        print("⏳ მოდელი იტვირთება ფონურ რეჟიმში; სერვერი უკვე პასუხობს (/health, /ready)")
+        threading.Thread(target=print_banner_when_ready, name='startup-banner', daemon=True).start()
     
     # Создаем необходимые папки если их нет
     (current_dir / "templates").mkdir(exist_ok=True)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Воспроизводимые замеры спеллчекеров
+Нагрузка одинакова для всех движков и всех запусков:
+- тексты test_corpus и фиксированная выборка файлов 1_collect/corpus
+- опечатки с фиксированным seed (make_typo из vocabulary_pruning)
+Для каждого движка (GeorgianSpellChecker, AdvancedGeorgianSpellChecker,
+OptimizedSpellChecker веб-интерфейса) в отдельном процессе замеряются:
+время загрузки модели, пиковая память процесса, задержка исправления
+одного слова (p50/p99) и скорость проверки текста (слов в секунду).
+
+Запуск:
+    python benchmark.py run --output before.json
+    python benchmark.py run --output after.json
+    python benchmark.py compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import multiprocessing
+from pathlib import Path
+from typing import Dict, List
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "2_basis"))
+sys.path.insert(0, str(project_root / "4_advanced"))
+
+ENGINES = ('basic', 'advanced', 'web')
+# Метрика -> True, если больше - лучше (для compare)
+METRICS = {
+    'load_seconds': False,
+    'peak_rss_mb': False,
+    'suggest_p50_ms': False,
+    'suggest_p99_ms': False,
+    'check_words_per_second': True,
+}
+
+
+def _percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))] if ordered else 0.0
+
+
+def _peak_rss_mb() -> float:
+    """Пиковая память процесса (ru_maxrss: КБ в Linux, байты в macOS)"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def build_workload(test_corpus: Path, corpus: Path, corpus_files: int = 20,
+                   samples: int = 20, texts: int = 20, typo_rate: float = 0.1,
+                   seed: int = 42) -> dict:
+    """Опечатки и тексты для замеров; зависит только от корпусов и seed"""
+    from georgian_tokenizer import tokenize_georgian
+    from vocabulary_pruning import make_typo
+
+    rng = random.Random(seed)
+    files = sorted(test_corpus.rglob("*.txt"))
+    corpus_paths = sorted(corpus.rglob("*.txt"))
+    files += sorted(rng.sample(corpus_paths, min(corpus_files, len(corpus_paths))))
+
+    sentences = []
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            sentences.extend(line.strip() for line in f if len(line.split()) >= 3)
+    if not sentences:
+        return {'files': [], 'typos': [], 'texts': []}
+
+    words = sorted({word for sentence in sentences for word in tokenize_georgian(sentence) if len(word) > 3})
+    typos = [make_typo(rng.choice(words), rng) for _ in range(samples)]
+
+    check_texts = []
+    for _ in range(texts):
+        tokens = tokenize_georgian(rng.choice(sentences))
+        check_texts.append(' '.join(
+            make_typo(token, rng) if len(token) > 3 and rng.random() < typo_rate else token
+            for token in tokens
+        ))
+    return {
+        'files': [os.path.relpath(path, project_root) for path in files],
+        'typos': typos,
+        'texts': check_texts,
+    }
+
+
+def _load_engine(engine: str, model_path: str):
+    """Загрузка движка: (функция исправлений, функция проверки текста, источник модели)"""
+    if engine == 'basic':
+        from georgian_spellchecker import GeorgianSpellChecker
+        checker = GeorgianSpellChecker()
+        checker.load_model(model_path)
+        return checker.suggest_corrections, checker.check_text, model_path
+
+    if engine == 'advanced':
+        from advanced_spellchecker import AdvancedGeorgianSpellChecker
+        checker = AdvancedGeorgianSpellChecker()
+        try:
+            checker.load_advanced_model(model_path)
+        except KeyError:
+            # Базовая модель без n-грамм: контекст просто не влияет на ранжирование
+            checker.load_model(model_path)
+        return checker.suggest_corrections, checker.check_text_with_context, model_path
+
+    # Веб-интерфейс сам выбирает модель при импорте (как при запуске сервера)
+    import importlib.util
+    # Модель загружается при импорте, а не в фоне, как у сервера
+    os.environ['SPELLCHECK_LAZY_LOAD'] = '0'
+    spec = importlib.util.spec_from_file_location("web_interface", project_root / "5_web" / "web_interface.py")
+    web_interface = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(web_interface)
+    checker = web_interface.checker
+    checker.suggestion_cache = None  # иначе повторные запуски меряют кеш, а не поиск
+    return checker.suggest_corrections, checker.check_text_fast, web_interface.model_info.get('source', '')
+
+
+def run_engine(engine: str, model_path: str, workload: dict) -> dict:
+    """Замеры одного движка (вызывается в отдельном процессе)"""
+    start = time.perf_counter()
+    suggest, check, source = _load_engine(engine, model_path)
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for typo in workload['typos']:
+        start = time.perf_counter()
+        suggest(typo)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    from georgian_tokenizer import tokenize_georgian
+    words = sum(len(tokenize_georgian(text)) for text in workload['texts'])
+    start = time.perf_counter()
+    for text in workload['texts']:
+        check(text)
+    check_seconds = time.perf_counter() - start
+
+    return {
+        'model': source,
+        'load_seconds': load_seconds,
+        'peak_rss_mb': _peak_rss_mb(),
+        'suggest_p50_ms': _percentile(latencies, 0.5),
+        'suggest_p99_ms': _percentile(latencies, 0.99),
+        'check_words_per_second': words / check_seconds if check_seconds else 0.0,
+        'check_words': words,
+    }
+
+
+def _engine_worker(engine: str, model_path: str, workload: dict, results) -> None:
+    try:
+        results.put(run_engine(engine, model_path, workload))
+    except Exception as e:
+        results.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=project_root).stdout.strip()
+    except OSError:
+        return ''
+
+
+def run(engines: List[str], models: Dict[str, str], workload: dict, seed: int) -> dict:
+    """Все движки по очереди, каждый в чистом процессе (честная пиковая память)"""
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'seed': seed,
+            'files': len(workload['files']),
+            'typos': len(workload['typos']),
+            'texts': len(workload['texts']),
+        },
+        'engines': {},
+    }
+    for engine in engines:
+        model_path = models.get(engine, '')
+        if engine != 'web' and not Path(model_path).exists():
+            print(f"⚠️  {engine}: модель не найдена ({model_path}), пропуск")
+            results['engines'][engine] = {'error': f"модель не найдена: {model_path}"}
+            continue
+        print(f"⏱  {engine}...")
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_engine_worker, args=(engine, model_path, workload, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        if 'error' in result:
+            print(f"❌ {engine}: {result['error']}")
+        results['engines'][engine] = result
+    return results
+
+
+def print_results(results: dict) -> None:
+    meta = results['meta']
+    print(f"\nКоммит {meta['commit']}, Python {meta['python']}, seed {meta['seed']}: "
+          f"{meta['typos']} опечаток, {meta['texts']} текстов из {meta['files']} файлов")
+    print(f"{'':<10}{'загрузка, с':>13}{'память, MB':>12}{'p50, мс':>10}{'p99, мс':>10}{'слов/с':>10}")
+    for engine, result in results['engines'].items():
+        if 'error' in result:
+            print(f"{engine:<10}{result['error']}")
+            continue
+        print(f"{engine:<10}{result['load_seconds']:>13.2f}{result['peak_rss_mb']:>12.1f}"
+              f"{result['suggest_p50_ms']:>10.2f}{result['suggest_p99_ms']:>10.2f}"
+              f"{result['check_words_per_second']:>10.0f}")
+
+
+def compare(before: dict, after: dict) -> None:
+    """Разница двух запусков по каждой метрике каждого движка"""
+    print(f"Было: {before['meta']['commit']} ({before['meta']['timestamp']}), "
+          f"стало: {after['meta']['commit']} ({after['meta']['timestamp']})")
+    for key in ('seed', 'typos', 'texts', 'files'):
+        if before['meta'].get(key) != after['meta'].get(key):
+            print(f"⚠️  Разная нагрузка: {key} {before['meta'].get(key)} -> {after['meta'].get(key)}")
+
+    print(f"\n{'':<10}{'метрика':<26}{'было':>12}{'стало':>12}{'изменение':>12}")
+    for engine in sorted(set(before['engines']) | set(after['engines'])):
+        old = before['engines'].get(engine, {})
+        new = after['engines'].get(engine, {})
+        if 'error' in old or 'error' in new or not old or not new:
+            print(f"{engine:<10}нет данных в одном из запусков")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            better = change > 0 if higher_is_better else change < 0
+            mark = '' if abs(change) < 5 else (' ✅' if better else ' ❌')
+            print(f"{engine:<10}{metric:<26}{old[metric]:>12.2f}{new[metric]:>12.2f}{change:>+11.1f}%{mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замеры скорости и памяти спеллчекеров')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Замерить движки и сохранить JSON')
+    run_parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES),
+                            help='Какие движки замерять')
+    run_parser.add_argument('--basic-model', default=str(project_root / "2_basis" / "georgian_spellchecker.pkl"),
+                            help='Модель GeorgianSpellChecker')
+    run_parser.add_argument('--advanced-model',
+                            default=str(project_root / "4_advanced" / "advanced_georgian_spellchecker.pkl"),
+                            help='Модель AdvancedGeorgianSpellChecker')
+    run_parser.add_argument('--test-corpus', default=str(project_root / "test_corpus"),
+                            help='Тестовый корпус (берется целиком)')
+    run_parser.add_argument('--corpus', default=str(project_root / "1_collect" / "corpus"),
+                            help='Корпус, из которого берется фиксированная выборка файлов')
+    run_parser.add_argument('--corpus-files', type=int, default=20,
+                            help='Размер выборки файлов корпуса')
+    run_parser.add_argument('--samples', type=int, default=20,
+                            help='Опечаток для замера задержки исправления')
+    run_parser.add_argument('--texts', type=int, default=20,
+                            help='Текстов для замера скорости проверки')
+    run_parser.add_argument('--seed', type=int, default=42,
+                            help='Seed выборки файлов и опечаток')
+    run_parser.add_argument('--output', default='benchmark.json',
+                            help='Файл результатов')
+
+    compare_parser = subparsers.add_parser('compare', help='Сравнить два JSON с результатами')
+    compare_parser.add_argument('before', help='Результаты до изменения')
+    compare_parser.add_argument('after', help='Результаты после изменения')
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        with open(args.before, 'r', encoding='utf-8') as f:
+            before = json.load(f)
+        with open(args.after, 'r', encoding='utf-8') as f:
+            after = json.load(f)
+        compare(before, after)
+        return
+
+    workload = build_workload(Path(args.test_corpus), Path(args.corpus), args.corpus_files,
+                              args.samples, args.texts, seed=args.seed)
+    if not workload['typos']:
+        print("❌ Нет текстов для нагрузки: проверьте --test-corpus и --corpus")
+        return
+    models = {'basic': args.basic_model, 'advanced': args.advanced_model}
+    results = run(args.engines, models, workload, args.seed)
+    print_results(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
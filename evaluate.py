@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Качество исправлений против скорости
+Ускорения поиска кандидатов (отсечение по первым буквам и остановка после
+20 найденных в веб-интерфейсе, расстояние 1 вместо 2, DAWG вместо перебора)
+меняют не только задержку, но и полноту. Здесь для каждого движка и
+настройки на одном размеченном наборе считаются:
+- обнаружение: точность и полнота (опечатка не прошла is_correct)
+- исправление: исходное слово первое (top-1) или в первых пяти (top-5)
+  среди исправлений обнаруженной опечатки
+- задержка исправления одного слова (p50/p99)
+Итог - таблица, отсортированная по задержке, с отметкой Парето-оптимальных
+настроек (нет другой, которая одновременно быстрее и точнее по top-5).
+
+Размеченный набор: предложения из отложенных файлов корпуса, в которых
+часть слов заменена опечатками, характерными для грузинского набора:
+соседняя клавиша, пропущенный Shift (ტ/თ, ს/შ, ც/ჩ ...), похожие звуки
+(კ/ქ/ყ, პ/ფ, წ/ც ...), пропуск, удвоение и перестановка букв.
+Отложенные файлы должны быть исключены из обучения модели, иначе словарь
+уже содержит их слова (тогда полнота обнаружения завышена).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "2_basis"))
+sys.path.insert(0, str(project_root / "4_advanced"))
+
+from typo_generator import build_labeled_set
+
+
+class Engines:
+    """Модели загружаются один раз и общие для всех настроек одного движка"""
+
+    def __init__(self, basic_model: str, advanced_model: str):
+        self.basic_model = basic_model
+        self.advanced_model = advanced_model
+        self._loaded = {}
+
+    def get(self, name: str):
+        if name not in self._loaded:
+            start = time.perf_counter()
+            self._loaded[name] = getattr(self, f"_load_{name}")()
+            print(f"   {name}: загружено за {time.perf_counter() - start:.1f} с")
+        return self._loaded[name]
+
+    def _load_basic(self):
+        from georgian_spellchecker import GeorgianSpellChecker
+        checker = GeorgianSpellChecker()
+        checker.load_model(self.basic_model)
+        checker.suggestion_table = None
+        return checker
+
+    def _load_advanced(self):
+        from advanced_spellchecker import AdvancedGeorgianSpellChecker
+        checker = AdvancedGeorgianSpellChecker()
+        try:
+            checker.load_advanced_model(self.advanced_model)
+        except KeyError:
+            checker.load_model(self.advanced_model)
+        return checker
+
+    def _load_dawg(self):
+        from dawg import Dawg
+        basic = self.get('basic')
+        return Dawg.build({word: basic.word_freq.get(word, 1) for word in basic.vocabulary})
+
+    def _load_web(self):
+        import importlib.util
+        # Модель загружается при импорте, а не в фоне, как у сервера
+        os.environ['SPELLCHECK_LAZY_LOAD'] = '0'
+        spec = importlib.util.spec_from_file_location("web_interface", project_root / "5_web" / "web_interface.py")
+        web_interface = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(web_interface)
+        return web_interface
+
+
+def _web_config(prefix_filter: int, early_stop: int, max_distance: int):
+    def make(engines: Engines):
+        web_interface = engines.get('web')
+        checker = web_interface.OptimizedSpellChecker()
+        checker.vocabulary = web_interface.checker.vocabulary
+        checker.word_freq = web_interface.checker.word_freq
+        checker.prefix_filter = prefix_filter
+        checker.early_stop = early_stop
+        return checker.is_correct, lambda word, context: checker.generate_candidates_fast(word, max_distance)
+    return make
+
+
+def _basic_config(max_distance: int):
+    def make(engines: Engines):
+        checker = engines.get('basic')
+        return checker.is_correct, lambda word, context: checker.generate_candidates(word, max_distance)
+    return make
+
+
+def _dawg_config(max_distance: int):
+    def make(engines: Engines):
+        dawg = engines.get('dawg')
+
+        def suggest(word: str, context: List[str]) -> List[str]:
+            candidates = sorted(dawg.fuzzy(word, max_distance), key=lambda x: (x[1], -dawg.get(x[0])))
+            return [candidate for candidate, _ in candidates[:5]]
+        return dawg.__contains__, suggest
+    return make
+
+
+def _advanced_config(engines: Engines):
+    checker = engines.get('advanced')
+    return checker.is_correct, lambda word, context: checker.suggest_with_context(word, context[-checker.context_window:])
+
+
+# Настройка -> (описание, фабрика (is_correct, suggest(слово, предыдущие слова)))
+CONFIGS: Dict[str, Tuple[str, Callable]] = {
+    'web': ('веб: префикс 2, стоп 20, расстояние 1', _web_config(2, 20, 1)),
+    'web-no-prefix': ('веб: без префикса, стоп 20, расстояние 1', _web_config(0, 20, 1)),
+    'web-no-stop': ('веб: префикс 2, без стопа, расстояние 1', _web_config(2, 0, 1)),
+    'web-exact-d1': ('веб: без отсечений, расстояние 1', _web_config(0, 0, 1)),
+    'web-exact-d2': ('веб: без отсечений, расстояние 2', _web_config(0, 0, 2)),
+    'dawg-d1': ('DAWG: расстояние 1', _dawg_config(1)),
+    'dawg-d2': ('DAWG: расстояние 2', _dawg_config(2)),
+    'basic-d1': ('базовый: перебор, расстояние 1', _basic_config(1)),
+    'basic-d2': ('базовый: перебор, расстояние 2', _basic_config(2)),
+    'advanced': ('продвинутый: перебор, расстояние 2, контекст n-грамм', _advanced_config),
+}
+
+
+def _percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))] if ordered else 0.0
+
+
+def evaluate(is_correct: Callable[[str], bool], suggest: Callable[[str, List[str]], List[str]],
+             labeled: List[dict], max_corrections: int = 50) -> dict:
+    """Обнаружение по всем словам набора, исправление - по первым обнаруженным опечаткам"""
+    true_positive = false_positive = false_negative = 0
+    detected = []
+    for sentence in labeled:
+        tokens, typos = sentence['tokens'], sentence['typos']
+        for i, token in enumerate(tokens):
+            flagged = not is_correct(token)
+            is_typo = i in typos
+            if flagged and is_typo:
+                true_positive += 1
+                detected.append((token, typos[i]['original'], tokens[:i]))
+            elif flagged:
+                false_positive += 1
+            elif is_typo:
+                false_negative += 1
+
+    top1 = top5 = 0
+    latencies = []
+    corrections = detected[:max_corrections]
+    for typo, original, context in corrections:
+        start = time.perf_counter()
+        suggestions = suggest(typo, context)
+        latencies.append((time.perf_counter() - start) * 1000)
+        top1 += bool(suggestions) and suggestions[0] == original
+        top5 += original in suggestions[:5]
+
+    return {
+        'precision': true_positive / max(true_positive + false_positive, 1),
+        'recall': true_positive / max(true_positive + false_negative, 1),
+        'top1': top1 / max(len(corrections), 1),
+        'top5': top5 / max(len(corrections), 1),
+        'p50_ms': _percentile(latencies, 0.5),
+        'p99_ms': _percentile(latencies, 0.99),
+        'corrections': len(corrections),
+    }
+
+
+def pareto_front(results: Dict[str, dict]) -> List[str]:
+    """Настройки, для которых нет другой и быстрее (p50), и точнее (top-5)"""
+    front = []
+    for name, result in results.items():
+        dominated = any(
+            other['p50_ms'] <= result['p50_ms'] and other['top5'] >= result['top5']
+            and (other['p50_ms'] < result['p50_ms'] or other['top5'] > result['top5'])
+            for other_name, other in results.items() if other_name != name
+        )
+        if not dominated:
+            front.append(name)
+    return front
+
+
+def print_pareto_table(results: Dict[str, dict]) -> None:
+    front = set(pareto_front(results))
+    print(f"\n{'настройка':<16}{'точность':>10}{'полнота':>10}{'top-1':>8}{'top-5':>8}"
+          f"{'p50, мс':>10}{'p99, мс':>10}  Парето")
+    for name, result in sorted(results.items(), key=lambda x: x[1]['p50_ms']):
+        print(f"{name:<16}{result['precision']:>10.3f}{result['recall']:>10.3f}{result['top1']:>8.3f}"
+              f"{result['top5']:>8.3f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+              f"  {'★' if name in front else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Качество исправлений против задержки')
+    parser.add_argument('--configs', nargs='+', choices=list(CONFIGS), default=['web', 'web-exact-d1', 'dawg-d1', 'dawg-d2'],
+                       help='Какие движки и настройки оценивать')
+    parser.add_argument('--basic-model', default=str(project_root / "2_basis" / "georgian_spellchecker.pkl"),
+                       help='Модель GeorgianSpellChecker (и словарь для DAWG)')
+    parser.add_argument('--advanced-model',
+                       default=str(project_root / "4_advanced" / "advanced_georgian_spellchecker.pkl"),
+                       help='Модель AdvancedGeorgianSpellChecker')
+    parser.add_argument('--corpus', default=str(project_root / "1_collect" / "corpus"),
+                       help='Корпус, из которого откладываются файлы')
+    parser.add_argument('--holdout-files', type=int, default=50,
+                       help='Сколько файлов корпуса отложить')
+    parser.add_argument('--sentences', type=int, default=300,
+                       help='Предложений в размеченном наборе')
+    parser.add_argument('--typo-rate', type=float, default=0.15,
+                       help='Доля слов, заменяемых опечатками')
+    parser.add_argument('--corrections', type=int, default=50,
+                       help='Сколько обнаруженных опечаток исправлять (перебор словаря медленный)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Seed отложенных файлов и опечаток')
+    parser.add_argument('--output', default=None,
+                       help='Сохранить набор и результаты в JSON')
+    args = parser.parse_args()
+
+    labeled = build_labeled_set(Path(args.corpus), args.holdout_files, args.sentences,
+                                args.typo_rate, args.seed)
+    sentences = labeled['sentences']
+    if not sentences:
+        print(f"❌ В корпусе нет предложений: {args.corpus}")
+        return
+    typo_count = sum(len(sentence['typos']) for sentence in sentences)
+    print(f"Размеченный набор: {len(sentences)} предложений, {typo_count} опечаток "
+          f"из {len(labeled['holdout_files'])} отложенных файлов")
+
+    engines = Engines(args.basic_model, args.advanced_model)
+    results = {}
+    for name in args.configs:
+        description, make = CONFIGS[name]
+        print(f"⏱  {name} ({description})...")
+        try:
+            is_correct, suggest = make(engines)
+        except (ImportError, OSError) as e:
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+            continue
+        results[name] = evaluate(is_correct, suggest, sentences, args.corrections)
+
+    if not results:
+        return
+    print_pareto_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'seed': args.seed, 'labeled': labeled, 'results': results,
+                       'pareto': pareto_front(results)}, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Нагрузочное тестирование веб-интерфейса
+Генератор нагрузки (только стандартная библиотека) отправляет реальные
+грузинские тексты с опечатками на /check, слова на /suggest и, при
+необходимости, пачки текстов на отдельный эндпоинт:
+- замкнутый цикл: --concurrency N клиентов, каждый ждет ответа
+- открытый цикл: --rps R запросов в секунду по расписанию; задержка
+  считается от запланированного момента, а не от фактической отправки,
+  чтобы перегруженный сервер не прятал очередь (coordinated omission)
+Итог: пропускная способность, p50/p90/p99 и доля ошибок по эндпоинтам.
+
+Поиск кандидатов - чистый Python и упирается в GIL, поэтому важна
+конфигурация сервера. --servers запускает по очереди несколько
+конфигураций и сравнивает их на одной нагрузке:
+    dev          - run_web.py (Flask, threaded=True)
+    gunicorn:W   - gunicorn, W процессов
+    gunicorn:WxT - gunicorn, W процессов по T потоков
+gunicorn не входит в requirements.txt: pip install gunicorn (только Linux/macOS).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "2_basis"))
+
+ENDPOINTS = ('check', 'suggest')
+
+
+def _percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))] if ordered else 0.0
+
+
+def build_requests(corpus: Path, count: int, endpoints: List[str], batch_endpoint: Optional[str] = None,
+                   batch_size: int = 10, corpus_files: int = 20, typo_rate: float = 0.1,
+                   seed: int = 42) -> List[Tuple[str, str, Optional[bytes]]]:
+    """Запросы (эндпоинт, путь, тело JSON) из предложений корпуса с опечатками"""
+    from georgian_tokenizer import iter_file_sentences
+    from typo_generator import make_realistic_typo
+
+    rng = random.Random(seed)
+    paths = sorted(corpus.rglob("*.txt"))
+    sentences = [sentence for path in sorted(rng.sample(paths, min(corpus_files, len(paths))))
+                 for sentence in iter_file_sentences(path) if len(sentence) >= 3]
+    if not sentences:
+        return []
+
+    def text() -> str:
+        return ' '.join(make_realistic_typo(word, rng)[0] if len(word) > 3 and rng.random() < typo_rate
+                        else word for word in rng.choice(sentences))
+
+    kinds = list(endpoints) + (['batch'] if batch_endpoint else [])
+    requests = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        if kind == 'check':
+            body = {'text': text()}
+            requests.append((kind, '/check', json.dumps(body, ensure_ascii=False).encode('utf-8')))
+        elif kind == 'suggest':
+            word = rng.choice([word for word in rng.choice(sentences) if len(word) > 3] or ['ტექსტი'])
+            typo = make_realistic_typo(word, rng)[0]
+            requests.append((kind, '/suggest/' + urllib.parse.quote(typo), None))
+        else:
+            body = {'texts': [text() for _ in range(batch_size)]}
+            requests.append((kind, batch_endpoint, json.dumps(body, ensure_ascii=False).encode('utf-8')))
+    return requests
+
+
+def send(base_url: str, path: str, body: Optional[bytes], timeout: float) -> Tuple[int, str]:
+    """Один запрос: (HTTP-статус, ошибка); статус 0 - соединение не удалось"""
+    request = urllib.request.Request(base_url + path, data=body,
+                                     headers={'Content-Type': 'application/json'} if body else {})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status, ''
+    except urllib.error.HTTPError as e:
+        return e.code, f"HTTP {e.code}"
+    except (urllib.error.URLError, OSError) as e:
+        return 0, type(e).__name__
+
+
+def run_load(base_url: str, requests: List[Tuple[str, str, Optional[bytes]]], concurrency: int = 8,
+             rps: float = 0.0, timeout: float = 30.0, max_inflight: int = 256) -> dict:
+    """Нагрузка в замкнутом (concurrency) или открытом (rps > 0) цикле"""
+    results = []
+    lock = threading.Lock()
+
+    def worker(item, scheduled: float) -> None:
+        kind, path, body = item
+        status, error = send(base_url, path, body, timeout)
+        latency = time.perf_counter() - scheduled
+        with lock:
+            results.append((kind, status, error, latency))
+
+    start = time.perf_counter()
+    if rps > 0:
+        with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+            for i, item in enumerate(requests):
+                scheduled = start + i / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(worker, item, scheduled)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for item in requests:
+                pool.submit(lambda item=item: worker(item, time.perf_counter()))
+    wall = time.perf_counter() - start
+
+    by_endpoint = defaultdict(list)
+    for result in results:
+        by_endpoint[result[0]].append(result)
+        by_endpoint['total'].append(result)
+
+    report = {'wall_seconds': wall, 'endpoints': {}}
+    for kind, items in by_endpoint.items():
+        latencies = [latency * 1000 for _, status, _, latency in items if 200 <= status < 300]
+        errors = defaultdict(int)
+        for _, status, error, _ in items:
+            if not 200 <= status < 300:
+                errors[error] += 1
+        report['endpoints'][kind] = {
+            'requests': len(items),
+            'throughput_rps': len(latencies) / wall if wall else 0.0,
+            'error_rate': sum(errors.values()) / len(items),
+            'errors': dict(errors),
+            'p50_ms': _percentile(latencies, 0.5),
+            'p90_ms': _percentile(latencies, 0.9),
+            'p99_ms': _percentile(latencies, 0.99),
+            'max_ms': max(latencies, default=0.0),
+        }
+    return report
+
+
+def server_command(config: str, port: int) -> List[str]:
+    """Команда запуска конфигурации сервера"""
+    if config == 'dev':
+        return [sys.executable, str(project_root / "run_web.py")]
+    if config.startswith('gunicorn:'):
+        workers, _, threads = config.split(':', 1)[1].partition('x')
+        return [sys.executable, '-m', 'gunicorn', '--chdir', str(project_root / "5_web"),
+                '--workers', workers, '--threads', threads or '1', '--preload',
+                '--bind', f'127.0.0.1:{port}', '--timeout', '120', 'web_interface:app']
+    raise ValueError(f"Неизвестная конфигурация сервера: {config}")
+
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float) -> bool:
+    """Ожидание /ready (модель загружается в фоне после старта)"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            return False
+        if send(base_url, '/ready', None, 2.0)[0] == 200:
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def run_server_config(config: str, port: int, warmup, requests, args) -> Optional[dict]:
+    """Запуск сервера, нагрузка, остановка"""
+    base_url = f'http://127.0.0.1:{port}'
+    if config == 'dev' and port != 5000:
+        print("⚠️  run_web.py слушает порт 5000")
+        base_url = 'http://127.0.0.1:5000'
+    # Журнал сервера в файл: журнал каждого запроса в PIPE заполнил бы буфер и остановил сервер
+    log_path = Path(tempfile.gettempdir()) / f"load_test_{config.replace(':', '_')}.log"
+    # gunicorn --preload: модель загружается до fork, и процессы делят ее страницы
+    env = dict(os.environ, SPELLCHECK_LAZY_LOAD='0') if config.startswith('gunicorn:') else None
+    with open(log_path, 'wb') as log:
+        process = subprocess.Popen(server_command(config, port), cwd=project_root, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+    try:
+        if not wait_ready(base_url, process, args.startup_timeout):
+            print(f"❌ {config}: сервер не запустился, журнал: {log_path}")
+            return None
+        # Прогрев: первые запросы заполняют кеши и не входят в замер
+        run_load(base_url, warmup, concurrency=args.concurrency, timeout=args.timeout)
+        return run_load(base_url, requests, args.concurrency, args.rps, args.timeout)
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_report(name: str, report: dict) -> None:
+    print(f"\n{name}: {report['wall_seconds']:.1f} с")
+    print(f"{'эндпоинт':<10}{'запросов':>10}{'запр/с':>10}{'ошибки':>9}"
+          f"{'p50, мс':>10}{'p90, мс':>10}{'p99, мс':>10}{'max, мс':>10}")
+    for kind, stats in sorted(report['endpoints'].items(), key=lambda x: x[0] == 'total'):
+        print(f"{kind:<10}{stats['requests']:>10}{stats['throughput_rps']:>10.1f}{stats['error_rate'] * 100:>8.1f}%"
+              f"{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+        for error, count in stats['errors'].items():
+            print(f"{'':<10}{error}: {count}")
+
+
+def print_comparison(reports: Dict[str, dict]) -> None:
+    print(f"\n{'конфигурация':<16}{'запр/с':>10}{'ошибки':>9}{'p50, мс':>10}{'p99, мс':>10}")
+    for name, report in reports.items():
+        total = report['endpoints']['total']
+        print(f"{name:<16}{total['throughput_rps']:>10.1f}{total['error_rate'] * 100:>8.1f}%"
+              f"{total['p50_ms']:>10.1f}{total['p99_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочное тестирование веб-интерфейса')
+    parser.add_argument('--url', default=None,
+                       help='Уже запущенный сервер (иначе запускаются --servers)')
+    parser.add_argument('--servers', nargs='+', default=['dev'],
+                       help='Конфигурации сервера: dev, gunicorn:W, gunicorn:WxT')
+    parser.add_argument('--port', type=int, default=5000,
+                       help='Порт запускаемого сервера')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS),
+                       help='Эндпоинты для нагрузки (чередуются)')
+    parser.add_argument('--batch-endpoint', default=None,
+                       help='Путь эндпоинта пачек (тело {"texts": [...]})')
+    parser.add_argument('--batch-size', type=int, default=10,
+                       help='Текстов в одной пачке')
+    parser.add_argument('--requests', type=int, default=500,
+                       help='Количество запросов')
+    parser.add_argument('--concurrency', type=int, default=8,
+                       help='Одновременных клиентов (замкнутый цикл)')
+    parser.add_argument('--rps', type=float, default=0.0,
+                       help='Целевая частота запросов (открытый цикл; 0 - замкнутый)')
+    parser.add_argument('--warmup', type=int, default=20,
+                       help='Запросов прогрева перед замером')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                       help='Таймаут одного запроса, с')
+    parser.add_argument('--startup-timeout', type=float, default=180.0,
+                       help='Ожидание запуска сервера, с')
+    parser.add_argument('--corpus', default=str(project_root / "1_collect" / "corpus"),
+                       help='Корпус с текстами для запросов')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Seed выбора текстов и опечаток')
+    parser.add_argument('--output', default=None,
+                       help='Сохранить отчеты в JSON')
+    args = parser.parse_args()
+
+    requests = build_requests(Path(args.corpus), args.requests + args.warmup, args.endpoints,
+                              args.batch_endpoint, args.batch_size, seed=args.seed)
+    if not requests:
+        print(f"❌ В корпусе нет текстов: {args.corpus}")
+        return
+    warmup, requests = requests[:args.warmup], requests[args.warmup:]
+    mode = f"{args.rps:g} запр/с" if args.rps > 0 else f"{args.concurrency} клиентов"
+    print(f"Запросов: {len(requests)} ({', '.join(args.endpoints)}"
+          f"{', ' + args.batch_endpoint if args.batch_endpoint else ''}), {mode}")
+
+    reports = {}
+    if args.url:
+        base_url = args.url.rstrip('/')
+        run_load(base_url, warmup, concurrency=args.concurrency, timeout=args.timeout)
+        reports[base_url] = run_load(base_url, requests, args.concurrency, args.rps, args.timeout)
+    else:
+        for config in args.servers:
+            print(f"🚀 {config}...")
+            report = run_server_config(config, args.port, warmup, requests, args)
+            if report:
+                reports[config] = report
+
+    for name, report in reports.items():
+        print_report(name, report)
+    if len(reports) > 1:
+        print_comparison(reports)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'mode': mode, 'requests': len(requests), 'reports': reports}, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
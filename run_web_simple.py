@@ -25,7 +25,8 @@ def main():
         print("Open your browser and go to: http://localhost:5000")
         print("=" * 50)
         
-        app.run(host='0.0.0.0', port=5000, debug=True)
+        # Без reloader: он импортирует модуль второй раз и загружает вторую копию модели
+        app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
         
     except ImportError as e:
         print(f"Error: {e}")
@@ -2,12 +2,30 @@
 """
 Главный скрипт для полной сборки грузинского спеллчекера
 Запускает все процессы: сбор корпуса, обучение моделей, объединение базовой и продвинутой версий
+
+Сборка описана графом этапов: у каждого этапа есть входы, выходы и
+зависимости. Как в make, этап пропускается, если его выходы на месте и
+не изменились ни входы (по хешу содержимого), ни команда. Хеши и время
+изменения файлов хранятся в .build_state.json: файл с прежними размером и
+временем изменения повторно не читается. Независимые этапы (резервная
+модель, расширение корпуса) идут параллельно с остальными, каждый этап -
+отдельный процесс, его вывод печатается сразу с именем этапа. В конце -
+время и пиковая память каждого этапа.
 """
 
 import os
 import sys
+import ast
+import json
 import pickle
 import time
+import glob
+import hashlib
+import inspect
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 import subprocess
 import shutil
@@ -18,41 +36,30 @@ sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "2_basis"))
 sys.path.insert(0, str(project_root / "4_advanced"))
 
+STATE_PATH = project_root / ".build_state.json"
+# Статусы, после которых зависимые этапы могут выполняться
+DONE = 'выполнен'
+UP_TO_DATE = 'актуален'
+NOT_NEEDED = 'не нужен'
+FAILED = 'ошибка'
+BLOCKED = 'не запущен'
+SUCCESS_STATUSES = (DONE, UP_TO_DATE, NOT_NEEDED)
+
+print_lock = threading.Lock()
+state_lock = threading.Lock()
+
+# Папки, откуда этапы импортируют модули проекта (после папки самого скрипта)
+MODULE_DIRS = [project_root, project_root / "2_basis", project_root / "4_advanced", project_root / "5_web"]
+
+
+def log(message=""):
+    """Печать строки целиком: этапы пишут одновременно"""
+    with print_lock:
+        print(message, flush=True)
+
 def print_step(step_number, description):
     """Красивый вывод шагов процесса"""
-    print(f"\n{'='*60}")
-    print(f"🚀 ШАГ {step_number}: {description}")
-    print(f"{'='*60}")
-
-def run_python_script(script_path, args=None):
-    """Запуск Python скрипта"""
-    if args is None:
-        args = []
-    
-    script_full_path = project_root / script_path
-    if not script_full_path.exists():
-        print(f"❌ Скрипт не найден: {script_path}")
-        return False
-    
-    try:
-        cmd = [sys.executable, str(script_full_path)] + args
-        print(f"📝 Запуск: {' '.join(cmd)}")
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=project_root)
-        
-        if result.returncode == 0:
-            print(f"✅ Успешно: {script_path}")
-            if result.stdout:
-                print(f"📋 Вывод: {result.stdout}")
-            return True
-        else:
-            print(f"❌ Ошибка в {script_path}:")
-            print(f"stderr: {result.stderr}")
-            print(f"stdout: {result.stdout}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Исключение при запуске {script_path}: {e}")
-        return False
+    log(f"\n{'='*60}\n🚀 ШАГ {step_number}: {description}\n{'='*60}")
 
 def ensure_directories():
     """Создание необходимых директорий"""
@@ -71,64 +78,313 @@ def ensure_directories():
         full_path.mkdir(parents=True, exist_ok=True)
         print(f"📁 Создана директория: {dir_path}")
 
-def collect_corpus():
-    """Сбор корпуса текстов"""
-    print_step(1, "СБОР ТЕКСТОВОГО КОРПУСА")
-    
-    # Проверяем, есть ли уже корпус
+def corpus_files():
+    """Текстовые файлы корпуса (верхний уровень)"""
+    return list((project_root / "1_collect" / "corpus").glob("*.txt"))
+
+def corpus_exists():
+    """Сбор не нужен, если корпус уже есть"""
     corpus_dir = project_root / "1_collect" / "corpus"
     if corpus_dir.exists() and any(corpus_dir.iterdir()):
-        print("📚 Корпус уже существует, пропускаем сбор...")
-        return True
-    
-    print("📥 Сбор корпуса с веб-сайтов...")
-    return run_python_script("1_collect/corpus.py")
+        return "📚 Корпус уже существует, пропускаем сбор..."
+    return None
 
-def build_basic_model():
-    """Построение базовой модели"""
-    print_step(2, "ПОСТРОЕНИЕ БАЗОВОЙ МОДЕЛИ")
-    
-    # Запускаем базовый спеллчекер в режиме обучения
-    success = run_python_script("2_basis/georgian_spellchecker.py", ["--build"])
-    
-    if not success:
-        print("🔄 Альтернативный метод: обучение базовой модели...")
-        success = run_python_script("2_basis/georgian_spellchecker.py", ["--train"])
-    
-    return success
+def corpus_large_enough():
+    """Расширение нужно только маленькому корпусу"""
+    txt_files = corpus_files()
+    if len(txt_files) >= 10:
+        return f"📚 Корпус содержит {len(txt_files)} файлов, расширение не требуется"
+    return None
 
-def expand_corpus():
-    """Расширение корпуса"""
-    print_step(3, "РАСШИРЕНИЕ КОРПУСА")
-    
-    # Проверяем, нужно ли расширять корпус
-    corpus_dir = project_root / "1_collect" / "corpus"
-    txt_files = list(corpus_dir.glob("*.txt"))
-    
-    if len(txt_files) < 10:  # Если мало файлов, расширяем
-        print("📈 Расширение корпуса дополнительными текстами...")
-        return run_python_script("3_expand/expand_corpus.py")
-    else:
-        print(f"📚 Корпус содержит {len(txt_files)} файлов, расширение не требуется")
-        return True
 
-def build_advanced_model():
-    """Построение продвинутой модели"""
-    print_step(4, "ПОСТРОЕНИЕ ПРОДВИНУТОЙ МОДЕЛИ")
-    
-    # Проверяем существование базовой модели
-    basic_model_path = project_root / "2_basis" / "georgian_spellchecker.pkl"
-    if not basic_model_path.exists():
-        print("❌ Базовая модель не найдена! Сначала выполните шаг 2.")
-        return False
-    
-    print("🧠 Построение продвинутой модели с N-gram...")
-    return run_python_script("4_advanced/advanced_spellchecker.py", ["--build"])
+class Stage:
+    """Этап сборки: скрипт или функция этого файла, входы, выходы и зависимости
+    deps  - этапы, которые должны завершиться успешно
+    after - этапы, которые просто должны завершиться раньше (успешно или нет)
+    Входы и выходы - пути от корня проекта: файлы, папки или шаблоны (*.py)"""
+
+    def __init__(self, name, number, description, script=None, args=(), retry_args=None,
+                 function=None, inputs=(), outputs=(), deps=(), after=(), cwd=".", skip_if=None):
+        self.name = name
+        self.number = number
+        self.description = description
+        self.script = script
+        self.args = list(args)
+        self.retry_args = retry_args
+        self.function = function
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.after = list(after)
+        self.cwd = project_root / cwd
+        self.skip_if = skip_if
+
+    def command(self, args=None):
+        """Команда процесса этапа; функции запускаются через --stage этого файла"""
+        if self.function is not None:
+            return [sys.executable, str(Path(__file__).resolve()), '--stage', self.name]
+        return [sys.executable, str(project_root / self.script)] + list(self.args if args is None else args)
+
+    def recipe(self):
+        """То, что этап делает: при изменении этап пересобирается"""
+        if self.function is not None:
+            return inspect.getsource(self.function)
+        return json.dumps([self.script, self.args, self.retry_args, str(self.cwd.relative_to(project_root))])
+
+    def code(self):
+        """Файлы кода этапа: скрипт и модули проекта, которые он импортирует (транзитивно)
+        Для этапа-функции - модули, импортируемые в ее теле"""
+        if self.function is not None:
+            tree = ast.parse(inspect.cleandoc('\n' + inspect.getsource(self.function)))
+            return code_dependencies([], imported_modules(tree))
+        script = project_root / self.script
+        return code_dependencies([script], ())
+
+
+def imported_modules(tree):
+    """Имена модулей верхнего уровня из import / from ... import (без относительных)"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return names
+
+def find_module(name, first_dir=None):
+    """Файл модуля проекта (None - модуль стандартный или сторонний)"""
+    for directory in ([first_dir] if first_dir else []) + MODULE_DIRS:
+        for path in (directory / f"{name}.py", directory / name / "__init__.py"):
+            if path.is_file():
+                return path
+    return None
+
+def code_dependencies(scripts, modules):
+    """Скрипты и все модули проекта, которые они импортируют, с обходом импортов модулей"""
+    pending = [path for path in scripts if path.is_file()]
+    pending += [path for path in (find_module(name) for name in sorted(modules)) if path is not None]
+    found = set()
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        try:
+            tree = ast.parse(path.read_text(encoding='utf-8'))
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            continue
+        for name in imported_modules(tree):
+            module = find_module(name, path.parent)
+            if module is not None and module not in found:
+                pending.append(module)
+    # Отсутствующий скрипт тоже входит в ключ (его хеш - None)
+    return sorted(found | {path for path in scripts if not path.is_file()})
+
+
+def expand_paths(patterns):
+    """Файлы по списку путей: папки обходятся рекурсивно; несуществующие пути сохраняются"""
+    paths = []
+    for pattern in patterns:
+        full = project_root / pattern
+        if any(char in pattern for char in '*?['):
+            paths.extend(Path(path) for path in sorted(glob.glob(str(full))))
+        elif full.is_dir():
+            paths.extend(sorted(path for path in full.rglob('*') if path.is_file()))
+        else:
+            paths.append(full)
+    return paths
+
+def file_hash(path, file_cache):
+    """sha256 содержимого (None - файла нет); не изменившиеся файлы не перечитываются"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    relative = str(path.relative_to(project_root))
+    with state_lock:
+        cached = file_cache.get(relative)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with state_lock:
+        file_cache[relative] = [stat.st_size, stat.st_mtime_ns, value]
+    return value
+
+def stage_key(stage, file_cache):
+    """Хеш рецепта, кода этапа и содержимого всех входов
+    Код (скрипт и импортируемые модули) входит в ключ, даже если его нет во входах"""
+    digest = hashlib.sha256(stage.recipe().encode('utf-8'))
+    paths = expand_paths(stage.inputs)
+    listed = set(paths)
+    paths += [path for path in stage.code() if path not in listed]
+    for path in paths:
+        digest.update(str(path.relative_to(project_root)).encode('utf-8'))
+        digest.update(str(file_hash(path, file_cache)).encode('utf-8'))
+    return digest.hexdigest()
+
+def output_hashes(stage, file_cache):
+    """Хеши выходов этапа (None - какого-то выхода нет)"""
+    hashes = {}
+    for pattern in stage.outputs:
+        paths = expand_paths([pattern])
+        if not paths:
+            return None
+        for path in paths:
+            value = file_hash(path, file_cache)
+            if value is None:
+                return None
+            hashes[str(path.relative_to(project_root))] = value
+    return hashes
+
+def load_state():
+    """Состояние прошлых сборок: {'files': ..., 'stages': ...}"""
+    try:
+        with open(STATE_PATH, encoding='utf-8') as f:
+            state = json.load(f)
+        return {'files': state.get('files', {}), 'stages': state.get('stages', {})}
+    except (OSError, ValueError):
+        return {'files': {}, 'stages': {}}
+
+def save_state(state):
+    """Атомарная запись состояния (прерванная сборка не портит файл)"""
+    with state_lock:
+        temp_path = STATE_PATH.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, STATE_PATH)
+
+def exit_code(status):
+    """Код возврата из статуса wait (os.waitstatus_to_exitcode появился в Python 3.9)"""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+def max_rss_mb(usage):
+    """ru_maxrss: килобайты в Linux, байты в macOS"""
+    if sys.platform == 'darwin':
+        return usage.ru_maxrss / 1024 / 1024
+    return usage.ru_maxrss / 1024
+
+def run_process(stage, command):
+    """Запуск процесса этапа с выводом строк по мере появления: (код, пиковая память MB)"""
+    log(f"📝 [{stage.name}] Запуск: {' '.join(command)}")
+    env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+    process = subprocess.Popen(command, cwd=stage.cwd, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace')
+    with process.stdout:
+        for line in process.stdout:
+            log(f"[{stage.name}] {line.rstrip()}")
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = exit_code(status)
+        return process.returncode, max_rss_mb(usage)
+    return process.wait(), None
+
+def run_stage(stage, state, force):
+    """Выполнение одного этапа, если он не актуален"""
+    started = time.time()
+    result = {'status': DONE, 'seconds': 0.0, 'memory_mb': None, 'note': ''}
+    file_cache = state['files']
+
+    if stage.skip_if is not None and not force:
+        reason = stage.skip_if()
+        if reason:
+            log(f"[{stage.name}] {reason}")
+            result.update(status=NOT_NEEDED, seconds=time.time() - started)
+            return result
+
+    key = stage_key(stage, file_cache)
+    recorded = state['stages'].get(stage.name)
+    if not force and stage.outputs and recorded and recorded['key'] == key \
+            and recorded['outputs'] == output_hashes(stage, file_cache):
+        log(f"✅ [{stage.name}] Актуален, входы не изменились")
+        result.update(status=UP_TO_DATE, seconds=time.time() - started)
+        return result
+
+    print_step(stage.number, stage.description)
+    try:
+        returncode, memory = run_process(stage, stage.command())
+        if returncode != 0 and stage.retry_args is not None:
+            log(f"🔄 [{stage.name}] Альтернативный метод: {' '.join(stage.retry_args)}")
+            returncode, retry_memory = run_process(stage, stage.command(stage.retry_args))
+            memory = max(memory or 0, retry_memory or 0) or None
+    except Exception as e:
+        log(f"❌ [{stage.name}] Исключение при запуске: {e}")
+        returncode, memory = -1, None
+    result.update(seconds=time.time() - started, memory_mb=memory)
+
+    if returncode != 0:
+        log(f"❌ [{stage.name}] Ошибка, код {returncode}")
+        result['status'] = FAILED
+        return result
+
+    outputs = output_hashes(stage, file_cache)
+    if stage.outputs and outputs is None:
+        log(f"❌ [{stage.name}] Этап не создал выходы: {', '.join(stage.outputs)}")
+        result['status'] = FAILED
+        return result
+    log(f"✅ [{stage.name}] Успешно за {result['seconds']:.1f} с")
+    if stage.outputs:
+        with state_lock:
+            state['stages'][stage.name] = {'key': key, 'outputs': outputs}
+        save_state(state)
+    return result
+
+def run_pipeline(stages, jobs, force):
+    """Выполнение графа: этап запускается, как только завершены его зависимости"""
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        for dependency in stage.deps + stage.after:
+            if dependency not in by_name:
+                raise ValueError(f"Этап {stage.name} зависит от неизвестного этапа {dependency}")
+
+    state = load_state()
+    results = {}
+    pending = list(stages)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            progressed = False
+            for stage in list(pending):
+                if any(name not in results for name in stage.deps + stage.after):
+                    continue
+                pending.remove(stage)
+                progressed = True
+                failed = [name for name in stage.deps if results[name]['status'] not in SUCCESS_STATUSES]
+                if failed:
+                    log(f"⚠️  [{stage.name}] Пропущен: не выполнены {', '.join(failed)}")
+                    results[stage.name] = {'status': BLOCKED, 'seconds': 0.0, 'memory_mb': None,
+                                           'note': ', '.join(failed)}
+                    continue
+                running[pool.submit(run_stage, stage, state, force)] = stage
+            if not running:
+                if pending and not progressed:
+                    raise ValueError(f"Цикл в зависимостях: {', '.join(stage.name for stage in pending)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                results[stage.name] = future.result()
+    save_state(state)
+    return results
+
+def print_report(stages, results, elapsed):
+    """Время и пиковая память этапов"""
+    print(f"\n{'этап':<22} {'статус':<11} {'время':>9} {'память':>10}")
+    for stage in stages:
+        result = results[stage.name]
+        memory = f"{result['memory_mb']:.0f} MB" if result['memory_mb'] else '-'
+        note = f"  ({result['note']})" if result['note'] else ''
+        print(f"{stage.name:<22} {result['status']:<11} {result['seconds']:>7.1f} с {memory:>10}{note}")
+    total = sum(result['seconds'] for result in results.values())
+    print(f"Сумма времени этапов: {total:.1f} с, сборка: {elapsed:.1f} с")
 
 def merge_models():
     """Объединение базовой и продвинутой моделей"""
-    print_step(5, "ОБЪЕДИНЕНИЕ МОДЕЛЕЙ")
-    
     try:
         # Импортируем классы моделей
         from georgian_spellchecker import GeorgianSpellChecker
@@ -156,7 +412,7 @@ def merge_models():
             # Объединяем словари
             print("🔗 Объединение словарей...")
             merged_vocabulary = basic_model.vocabulary.union(advanced_model.vocabulary)
-            merged_word_freq = basic_model.word_freq.copy()
+            merged_word_freq = Counter(dict(basic_model.word_freq.items()))
             
             # Обновляем частоты из продвинутой модели
             for word, freq in advanced_model.word_freq.items():
@@ -170,6 +426,10 @@ def merge_models():
             merged_model = AdvancedGeorgianSpellChecker()
             merged_model.vocabulary = merged_vocabulary
             merged_model.word_freq = merged_word_freq
+            # Разрядность упакованных частот переходит из исходных моделей
+            freq_bits = getattr(advanced_model.word_freq, 'bits', None) or getattr(basic_model.word_freq, 'bits', None)
+            if freq_bits:
+                merged_model.compact_frequencies(freq_bits)
             
             # Копируем N-gram модели из продвинутой версии
             if hasattr(advanced_model, 'bigram_model'):
@@ -205,8 +465,6 @@ def merge_models():
 
 def create_fallback_model():
     """Создание резервной модели если основные не работают"""
-    print_step(6, "СОЗДАНИЕ РЕЗЕРВНОЙ МОДЕЛИ")
-    
     try:
         from advanced_spellchecker import AdvancedGeorgianSpellChecker
         
@@ -240,8 +498,6 @@ def create_fallback_model():
 
 def test_models():
     """Тестирование созданных моделей"""
-    print_step(7, "ТЕСТИРОВАНИЕ МОДЕЛЕЙ")
-    
     test_cases = [
         "გამარჯობა როგორ ხარ",
         "გამარჯაბა როგოთ ხართ",
@@ -282,10 +538,12 @@ def test_models():
         
         for text in test_cases:
             print(f"\n📝 Текст: '{text}'")
-            errors = model.check_text(text)
+            # У продвинутой модели проверка с контекстом: (слово, исправления, контекст)
+            check_text = getattr(model, 'check_text', None) or model.check_text_with_context
+            errors = check_text(text)
             
             if errors:
-                for word, suggestions in errors:
+                for word, suggestions, *_ in errors:
                     print(f"   ❌ '{word}' -> {suggestions[:3]}")
             else:
                 print("   ✅ Ошибок не найдено")
@@ -296,8 +554,57 @@ def test_models():
         print(f"❌ Ошибка тестирования: {e}")
         return False
 
+# Граф сборки; порядок списка - порядок вывода в отчете
+STAGES = [
+    Stage('collect_corpus', 1, "СБОР ТЕКСТОВОГО КОРПУСА",
+          script="1_collect/corpus.py",
+          inputs=["1_collect/corpus.py"], outputs=["1_collect/corpus"],
+          skip_if=corpus_exists),
+    # Скрипты 2_basis ищут корпус и пишут модель относительно своей папки
+    Stage('build_basic_model', 2, "ПОСТРОЕНИЕ БАЗОВОЙ МОДЕЛИ",
+          script="2_basis/georgian_spellchecker.py", args=["--build"], retry_args=["--train"],
+          cwd="2_basis",
+          inputs=["1_collect/corpus", "2_basis/*.py"],
+          outputs=["2_basis/georgian_spellchecker.pkl"],
+          after=['collect_corpus']),
+    Stage('expand_corpus', 3, "РАСШИРЕНИЕ КОРПУСА",
+          script="3_expand/expand_corpus.py",
+          after=['collect_corpus'], skip_if=corpus_large_enough),
+    Stage('build_advanced_model', 4, "ПОСТРОЕНИЕ ПРОДВИНУТОЙ МОДЕЛИ",
+          script="4_advanced/ngram_counter.py", args=["--output", "advanced_georgian_spellchecker.pkl"],
+          cwd="4_advanced",
+          inputs=["1_collect/corpus", "2_basis/georgian_spellchecker.pkl", "2_basis/*.py", "4_advanced/*.py"],
+          outputs=["4_advanced/advanced_georgian_spellchecker.pkl"],
+          deps=['build_basic_model'], after=['expand_corpus']),
+    Stage('merge_models', 5, "ОБЪЕДИНЕНИЕ МОДЕЛЕЙ", function=merge_models,
+          inputs=["2_basis/georgian_spellchecker.pkl", "4_advanced/advanced_georgian_spellchecker.pkl",
+                  "4_advanced/advanced_spellchecker.py"],
+          outputs=["4_advanced/merged_georgian_spellchecker.pkl", "5_web/merged_georgian_spellchecker.pkl"],
+          deps=['build_basic_model', 'build_advanced_model']),
+    Stage('create_fallback_model', 6, "СОЗДАНИЕ РЕЗЕРВНОЙ МОДЕЛИ", function=create_fallback_model,
+          inputs=["4_advanced/advanced_spellchecker.py"],
+          outputs=["5_web/fallback_spellchecker.pkl"]),
+    # Без выходов: проверка выполняется при каждой сборке
+    Stage('test_models', 7, "ТЕСТИРОВАНИЕ МОДЕЛЕЙ", function=test_models,
+          after=['merge_models', 'create_fallback_model']),
+]
+
 def main():
     """Главная функция"""
+    parser = argparse.ArgumentParser(description='Полная сборка грузинского спеллчекера')
+    parser.add_argument('--force', action='store_true',
+                       help='Выполнить все этапы, даже актуальные')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                       help='Сколько этапов выполнять одновременно')
+    parser.add_argument('--stage', type=str, choices=[stage.name for stage in STAGES if stage.function],
+                       help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Процесс одного этапа-функции, запущенный из графа
+    if args.stage:
+        stage = next(stage for stage in STAGES if stage.name == args.stage)
+        sys.exit(0 if stage.function() else 1)
+
     print("🎯 ЗАПУСК ПОЛНОЙ СБОРКИ ГРУЗИНСКОГО СПЕЛЛЧЕКЕРА")
     print("=" * 60)
     
@@ -307,38 +614,19 @@ def main():
         # Создаем необходимые директории
         ensure_directories()
         
-        # Шаг 1: Сбор корпуса
-        if not collect_corpus():
-            print("⚠️  Пропускаем сбор корпуса...")
-        
-        # Шаг 2: Построение базовой модели
-        if not build_basic_model():
-            print("❌ Ошибка построения базовой модели!")
-            return
-        
-        # Шаг 3: Расширение корпуса (опционально)
-        expand_corpus()
-        
-        # Шаг 4: Построение продвинутой модели
-        if not build_advanced_model():
-            print("⚠️  Продвинутая модель не построена, используем базовую...")
-        
-        # Шаг 5: Объединение моделей
-        if not merge_models():
-            print("⚠️  Объединение моделей не удалось...")
-        
-        # Шаг 6: Резервная модель
-        create_fallback_model()
-        
-        # Шаг 7: Тестирование
-        test_models()
+        results = run_pipeline(STAGES, max(1, args.jobs), args.force)
         
         # Итоговая статистика
         end_time = time.time()
         execution_time = end_time - start_time
+        print_report(STAGES, results, execution_time)
         
+        failed = [name for name, result in results.items() if result['status'] in (FAILED, BLOCKED)]
         print(f"\n{'='*60}")
-        print("🎉 СБОРКА ЗАВЕРШЕНА УСПЕШНО!")
+        if failed:
+            print(f"⚠️  СБОРКА ЗАВЕРШЕНА С ОШИБКАМИ: {', '.join(failed)}")
+        else:
+            print("🎉 СБОРКА ЗАВЕРШЕНА УСПЕШНО!")
         print(f"{'='*60}")
         print(f"⏱️  Время выполнения: {execution_time:.2f} секунд")
         print(f"📁 Проект готов к использованию!")
@@ -348,6 +636,8 @@ def main():
         print(f"   cd 5_web && python web_interface.py")
         print(f"\n🌐 Затем откройте: http://localhost:5000")
         print(f"{'='*60}")
+        if 'build_basic_model' in failed:
+            sys.exit(1)
         
     except KeyboardInterrupt:
         print(f"\n⏹️  Сборка прервана пользователем")
@@ -357,4 +647,4 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
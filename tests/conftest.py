@@ -0,0 +1,15 @@
+# conftest.py
+"""
+Общая настройка тестов: модули проекта лежат в папках этапов (2_basis,
+4_advanced, 5_web) и импортируются так же, как их импортируют сами этапы
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+for folder in ("2_basis", "4_advanced", "5_web"):
+    path = str(project_root / folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
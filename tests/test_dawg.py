@@ -0,0 +1,99 @@
+# test_dawg.py
+"""DAWG: членство и частоты как у словаря, нечеткий поиск совпадает с полным перебором"""
+
+import pickle
+import random
+
+import pytest
+
+import browser_dictionary
+from dawg import Dawg
+
+ALPHABET = 'აბგდევზთიკლმნოპ'
+
+
+def levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        previous, row[0] = row[0], i
+        for j, char_b in enumerate(b, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (char_a != char_b))
+    return row[-1]
+
+
+@pytest.fixture(scope='module')
+def word_freq():
+    rng = random.Random(7)
+    words = {''.join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 8))) for _ in range(3000)}
+    words |= {'სახლი', 'სახლის', 'სახლებს', 'ქალაქი', 'და'}
+    return {word: rng.randint(1, 100000) for word in words}
+
+
+@pytest.fixture(scope='module')
+def dawg(word_freq):
+    return Dawg.build(word_freq)
+
+
+def test_membership_and_frequencies(dawg, word_freq):
+    assert len(dawg) == len(word_freq)
+    assert list(dawg) == sorted(word_freq)
+    assert dict(dawg.items()) == word_freq
+    for word, freq in word_freq.items():
+        assert word in dawg
+        assert dawg.get(word) == dawg[word] == freq
+    for word in ('', 'სახლ', 'სახლიი', 'ქალაქები', 'xyz'):
+        assert word not in dawg
+        assert dawg.get(word, -1) == -1
+    with pytest.raises(KeyError):
+        dawg['სახლ']
+    assert list(dawg.iter_prefix('სახლ')) == ['სახლებს', 'სახლი', 'სახლის']
+    assert list(dawg.iter_prefix('xyz')) == []
+
+
+@pytest.mark.parametrize('max_distance', [0, 1, 2])
+def test_fuzzy_matches_brute_force(dawg, word_freq, max_distance):
+    rng = random.Random(max_distance)
+    queries = ['სახლო', 'ქალქი', 'დ', ''] + rng.sample(sorted(word_freq), 20)
+    queries += [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(2, 7))) for _ in range(20)]
+    for query in queries:
+        expected = {}
+        for word in word_freq:
+            distance = levenshtein(query, word)
+            if distance <= max_distance:
+                expected[word] = distance
+        results = dawg.fuzzy(query, max_distance)
+        assert len(results) == len(expected)
+        assert dict(results) == expected
+
+
+def test_bytes_pickle_and_mmap_round_trip(dawg, word_freq, tmp_path):
+    copy = Dawg(dawg.to_bytes())
+    assert dict(copy.items()) == word_freq
+    copy = pickle.loads(pickle.dumps(dawg))
+    assert isinstance(copy, Dawg) and dict(copy.items()) == word_freq
+    path = str(tmp_path / 'words.dawg')
+    dawg.save(path)
+    for use_mmap in (True, False):
+        loaded = Dawg.load(path, use_mmap=use_mmap)
+        assert 'სახლის' in loaded and 'სახლ' not in loaded
+        assert loaded.get('ქალაქი') == word_freq['ქალაქი']
+    with pytest.raises(ValueError):
+        Dawg(b'\x00' * len(dawg.to_bytes()))
+
+
+def test_browser_export_matches_dawg(dawg, word_freq):
+    data = browser_dictionary.export_vocabulary(dawg)
+    for word in list(word_freq)[:500] + ['სახლ', 'სახლიი', 'xyz']:
+        assert browser_dictionary.contains(data, word) == (word in dawg)
+
+
+def test_browser_export_skips_words_outside_bmp():
+    words = {'სახლი': 3, 'ქალაქი': 2, 'სახლი\U0001F600': 1}
+    non_bmp = Dawg.build(words)
+    with pytest.raises(ValueError):
+        browser_dictionary.export_dawg(non_bmp)
+    data = browser_dictionary.export_vocabulary(non_bmp)
+    assert browser_dictionary.contains(data, 'სახლი')
+    assert browser_dictionary.contains(data, 'ქალაქი')
+    assert not browser_dictionary.contains(data, 'სახლი\U0001F600')
+    assert browser_dictionary.export_vocabulary(object()) is None
@@ -0,0 +1,38 @@
+# test_frequency_table.py
+"""Упакованные частоты: разрядность сохраняется в модели и восстанавливается при загрузке"""
+
+from collections import Counter
+
+import pytest
+
+from advanced_spellchecker import AdvancedGeorgianSpellChecker
+from frequency_table import FrequencyTable
+
+
+@pytest.mark.parametrize('bits', [8, 16, 32])
+def test_compact_frequencies_survive_save_and_load(tmp_path, bits):
+    checker = AdvancedGeorgianSpellChecker()
+    checker.word_freq = Counter({f"სიტყვა{i}": 1000000 // (i + 1) for i in range(3000)})
+    checker.vocabulary = set(checker.word_freq)
+    checker.compact_frequencies(bits)
+    saved = dict(checker.word_freq.items())
+
+    path = tmp_path / 'model.pkl'
+    checker.save_advanced_model(str(path))
+    loaded = AdvancedGeorgianSpellChecker()
+    loaded.load_advanced_model(str(path))
+
+    assert isinstance(loaded.word_freq, FrequencyTable)
+    assert loaded.word_freq.bits == bits
+    assert dict(loaded.word_freq.items()) == saved
+
+
+def test_plain_counter_stays_counter(tmp_path):
+    checker = AdvancedGeorgianSpellChecker()
+    checker.word_freq = Counter({'სახლი': 5, 'ქალაქი': 2})
+    checker.vocabulary = set(checker.word_freq)
+    path = tmp_path / 'model.pkl'
+    checker.save_advanced_model(str(path))
+    loaded = AdvancedGeorgianSpellChecker()
+    loaded.load_advanced_model(str(path))
+    assert loaded.word_freq == checker.word_freq
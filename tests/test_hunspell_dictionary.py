@@ -0,0 +1,91 @@
+# test_hunspell_dictionary.py
+"""Словарь Hunspell: разбор аффиксов, одинаковые границы в обоих путях и кеш проверки"""
+
+import pickle
+
+import pytest
+
+from hunspell_dictionary import HunspellDictionary
+
+AFF = """SET UTF-8
+PFX P Y 1
+PFX P 0 გა .
+SFX S Y 2
+SFX S 0 ს .
+SFX S ი ს ი
+SFX E Y 1
+SFX E ი ებს ი
+"""
+DIC = """5
+სახლი/SE
+კეთება/P
+წერა/PS
+ი/S
+ქალაქი
+"""
+
+
+@pytest.fixture
+def paths(tmp_path):
+    (tmp_path / 'test.aff').write_text(AFF, encoding='utf-8')
+    (tmp_path / 'test.dic').write_text(DIC, encoding='utf-8')
+    return str(tmp_path / 'test.dic')
+
+
+@pytest.mark.parametrize('cache_size', [0, 3])
+def test_affixes(paths, cache_size):
+    dictionary = HunspellDictionary.load(paths, cache_size=cache_size)
+    for _ in range(2):
+        assert 'სახლი' in dictionary
+        assert 'სახლის' in dictionary and 'სახლს' in dictionary
+        assert 'სახლებს' in dictionary
+        assert 'გაკეთება' in dictionary
+        assert 'გაწერას' in dictionary
+        assert 'ქალაქის' not in dictionary
+        assert 'გასახლი' not in dictionary
+    assert len(dictionary._known) <= cache_size
+
+
+def test_affix_never_covers_the_whole_word(paths):
+    """Окончание, равное всему слову, не принимается ни одним путем проверки"""
+    dictionary = HunspellDictionary.load(paths, cache_size=0)
+    assert 'ი' in dictionary
+    # 'ს' = основа 'ი' без strip 'ი' + окончание 'ს': от слова ничего не остается
+    assert 'ს' not in dictionary
+    assert list(dictionary._roots('ს', suffix=True)) == []
+    assert 'ს' not in dictionary.words()
+
+
+def test_expanded_forms_are_accepted(paths):
+    dictionary = HunspellDictionary.load(paths)
+    forms = dictionary.words()
+    assert {'სახლი', 'სახლის', 'სახლს', 'სახლებს', 'გაწერას', 'ის'} <= forms
+    assert all(form in dictionary for form in forms)
+
+
+def test_cache_is_not_pickled(paths):
+    dictionary = HunspellDictionary.load(paths)
+    assert 'სახლის' in dictionary
+    copy = pickle.loads(pickle.dumps(dictionary))
+    assert copy._known == {}
+    assert 'სახლის' in copy
+
+
+@pytest.mark.parametrize('start', ['', 'ს', 'სა', 'სახლ', 'გა', 'გაწ', 'ის', 'ი', 'ქ', 'ჰ'])
+def test_forms_starting_with_matches_full_expansion(paths, start):
+    dictionary = HunspellDictionary.load(paths)
+    expected = {form for form in dictionary.words() if form.startswith(start)}
+    assert set(dictionary.forms_starting_with(start)) == expected
+
+
+def test_candidate_search_expands_only_matching_stems(paths, monkeypatch):
+    from candidate_search import CandidateSearch
+    dictionary = HunspellDictionary.load(paths)
+    forms = dictionary.words()
+    frequencies = {form: rank for rank, form in enumerate(sorted(forms))}
+    expected = CandidateSearch(forms, frequencies)
+    # Поиск не должен разворачивать весь словарь
+    monkeypatch.setattr(HunspellDictionary, '__iter__', lambda self: pytest.fail('полное развертывание'))
+    search = CandidateSearch(dictionary, frequencies)
+    for word in ('სახლო', 'სახლებ', 'გაკეთებო', 'გაწერს', 'ქალაქო'):
+        assert search.generate_candidates_fast(word, 2) == expected.generate_candidates_fast(word, 2)
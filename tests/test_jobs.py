@@ -0,0 +1,109 @@
+# test_jobs.py
+"""Задания: результаты по абзацам, partial, продолжение после перезапуска"""
+
+import time
+
+import pytest
+
+from jobs import JobManager, split_paragraphs
+
+
+def fake_check(paragraph):
+    """Ошибка - каждое слово "ბაგ"; абзац со словом "ნელა" не уложился в срок"""
+    errors = []
+    position = paragraph.find('ბაგ')
+    if position >= 0:
+        errors.append({'word': 'ბაგ', 'suggestions': [], 'start_pos': position, 'end_pos': position + 3})
+    return errors, 'ნელა' in paragraph
+
+
+def wait_finished(manager, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in ('done', 'cancelled', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Задание не завершилось: {manager.get(job_id)}")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite")
+
+
+def test_split_paragraphs_offsets():
+    document = "პირველი\n\n  \nმეორე ხაზი"
+    assert split_paragraphs(document) == [(0, "პირველი"), (12, "მეორე ხაზი")]
+
+
+def test_results_are_shifted_and_partial_is_reported(db_path):
+    manager = JobManager(db_path, fake_check, workers=1)
+    try:
+        job_id = manager.submit("კარგი ტექსტი\nაქ ბაგ არის\nნელა ბაგ")
+        job = wait_finished(manager, job_id)
+    finally:
+        manager.close()
+    assert job['status'] == 'done'
+    assert job['progress'] == {'done': 3, 'total': 3, 'percent': 100.0}
+    assert [error['start_pos'] for error in job['errors']] == [16, 30]
+    assert job['partial'] is True
+    assert job['partial_paragraphs'] == [2]
+    # Опрос по частям: только абзацы с номера since
+    assert manager.get(job_id, since=2)['errors'] == job['errors'][1:]
+
+
+def test_interrupted_job_is_resumed_by_next_process(db_path):
+    def blocked(paragraph):
+        raise SystemExit  # "процесс" останавливается, не записав абзац
+
+    # Прежний запуск взял задание и остановился; аренда истекает без продления
+    first = JobManager(db_path, blocked, workers=1, lease=0.2)
+    first.close()
+    job_id = first.submit("ერთი\nორი ბაგ")
+    time.sleep(0.3)
+    assert first.get(job_id)['status'] == 'running'
+
+    # Новый запуск (PID может совпасть с прежним) продолжает задание
+    second = JobManager(db_path, fake_check, workers=1, lease=0.2)
+    try:
+        assert second.resume() == 1
+        job = wait_finished(second, job_id)
+    finally:
+        second.close()
+    assert job['status'] == 'done'
+    assert job['error_count'] == 1
+
+
+def test_live_owner_keeps_its_job(db_path):
+    started = []
+
+    def slow(paragraph):
+        started.append(paragraph)
+        time.sleep(0.5)
+        return [], False
+
+    owner = JobManager(db_path, slow, workers=1, lease=0.2)
+    other = JobManager(db_path, fake_check, workers=1, lease=0.2)
+    try:
+        job_id = owner.submit("ერთი\nორი")
+        time.sleep(0.3)
+        # Аренда продлевается, пока владелец жив: другой процесс задание не забирает
+        assert other.resume() == 0
+        wait_finished(owner, job_id)
+    finally:
+        owner.close()
+        other.close()
+    assert started == ["ერთი", "ორი"]
+
+
+def test_cancel(db_path):
+    manager = JobManager(db_path, lambda paragraph: (time.sleep(0.05) or [], False), workers=1)
+    try:
+        job_id = manager.submit("\n".join(["აბზაცი"] * 50))
+        assert manager.cancel(job_id)
+        job = wait_finished(manager, job_id)
+    finally:
+        manager.close()
+    assert job['status'] == 'cancelled'
+    assert not manager.cancel(job_id)
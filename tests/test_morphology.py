@@ -0,0 +1,90 @@
+# test_morphology.py
+"""Морфология: разбиения, кандидаты обходом деревьев и их слияние со словарем"""
+
+import random
+from collections import Counter
+
+from georgian_spellchecker import GeorgianSpellChecker, levenshtein_distance
+from morphology import MorphologyIndex
+
+STEMS = {
+    'სახლ': {'ი', 'ის', 'ში', 'ებს'},
+    'ქალაქ': {'ი', 'ის', 'ში'},
+    'მასწავლებელ': {'ი', 'ს', 'მა'},
+    'წიგნ': {'ი', 'ის', 'ებს'},
+}
+
+
+def brute_force(morphology, word, max_distance):
+    """Прежний поиск: перебор всех основ и окончаний"""
+    found = {}
+    for start in morphology.suffix_starts(word):
+        if start < morphology.min_stem_len:
+            continue
+        for stem, endings in morphology.stem_endings.items():
+            distance = levenshtein_distance(word[:start], stem)
+            if distance <= max_distance and morphology._compatible(endings, word[start:]):
+                found[stem + word[start:]] = min(distance, found.get(stem + word[start:], distance))
+    for end, endings in morphology.stem_ends(word):
+        for suffix in morphology.suffixes:
+            distance = levenshtein_distance(word[end:], suffix)
+            if distance <= max_distance and morphology._compatible(endings, suffix):
+                found[word[:end] + suffix] = min(distance, found.get(word[:end] + suffix, distance))
+    return found
+
+
+def test_accepts_known_stem_and_suffix():
+    morphology = MorphologyIndex(STEMS, min_cooccurrence=1)
+    assert morphology.accepts('სახლში')
+    # 'ებს' у основы не засвидетельствовано, но часто встречается вместе с 'ის'
+    assert morphology.accepts('ქალაქებს')
+    assert not morphology.accepts('სახლ')
+    assert ('სახლ', 'ში') in morphology.splits('სახლში')
+
+
+def test_candidates_for_stem_and_suffix_errors():
+    morphology = MorphologyIndex(STEMS, min_cooccurrence=10)
+    assert dict(morphology.candidates('სახკში', 1)) == {'სახლში': 1}
+    assert dict(morphology.candidates('სახლშა', 1)) == {'სახლში': 1}
+    assert morphology.candidates('ჰჰჰჰჰჰჰ', 2) == []
+
+
+def test_trie_walk_matches_brute_force():
+    rng = random.Random(7)
+    morphology = MorphologyIndex(STEMS, min_cooccurrence=1)
+    letters = 'აბგდევზთიკლმნოპრსტუფქღყშჩცძწჭხჯჰ'
+    forms = [stem + suffix for stem, endings in STEMS.items() for suffix in endings]
+    for _ in range(300):
+        word = list(rng.choice(forms))
+        position = rng.randrange(len(word))
+        operation = rng.choice('sdi')
+        if operation == 's':
+            word[position] = rng.choice(letters)
+        elif operation == 'd':
+            del word[position]
+        else:
+            word.insert(position, rng.choice(letters))
+        word = ''.join(word)
+        for max_distance in (1, 2):
+            assert dict(morphology.candidates(word, max_distance)) == brute_force(morphology, word, max_distance)
+
+
+def test_generate_candidates_merges_dictionary_and_morphology():
+    checker = GeorgianSpellChecker()
+    checker.word_freq = Counter({'სახლი': 50, 'სახლის': 20, 'სახლში': 10, 'ქალაქი': 30, 'ქალაქის': 5,
+                                 'ქალაქში': 5, 'წიგნი': 8, 'წიგნის': 3})
+    checker.vocabulary = set(checker.word_freq)
+    checker.morphology = MorphologyIndex(STEMS, min_cooccurrence=1)
+
+    # Опечатка в основе формы, которой нет в словаре: 'სახლებს' - только морфология
+    candidates = checker.generate_candidates('სახკებს', 1)
+    assert candidates == ['სახლებს']
+    # Слова словаря и формы морфологии вместе; при равном расстоянии словарь первым
+    candidates = checker.generate_candidates('სახლიბ', 2)
+    assert candidates[:3] == ['სახლი', 'სახლის', 'სახლში']
+    assert set(candidates[3:]) == {'სახლმა', 'სახლს', 'სახლებს'}
+    # Без морфологии - те же кандидаты, что и перебор словаря
+    checker.morphology = None
+    expected = sorted((word for word in checker.vocabulary if levenshtein_distance('სახლა', word) <= 2),
+                      key=lambda word: (levenshtein_distance('სახლა', word), -checker.word_freq[word]))
+    assert checker.generate_candidates('სახლა') == expected
@@ -0,0 +1,58 @@
+# test_ngram_counter.py
+"""Внешний подсчет n-грамм: маленький бюджет дает те же модели, что подсчет в памяти"""
+
+import os
+from collections import Counter, defaultdict
+
+import pytest
+
+from ngram_counter import (
+    PEAK_TOLERANCE, ExternalCounter, build_external, build_models, count_ngrams,
+    measure_counting, synthetic_corpus,
+)
+
+
+def in_memory_models(corpus):
+    bigrams, trigrams = defaultdict(Counter), defaultdict(Counter)
+    for words in corpus:
+        for i in range(len(words) - 1):
+            bigrams[words[i]][words[i + 1]] += 1
+        for i in range(len(words) - 2):
+            trigrams[(words[i], words[i + 1])][words[i + 2]] += 1
+    return bigrams, trigrams
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return synthetic_corpus(sentences=20000, seed=42)
+
+
+def test_small_budget_matches_in_memory_and_stays_within_budget(corpus):
+    memory_mb = 0.25
+    bigrams, trigrams, runs, counting_peak = measure_counting(corpus, memory_mb)
+    assert (bigrams, trigrams) == in_memory_models(corpus)
+    assert runs >= 2
+    assert counting_peak <= memory_mb * 1024 * 1024 * PEAK_TOLERANCE
+
+
+def test_multi_pass_merge(corpus, tmp_path):
+    sample = corpus[:3000]
+    with ExternalCounter(32 * 1024, tmp_dir=str(tmp_path), fan_in=3) as counter:
+        count_ngrams(sample, counter)
+        assert len(counter.runs) > counter.fan_in
+        models = build_models(counter)
+        assert len(counter.runs) <= counter.fan_in
+    assert models == in_memory_models(sample)
+    assert not os.listdir(tmp_path)
+
+
+def test_min_count_drops_rare_ngrams(corpus):
+    sample = corpus[:2000]
+    bigrams, trigrams, stats = build_external(sample, memory_mb=0.05, min_count=3)
+    expected_bigrams, expected_trigrams = in_memory_models(sample)
+    assert stats['runs'] >= 2
+    assert all(count >= 3 for following in bigrams.values() for count in following.values())
+    for word, following in bigrams.items():
+        for next_word, count in following.items():
+            assert expected_bigrams[word][next_word] == count
+    assert sum(map(len, trigrams.values())) < sum(map(len, expected_trigrams.values()))
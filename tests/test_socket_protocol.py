@@ -0,0 +1,162 @@
+# test_socket_protocol.py
+"""Двоичный протокол: кодирование туда и обратно и клиент против сервера на Unix-сокете"""
+
+import os
+import socket
+import socketserver
+import threading
+
+import pytest
+
+from socket_protocol import (
+    HEADER, SUGGEST_PARAMS, OP_PING, OP_CHECK, OP_SUGGEST, STATUS_OK, STATUS_ERROR,
+    ProtocolError, Reader, frame, split_frames, pack_str, pack_strings,
+    encode_ping, decode_ping, encode_suggest, decode_suggest, encode_errors, decode_errors,
+)
+from spellcheck_client import SpellcheckClient, SpellcheckError
+
+VOCABULARY = {'და', 'არის', 'სახლი', 'ქალაქი'}
+VERSION = 'test-version'
+
+
+def test_frames_split_across_reads():
+    data = frame(7, OP_CHECK, pack_strings(['სახლი', 'ა'])) + frame(8, OP_PING)
+    buffer = bytearray()
+    payloads = []
+    for i in range(len(data)):
+        buffer += data[i:i + 1]
+        payloads += split_frames(buffer)
+    assert not buffer
+    assert [HEADER.unpack_from(payload) for payload in payloads] == [(7, OP_CHECK), (8, OP_PING)]
+    reader = Reader(payloads[0], HEADER.size)
+    assert reader.strings() == ['სახლი', 'ა']
+
+
+def test_bodies_round_trip():
+    results = [(True, []), (False, ['სახლი', 'სახლს'])]
+    assert decode_suggest(Reader(encode_suggest(results, True)), 2) == (results, True)
+    errors = [{'word': 'სახლო', 'suggestions': ['სახლი'], 'start_pos': 3, 'end_pos': 8}]
+    assert decode_errors(Reader(encode_errors(errors, False))) == (errors, False)
+    assert decode_ping(Reader(encode_ping('v1', 250))) == ('v1', 250)
+    # Сервер до появления предела в ответе на PING
+    assert decode_ping(Reader(pack_str('v0'))) == ('v0', None)
+
+
+def test_corrupt_input_is_rejected():
+    with pytest.raises(ProtocolError):
+        split_frames(bytearray(b'\xff\xff\xff\xff' + b'\x00' * 8))
+    with pytest.raises(ProtocolError):
+        Reader(pack_str('სახლი')[:-2]).string()
+
+
+def answer(payload, max_words):
+    """Ответ сервера на кадр: словарь VOCABULARY, исправлений нет"""
+    request_id, operation = HEADER.unpack_from(payload)
+    reader = Reader(payload, HEADER.size)
+    if operation == OP_PING:
+        return frame(request_id, STATUS_OK, encode_ping(VERSION, max_words))
+    if operation == OP_SUGGEST:
+        reader.unpack(SUGGEST_PARAMS)
+    words = reader.strings()
+    if len(words) > max_words:
+        return frame(request_id, STATUS_ERROR, pack_str('too many words'))
+    if operation == OP_CHECK:
+        return frame(request_id, STATUS_OK, bytes(word in VOCABULARY for word in words))
+    return frame(request_id, STATUS_OK, encode_suggest([(word in VOCABULARY, []) for word in words], False))
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Сервер на Unix-сокете; batches - размеры принятых групп слов"""
+    path = str(tmp_path / 'spellcheck.sock')
+    batches = []
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            buffer = bytearray()
+            while True:
+                chunk = self.request.recv(65536)
+                if not chunk:
+                    return
+                buffer += chunk
+                payloads = split_frames(buffer)
+                for payload in payloads:
+                    operation = HEADER.unpack_from(payload)[1]
+                    if operation != OP_PING:
+                        reader = Reader(payload, HEADER.size)
+                        if operation == OP_SUGGEST:
+                            reader.unpack(SUGGEST_PARAMS)
+                        batches.append(len(reader.strings()))
+                self.request.sendall(b''.join(answer(payload, server.max_words) for payload in payloads))
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    server = Server(path, Handler)
+    server.path, server.batches, server.max_words = path, batches, 5
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='нужен Unix-сокет')
+def test_client_round_trip_respects_server_limit(server):
+    words = ['და', 'დაა', 'არის', 'სახლო', 'ქალაქი', 'და', 'ბბბ', 'სახლი'] * 3
+    with SpellcheckClient(unix_path=server.path, max_batch=100) as client:
+        assert client.ping() == VERSION
+        assert client.check_words(words) == [word in VOCABULARY for word in words]
+        suggestions, partial = client.suggest_many(words)
+        assert set(suggestions) == {word for word in words if word not in VOCABULARY}
+        assert not partial
+        assert client.server_max_words == 5 and client.max_batch == 5
+        # Одиночные вызовы из многих потоков собираются в группы не больше предела
+        results = {}
+        threads = [threading.Thread(target=lambda w=word: results.setdefault(w, client.is_correct(w)))
+                   for word in words]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {word: word in VOCABULARY for word in words}
+    assert server.batches and max(server.batches) <= 5
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='нужен Unix-сокет')
+def test_pending_requests_fail_when_server_closes(tmp_path):
+    path = str(tmp_path / 'silent.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    accepted = []
+
+    def serve():
+        sock, _ = listener.accept()
+        accepted.append(sock)
+        buffer = bytearray()
+        # Ответ только на PING; на остальные запросы соединение закрывается без ответа
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return
+            buffer += chunk
+            for payload in split_frames(buffer):
+                request_id, operation = HEADER.unpack_from(payload)
+                if operation == OP_PING:
+                    sock.sendall(frame(request_id, STATUS_OK, encode_ping(VERSION, 10)))
+                else:
+                    sock.shutdown(socket.SHUT_RDWR)
+                    return
+
+    threading.Thread(target=serve, daemon=True).start()
+    try:
+        with SpellcheckClient(unix_path=path, connections=1, timeout=5) as client:
+            with pytest.raises((ConnectionError, SpellcheckError)):
+                client.check_words(['და'])
+    finally:
+        listener.close()
+        for sock in accepted:
+            sock.close()
+        if os.path.exists(path):
+            os.remove(path)
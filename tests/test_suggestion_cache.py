@@ -0,0 +1,111 @@
+# test_suggestion_cache.py
+"""Кеш исправлений: версии моделей рядом, очистка по возрасту и LRU, запись при выходе"""
+
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import suggestion_cache
+from suggestion_cache import SuggestionCache
+
+
+def test_versions_coexist(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    old = SuggestionCache(path, 'v1', batch_size=1)
+    old.put('სახლა', ['სახლი'])
+    # Поэтапный деплой: новая версия открывает тот же файл
+    new = SuggestionCache(path, 'v2', batch_size=1)
+    assert new.get('სახლა') is None
+    new.put('სახლა', ['სახელი'])
+    assert old.get('სახლა') == ['სახლი']
+    assert new.get('სახლა') == ['სახელი']
+    # Откат на прежнюю версию: ее записи на месте
+    assert SuggestionCache(path, 'v1').get('სახლა') == ['სახლი']
+
+
+def test_pending_writes_are_visible_before_flush(tmp_path):
+    cache = SuggestionCache(str(tmp_path / "cache.sqlite"), 'v1', batch_size=10)
+    cache.put('ქალაკი', ['ქალაქი'])
+    assert cache.get('ქალაკი') == ['ქალაქი']
+    assert len(cache) == 0
+    cache.flush()
+    assert len(cache) == 1
+
+
+def test_prune_by_age_and_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SuggestionCache(path, 'v1', batch_size=100)
+    for i in range(10):
+        cache.put(f"სიტყვა{i}", [])
+    cache.flush()
+    now = time.time()
+    with sqlite3.connect(path) as connection:
+        # Две записи давно не использовались, остальные - по возрастанию времени
+        connection.execute("UPDATE suggestions SET used = ? WHERE word IN ('სიტყვა0', 'სიტყვა1')",
+                           (now - 30 * 86400,))
+        for i in range(2, 10):
+            connection.execute("UPDATE suggestions SET used = ? WHERE word = ?", (now - 100 + i, f"სიტყვა{i}"))
+
+    SuggestionCache(path, 'v2', max_age_days=7)
+    cache = SuggestionCache(path, 'v1', max_entries=5)
+    assert len(cache) == 5
+    assert cache.get('სიტყვა1') is None and cache.get('სიტყვა4') is None
+    assert cache.get('სიტყვა5') == [] and cache.get('სიტყვა9') == []
+
+
+def test_reads_refresh_last_use(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SuggestionCache(path, 'v1', batch_size=1)
+    cache.put('სახლა', ['სახლი'])
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE suggestions SET used = 1")
+    monkeypatch.setattr(suggestion_cache, 'TOUCH_INTERVAL', 0)
+    assert cache.get('სახლა') == ['სახლი']
+    cache.flush()
+    with sqlite3.connect(path) as connection:
+        used = connection.execute("SELECT used FROM suggestions").fetchone()[0]
+    assert used > time.time() - 60
+
+
+def test_old_file_is_migrated(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE suggestions (model TEXT NOT NULL, word TEXT NOT NULL, "
+                           "suggestions TEXT NOT NULL, PRIMARY KEY (model, word)) WITHOUT ROWID")
+        connection.execute("INSERT INTO suggestions VALUES ('v1', 'სახლა', '[]')")
+    cache = SuggestionCache(path, 'v1')
+    # Записи без времени использования считаются давними и удаляются
+    assert len(cache) == 0
+    cache.put('სახლა', ['სახლი'])
+    cache.flush()
+    assert cache.get('სახლა') == ['სახლი']
+
+
+def test_pending_batch_is_written_at_exit(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    script = (f"from suggestion_cache import SuggestionCache\n"
+              f"cache = SuggestionCache({path!r}, 'v1', batch_size=32)\n"
+              f"cache.put('სახლა', ['სახლი'])\n")
+    subprocess.run([sys.executable, '-c', script], check=True,
+                   cwd=str(Path(suggestion_cache.__file__).parent))
+    assert SuggestionCache(path, 'v1').get('სახლა') == ['სახლი']
+
+
+def test_counters_from_many_threads(tmp_path):
+    cache = SuggestionCache(str(tmp_path / "cache.sqlite"), 'v1', batch_size=1000)
+    cache.put('სახლა', ['სახლი'])
+
+    def lookups():
+        for i in range(2000):
+            cache.get('სახლა' if i % 2 else 'ქალაკი')
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (cache.hits, cache.misses) == (8000, 8000)
+    cache.close()
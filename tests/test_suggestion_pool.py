@@ -0,0 +1,71 @@
+# test_suggestion_pool.py
+"""Пул поиска исправлений: процессы без fork, сроки и флаг просрочки"""
+
+import time
+from collections import Counter
+
+import pytest
+
+from candidate_search import CandidateSearch
+from dawg import Dawg
+from suggestion_pool import SuggestionPool, pool_context, search_until
+
+WORDS = Counter({'სახლი': 50, 'სახლის': 20, 'სახელი': 30, 'ქალაქი': 10, 'წიგნი': 5})
+
+
+class SlowSearch(CandidateSearch):
+    """Поиск, который не укладывается ни в какой разумный срок"""
+
+    def generate_candidates_fast(self, word, max_distance=1, timer=None, deadline=None):
+        time.sleep(1.0)
+        return []
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = SuggestionPool(CandidateSearch(set(WORDS), WORDS), workers=1, queue_size=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_workers_are_not_forked():
+    assert pool_context().get_start_method() in ('forkserver', 'spawn')
+
+
+def test_all_workers_are_started_up_front():
+    pool = SuggestionPool(CandidateSearch(set(WORDS), WORDS), workers=3, queue_size=1)
+    try:
+        assert len(pool.pids) == 3
+    finally:
+        pool.shutdown()
+
+
+def test_pool_matches_search_in_thread(pool):
+    words = ['სახლა', 'ქალაკი', 'ზზზზზ']
+    local = CandidateSearch(set(WORDS), WORDS)
+    found, interrupted, expired = pool.suggest(words, time.time() + 10)
+    assert not expired and not interrupted
+    assert found == search_until(local, words)[0]
+    assert found['სახლა'] == ['სახლი']
+    assert found['ზზზზზ'] == []
+
+
+def test_dawg_vocabulary_is_sent_to_workers():
+    vocabulary = Dawg.build(WORDS)
+    pool = SuggestionPool(CandidateSearch(vocabulary, WORDS), workers=1, queue_size=1)
+    try:
+        found, _, expired = pool.suggest(['სახლა'], time.time() + 10)
+    finally:
+        pool.shutdown()
+    assert not expired
+    assert found == {'სახლა': ['სახლი']}
+
+
+def test_timeout_is_reported_as_expired():
+    pool = SuggestionPool(SlowSearch(set(WORDS), WORDS), workers=1, queue_size=1)
+    try:
+        found, interrupted, expired = pool.suggest(['სახლა'], time.time() + 0.1)
+    finally:
+        pool.shutdown()
+    assert expired
+    assert found == {} and interrupted == {}
@@ -0,0 +1,94 @@
+# test_tenants.py
+"""Словари команд: кандидаты слоя, слияние с исправлениями модели, хранение и токены"""
+
+import pytest
+
+from tenants import TenantOverlay, TenantRegistry, OverlayTooLarge, normalize_words, valid_name
+
+GLOSSARY = {'კომპანია': 5, 'კამპანია': 50, 'პროდუქტი': 3, 'ბრენდი': 1}
+
+
+@pytest.mark.parametrize('use_index', [False, True])
+def test_candidates_with_and_without_index(use_index):
+    overlay = TenantOverlay('acme', GLOSSARY, use_index)
+    assert (overlay.index is not None) == use_index
+    assert overlay.candidates('კომპანიე') == ['კომპანია']
+    # Ближнее слово первым, при равном расстоянии - частое
+    assert overlay.candidates('კამპანია') == ['კამპანია', 'კომპანია']
+    assert overlay.candidates('კმპანია') == ['კამპანია', 'კომპანია']
+    assert overlay.candidates('სულსხვა') == []
+
+
+def test_index_matches_scan_on_random_words():
+    words = {f"{'აბგდე'[i % 5]}{'ვზთიკ'[i // 5 % 5]}ლმნ{i}": i + 1 for i in range(200)}
+    indexed, scanned = TenantOverlay('t', words, True), TenantOverlay('t', words, False)
+    for word in list(words)[:50]:
+        for typo in (word[1:], word[:2] + 'ო' + word[2:], 'ჰ' + word[1:]):
+            assert indexed.candidates(typo) == scanned.candidates(typo)
+
+
+def test_merge_puts_overlay_first_without_duplicates():
+    overlay = TenantOverlay('acme', GLOSSARY)
+    merged = overlay.merge('კმპანია', ['კამპანია', 'კომპანიამ', 'კომპანიის'], limit=4)
+    assert merged == ['კამპანია', 'კომპანია', 'კომპანიამ', 'კომპანიის']
+    # Без кандидатов слоя исправления модели не меняются
+    suggestions = ['ერთი', 'ორი']
+    assert overlay.merge('სულსხვა', suggestions) is suggestions
+
+
+def test_updated_is_copy_on_write():
+    overlay = TenantOverlay('acme', dict(GLOSSARY))
+    changed = overlay.updated({'ახალი': 2}, ['ბრენდი'])
+    assert 'ბრენდი' in overlay and 'ახალი' not in overlay
+    assert 'ბრენდი' not in changed and 'ახალი' in changed
+    assert changed.version != overlay.version
+
+
+def test_complete_by_frequency():
+    overlay = TenantOverlay('acme', GLOSSARY)
+    assert overlay.complete('კ', 2) == ['კამპანია', 'კომპანია']
+    assert overlay.complete('ხ', 2) == []
+
+
+def test_normalize_words():
+    assert normalize_words(['  ბრენდი ', 'ორი სიტყვა', '']) == {'ბრენდი': 1}
+    assert normalize_words({'ბრენდი': 0}) == {'ბრენდი': 1}
+    for bad in ({'ბრენდი': float('inf')}, {'ბრენდი': 'ბევრი'}, [7]):
+        with pytest.raises(ValueError):
+            normalize_words(bad)
+    assert valid_name('team-1.a') and not valid_name('../x') and not valid_name('')
+
+
+def test_registry_put_update_delete(tmp_path):
+    path = str(tmp_path / "tenants.sqlite")
+    registry = TenantRegistry(path, max_words=5, refresh=0)
+    registry.put('acme', dict(GLOSSARY))
+    overlay = registry.update('acme', {'ახალი': 1}, ['ბრენდი'])
+    assert set(overlay.word_freq) == set(GLOSSARY) - {'ბრენდი'} | {'ახალი'}
+
+    # Другой процесс видит правку через базу
+    other = TenantRegistry(path, refresh=0)
+    assert other.get('acme').version == overlay.version
+    assert other.names() == ['acme']
+
+    with pytest.raises(OverlayTooLarge):
+        registry.update('acme', {'ერთი': 1, 'ორი': 1})
+    assert registry.get('acme').version == overlay.version
+
+    assert registry.delete('acme')
+    assert other.get('acme') is None
+    assert not registry.delete('acme')
+
+
+def test_tenant_tokens(tmp_path):
+    registry = TenantRegistry(str(tmp_path / "tenants.sqlite"))
+    assert not registry.check_token('acme', 'anything')
+    token = registry.issue_token('acme')
+    assert registry.has_token('acme')
+    assert registry.check_token('acme', token)
+    assert not registry.check_token('other', token)
+    assert not registry.check_token('acme', '')
+    rotated = registry.issue_token('acme')
+    assert not registry.check_token('acme', token) and registry.check_token('acme', rotated)
+    registry.delete('acme')
+    assert not registry.check_token('acme', rotated)
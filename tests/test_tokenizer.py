@@ -0,0 +1,65 @@
+# test_tokenizer.py
+"""Токенизатор: строковый и потоковый пути дают одинаковые слова"""
+
+import random
+
+import pytest
+
+from georgian_tokenizer import (
+    iter_file_sentences, iter_tokens, normalize_georgian, tokenize_file, tokenize_georgian,
+)
+
+PIECES = [
+    'სახლი', 'ქალაქში', 'ნელ-ნელა', 'ნელ‐ნელა', 'ᲡᲐᲥᲐᲠᲗᲕᲔᲚᲝ', 'Ⴀნბანი', 'ა', 'თბილისი--ში',
+    '-დეფისი', 'ბოლო-', 'word', '123', 'ကမ္ဘာ', 'ё', '—', '«ციტატა»', 'ᲐᲑᲒ-დ',
+]
+SEPARATORS = [' ', ' ', '\n', '. ', '! ', '? ', ', ', '\t', '']
+
+
+def random_text(rng, words):
+    return ''.join(rng.choice(PIECES) + rng.choice(SEPARATORS) for _ in range(words))
+
+
+@pytest.fixture(scope='module')
+def texts():
+    rng = random.Random(13)
+    return [random_text(rng, rng.randint(0, 400)) for _ in range(40)]
+
+
+def test_normalization_folds_capitals_and_hyphens():
+    assert normalize_georgian('ᲡᲐᲥᲐᲠᲗᲕᲔᲚᲝ') == 'საქართველო'
+    assert normalize_georgian('Ⴀ') == 'ა'
+    assert tokenize_georgian('ნელ‐ნელა, Დიდი ა') == ['ნელ-ნელა', 'დიდი']
+
+
+def test_spans_point_into_original_text(texts):
+    for text in texts:
+        tokens = list(iter_tokens(text))
+        assert [word for word, _, _ in tokens] == tokenize_georgian(text)
+        for word, start, end in tokens:
+            assert normalize_georgian(text[start:end]) == word
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 20])
+def test_file_tokens_match_string_tokenizer(tmp_path, texts, chunk_size):
+    for i, text in enumerate(texts):
+        path = tmp_path / f"text_{i}.txt"
+        path.write_text(text, encoding='utf-8')
+        assert tokenize_file(path, chunk_size) == tokenize_georgian(text)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64])
+def test_sentences_do_not_depend_on_chunks(tmp_path, texts, chunk_size):
+    for i, text in enumerate(texts):
+        path = tmp_path / f"text_{i}.txt"
+        path.write_text(text, encoding='utf-8')
+        whole = list(iter_file_sentences(path))
+        assert list(iter_file_sentences(path, chunk_size)) == whole
+        assert [word for sentence in whole for word in sentence] == tokenize_georgian(text)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b'')
+    assert tokenize_file(path) == []
+    assert not any(iter_file_sentences(path))
@@ -0,0 +1,118 @@
+# test_web_interface.py
+"""Эндпоинты веб-интерфейса на маленьком словаре (тестовый клиент Flask)"""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('flask')
+
+WORDS = {'გამარჯობა': 50, 'გამარჯვება': 20, 'გადაწყვეტა': 5, 'საქართველო': 40, 'არის': 100, 'და': 200}
+
+
+@pytest.fixture(scope='module')
+def web(tmp_path_factory):
+    """web_interface с моделью из текстового словаря, загруженной при импорте"""
+    directory = tmp_path_factory.mktemp('web')
+    model = directory / 'vocabulary.txt'
+    model.write_text(''.join(f"{word}\t{freq}\n" for word, freq in WORDS.items()), encoding='utf-8')
+    environment = {
+        'SPELLCHECK_MODEL': str(model),
+        'SPELLCHECK_LAZY_LOAD': '0',
+        'SPELLCHECK_METRICS': '1',
+        'SPELLCHECK_POOL_WORKERS': '0',
+        'SPELLCHECK_SUGGESTION_CACHE': '',
+        'SPELLCHECK_JOBS_DB': str(directory / 'jobs.sqlite'),
+        'SPELLCHECK_TENANTS_DB': str(directory / 'tenants.sqlite'),
+    }
+    saved = {name: os.environ.get(name) for name in environment}
+    os.environ.update(environment)
+    for name in ('metrics', 'web_interface'):
+        sys.modules.pop(name, None)
+    try:
+        module = importlib.import_module('web_interface')
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    module.active_model[0].index_thread.join(timeout=30)
+    module.get_tenant_registry().put('acme', {'გადაწყვეტილება': 3})
+    return module
+
+
+@pytest.fixture
+def client(web):
+    return web.app.test_client()
+
+
+def test_complete_records_metrics(web, client):
+    response = client.get('/complete?prefix=გამ')
+    assert response.status_code == 200
+    assert response.get_json()['completions'][:2] == ['გამარჯობა', 'გამარჯვება']
+
+    response = client.get('/complete?prefix=გად&tenant=acme')
+    assert response.status_code == 200
+    assert 'გადაწყვეტილება' in response.get_json()['completions']
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'spellcheck_requests_total{endpoint="complete"} 2' in metrics
+    assert 'phase="completion"' in metrics
+
+
+def test_model_is_activated_with_warm_pool(web, client, monkeypatch):
+    monkeypatch.setattr(web, 'POOL_WORKERS', 2)
+    assert web.load_and_activate() is None
+    checker = web.active_model[0]
+    try:
+        assert checker.pool and len(checker.pool.pids) == 2
+        assert web.get_suggestion_pool() is checker.pool
+        response = client.post('/check', json={'text': 'გამარჯობს საქართველო'})
+        result = response.get_json()
+        assert response.status_code == 200 and not result['partial']
+        assert result['errors'][0]['suggestions'][0] == 'გამარჯობა'
+        assert checker.pool.submitted == 1
+    finally:
+        checker.index_thread.join(timeout=30)
+        web.stop_suggestion_pool(checker)
+
+
+def test_rollback_keeps_previous_pool(web, client, monkeypatch):
+    monkeypatch.setattr(web, 'POOL_WORKERS', 1)
+    checkers = []
+    try:
+        for _ in range(2):
+            assert web.load_and_activate() is None
+            checkers.append(web.active_model[0])
+        first, second = checkers
+        first_pool, second_pool = first.pool, second.pool
+        assert first_pool and second_pool and web.previous_model[0] is first
+
+        assert client.post('/rollback').status_code == 200
+        assert web.active_model[0] is first and first.pool is first_pool
+        assert web.get_suggestion_pool() is first_pool
+        response = client.post('/check', json={'text': 'გამარჯობს'})
+        assert response.get_json()['errors'][0]['suggestions'][0] == 'გამარჯობა'
+        assert first_pool.submitted == 1
+        # После отката прежней стала вторая модель, и ее пул тоже жив
+        assert web.previous_model[0] is second and second.pool is second_pool
+
+        # Новая модель вытесняет вторую: ее пул останавливается
+        assert web.load_and_activate() is None
+        checkers.append(web.active_model[0])
+        assert second.pool is None and first.pool is first_pool
+    finally:
+        for checker in checkers:
+            checker.index_thread.join(timeout=30)
+            web.stop_suggestion_pool(checker)
+
+
+@pytest.mark.parametrize('body', [{'text': 123}, {'text': ['ტექსტი']}, {'text': 'ტექსტი', 'name': 5},
+                                  ['ტექსტი'], {'text': '   '}])
+def test_create_job_rejects_invalid_body(client, body):
+    response = client.post('/jobs', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()